@@ -0,0 +1,115 @@
+"""Measure the time to list the puzzles in a backup zip.
+
+This compares fully parsing each puzzle, reading only the headers, and using the
+index stored in the zip. Puzzles are generated with a typical amount of map data.
+Run from the repository root:
+
+    python dev/benchmarks/backup_index.py [puzzle count] [voxels per puzzle]
+"""
+from io import BytesIO, TextIOWrapper
+from pathlib import Path
+from typing import Callable, List
+from zipfile import ZIP_LZMA, ZipFile
+import random
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'src'))
+
+from srctools import Property  # noqa: E402
+from backup_index import cached_info, read_index, read_puzzle, write_index  # noqa: E402
+
+
+def make_puzzle(num: int, voxel_count: int) -> bytes:
+    """Generate a puzzle file."""
+    rand = random.Random(num)
+    voxels = Property('Voxels', [
+        Property('Voxel', [
+            Property('Position', f'{rand.randrange(32)} {rand.randrange(32)} {rand.randrange(32)}'),
+            Property('Solid', '1'),
+            Property('Portal0', str(rand.randrange(2))),
+            Property('Portal1', str(rand.randrange(2))),
+            Property('Portal2', str(rand.randrange(2))),
+        ])
+        for _ in range(voxel_count)
+    ])
+    items = Property('Items', [
+        Property('Item', [
+            Property('ID', str(i)),
+            Property('Type', 'ITEM_CUBE'),
+            Property('Deletable', '1'),
+            Property('VoxelPos', '1 2 3'),
+            Property('LocalPos', '0 0 0'),
+            Property('Angles', '0 0 0'),
+        ])
+        for i in range(voxel_count // 20)
+    ])
+    puzzle = Property('portal2_puzzle', [
+        Property('AppID', '644'),
+        Property('Version', '12'),
+        Property('Title', f'Puzzle {num}'),
+        Property('Description', f'The description for puzzle {num}.'),
+        Property('Timestamp_Created', f'0x{0x60000000 + num:016X}'),
+        Property('Timestamp_Modified', f'0x{0x61000000 + num:016X}'),
+        Property('Coop', str(num % 2)),
+        voxels,
+        items,
+    ])
+    return ''.join(puzzle.export()).encode('utf8')
+
+
+def list_full(zip_file: ZipFile, names: List[str]) -> None:
+    """Parse each puzzle entirely, as was done previously."""
+    for name in names:
+        with zip_file.open(name + '.p2c') as f, TextIOWrapper(f, encoding='utf8') as text:
+            Property.parse(text, name).find_key('portal2_puzzle')['title']
+
+
+def list_headers(zip_file: ZipFile, names: List[str]) -> None:
+    """Read just the header of each puzzle."""
+    for name in names:
+        read_puzzle(zip_file, name)
+
+
+def list_index(zip_file: ZipFile, names: List[str]) -> None:
+    """Use the index, falling back to the header."""
+    index = read_index(zip_file)
+    for name in names:
+        if cached_info(index, zip_file, name) is None:
+            read_puzzle(zip_file, name)
+
+
+def measure(data: bytes, func: Callable[[ZipFile, List[str]], None]) -> float:
+    """Time listing the zip, including opening it."""
+    start = time.perf_counter()
+    with ZipFile(BytesIO(data)) as zip_file:
+        names = [name[:-4] for name in zip_file.namelist() if name.endswith('.p2c')]
+        func(zip_file, names)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    """Run the benchmark."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    voxels = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+
+    buf = BytesIO()
+    with ZipFile(buf, 'w', compression=ZIP_LZMA) as zip_file:
+        for i in range(count):
+            zip_file.writestr(f'puzzle_{i}.p2c', make_puzzle(i, voxels))
+        size = sum(info.file_size for info in zip_file.infolist())
+        write_index(zip_file, [read_puzzle(zip_file, f'puzzle_{i}') for i in range(count)])
+    data = buf.getvalue()
+    print(f'{count} puzzles, {size / count / 1024:.0f}KB each, {len(data) / 1024 / 1024:.1f}MB zip.')
+
+    for label, func in [
+        ('Full parse', list_full),
+        ('Headers only', list_headers),
+        ('Indexed', list_index),
+    ]:
+        duration = min(measure(data, func) for _ in range(3))
+        print(f'{label:>12}: {duration * 1000:8.1f}ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+"""Compare box_decomp against the previous grid_optim/bounding_boxes algorithms.
+
+Reports the number of boxes produced (fewer means fewer brushes) and the time taken.
+Run from the repository root: python dev/benchmarks/box_decomp.py
+"""
+from pathlib import Path
+import random
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'src'))
+
+import box_decomp  # noqa: E402
+from plane import Plane  # noqa: E402
+
+
+VOID = object()
+
+
+def old_optimise(grid):
+    """The previous precomp.grid_optim.optimise()."""
+    full_grid = Plane(grid, default=VOID)
+    x_min, y_min = full_grid.mins
+    x_max, y_max = full_grid.maxes
+    x_max += 1
+    y_max += 1
+    for x in range(x_min, x_max):
+        for y in range(y_min, y_max):
+            value = full_grid[x, y]
+            if value is VOID:
+                continue
+            min_x, min_y = x, y
+            x1 = x2 = min_x
+            y1 = y2 = min_y
+            for x1 in range(min_x, x_max + 1):
+                if full_grid[x1, min_y] is not value:
+                    break
+            for y1 in range(min_y, y_max + 1):
+                if any(full_grid[xx, y1] is not value for xx in range(min_x, x1)):
+                    break
+            for y2 in range(min_y, y_max + 1):
+                if full_grid[min_x, y2] is not value:
+                    break
+            for x2 in range(min_x, x_max + 1):
+                if any(full_grid[x2, yy] is not value for yy in range(min_y, y2)):
+                    break
+            if (x1 - min_x) * (y1 - min_y) > (x2 - min_x) * (y2 - min_y):
+                end_x, end_y = x1, y1
+            else:
+                end_x, end_y = x2, y2
+            for xx in range(min_x, end_x):
+                for yy in range(min_y, end_y):
+                    del full_grid[xx, yy]
+            yield min_x, min_y, end_x - 1, end_y - 1, value
+
+
+def old_bounding_boxes(voxels):
+    """The previous editoritems.bounding_boxes(), using tuples instead of Coord."""
+    extent = 50
+    todo = set(voxels)
+    while todo:
+        x1, y1, z1 = x2, y2, z2 = todo.pop()
+        for x in range(x1 + 1, x1 + extent):
+            if (x, y1, z1) in todo:
+                x2 = x
+            else:
+                break
+        for x in range(x1 - 1, x1 - extent, -1):
+            if (x, y1, z1) in todo:
+                x1 = x
+            else:
+                break
+        for y in range(y1 + 1, y1 + extent):
+            if all((x, y, z1) in todo for x in range(x1, x2+1)):
+                y2 = y
+            else:
+                break
+        for y in range(y1 - 1, y1 - extent, -1):
+            if all((x, y, z1) in todo for x in range(x1, x2+1)):
+                y1 = y
+            else:
+                break
+        for z in range(z1 + 1, z1 + extent):
+            if all((x, y, z) in todo for x in range(x1, x2+1) for y in range(y1, y2+1)):
+                z2 = z
+            else:
+                break
+        for z in range(z1 - 1, z1 - extent, -1):
+            if all((x, y, z) in todo for x in range(x1, x2+1) for y in range(y1, y2+1)):
+                z1 = z
+            else:
+                break
+        for x in range(x1, x2+1):
+            for y in range(y1, y2+1):
+                for z in range(z1, z2+1):
+                    todo.discard((x, y, z))
+        yield (x1, y1, z1), (x2, y2, z2)
+
+
+def make_floor(size: int, rand: random.Random) -> dict:
+    """A chamber floor: mostly tiles of two colours, with holes for items."""
+    white, black = object(), object()
+    grid = {}
+    for x in range(size):
+        for y in range(size):
+            if rand.random() < 0.05:
+                continue  # Item/hole.
+            grid[x, y] = white if (x // 7 + y // 5) % 3 else black
+    return grid
+
+
+def make_voxels(size: int, rand: random.Random) -> set:
+    """Embedded voxels for a large item, with a few missing chunks."""
+    return {
+        (x, y, z)
+        for x in range(size)
+        for y in range(size)
+        for z in range(size // 2)
+        if not (rand.random() < 0.03)
+    }
+
+
+def bench(name: str, func, arg, repeat: int = 5) -> tuple:
+    """Time a decomposition, returning the box count and best time."""
+    best = float('inf')
+    count = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = sum(1 for _ in func(arg))
+        best = min(best, time.perf_counter() - start)
+    return count, best
+
+
+def main() -> None:
+    """Run the comparison."""
+    rand = random.Random(1234)
+    for size in [16, 64, 128]:
+        grid = make_floor(size, rand)
+        old_count, old_time = bench('old', old_optimise, grid)
+        new_count, new_time = bench('new', box_decomp.decompose_2d, grid)
+        print(
+            f'2D {size}x{size}: old={old_count} boxes/{old_time * 1000:.1f}ms, '
+            f'new={new_count} boxes/{new_time * 1000:.1f}ms'
+        )
+    for size in [4, 8, 16]:
+        voxels = make_voxels(size, rand)
+        old_count, old_time = bench('old', old_bounding_boxes, voxels)
+        new_count, new_time = bench('new', box_decomp.decompose_3d, voxels)
+        print(
+            f'3D {size}x{size}x{size // 2}: old={old_count} boxes/{old_time * 1000:.1f}ms, '
+            f'new={new_count} boxes/{new_time * 1000:.1f}ms'
+        )
+
+
+if __name__ == '__main__':
+    main()
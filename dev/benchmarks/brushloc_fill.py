@@ -0,0 +1,111 @@
+"""Compare the brushLoc flood fill against the original per-voxel implementation.
+
+Run from the repository root: python dev/benchmarks/brushloc_fill.py
+"""
+from collections import deque
+from pathlib import Path
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'src'))
+
+from srctools import Vec  # noqa: E402
+
+from precomp.brushLoc import Block, Grid  # noqa: E402
+
+
+def old_fill_air(grid: Grid, search_locs) -> None:
+    """The previous implementation, kept for comparison."""
+    queue = deque(search_locs)
+    goo_fillable = [
+        Block.AIR, Block.OCCUPIED,
+        Block.PIT_BOTTOM, Block.PIT_MID, Block.PIT_TOP, Block.PIT_SINGLE,
+    ]
+    while queue:
+        pos, is_goo = queue.popleft()
+        if pos in grid and not (is_goo and grid[pos] in goo_fillable):
+            continue
+        if not ((-15, -15, -15) <= pos <= (40, 40, 40)):
+            raise ValueError('Leak')
+        if is_goo:
+            if grid[pos].is_pit:
+                grid[pos] = Block.from_pitgoo_attr(False, grid[pos].is_top, grid[pos].is_bottom)
+            elif grid[pos.x, pos.y - 1, pos.z].is_solid:
+                grid[pos] = Block.GOO_BOTTOM
+            else:
+                grid[pos] = Block.GOO_MID
+        else:
+            grid[pos] = Block.AIR
+        x, y, z = pos
+        if not is_goo:
+            queue.append((Vec(x, y, z + 1), is_goo))
+        queue.append((Vec(x, y + 1, z), is_goo))
+        queue.append((Vec(x, y - 1, z), is_goo))
+        queue.append((Vec(x + 1, y, z), is_goo))
+        queue.append((Vec(x - 1, y, z), is_goo))
+        queue.append((Vec(x, y, z - 1), is_goo))
+
+
+def make_map(size: int) -> tuple:
+    """Build a sealed open chamber, with a goo pool, pillars and a submerged tunnel."""
+    grid = Grid()
+    for x in range(-1, size + 1):
+        for y in range(-1, size + 1):
+            for z in range(-1, size + 1):
+                if x in (-1, size) or y in (-1, size) or z in (-1, size):
+                    grid[x, y, z] = Block.SOLID
+    # Raised floor, with a goo pool and a tunnel underneath.
+    for x in range(size):
+        for y in range(size):
+            grid[x, y, 0] = Block.SOLID
+            grid[x, y, 1] = Block.SOLID
+    for x in range(2, size // 2):
+        for y in range(2, size // 2):
+            grid.set_region((x, y, 1), (x, y, 1), Block.GOO_TOP)
+    for x in range(2, size - 2):
+        del grid[x, 4, 0]
+    for x in range(4, size, 4):
+        grid.set_region((x, size - 3, 2), (x, size - 3, size - 2), Block.SOLID)
+
+    goo_locs = [
+        (Vec(x + dx, y + dy, 1), True)
+        for x in range(2, size // 2)
+        for y in range(2, size // 2)
+        for dx, dy in [(-1, 0), (1, 0), (0, 1), (0, -1)]
+    ]
+    air_locs = [
+        (Vec(x, y, 4), False)
+        for x in range(0, size, 5)
+        for y in range(0, size, 5)
+    ]
+    return grid, goo_locs + air_locs
+
+
+def main() -> None:
+    """Run the comparison."""
+    for size in [10, 18, 26]:
+        old_grid, locs = make_map(size)
+        new_grid, _ = make_map(size)
+
+        start = time.perf_counter()
+        old_fill_air(old_grid, locs)
+        old_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        new_grid.fill_air(locs)
+        new_time = time.perf_counter() - start
+
+        assert {
+            pos.as_tuple(): block for pos, block in old_grid.items()
+        } == {
+            pos.as_tuple(): block for pos, block in new_grid.items()
+        }, 'Results differ!'
+        print(
+            f'{size}^3 chamber, {len(new_grid)} voxels: '
+            f'old={old_time * 1000:.1f}ms, new={new_time * 1000:.1f}ms, '
+            f'speedup={old_time / new_time:.1f}x'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""Measure the latency of refreshing, sorting and scrolling a CheckDetails list with many rows.
+
+This fills a list like the package manager's with several thousand items, then times
+adding them, refreshing after a resize, sorting by a column, and scrolling a page.
+The app requires Tk, so on Linux run under a virtual display.
+Run from the repository root:
+
+    xvfb-run python dev/benchmarks/check_details.py [rows]
+"""
+from pathlib import Path
+from typing import Callable, List
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'src'))
+
+from app import TK_ROOT  # noqa: E402
+from app.CheckDetails import CheckDetails, Item  # noqa: E402
+from transtoken import TransToken  # noqa: E402
+
+
+def measure(label: str, func: Callable[[int], object], repeats: int) -> None:
+    """Time a function, including processing the resulting Tk events."""
+    times: List[float] = []
+    for i in range(repeats):
+        start = time.perf_counter()
+        func(i)
+        TK_ROOT.update()
+        times.append(time.perf_counter() - start)
+    print(f'{label:>8}: median {statistics.median(times) * 1000:8.1f}ms, max {max(times) * 1000:8.1f}ms')
+
+
+def main() -> None:
+    """Run the benchmark."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    rand = random.Random(42)
+    tt = TransToken.untranslated
+    items = [
+        Item(
+            tt(f'Package {rand.randrange(10**6):06}'),
+            tt(f'Author {rand.randrange(100)}'),
+            tt('A description of this package, which is too long to fit in the column. ' * 2),
+            state=rand.random() < 0.5,
+        )
+        for _ in range(count)
+    ]
+    details: CheckDetails[None] = CheckDetails(
+        TK_ROOT,
+        headers=[tt('Name'), tt('Author'), tt('Description')],
+    )
+    details.grid(row=0, column=0, sticky='NSEW')
+    TK_ROOT.columnconfigure(0, weight=1)
+    TK_ROOT.rowconfigure(0, weight=1)
+    TK_ROOT.geometry('800x600')
+    TK_ROOT.deiconify()
+    TK_ROOT.update()
+
+    measure('add', lambda i: details.add_items(*items), 1)
+    measure('resize', lambda i: TK_ROOT.geometry(f'{800 + 10 * (i % 2)}x600'), 10)
+    measure('sort', lambda i: details.sort(i % 2, None), 10)
+    measure('scroll', lambda i: details.wid_canvas.yview_scroll(1, 'pages'), 20)
+    print(f'{count} rows, {len(details.rows)} row widgets')
+
+
+if __name__ == '__main__':
+    main()
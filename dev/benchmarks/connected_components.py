@@ -0,0 +1,90 @@
+"""Measure grouping very large contiguous regions of grid cells.
+
+This compares the list-merging previously used for glass floorbeams with the
+union-find engine, for square regions and a winding path of increasing size.
+Run from the repository root:
+
+    python dev/benchmarks/connected_components.py [max side length]
+"""
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'src'))
+
+from union_find import grid_components  # noqa: E402
+
+Cell = Tuple[float, float, float]
+OFFSETS = [(128, 0, 0), (0, 128, 0)]
+
+
+def merge_lists(cells: List[Cell]) -> List[List[Cell]]:
+    """Group cells by merging lists, as was done previously."""
+    groups: Dict[Cell, List[Cell]] = {cell: [cell] for cell in cells}
+    for (x, y, z) in cells:
+        for off_x, off_y, off_z in OFFSETS:
+            neighbour = (x + off_x, y + off_y, z + off_z)
+            if neighbour not in groups:
+                continue
+            our_group = groups[x, y, z]
+            neigh_group = groups[neighbour]
+            if our_group is neigh_group:
+                continue
+            if len(neigh_group) > len(our_group):
+                small_group, large_group = our_group, neigh_group
+            else:
+                small_group, large_group = neigh_group, our_group
+            large_group.extend(small_group)
+            for cell in small_group:
+                groups[cell] = large_group
+    return list({id(group): group for group in groups.values()}.values())
+
+
+def square(size: int) -> List[Cell]:
+    """A solid square region."""
+    return [(x * 128.0, y * 128.0, 0.0) for x in range(size) for y in range(size)]
+
+
+def winding(size: int) -> List[Cell]:
+    """A path winding back and forth, in a square."""
+    cells = []
+    for y in range(size):
+        if y % 2 == 0:
+            cells += [(x * 128.0, y * 128.0, 0.0) for x in range(size)]
+        else:
+            # Only join at alternating ends.
+            x = size - 1 if y % 4 == 1 else 0
+            cells.append((x * 128.0, y * 128.0, 0.0))
+    # Scan the rows in reverse, so the merges are as unbalanced as possible.
+    return cells[::-1]
+
+
+def measure(func: Callable[[List[Cell]], List[List[Cell]]], cells: List[Cell]) -> float:
+    """Time grouping, checking it produces one region."""
+    start = time.perf_counter()
+    groups = func(cells)
+    duration = time.perf_counter() - start
+    assert len(groups) == 1, len(groups)
+    return duration
+
+
+def main() -> None:
+    """Run the benchmark."""
+    max_size = int(sys.argv[1]) if len(sys.argv) > 1 else 1024
+    size = 64
+    while size <= max_size:
+        for label, make in [('square', square), ('winding', winding)]:
+            cells = make(size)
+            merge_time = measure(merge_lists, cells)
+            uf_time = measure(lambda cells: grid_components(cells, OFFSETS), cells)
+            print(
+                f'{label:>7} {size:>4}x{size:<4} {len(cells):>8} cells: '
+                f'list merging {merge_time * 1000:8.1f}ms, '
+                f'union-find {uf_time * 1000:8.1f}ms'
+            )
+        size *= 2
+
+
+if __name__ == '__main__':
+    main()
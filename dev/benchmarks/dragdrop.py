@@ -0,0 +1,81 @@
+"""Measure the cost of drag events and palette edits, with thousands of drag-drop slots.
+
+Target slots are gridded in a window, with grouped items placed in them. This times
+hit-testing the slot under the cursor as a drag moves, dropping items into slots,
+and shift-clicking items off the palette.
+The app requires Tk, so on Linux run under a virtual display.
+Run from the repository root:
+
+    xvfb-run python dev/benchmarks/dragdrop.py [slots]
+"""
+from pathlib import Path
+from typing import Callable, List, Optional
+import random
+import statistics
+import sys
+import time
+import tkinter
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'src'))
+
+from app import TK_ROOT, dragdrop, img  # noqa: E402
+
+
+COLUMNS = 40
+
+
+class Item:
+    """An item which can be dragged around."""
+    def __init__(self, index: int) -> None:
+        self.dnd_icon = img.Handle.color(img.PETI_ITEM_BG, 16, 16)
+        # Groups of a few items, like cubes or gels.
+        self.dnd_group: Optional[str] = f'group_{index // 4}' if index % 3 == 0 else None
+        self.dnd_group_icon = self.dnd_icon
+
+
+def measure(label: str, func: Callable[[int], object], count: int) -> None:
+    """Time each call of a function, then print the median cost."""
+    times: List[float] = []
+    for i in range(count):
+        start = time.perf_counter()
+        func(i)
+        times.append(time.perf_counter() - start)
+    print(f'{label:>14}: median {statistics.median(times) * 1e6:8.1f}us, max {max(times) * 1e6:8.1f}us')
+
+
+def main() -> None:
+    """Run the benchmark."""
+    slot_count = int(sys.argv[1]) if len(sys.argv) > 1 else 4000
+    rand = random.Random(42)
+    manager: dragdrop.Manager[Item] = dragdrop.Manager(TK_ROOT, size=(16, 16))
+    frame = tkinter.Frame(TK_ROOT)
+    frame.grid()
+    items = [Item(i) for i in range(slot_count)]
+    slots = []
+    for i in range(slot_count):
+        slot = manager.slot_target(frame)
+        slot.grid(row=i // COLUMNS, column=i % COLUMNS)
+        slots.append(slot)
+    for slot, item in zip(slots, items):
+        if rand.random() < 0.5:
+            slot.contents = item
+    TK_ROOT.deiconify()
+    TK_ROOT.update()
+
+    left, top = frame.winfo_rootx(), frame.winfo_rooty()
+    width, height = frame.winfo_width(), frame.winfo_height()
+    points = [
+        (left + rand.randrange(width), top + rand.randrange(height))
+        for _ in range(2000)
+    ]
+    # The first lookup in a drag may need to fetch slot positions.
+    start = time.perf_counter()
+    manager._pos_slot(*points[0])
+    print(f'{slot_count} slots, first lookup {(time.perf_counter() - start) * 1000:.1f}ms')
+    measure('drag motion', lambda i: manager._pos_slot(*points[i]), len(points))
+    measure('drop', lambda i: setattr(rand.choice(slots), 'contents', rand.choice(items)), 2000)
+    measure('remove', lambda i: setattr(slots[i], 'contents', None), min(2000, slot_count))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""Measure how long it takes for a compile error to be displayed.
+
+This times from the point VRAD finds an error, until the first /displaydata response
+from the error server. That's done with no server running (cold), and with a resident
+server which is told to reload the pickle from disk.
+This writes the error pickle and server info to the real config folder, like a compile.
+Run from the repository root:
+
+    python dev/benchmarks/error_server.py [repeats]
+"""
+from pathlib import Path
+from typing import Callable, List
+from urllib.request import urlopen
+import json
+import pickle
+import statistics
+import subprocess
+import sys
+import time
+
+SRC = Path(__file__).parent.parent.parent / 'src'
+sys.path.insert(0, str(SRC))
+
+from transtoken import TransToken  # noqa: E402
+from user_errors import DATA_LOC, SERVER_INFO_FILE, ErrorInfo  # noqa: E402
+
+
+def make_error(i: int) -> bytes:
+    """Produce a pickled error, with a reasonable amount of geometry."""
+    info = ErrorInfo(
+        message=TransToken.untranslated(f'Error number {i}'),
+        voxels=[(x, y, 0.0) for x in range(16) for y in range(16)],
+        faces={'white': [{'position': (x, 0.0, 0.0), 'orient': 'u'} for x in range(512)]},
+    )
+    return pickle.dumps(info, pickle.HIGHEST_PROTOCOL)
+
+
+def read_port() -> int:
+    """Read the port from the server info file, raising if not present."""
+    return json.loads(SERVER_INFO_FILE.read_text('utf8'))['port']
+
+
+def display(port: int) -> None:
+    """Request the data the webpage uses to render the error."""
+    with urlopen(f'http://127.0.0.1:{port}/displaydata', timeout=5.0) as resp:
+        resp.read()
+
+
+def cold(data: bytes) -> float:
+    """Boot a new server, as VRAD did for every error previously."""
+    SERVER_INFO_FILE.unlink(missing_ok=True)
+    start = time.perf_counter()
+    DATA_LOC.write_bytes(data)
+    subprocess.Popen([sys.executable, 'compiler_launch.py', 'vrad.exe', '--errorserver'], cwd=SRC)
+    while True:
+        try:
+            port = read_port()
+        except (FileNotFoundError, json.JSONDecodeError):
+            time.sleep(0.01)
+        else:
+            break
+    display(port)
+    return time.perf_counter() - start
+
+
+def warm_reload(data: bytes) -> float:
+    """Tell a resident server to reload the pickle from disk."""
+    port = read_port()
+    start = time.perf_counter()
+    DATA_LOC.write_bytes(data)
+    urlopen(f'http://127.0.0.1:{port}/reload', timeout=5.0).close()
+    display(port)
+    return time.perf_counter() - start
+
+
+def shutdown() -> None:
+    """Stop the running server."""
+    try:
+        urlopen(f'http://127.0.0.1:{read_port()}/shutdown', timeout=5.0).close()
+    except (OSError, json.JSONDecodeError):
+        pass
+    # Wait for it to remove the info file.
+    while SERVER_INFO_FILE.exists():
+        time.sleep(0.01)
+
+
+def run(label: str, func: Callable[[bytes], float], repeats: int, restart: bool) -> None:
+    """Time one of the methods."""
+    times: List[float] = []
+    for i in range(repeats):
+        if restart:
+            shutdown()
+        times.append(func(make_error(i)))
+    print(
+        f'{label:>12}: median {statistics.median(times) * 1000:8.1f}ms, '
+        f'min {min(times) * 1000:8.1f}ms, max {max(times) * 1000:8.1f}ms'
+    )
+
+
+def main() -> None:
+    """Run the benchmark."""
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    try:
+        run('cold', cold, repeats, restart=True)
+        run('warm reload', warm_reload, repeats * 4, restart=False)
+    finally:
+        shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""Measure the cost of finding instances, with and without the instance index.
+
+A dense map is generated, then the lookups done by the passes using the index
+(cubes, glass, track platforms, catwalks, Aperture Tag and vactubes) are repeated.
+Previously each of these looped over every instance in the map. The cost of checking
+the index is in sync with the map, paid on every query, is also compared to a scan.
+Run from the repository root:
+
+    python dev/benchmarks/instance_index.py [instance count]
+"""
+from pathlib import Path
+from typing import List, Set
+import random
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'src'))
+
+from srctools import VMF, Entity  # noqa: E402
+from precomp import instance_index  # noqa: E402
+
+FILES = [f'instances/bee2/item_{i}.vmf' for i in range(200)]
+# The files each pass looks for, with the number of scans it did.
+PASSES = [
+    ('cubes', FILES[0:6], 2),
+    ('glass', FILES[10:12], 1),
+    ('track platforms', FILES[20:26], 2),
+    ('catwalks', FILES[30:31], 1),
+    ('aperture tag', FILES[40:41], 1),
+    ('vactubes', FILES[50:56], 1),
+]
+
+
+def make_map(count: int) -> VMF:
+    """Generate a map with lots of instances."""
+    rand = random.Random(42)
+    vmf = VMF()
+    for i in range(count):
+        vmf.create_ent(
+            'func_instance',
+            targetname=f'inst_{i}',
+            file=rand.choice(FILES).upper(),
+            origin=f'{rand.randrange(-32, 32) * 128} {rand.randrange(-32, 32) * 128} {rand.randrange(0, 16) * 128}',
+            angles='0 0 0',
+        )
+    return vmf
+
+
+def scan(vmf: VMF, files: Set[str]) -> List[Entity]:
+    """Find instances as each pass did previously."""
+    return [
+        inst for inst in vmf.by_class['func_instance']
+        if inst['file'].casefold() in files
+    ]
+
+
+def main() -> None:
+    """Run the benchmark."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    vmf = make_map(count)
+    scans = sum(scan_count for _, _, scan_count in PASSES)
+    print(f'{count} instances, {len(PASSES)} passes.')
+
+    start = time.perf_counter()
+    for _, files, scan_count in PASSES:
+        for _ in range(scan_count):
+            scan(vmf, set(files))
+    scan_time = time.perf_counter() - start
+    print(f'Scanning: {scans} full scans, {scans * count} instances examined, {scan_time * 1000:.1f}ms')
+
+    start = time.perf_counter()
+    index = instance_index.get(vmf)
+    for _, files, scan_count in PASSES:
+        for _ in range(scan_count):
+            index.by_file(files)
+    index_time = time.perf_counter() - start
+    print(f'   Index: 1 full scan, {index.examined} instances examined, {index_time * 1000:.1f}ms')
+
+    # The index is built once, later queries are cheap.
+    start = time.perf_counter()
+    for _, files, scan_count in PASSES:
+        for _ in range(scan_count):
+            index.by_file(files)
+    print(f'   Index queries alone: {(time.perf_counter() - start) * 1000:.2f}ms')
+
+    # Every query first checks the map's instances against the index, so compare that
+    # to the full scan it replaces.
+    repeats = 200
+    start = time.perf_counter()
+    for _ in range(repeats):
+        index._sync()
+    sync_time = (time.perf_counter() - start) / repeats
+    start = time.perf_counter()
+    for _ in range(repeats):
+        scan(vmf, {FILES[0]})
+    scan_time = (time.perf_counter() - start) / repeats
+    print(f'Per query: sync {sync_time * 1000:.2f}ms, full scan {scan_time * 1000:.2f}ms')
+
+
+if __name__ == '__main__':
+    main()
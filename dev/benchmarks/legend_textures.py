@@ -0,0 +1,100 @@
+"""Measure generating the signage and cube colouriser legends during export, with and without the cache.
+
+Signage icons are written as PNGs to a temporary package, so loading them is included.
+The first export is done with an empty cache, then repeated to reuse the cached textures.
+The app's image module requires Tk, so on Linux run under a virtual display.
+Run from the repository root:
+
+    xvfb-run python dev/benchmarks/legend_textures.py [repeats]
+"""
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+import random
+import statistics
+import sys
+import tempfile
+import time
+import types
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'src'))
+
+from PIL import Image  # noqa: E402
+from srctools.filesys import RawFileSystem  # noqa: E402
+
+from app import img, resource_gen  # noqa: E402
+from packages import PackagesSet, signage  # noqa: E402
+import texture_cache  # noqa: E402
+import utils  # noqa: E402
+
+
+def make_icons(folder: Path) -> Dict[int, img.Handle]:
+    """Write out random signage icons, and return handles for them."""
+    rand = random.Random(42)
+    folder.mkdir()
+    img.PACK_SYSTEMS['benchmark'] = RawFileSystem(str(folder))
+    icons = {}
+    for i in range(3, 31):
+        Image.effect_noise((256, 256), rand.randrange(20, 100)).convert('RGBA').save(folder / f'sign_{i}.png')
+        icons[i] = img.Handle.file(
+            utils.PackagePath('benchmark', f'sign_{i}.png'),
+            signage.CELL_SIZE, signage.CELL_SIZE,
+        )
+    return icons
+
+
+def export(icons: Dict[int, img.Handle], colors: Dict[int, tuple]) -> None:
+    """Produce both textures, as an export does."""
+    # Each export loads images fresh.
+    for handle in icons.values():
+        handle._cached_pil = None
+    packset = PackagesSet()
+    # No legend overlays, just the icons.
+    style: Any = types.SimpleNamespace(bases=[])
+    texture_cache.cached(
+        'signage',
+        signage.texture_key(packset, style, icons),
+        lambda: signage.build_texture(packset, style, icons),
+    )
+    hasher = texture_cache.make_hasher('cube_colourizer')
+    hasher.update(repr(sorted(colors.items())).encode())
+    texture_cache.cached(
+        'cube_colourizer', hasher.hexdigest(),
+        lambda: resource_gen.build_cube_colourizer_legend(colors),
+    )
+
+
+def measure(func: Callable[[], None], repeats: int) -> List[float]:
+    """Time a function several times."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def main() -> None:
+    """Run the benchmark."""
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    rand = random.Random(1)
+    colors = {tim: (rand.randrange(256), rand.randrange(256), rand.randrange(256)) for tim in range(3, 31)}
+    with tempfile.TemporaryDirectory() as temp:
+        icons = make_icons(Path(temp, 'package'))
+        texture_cache.CACHE_FOLDER = Path(temp, 'cache')
+
+        def cold() -> None:
+            """Clear the cache, then export."""
+            for file in texture_cache.CACHE_FOLDER.glob('*.vtf'):
+                file.unlink()
+            export(icons, colors)
+
+        for label, func in [
+            ('cold cache', cold),
+            ('warm cache', lambda: export(icons, colors)),
+        ]:
+            times = measure(func, repeats)
+            print(f'{label}: median {statistics.median(times) * 1000:.1f}ms, min {min(times) * 1000:.1f}ms')
+
+
+if __name__ == '__main__':
+    main()
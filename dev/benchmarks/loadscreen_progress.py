@@ -0,0 +1,78 @@
+"""Measure package loading time with the loading screen shown, versus a no-op loader.
+
+This needs a display (the loading screen runs in the background daemon) and a
+packages folder. Run from the repository root:
+
+    python dev/benchmarks/loadscreen_progress.py path/to/packages
+"""
+from pathlib import Path
+from typing import Any, List
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'src'))
+
+import trio  # noqa: E402
+from transtoken import TransToken  # noqa: E402
+
+
+class NullLoader:
+    """Accepts progress updates, but does nothing."""
+    active = True
+
+    def set_length(self, stage: str, num: int) -> None:
+        """Ignored."""
+
+    def step(self, stage: str, disp_name: str = '') -> None:
+        """Ignored."""
+
+    def skip_stage(self, stage: str) -> None:
+        """Ignored."""
+
+
+async def load(pak_dirs: List[Path], loader: Any) -> float:
+    """Load all packages, returning the time taken."""
+    import app
+    import packages
+
+    packset = packages.PackagesSet()
+    start = time.perf_counter()
+    async with trio.open_nursery() as nursery:
+        # Background object types are parsed here too, so include them in the time.
+        app._APP_NURSERY = nursery
+        try:
+            await packages.load_packages(packset, pak_dirs, loader)
+        finally:
+            app._APP_NURSERY = None
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    """Run the comparison."""
+    pak_dirs = [Path(arg) for arg in sys.argv[1:]]
+    if not pak_dirs:
+        sys.exit('Usage: loadscreen_progress.py <package dir>...')
+
+    import loadScreen
+    screen = loadScreen.LoadScreen(
+        ('PAK', TransToken.untranslated('Packages')),
+        ('OBJ', TransToken.untranslated('Objects')),
+        title_text=TransToken.untranslated('Benchmark'),
+    )
+    try:
+        # Alternate so that filesystem caching affects both equally.
+        for run in range(3):
+            off_time = trio.run(load, pak_dirs, NullLoader())
+            with screen:
+                on_time = trio.run(load, pak_dirs, screen)
+            print(
+                f'Run {run}: screen off = {off_time:.2f}s, '
+                f'screen on = {on_time:.2f}s ({on_time / off_time:.2f}x)'
+            )
+    finally:
+        screen.destroy()
+        loadScreen.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""Measure the cost of attributing the map budget to conditions.
+
+A dense map is generated, then conditions are simulated which each add a few entities
+and outputs. This times a checkpoint after every condition which ran, and with
+consecutive conditions from the same source checked together, as check_all() does.
+Run from the repository root:
+
+    python dev/benchmarks/map_budget.py [entity count] [conditions]
+"""
+from pathlib import Path
+from typing import List, Tuple
+import random
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'src'))
+
+from srctools import VMF, Output  # noqa: E402
+from precomp import budget  # noqa: E402
+
+# Each item's conditions are usually consecutive, so sources come in runs of this length.
+RUN_LENGTH = 4
+
+
+def make_map(count: int) -> VMF:
+    """Generate a map with lots of entities and brushes."""
+    rand = random.Random(42)
+    vmf = VMF()
+    for i in range(count // 2):
+        vmf.add_brush(vmf.make_prism((i, 0, 0), (i + 1, 64, 64)).solid)
+    for i in range(count):
+        ent = vmf.create_ent(
+            rand.choice(['func_instance', 'info_target', 'logic_relay', 'func_detail']),
+            targetname=f'ent_{i}',
+        )
+        if ent['classname'] == 'func_detail':
+            ent.solids.append(vmf.make_prism((i, 0, 0), (i + 1, 64, 64)).solid)
+        for _ in range(rand.randrange(3)):
+            ent.add_out(Output('OnTrigger', f'ent_{rand.randrange(count)}', 'Trigger'))
+    return vmf
+
+
+def run(count: int, conditions: List[Tuple[str, int]], batched: bool) -> float:
+    """Simulate running conditions, returning the total time spent in checkpoints."""
+    vmf = make_map(count)
+    budget.start(vmf, 'map')
+    elapsed = 0.0
+    pending = None
+    for source, added in conditions:
+        if batched and pending is not None and source != pending:
+            start = time.perf_counter()
+            budget.checkpoint(vmf, pending)
+            elapsed += time.perf_counter() - start
+            pending = None
+        for i in range(added):
+            vmf.create_ent('info_target', targetname=f'{source}_{i}').add_out(
+                Output('OnUser1', '!self', 'Kill'),
+            )
+        if batched:
+            pending = source
+        else:
+            start = time.perf_counter()
+            budget.checkpoint(vmf, source)
+            elapsed += time.perf_counter() - start
+    if pending is not None:
+        start = time.perf_counter()
+        budget.checkpoint(vmf, pending)
+        elapsed += time.perf_counter() - start
+    budget._TRACKERS.pop(vmf)
+    return elapsed
+
+
+def main() -> None:
+    """Run the benchmark."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 4000
+    cond_count = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    conditions = [(f'condition: item_{i // RUN_LENGTH}', 2) for i in range(cond_count)]
+    print(f'{count} entities, {cond_count} conditions run.')
+    for batched in [False, True]:
+        elapsed = run(count, conditions, batched)
+        label = 'batched' if batched else 'each'
+        print(f'{label:>8}: {elapsed * 1000:.0f}ms total in checkpoints')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""Measure the memory and time used to pack files into a BSP.
+
+This compares PackList.pack_into_zip() with the streaming packer used by the
+postcompiler. A map is generated with an existing pakfile (like cubemaps), along with
+a folder of content to pack. Run from the repository root:
+
+    python dev/benchmarks/pakfile_pack.py [content MB] [existing MB]
+"""
+from io import BytesIO
+from pathlib import Path
+from typing import Callable, Tuple
+from zipfile import ZIP_DEFLATED, ZipFile
+import os
+import struct
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'src'))
+
+from srctools.bsp import BSP, BSP_LUMPS  # noqa: E402
+from srctools.filesys import FileSystemChain, RawFileSystem  # noqa: E402
+from srctools.packlist import PackList  # noqa: E402
+from postcomp import pakfile  # noqa: E402
+
+FILE_SIZE = 4 * 1024 * 1024
+
+
+def write_bsp(path: Path, existing_mb: int) -> None:
+    """Write a BSP containing only a pakfile."""
+    buf = BytesIO()
+    with ZipFile(buf, 'w') as zip_file:
+        for i in range(existing_mb * 1024 * 1024 // FILE_SIZE):
+            # Cubemaps are somewhat compressible.
+            zip_file.writestr(
+                f'materials/maps/bench/c{i}.vtf',
+                os.urandom(FILE_SIZE // 2) * 2,
+                ZIP_DEFLATED,
+            )
+    lump_data = {
+        BSP_LUMPS.PAKFILE: buf.getvalue(),
+        BSP_LUMPS.GAME_LUMP: struct.pack('<i', 0),
+    }
+    offset = 4 + 4 + 16 * len(BSP_LUMPS) + 4
+    headers = []
+    for lump in BSP_LUMPS:
+        data = lump_data.get(lump, b'')
+        headers.append(struct.pack('<iiii', offset, len(data), 0, 0))
+        offset += len(data)
+    with path.open('wb') as f:
+        f.write(struct.pack('<4si', b'VBSP', 21))
+        f.write(b''.join(headers))
+        f.write(struct.pack('<i', 1))
+        for lump in BSP_LUMPS:
+            f.write(lump_data.get(lump, b''))
+
+
+def pack_srctools(packlist: PackList, bsp: BSP) -> None:
+    """Pack using srctools, as was done previously."""
+    packlist.pack_into_zip(bsp, ignore_vpk=True)
+    bsp.save()
+
+
+def pack_streaming(packlist: PackList, bsp: BSP) -> None:
+    """Pack by streaming into a temporary file."""
+    with pakfile.spool(bsp) as buf:
+        pakfile.pack_into_bsp(packlist, bsp, buf, ignore_vpk=True)
+        bsp.save()
+
+
+def measure(
+    folder: Path, existing_mb: int,
+    func: Callable[[PackList, BSP], None],
+) -> Tuple[float, float, int]:
+    """Pack a fresh copy of the map, returning the time, peak memory and map size."""
+    bsp_path = folder / 'map.bsp'
+    write_bsp(bsp_path, existing_mb)
+    fsys = FileSystemChain(RawFileSystem(str(folder / 'content')))
+    packlist = PackList(fsys)
+    for file in fsys.walk_folder(''):
+        packlist.pack_file(file.path)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    bsp = BSP(bsp_path)
+    # The postcompiler mounts the pakfile, so it's already parsed.
+    bsp.pakfile.namelist()
+    func(packlist, bsp)
+    duration = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return duration, peak, bsp_path.stat().st_size
+
+
+def main() -> None:
+    """Run the benchmark."""
+    content_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+    existing_mb = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+
+    with tempfile.TemporaryDirectory() as temp:
+        folder = Path(temp)
+        content = folder / 'content' / 'materials' / 'bench'
+        content.mkdir(parents=True)
+        for i in range(content_mb * 1024 * 1024 // FILE_SIZE):
+            (content / f'tex{i}.vtf').write_bytes(os.urandom(FILE_SIZE))
+        print(f'Packing {content_mb}MB into a map with a {existing_mb}MB pakfile.')
+
+        for label, func in [
+            ('srctools', pack_srctools),
+            ('Streaming', pack_streaming),
+        ]:
+            duration, peak, size = measure(folder, existing_mb, func)
+            print(
+                f'{label:>10}: {duration:6.2f}s, {size / 1024 / 1024 / duration:7.1f}MB/s, '
+                f'peak memory {peak / 1024 / 1024:7.1f}MB'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""Measure how long the application takes to start.
+
+This reports the import time of each module, from ``python -X importtime``, and the time
+until the Trio loop first runs a task. Each measurement is done in a fresh interpreter,
+repeated several times and the median reported. Tk requires a display, so on Linux
+run under a virtual one for a headless measurement. Run from the repository root:
+
+    xvfb-run python dev/benchmarks/startup_time.py [--runs 5] [--top 25] [--module app.BEE2]
+"""
+from pathlib import Path
+from typing import Dict, List, Tuple
+import argparse
+import statistics
+import subprocess
+import sys
+
+SRC = Path(__file__).parent.parent.parent / 'src'
+# Slow imports which should only happen once required, not during startup.
+DEFERRED = ['mistletoe', 'pyglet', 'app.md_renderer']
+
+# Run in the child process: start the app's loops, then report once the first task runs.
+# Exit immediately after that, so nothing is actually loaded or saved.
+TICK_SCRIPT = '''\
+import time
+start = time.perf_counter()
+import os
+import app.BEE2
+imported = time.perf_counter()
+
+async def first_tick() -> None:
+    print(f'{imported - start} {time.perf_counter() - start}', flush=True)
+    os._exit(0)
+
+app.BEE2.start_main(first_tick)
+'''
+
+
+def run_child(args: List[str]) -> subprocess.CompletedProcess:
+    """Run Python in a fresh process, from the source folder."""
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=SRC,
+        capture_output=True,
+        encoding='utf8',
+    )
+
+
+def import_times(module: str) -> Dict[str, Tuple[int, int]]:
+    """Import the module, then return the self and cumulative time of each import in microseconds."""
+    proc = run_child(['-X', 'importtime', '-c', f'import {module}'])
+    if proc.returncode != 0:
+        raise RuntimeError(f'Could not import {module}:\n{proc.stderr}')
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_time, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = (int(self_time), int(cumulative))
+    return times
+
+
+def first_tick() -> Tuple[float, float]:
+    """Start the application loop, returning the time to import and to run the first task."""
+    proc = run_child(['-c', TICK_SCRIPT])
+    if proc.returncode != 0 or not proc.stdout.strip():
+        raise RuntimeError(f'Could not start application:\n{proc.stderr}')
+    imported, ticked = proc.stdout.split()
+    return float(imported), float(ticked)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--runs', type=int, default=5, help='Number of runs to take the median of.')
+    parser.add_argument('--top', type=int, default=25, help='Number of modules to list.')
+    parser.add_argument('--module', default='app.BEE2', help='The module to import.')
+    args = parser.parse_args()
+
+    try:
+        # Do one run first, so the bytecode cache is populated.
+        import_times(args.module)
+        runs = [import_times(args.module) for _ in range(args.runs)]
+    except RuntimeError as exc:
+        sys.exit(f'{exc}\nIs a display available?')
+    medians = {
+        name: (
+            statistics.median(run[name][0] for run in runs if name in run),
+            statistics.median(run[name][1] for run in runs if name in run),
+        )
+        for name in runs[0]
+    }
+    print(f'Slowest imports for "{args.module}", median of {args.runs} runs:')
+    print(f'{"self [ms]":>10} {"total [ms]":>10}  module')
+    for name, (self_time, cumulative) in sorted(
+        medians.items(), key=lambda kv: kv[1][1], reverse=True,
+    )[:args.top]:
+        print(f'{self_time / 1000:10.1f} {cumulative / 1000:10.1f}  {name}')
+    print()
+    for name in DEFERRED:
+        if name in medians:
+            print(f'Warning: "{name}" is imported at startup ({medians[name][1] / 1000:.1f}ms)')
+        else:
+            print(f'"{name}" is deferred.')
+
+    if args.module != 'app.BEE2':
+        return
+    print()
+    try:
+        ticks = [first_tick() for _ in range(args.runs)]
+    except RuntimeError as exc:
+        print(exc)
+        print('Could not measure time to first tick, is a display available?')
+        return
+    print(f'Import app.BEE2: {statistics.median(imp for imp, tick in ticks) * 1000:.0f}ms')
+    print(f'First loop tick: {statistics.median(tick for imp, tick in ticks) * 1000:.0f}ms')
+
+
+if __name__ == '__main__':
+    main()
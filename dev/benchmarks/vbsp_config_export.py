@@ -0,0 +1,166 @@
+"""Measure the peak memory and time of assembling and writing vbsp_config during export.
+
+A large synthetic package is generated, with item configs using replacement variables
+and a voice pack with many lines. Each config is parsed once beforehand, as happens on
+the first export. vbsp_config is then built by copying every block as exports previously
+did, and by sharing the cached blocks and writing them directly to the file.
+The app's modules require Tk, so on Linux run under a virtual display.
+Run from the repository root:
+
+    xvfb-run python dev/benchmarks/vbsp_config_export.py [items]
+"""
+from pathlib import Path
+from typing import Callable, List, Tuple
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'src'))
+
+from srctools import Property  # noqa: E402
+from srctools.filesys import RawFileSystem  # noqa: E402
+
+from app import lazy_conf  # noqa: E402
+from packages.item import RE_PERCENT_VAR, apply_replacements  # noqa: E402
+from packages.quote_pack import QuotePack  # noqa: E402
+import packages  # noqa: E402
+import utils  # noqa: E402
+
+
+MERGED = ['Textures', 'Fizzlers', 'Options', 'StyleVars', 'DropperItems', 'Conditions', 'Quotes', 'PackTriggers']
+
+
+def item_config(i: int) -> str:
+    """Produce an item config, with conditions using replacement variables."""
+    conds = ''.join(
+        f'"Condition"\n{{\n"Instance" "<ITEM_{i}>"\n"ifMode" "%mode%"\n'
+        f'"Result"\n{{\n"addGlobal"\n{{\n"File" "instances/bee2/item_{i}/part_{j}.vmf"\n'
+        f'"Origin" "0 0 {j * 16}"\n"Name" "%prefix%_{j}"\n}}\n"setKey" "${j} {j}"\n}}\n}}\n'
+        for j in range(20)
+    )
+    return (
+        f'"Replacements"\n{{\n"%mode%" "sp"\n"%prefix%" "item_{i}"\n}}\n'
+        f'"Options"\n{{\n"item_{i}_opt" "1"\n}}\n'
+        f'"Conditions"\n{{\n{conds}}}\n'
+    )
+
+
+def quote_config() -> str:
+    """Produce a voice pack config, with lines including captions to strip."""
+    groups = []
+    for g in range(20):
+        quotes = ''.join(
+            f'"Quote"\n{{\n"Name" "Quote {q}"\n"Priority" "{q}"\n'
+            + ''.join(
+                f'"Line"\n{{\n"Name" "Line {ln}"\n"ID" "line_{g}_{q}_{ln}"\n'
+                f'"Trans" "Some long caption text, which the compiler never needs to read {ln}."\n'
+                f'"File" "bee2/voice/line_{g}_{q}_{ln}.wav"\n}}\n'
+                for ln in range(5)
+            ) + '}\n'
+            for q in range(20)
+        )
+        groups.append(f'"Group"\n{{\n"Name" "Group {g}"\n"Choreo_Name" "@glados"\n{quotes}}}\n')
+    return '"Quotes"\n{\n' + ''.join(groups) + '}\n'
+
+
+def copying_replacements(conf: Property, item_id: str) -> Property:
+    """apply_replacements() as it was, modifying a full copy of the config."""
+    replace = {}
+    new_conf = Property.root()
+    for prop in conf:
+        if prop.name == 'replacements':
+            for rep_prop in prop:
+                replace[rep_prop.name.strip('%')] = rep_prop.value
+        else:
+            new_conf.append(prop)
+
+    def rep_func(match: 're.Match[str]') -> str:
+        """Does the replacement."""
+        var = match.group(1)
+        return replace[var.casefold()] if var else '%'
+
+    for prop in new_conf.iter_tree(blocks=True):
+        prop.name = RE_PERCENT_VAR.sub(rep_func, prop.real_name)
+        if not prop.has_children():
+            prop.value = RE_PERCENT_VAR.sub(rep_func, prop.value)
+    return new_conf
+
+
+def export_copying(items: List[Tuple[str, lazy_conf.LazyConf]], quotes: Property, dest: Path) -> None:
+    """Build vbsp_config by copying each block, then write it via export()."""
+    vbsp_config = Property.root()
+    for item_id, conf in items:
+        vbsp_config.extend(copying_replacements(conf(), item_id))
+    for prop in quotes:
+        vbsp_config.append(QuotePack.strip_quote_data(prop))
+    vbsp_config.set_key(('Options', 'Game_ID'), '620')
+    vbsp_config.merge_children(*MERGED)
+    with dest.open('w', encoding='utf8') as f:
+        for line in vbsp_config.export():
+            f.write(line)
+
+
+def export_shared(items: List[Tuple[str, lazy_conf.LazyConf]], quotes: Property, dest: Path) -> None:
+    """Build vbsp_config by sharing the cached blocks, then write it directly."""
+    vbsp_config = Property.root()
+    for item_id, conf in items:
+        packages.add_shared_conf(vbsp_config, apply_replacements(lazy_conf.shared(conf), item_id))
+    packages.add_shared_conf(vbsp_config, quotes)
+    vbsp_config.set_key(('Options', 'Game_ID'), '620')
+    vbsp_config.merge_children(*MERGED)
+    with dest.open('w', encoding='utf8') as f:
+        packages.write_config(f, vbsp_config)
+
+
+def measure(func: Callable[[], None]) -> Tuple[float, float]:
+    """Return the peak memory allocated in MiB, and the time taken in ms.
+
+    Tracing slows down allocations, so the time is measured separately.
+    """
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    start = time.perf_counter()
+    func()
+    return peak / 2**20, (time.perf_counter() - start) * 1000
+
+
+def main() -> None:
+    """Run the benchmark."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    with tempfile.TemporaryDirectory() as temp:
+        folder = Path(temp)
+        (folder / 'items').mkdir()
+        for i in range(count):
+            (folder / 'items' / f'item_{i}.cfg').write_text(item_config(i))
+        (folder / 'voice.cfg').write_text(quote_config())
+        packages.PACKAGE_SYS['benchmark'] = RawFileSystem(temp)
+
+        items = [
+            (f'item_{i}', lazy_conf.from_file(utils.PackagePath('benchmark', f'items/item_{i}.cfg')))
+            for i in range(count)
+        ]
+        for _, conf in items:  # Populate the parse cache.
+            conf()
+        voice = lazy_conf.from_file(utils.PackagePath('benchmark', 'voice.cfg'))()
+        # The voice pack strips its config once, then reuses it.
+        stripped = Property.root()
+        for prop in voice:
+            stripped.append(QuotePack.strip_quote_data(prop))
+
+        copied_dest, shared_dest = folder / 'copied.cfg', folder / 'shared.cfg'
+        for label, func in [
+            ('copying', lambda: export_copying(items, voice, copied_dest)),
+            ('shared', lambda: export_shared(items, stripped, shared_dest)),
+        ]:
+            peak, duration = measure(func)
+            print(f'{label:>8}: peak {peak:6.1f}MiB, {duration:7.1f}ms')
+        size = shared_dest.stat().st_size / 2**20
+        print(f'Output: {size:.1f}MiB, identical: {copied_dest.read_text() == shared_dest.read_text()}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""Measure the time until the voice line editor is interactive, for a large quote pack.
+
+A synthetic quote pack is generated, sized like the largest bundled packs multiplied
+by the given factor. This times voiceEditor.show(), then viewing every tab, and counts the
+widgets created. The voice config files written are removed afterwards.
+The editor requires Tk, so on Linux run under a virtual display.
+Run from the repository root:
+
+    xvfb-run python dev/benchmarks/voice_editor.py [factor]
+"""
+from pathlib import Path
+import sys
+import time
+import types
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'src'))
+
+from srctools import Property  # noqa: E402
+
+from app import TK_ROOT, voiceEditor  # noqa: E402
+from config.gen_opts import GenOptions  # noqa: E402
+from transtoken import TransToken  # noqa: E402
+import config  # noqa: E402
+import utils  # noqa: E402
+
+
+PACK_ID = 'BENCHMARK_VOICE'
+BADGES = ['line', 'line_sp', 'line_coop', 'line_atlas_pbody', 'line_human']
+
+
+def make_pack(factor: int) -> Property:
+    """Generate the config for a quote pack."""
+    groups = []
+    for g in range(12 * factor):
+        quotes = []
+        for q in range(15):
+            lines = [
+                Property(BADGES[ln % len(BADGES)], [
+                    Property('Name', f'Line {ln} of quote {q}'),
+                    Property('ID', f'line_{g}_{q}_{ln}'),
+                    Property('Trans', f'GLaDOS: Caption for line {ln}.'),
+                ])
+                for ln in range(8)
+            ]
+            quotes.append(Property('Quote', [
+                Property('Name', f'Quote {q}'),
+                Property('Priority', str(q)),
+                *lines,
+            ]))
+        groups.append(Property('Group', [Property('Name', f'Group {g}'), *quotes]))
+    return Property.root(Property('Quotes', groups))
+
+
+def count_widgets(widget) -> int:
+    """Count this widget and all its children."""
+    return 1 + sum(count_widgets(child) for child in widget.winfo_children())
+
+
+def main() -> None:
+    """Run the benchmark."""
+    factor = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    pack = types.SimpleNamespace(
+        id=PACK_ID,
+        pak_id='benchmark',
+        config=make_pack(factor),
+        selitem_data=types.SimpleNamespace(name=TransToken.untranslated('Benchmark')),
+    )
+    # The app stores the options on startup, which positioning windows needs.
+    config.APP.store_conf(GenOptions())
+    voiceEditor.init_widgets()
+    try:
+        start = time.perf_counter()
+        voiceEditor.show(pack)  # type: ignore[arg-type]
+        TK_ROOT.update()
+        shown = time.perf_counter() - start
+        widgets = count_widgets(voiceEditor.win)
+
+        start = time.perf_counter()
+        for tab in voiceEditor.TABS.values():
+            voiceEditor.UI['tabs'].select(tab.frame)
+            TK_ROOT.update()
+        all_tabs = time.perf_counter() - start
+        lines = sum(len(tab.enabled) for tab in voiceEditor.TABS.values())
+        print(f'{lines} lines in {len(voiceEditor.TABS)} tabs')
+        print(f'Interactive after {shown * 1000:.1f}ms, with {widgets} widgets')
+        print(f'Viewed every tab after {all_tabs * 1000:.1f}ms, with {count_widgets(voiceEditor.win)} widgets')
+        voiceEditor.save()
+    finally:
+        for prefix in ['', 'MID_', 'RESP_']:
+            utils.conf_location(f'config/voice/{prefix}{PACK_ID}.cfg').unlink(missing_ok=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -31,7 +31,7 @@ async def init_app() -> None:
     conf = config.APP.get_cur_conf(GenOptions)
 
     LOGGER.debug('Starting loading screen...')
-    loadScreen.main_loader.set_length('UI', 16)
+    loadScreen.main_loader.set_length('UI', 15)
     loadScreen.set_force_ontop(conf.force_load_ontop)
     loadScreen.show_main_loader(conf.compact_splash)
 
@@ -41,7 +41,9 @@ async def init_app() -> None:
 
     logWindow.HANDLER.set_visible(conf.show_log_win)
     logWindow.HANDLER.setLevel(conf.log_win_level)
+    logWindow.HANDLER.set_buffer(conf.log_win_capacity, conf.log_win_interval)
     app.background_run(logWindow.loglevel_bg)
+    app.background_run(config.APP.write_task)
 
     LOGGER.debug('Loading settings...')
 
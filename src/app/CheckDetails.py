@@ -3,10 +3,13 @@ A widget which displays items in a row with various attributes.
 
 Headings can
 be clicked to sort, the item can be enabled/disabled, and info can be shown
-via tooltips
+via tooltips.
+Items only store their values and state. Widgets are only made for the rows
+visible in the window, and are reused for other items when scrolling or sorting.
 """
 from __future__ import annotations
 from typing import Generic, Optional, TypeVar, Iterable, Iterator, overload
+import math
 from tkinter import ttk, font
 import tkinter as tk
 import functools
@@ -108,23 +111,34 @@ class Item(Generic[UserT]):
         - user can be set to any value.
         """
         self.values = values
-        self.state_var = tk.BooleanVar(value=bool(state))
+        self._state = bool(state)
         self.master: CheckDetails | None = None
-        self.check: ttk.Checkbutton | None = None
         self.locked = lock_check
         self.hover_text = hover_text  # Readonly.
-        self.val_widgets: list[tk.Label] = []
         if user is not None:
             self.user = user
 
-    def make_widgets(self, master: CheckDetails) -> None:
-        """Create the widgets for this item."""
+    @property
+    def state(self) -> bool:
+        """Return whether the checkbox is checked."""
+        return self._state
+
+    @state.setter
+    def state(self, value: bool) -> None:
+        self._state = bool(value)
         if self.master is not None:
-            # If we let items move between lists, the old widgets will become
-            # orphaned!
-            raise ValueError("Can't move Item objects between lists!")
+            self.master.update_allcheck()
+            self.master.update_row(self)
 
+
+class Row:
+    """The widgets for a row, which are reassigned to whichever item is visible at this position."""
+    def __init__(self, master: CheckDetails) -> None:
         self.master = master
+        self.item: Item | None = None
+        # The item and column sizes last displayed, to skip unchanged rows.
+        self._displayed: tuple[Item, list[tuple[int, int]]] | None = None
+        self.state_var = tk.BooleanVar(value=False)
         self.check = ttk.Checkbutton(
             master.wid_frame,
             variable=self.state_var,
@@ -133,75 +147,73 @@ class Item(Generic[UserT]):
             takefocus=False,
             width=0,
             style='CheckDetails.TCheckbutton',
-            command=self.master.update_allcheck,
+            command=self.evt_check,
         )
-        if self.locked:
-            self.check.state(['disabled'])
-
-        self.val_widgets = []
-        for value in self.values:
-            wid = tk.Label(
-                master.wid_frame,
-                justify=tk.LEFT,
-                anchor=tk.W,
-                background='white',
-            )
-            set_text(wid, value)
-            add_tooltip(wid, self.hover_text)
-
-            if not self.locked:
-                # Allow clicking on the row to toggle the checkbox
-                wid.bind('<Enter>', self.evt_hover_start, add=True)
-                wid.bind('<Leave>', self.evt_hover_stop, add=True)
-                tk_tools.bind_leftclick(wid, self.evt_row_click, add=True)
-                wid.bind(tk_tools.EVENTS['LEFT_RELEASE'], self.evt_row_unclick, add=True)
-
-            self.val_widgets.append(wid)
-
-        tk_tools.add_mousewheel(
-            self.master.wid_canvas,
-            self.check,
-            *self.val_widgets
+        self.val_widgets: list[tk.Label] = []
+        tk_tools.add_mousewheel(master.wid_canvas, self.check)
+
+    def _add_column(self) -> None:
+        """Create the label for another column."""
+        wid = tk.Label(
+            self.master.wid_frame,
+            justify=tk.LEFT,
+            anchor=tk.W,
+            background='white',
         )
-
-    def place(self, check_width: int, head_pos: list[tuple[int, int]], y: int) -> None:
-        """Position the widgets on the frame."""
+        add_tooltip(wid)
+        # Allow clicking on the row to toggle the checkbox
+        wid.bind('<Enter>', self.evt_hover_start, add=True)
+        wid.bind('<Leave>', self.evt_hover_stop, add=True)
+        tk_tools.bind_leftclick(wid, self.evt_row_click, add=True)
+        wid.bind(tk_tools.EVENTS['LEFT_RELEASE'], self.evt_row_unclick, add=True)
+        tk_tools.add_mousewheel(self.master.wid_canvas, wid)
+        self.val_widgets.append(wid)
+
+    def place(self, item: Item, check_width: int, head_pos: list[tuple[int, int]], y: int) -> None:
+        """Display an item, and position the widgets on the frame."""
+        self.item = item
+        self.state_var.set(item.state)
+        self.check.state(['disabled' if item.locked else '!disabled'])
         self.check.place(x=0, y=y, width=check_width, height=ROW_HEIGHT)
-        for text, widget, (x, width) in zip(self.values, self.val_widgets, head_pos):
+        while len(self.val_widgets) < len(item.values):
+            self._add_column()
+        unchanged = self._displayed == (item, head_pos)
+        self._displayed = (item, head_pos)
+        for _, widget, (x, width) in zip(item.values, self.val_widgets, head_pos):
             widget.place(
                 x=x+check_width,
                 y=y,
                 width=width,
                 height=ROW_HEIGHT,
             )
+        if unchanged:
+            return
+        for text, widget, (x, width) in zip(item.values, self.val_widgets, head_pos):
             short_text = truncate(str(text), width-5)
             if short_text is None:
                 set_text(widget, text)
-                set_tooltip(widget, self.hover_text)
+                set_tooltip(widget, item.hover_text)
             else:
                 set_text(widget, short_text)
-                set_tooltip(widget, self.hover_text or text)
-            x += width
+                set_tooltip(widget, item.hover_text or text)
 
-    def destroy(self) -> None:
+    def hide(self) -> None:
         """Remove this from the window."""
+        self.item = None
+        self._displayed = None
         self.check.place_forget()
         for wid in self.val_widgets:
             wid.place_forget()
 
-    @property
-    def state(self) -> bool:
-        """Return whether the checkbox is checked."""
-        return self.state_var.get()
-
-    @state.setter
-    def state(self, value: bool) -> None:
-        self.state_var.set(value)
-        self.master.update_allcheck()
+    def evt_check(self) -> None:
+        """The checkbox was clicked."""
+        if self.item is not None:
+            self.item.state = self.state_var.get()
 
     def evt_hover_start(self, _: tk.Event) -> None:
         """Start hovering over the checkbox."""
-        self.check.state(['active'])
+        if self.item is not None and not self.item.locked:
+            self.check.state(['active'])
 
     def evt_hover_stop(self, _: tk.Event) -> None:
         """Stop hovering over the checkbox."""
@@ -209,8 +221,9 @@ class Item(Generic[UserT]):
 
     def evt_row_click(self, _: tk.Event) -> None:
         """Occurs when the checkbox is clicked."""
-        self.state = not self.state
-        self.check.state(['pressed'])
+        if self.item is not None and not self.item.locked:
+            self.item.state = not self.item.state
+            self.check.state(['pressed'])
 
     def evt_row_unclick(self, _: tk.Event) -> None:
         """Reset the checkbox when released."""
@@ -237,6 +250,11 @@ class CheckDetails(ttk.Frame, Generic[UserT]):
 
         self.parent = parent
         self.items: list[Item[UserT]] = []
+        # Widgets for the rows currently visible.
+        self.rows: list[Row] = []
+        # The checkbox width and column positions, set when refreshed.
+        self._check_width = 0
+        self._header_sizes: list[tuple[int, int]] = []
         self.sort_ind: int | None = None
         self.rev_sort = False  # Should we sort in reverse?
 
@@ -254,14 +272,14 @@ class CheckDetails(ttk.Frame, Generic[UserT]):
 
         def checkbox_enter(_: tk.Event) -> None:
             """When hovering over the 'all' checkbox, highlight the others."""
-            for item in self.items:
-                item.check.state(['active'])
+            for row in self.rows:
+                row.check.state(['active'])
         self.wid_head_check.bind('<Enter>', checkbox_enter)
 
         def checkbox_leave(_: tk.Event) -> None:
             """When leaving, reset the checkboxes."""
-            for item in self.items:
-                item.check.state(['!active'])
+            for row in self.rows:
+                row.check.state(['!active'])
         self.wid_head_check.bind('<Leave>', checkbox_leave)
 
         self.wid_header = tk.PanedWindow(
@@ -293,7 +311,7 @@ class CheckDetails(ttk.Frame, Generic[UserT]):
             command=self.wid_canvas.yview,
         )
         self.wid_canvas['xscrollcommand'] = self.horiz_scroll.set
-        self.wid_canvas['yscrollcommand'] = self.vert_scroll.set
+        self.wid_canvas['yscrollcommand'] = self._evt_yscroll
 
         self.horiz_scroll.grid(row=2, column=0, columnspan=2, sticky='EWS')
         self.vert_scroll.grid(row=1, column=2, sticky='NSE')
@@ -354,8 +372,11 @@ class CheckDetails(ttk.Frame, Generic[UserT]):
     def add_items(self, *items: Item) -> None:
         """Add items to the details list."""
         for item in items:
+            if item.master is not None:
+                # Items can only be in one list, since they refer back to it.
+                raise ValueError("Can't move Item objects between lists!")
+            item.master = self
             self.items.append(item)
-            item.make_widgets(self)
         self.update_allcheck()
         self.refresh()
 
@@ -363,18 +384,21 @@ class CheckDetails(ttk.Frame, Generic[UserT]):
         """Remove items from the details list."""
         for item in items:
             self.items.remove(item)
-            item.destroy()
         self.update_allcheck()
         self.refresh()
 
     def remove_all(self) -> None:
         """Remove all items from the list."""
-        for item in self.items:
-            item.destroy()
         self.items.clear()
         self.update_allcheck()
         self.refresh()
 
+    def update_row(self, item: Item) -> None:
+        """If visible, update the checkbox for this item."""
+        for row in self.rows:
+            if row.item is item:
+                row.state_var.set(item.state)
+
     def update_allcheck(self) -> None:
         """Update the 'all' checkbox to match the state of sub-boxes."""
         num_checked = sum(item.state for item in self.items)
@@ -402,7 +426,10 @@ class CheckDetails(ttk.Frame, Generic[UserT]):
 
             # We can't use item.state, since that calls update_allcheck()
             # which would infinite-loop.
-            item.state_var.set(value)
+            item._state = value
+        for row in self.rows:
+            if row.item is not None:
+                row.state_var.set(row.item.state)
         if value and self.items:  # Don't enable if we don't have items
             self.event_generate(EVENT_HAS_CHECKS)
         else:
@@ -423,11 +450,9 @@ class CheckDetails(ttk.Frame, Generic[UserT]):
         ]
 
         self.wid_head_check.update_idletasks()
-        check_width = self.wid_head_check.winfo_width()
-        pos = ROW_PADDING
-        for item in self.items:
-            item.place(check_width, header_sizes, pos)
-            pos += ROW_HEIGHT + ROW_PADDING
+        self._check_width = check_width = self.wid_head_check.winfo_width()
+        self._header_sizes = header_sizes
+        pos = ROW_PADDING + len(self.items) * (ROW_HEIGHT + ROW_PADDING)
 
         # Disable checkbox if no items are present
         if self.items:
@@ -486,6 +511,36 @@ class CheckDetails(ttk.Frame, Generic[UserT]):
         self.wid_frame.update_idletasks()
 
         self.wid_canvas['scrollregion'] = (0, 0, width, height)
+        self.render()
+
+    def _evt_yscroll(self, first: str, last: str) -> None:
+        """When scrolled, update the scrollbar and then show the newly visible items."""
+        self.vert_scroll.set(first, last)
+        self.render()
+
+    def render(self) -> None:
+        """Display the items which are visible in the canvas, reusing the row widgets."""
+        if not self._header_sizes:
+            return  # Not refreshed yet.
+        spacing = ROW_HEIGHT + ROW_PADDING
+        start = max(0, int(self.wid_canvas.canvasy(0) - ROW_PADDING) // spacing)
+        count = min(
+            len(self.items) - start,
+            math.ceil(self.wid_canvas.winfo_height() / spacing) + 1,
+        )
+        while len(self.rows) < count:
+            self.rows.append(Row(self))
+        for offset, row in enumerate(self.rows):
+            index = start + offset
+            if offset < count:
+                row.place(
+                    self.items[index],
+                    self._check_width,
+                    self._header_sizes,
+                    ROW_PADDING + index * spacing,
+                )
+            elif row.item is not None:
+                row.hide()
 
     def sort(self, index: int, _: tk.Event) -> None:
         """Click event for headers."""
@@ -505,13 +560,13 @@ class CheckDetails(ttk.Frame, Generic[UserT]):
     def checked(self) -> Iterator[Item]:
         """Yields enabled check items."""
         for item in self.items:
-            if item.state_var.get():
+            if item.state:
                 yield item
 
     def unchecked(self) -> Iterator[Item]:
         """Yields disabled check items."""
         for item in self.items:
-            if not item.state_var.get():
+            if not item.state:
                 yield item
 
 
@@ -40,7 +40,6 @@ from app import (
     item_search,
     corridor_selector,
     optionWindow,
-    backup as backup_win,
     tooltip,
     signage_ui,
     paletteUI,
@@ -793,7 +792,7 @@ async def export_editoritems(pal_ui: paletteUI.PaletteUI, bar: MenuBar) -> None:
         # Save the configs since we're writing to disk lots anyway.
         GEN_OPTS.save_check()
         item_opts.save_check()
-        config.APP.write_file()
+        config.APP.request_write()
 
         message = TRANS_EXPORTED if vpk_success else TRANS_EXPORTED_NO_VPK
 
@@ -1598,9 +1597,6 @@ async def init_windows() -> None:
     tk_tools.bind_leftclick(windows['pal'], contextWin.hide_context)
 
     await trio.sleep(0)
-    backup_win.init_toplevel()
-    await trio.sleep(0)
-    loader.step('UI', 'backup')
     voiceEditor.init_widgets()
     await trio.sleep(0)
     loader.step('UI', 'voiceline')
@@ -9,7 +9,7 @@ import shutil
 import string
 import time
 from datetime import datetime
-from io import BytesIO, TextIOWrapper
+from io import BytesIO
 from typing import List, TYPE_CHECKING, Dict, Any, Optional, cast
 from zipfile import ZipFile, ZIP_LZMA
 
@@ -19,7 +19,7 @@ from app import tk_tools, img, TK_ROOT
 import utils
 from app.CheckDetails import CheckDetails, Item as CheckItem
 from FakeZip import FakeZip, zip_names, zip_open_bin
-from srctools import Property, KeyValError
+from backup_index import IndexEntry, PuzzleInfo, cached_info, read_index, read_puzzle, write_index
 from app.tooltip import add_tooltip
 from app.localisation import TransToken, set_text, set_menu_text, set_win_title
 if TYPE_CHECKING:
@@ -109,84 +109,41 @@ deleting_loader = loadScreen.LoadScreen(
 
 class P2C:
     """A PeTI map."""
-    def __init__(
-        self,
-        filename,
-        zip_file,
-        create_time: 'Date',
-        mod_time: 'Date',
-        title='<untitled>',
-        desc: TransToken = TRANS_NO_DESC,
-        is_coop=False,
-    ) -> None:
-        self.filename = filename
+    def __init__(self, info: PuzzleInfo, zip_file) -> None:
+        self.info = info
+        self.filename = info.filename
         self.zip_file = zip_file
-        self.create_time = create_time
-        self.mod_time = mod_time
-        self.title = title
-        self.desc = desc
-        self.is_coop = is_coop
+        self.create_time = Date(info.create_time)
+        self.mod_time = Date(info.mod_time)
+        self.is_coop = info.is_coop
+        if info.title is not None:
+            self.title = info.title
+        else:
+            self.title = f'<{info.filename}.p2c>'
+        self.desc: TransToken
+        if info.failed:
+            self.desc = TRANS_FAIL_PARSE
+        elif info.description is not None:
+            self.desc = TransToken.untranslated(info.description)
+        else:
+            self.desc = TRANS_NO_DESC
 
     @classmethod
-    def from_file(cls, path, zip_file):
+    def from_file(cls, path: str, zip_file, index: Dict[str, IndexEntry]) -> 'P2C':
         """Initialise from a file.
 
         path is the file path for the map inside the zip, without extension.
-        zip_file is either a ZipFile or FakeZip object.
+        zip_file is either a ZipFile or FakeZip object. If the map is present
+        in the index and unchanged, the file itself isn't read.
         """
-        # Some P2Cs may have non-ASCII characters in descriptions, so we
-        # need to read it as bytes and convert to utf-8 ourselves - zips
-        # don't convert encodings automatically for us.
-        try:
-            with zip_open_bin(zip_file, path + '.p2c') as file:
-                # Decode the P2C as UTF-8, and skip unknown characters.
-                # We're only using it for display purposes, so that should
-                # be sufficient.
-                with TextIOWrapper(
-                    file,
-                    encoding='utf-8',
-                    errors='replace',
-                ) as textfile:
-                    props = Property.parse(textfile, path)
-        except KeyValError:
-            # Silently fail if we can't parse the file. That way it's still
-            # possible to back up.
-            LOGGER.warning('Failed parsing puzzle file!', path, exc_info=True)
-            props = Property('portal2_puzzle', [])
-            title = None
-            desc = TRANS_FAIL_PARSE
-        else:
-            props = props.find_key('portal2_puzzle', or_blank=True)
-            title = props['title', None]
-            try:
-                desc = TransToken.untranslated(props['description'])
-            except LookupError:
-                desc = TRANS_NO_DESC
-
-        if title is None:
-            title = '<' + path.rsplit('/', 1)[-1] + '.p2c>'
-
-        return cls(
-            filename=os.path.basename(path),
-            zip_file=zip_file,
-            title=title,
-            desc=desc,
-            is_coop=srctools.conv_bool(props['coop', '0']),
-            create_time=Date(props['timestamp_created', '']),
-            mod_time=Date(props['timestamp_modified', '']),
-        )
+        info = cached_info(index, zip_file, path)
+        if info is None:
+            info = read_puzzle(zip_file, path)
+        return cls(info, zip_file)
 
     def copy(self):
         """Copy this item."""
-        return self.__class__(
-            self.filename,
-            create_time=self.create_time,
-            zip_file=self.zip_file,
-            mod_time=self.mod_time,
-            is_coop=self.is_coop,
-            desc=self.desc,
-            title=self.title,
-        )
+        return self.__class__(self.info, self.zip_file)
 
     def make_item(self) -> CheckItem['P2C']:
         """Make a corresponding CheckItem object."""
@@ -268,19 +225,21 @@ class Date:
 def load_backup(zip_file):
     """Load in a backup file."""
     maps = []
+    index = read_index(zip_file)
     puzzles = [
         file[:-4]  # Strip extension
         for file in
         zip_names(zip_file)
         if file.endswith('.p2c')
     ]
-    # Each P2C init requires reading in the properties file, so this may take
+    # Unindexed maps require reading the start of each file, so this may take
     # some time. Use a loading screen.
     reading_loader.set_length('READ', len(puzzles))
-    LOGGER.info('Loading {} maps..', len(puzzles))
+    LOGGER.info('Loading {} maps, {} indexed..', len(puzzles), len(index))
+    start = time.perf_counter()
     with reading_loader:
         for file in puzzles:
-            new_map = P2C.from_file(file, zip_file)
+            new_map = P2C.from_file(file, zip_file, index)
             maps.append(new_map)
             LOGGER.debug(
                 'Loading {} map "{}"',
@@ -288,7 +247,7 @@ def load_backup(zip_file):
                 new_map.title,
             )
             reading_loader.step('READ')
-    LOGGER.info('Done!')
+    LOGGER.info('Done in {:.2f}s!', time.perf_counter() - start)
 
     # It takes a while before the detail headers update positions,
     # so delay a refresh call.
@@ -368,7 +327,8 @@ def backup_maps(maps: List[P2C]) -> None:
 def auto_backup(game: 'gameMan.Game', loader: loadScreen.LoadScreen) -> None:
     """Perform an automatic backup for the given game.
 
-    We do this seperately since we don't need to read the property files.
+    We do this seperately since we don't need to parse the whole property files,
+    only the header for the index.
     """
     from BEE2_config import GEN_OPTS
     if not GEN_OPTS.get_bool('General', 'enable_auto_backup'):
@@ -427,6 +387,8 @@ def auto_backup(game: 'gameMan.Game', loader: loadScreen.LoadScreen) -> None:
         AUTO_BACKUP_FILE.format(game=safe_name, ind=''),
     )
     LOGGER.info('Writing backup to "{}"', final_backup)
+    game_zip = FakeZip(folder)
+    puzzles = []
     with open(final_backup, 'wb') as f:
         with ZipFile(f, mode='w', compression=ZIP_LZMA) as zip_file:
             for file in to_backup:
@@ -435,7 +397,11 @@ def auto_backup(game: 'gameMan.Game', loader: loadScreen.LoadScreen) -> None:
                     file,
                     ZIP_LZMA,
                 )
+                if file.endswith('.p2c'):
+                    # Only the header is read, so this is quick.
+                    puzzles.append(read_puzzle(game_zip, file[:-4]))
                 loader.step(AUTO_BACKUP_STAGE)
+            write_index(zip_file, puzzles)
 
 
 def save_backup() -> None:
@@ -471,6 +437,7 @@ def save_backup() -> None:
             with zip_open_bin(old_zip, map_path) as f:
                 new_zip.writestr(map_path, f.read())
             copy_loader.step('COPY')
+        write_index(new_zip, [p2c.info for p2c in maps])
 
     new_zip.close()  # Finalize zip
 
@@ -532,6 +499,8 @@ def restore_maps(maps: List[P2C]) -> None:
 
 def refresh_game_details():
     """Remake the items in the game maps list."""
+    if 'game_details' not in UI:
+        return  # Window isn't built yet, this is done when it is shown.
     game = UI['game_details']
     game.remove_all()
     game.add_items(*(
@@ -543,6 +512,8 @@ def refresh_game_details():
 
 def refresh_back_details():
     """Remake the items in the backup list."""
+    if 'back_details' not in UI:
+        return
     backup = UI['back_details']
     backup.remove_all()
     backup.add_items(*(
@@ -553,6 +524,9 @@ def refresh_back_details():
 
 
 def show_window() -> None:
+    """Show the window embedded in the BEE2, building it the first time."""
+    if 'game_details' not in UI:
+        init_toplevel()
     window.deiconify()
     window.lift()
     tk_tools.center_win(window, TK_ROOT)
@@ -957,7 +931,10 @@ def init_backup_settings() -> None:
 
 
 def init_toplevel() -> None:
-    """Initialise the window as part of the BEE2."""
+    """Initialise the window as part of the BEE2.
+
+    This is done when first shown, so it doesn't need to be built during startup.
+    """
     global window
     window = tk.Toplevel(TK_ROOT)
     window.transient(TK_ROOT)
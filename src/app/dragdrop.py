@@ -7,7 +7,7 @@ import trio
 from tkinter import ttk, messagebox
 from typing import (
     Callable, Union, Generic, TypeVar, Protocol, Optional,
-    List, Tuple, Dict, Iterator, Iterable,
+    List, Tuple, Dict, Iterator, Iterable, Set,
 )
 import tkinter
 
@@ -46,6 +46,8 @@ ItemT = TypeVar('ItemT', bound=ItemProto)  # The object the items move around.
 
 # Tag used on canvases for our flowed slots.
 _CANV_TAG = '_BEE2_dragdrop_item'
+# A slot, with the root-relative (left, top, width, height) bbox of its label.
+_SlotRect = Tuple['Slot', int, int, int, int]
 
 
 class Event(Enum):
@@ -189,6 +191,16 @@ class Manager(Generic[ItemT]):
         self.width, self.height = size
 
         self._slots: List[Slot[ItemT]] = []
+        # Reverse lookups, kept updated as contents change.
+        # id(item) -> the target slot holding it.
+        self._target_by_item: Dict[int, Slot[ItemT]] = {}
+        # dnd_group -> the target/flexi slots holding items in that group.
+        self._group_slots: Dict[str, Set[Slot[ItemT]]] = defaultdict(set)
+        # Flexi slots which are empty, in the order they were emptied.
+        self._empty_flexi: Dict[Slot[ItemT], None] = {}
+        # For hit-testing, target/flexi slots bucketed into a grid of cells the size of a slot.
+        # This is built when required, and discarded whenever slots move.
+        self._hit_grid: Optional[Dict[Tuple[int, int], List[_SlotRect]]] = None
 
         self._img_blank = img.Handle.color(img.PETI_ITEM_BG, *size)
 
@@ -270,11 +282,37 @@ class Manager(Generic[ItemT]):
             raise ValueError('Flexi callback missing!')
         slot: Slot[ItemT] = Slot(self, parent, SlotType.FLEXI, label)
         self._slots.append(slot)
+        self._empty_flexi[slot] = None
         return slot
 
     def remove(self, slot: Slot[ItemT]) -> None:
         """Remove the specified slot."""
         self._slots.remove(slot)
+        self._track_contents(slot, slot.contents, None)
+        self._empty_flexi.pop(slot, None)
+        self._hit_grid = None
+
+    def _track_contents(self, slot: Slot[ItemT], old: Optional[ItemT], new: Optional[ItemT]) -> None:
+        """Update the reverse lookups, after the contents of a slot changed."""
+        if slot.is_source:
+            return
+        if old is not None:
+            if slot.is_target and self._target_by_item.get(id(old)) is slot:
+                del self._target_by_item[id(old)]
+            old_group = getattr(old, 'dnd_group', None)
+            if old_group is not None:
+                self._group_slots[old_group].discard(slot)
+        if new is not None:
+            if slot.is_target:
+                self._target_by_item[id(new)] = slot
+            new_group = getattr(new, 'dnd_group', None)
+            if new_group is not None:
+                self._group_slots[new_group].add(slot)
+        if slot.is_flexi:
+            if new is None:
+                self._empty_flexi[slot] = None
+            else:
+                self._empty_flexi.pop(slot, None)
 
     def load_icons(self) -> None:
         """Load in all the item icons."""
@@ -351,19 +389,32 @@ class Manager(Generic[ItemT]):
         pos.resize_canvas()
         return pos.yoff
 
-    def _pos_slot(self, x: float, y: float) -> Optional[Slot[ItemT]]:
-        """Find the slot under this X,Y (if any). Sources are ignored."""
+    def _build_hit_grid(self) -> Dict[Tuple[int, int], List[_SlotRect]]:
+        """Fetch the positions of all target/flexi slots, and bucket them into cells."""
+        grid: Dict[Tuple[int, int], List[_SlotRect]] = defaultdict(list)
         for slot in self._slots:
             if not slot.is_source and slot.is_visible:
                 lbl = slot._lbl
-                if in_bbox(
-                    x, y,
-                    lbl.winfo_rootx(),
-                    lbl.winfo_rooty(),
-                    lbl.winfo_width(),
-                    lbl.winfo_height(),
-                ):
-                    return slot
+                left = lbl.winfo_rootx()
+                top = lbl.winfo_rooty()
+                width = lbl.winfo_width()
+                height = lbl.winfo_height()
+                rect = (slot, left, top, width, height)
+                # Add to every cell it overlaps. Slots are added in order, so
+                # overlapping slots are still checked in the same order.
+                for cell_x in range(left // self.width, (left + width) // self.width + 1):
+                    for cell_y in range(top // self.height, (top + height) // self.height + 1):
+                        grid[cell_x, cell_y].append(rect)
+        return grid
+
+    def _pos_slot(self, x: float, y: float) -> Optional[Slot[ItemT]]:
+        """Find the slot under this X,Y (if any). Sources are ignored."""
+        if self._hit_grid is None:
+            self._hit_grid = self._build_hit_grid()
+        cell = (int(x // self.width), int(y // self.height))
+        for slot, left, top, width, height in self._hit_grid.get(cell, ()):
+            if in_bbox(x, y, left, top, width, height):
+                return slot
         return None
 
     def _display_item(
@@ -390,11 +441,7 @@ class Manager(Generic[ItemT]):
         if group is None:
             # None to do..
             return
-        group_slots = [
-            slot for slot in self._slots
-            if not slot.is_source
-            if getattr(slot.contents, 'dnd_group', None) == group
-        ]
+        group_slots = self._group_slots.get(group, ())
 
         has_group = len(group_slots) == 1
         for slot in group_slots:
@@ -406,6 +453,8 @@ class Manager(Generic[ItemT]):
             return  # Can't pick up blank...
 
         self._cur_drag = slot.contents
+        # Windows may have moved since the last drag, so fetch slot positions again.
+        self._hit_grid = None
 
         show_group = False
 
@@ -419,13 +468,12 @@ class Manager(Generic[ItemT]):
             except AttributeError:
                 pass
             else:
-                if group is not None:
-                    for other_slot in self._slots:
-                        if other_slot.is_target and getattr(other_slot.contents, 'dnd_group', None) == group:
-                            break
-                    else:
-                        # None present.
-                        show_group = True
+                if group is not None and not any(
+                    other_slot.is_target
+                    for other_slot in self._group_slots.get(group, ())
+                ):
+                    # None present.
+                    show_group = True
 
         self._display_item(self._drag_lbl, self._cur_drag, show_group)
         self._cur_slot = slot
@@ -476,6 +524,7 @@ class Manager(Generic[ItemT]):
         self._drag_win.unbind(tk_tools.EVENTS['LEFT_MOVE'])
 
         dest = self._pos_slot(evt.x_root, evt.y_root)
+        self._hit_grid = None
 
         if dest is self._cur_slot:
             assert dest is not None
@@ -493,12 +542,11 @@ class Manager(Generic[ItemT]):
             if self._pick_flexi_group is None:
                 raise ValueError('No pick_flexi_group function!')
             group = self._pick_flexi_group(evt.x_root, evt.y_root)
-            for slot in self._slots:
-                if slot.is_flexi and slot.contents is None and group is not None:
-                    slot.contents = self._cur_drag
-                    slot.flexi_group = group
-                    background_run(self.event_bus, Event.MODIFIED)
-                    break
+            if group is not None and self._empty_flexi:
+                slot = next(iter(self._empty_flexi))
+                slot.contents = self._cur_drag
+                slot.flexi_group = group
+                background_run(self.event_bus, Event.MODIFIED)
             else:
                 LOGGER.warning('Ran out of FLEXI slots for "{}", restored item: {}', group, self._cur_drag)
                 self._cur_slot.contents = self._cur_drag
@@ -643,11 +691,12 @@ class Slot(Generic[ItemT]):
 
         if value is not None and self.is_target:
             # Make sure this isn't already present.
-            for slot in self.man._slots:
-                if slot.is_target and slot.contents is value:
-                    slot.contents = None
+            slot = self.man._target_by_item.get(id(value))
+            if slot is not None:
+                slot.contents = None
         # Then set us.
         self._contents = value
+        self.man._track_contents(self, old_cont, value)
 
         if self.is_target:
             # Update items in the previous group, so they gain the group icon
@@ -677,18 +726,21 @@ class Slot(Generic[ItemT]):
         """Grid-position this slot."""
         self._pos_type = GeoManager.GRID
         self._canv_info = None
+        self.man._hit_grid = None
         self._lbl.grid(*args, **kwargs)
 
     def place(self, *args, **kwargs) -> None:
         """Place-position this slot."""
         self._pos_type = GeoManager.PLACE
         self._canv_info = None
+        self.man._hit_grid = None
         self._lbl.place(*args, **kwargs)
 
     def pack(self, *args, **kwargs) -> None:
         """Pack-position this slot."""
         self._pos_type = GeoManager.PACK
         self._canv_info = None
+        self.man._hit_grid = None
         self._lbl.pack(*args, **kwargs)
 
     def canvas(self, canv: tkinter.Canvas, x: int, y: int, tag: str) -> None:
@@ -705,6 +757,7 @@ class Slot(Generic[ItemT]):
         )
         self._pos_type = GeoManager.CANVAS
         self._canv_info = (obj_id, x, y)
+        self.man._hit_grid = None
 
     def canvas_pos(self, canv: tkinter.Canvas) -> Tuple[int, int]:
         """If on a canvas, fetch the current x/y position."""
@@ -728,6 +781,7 @@ class Slot(Generic[ItemT]):
             getattr(self._lbl, self._pos_type.value + '_forget')()
         self._pos_type = None
         self._canv_info = None
+        self.man._hit_grid = None
 
     def _evt_start(self, event: tkinter.Event) -> None:
         """Start dragging."""
@@ -38,7 +38,7 @@ import trio
 import attrs
 
 from BEE2_config import ConfigFile
-from app import backup, tk_tools, resource_gen, TK_ROOT, DEV_MODE, background_run
+from app import backup, tk_tools, resource_gen, lazy_conf, TK_ROOT, DEV_MODE, background_run
 from config.gen_opts import GenOptions
 from transtoken import TransToken
 import transtoken
@@ -706,9 +706,10 @@ class Game:
             # Make the folders we need to copy files to, if desired.
             os.makedirs(self.abs_path('bin/bee2/'), exist_ok=True)
 
-            # Start off with the style's data.
+            # Start off with the style's data. Like other large configs, this is
+            # shared with the package data, not copied - it's only written out.
             vbsp_config = Property.root()
-            vbsp_config += style.config().copy()
+            packages.add_shared_conf(vbsp_config, lazy_conf.shared(style.config))
 
             all_items = style.items.copy()
             renderables = style.renderables.copy()
@@ -863,8 +864,7 @@ class Game:
             LOGGER.info('Writing VBSP Config!')
             os.makedirs(self.abs_path('bin/bee2/'), exist_ok=True)
             with open(self.abs_path('bin/bee2/vbsp_config.cfg'), 'w', encoding='utf8') as vbsp_file:
-                for line in vbsp_config.export():
-                    vbsp_file.write(line)
+                packages.write_config(vbsp_file, vbsp_config)
             export_screen.step('EXP', 'vbsp_config')
 
             error_server_running = await terminate_error_server()
@@ -945,6 +945,7 @@ class Game:
                 with open(self.abs_path('sdk_content/maps/instances/bee2/tag_coop_gun.vmf'), 'w') as f2:
                     TAG_COOP_INST_VMF.export(f2)
 
+            LOGGER.info('Config parse cache: {}', lazy_conf.cache_info())
             export_screen.reset()  # Hide loading screen, we're done
             return True, vpk_success
         except loadScreen.Cancelled:
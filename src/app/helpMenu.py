@@ -8,7 +8,7 @@ import io
 import urllib.request
 import urllib.error
 from enum import Enum
-from typing import Any, Callable, Dict, cast
+from typing import Any, Callable, Dict, Optional, cast
 from tkinter import ttk
 import tkinter as tk
 import webbrowser
@@ -26,7 +26,6 @@ from transtoken import TransToken
 # For version info
 import PIL
 import platform
-import mistletoe
 import pygtrie
 
 
@@ -416,27 +415,37 @@ CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT,
 TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE 
 SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 
-'''.format(
-    # Inject the running Python version.
-    py_ver=platform.python_version(),
-    tk_ver=TK_ROOT.tk.call('info', 'patchlevel'),
-    pyglet_ver=sound.pyglet_version,
-    mstle_ver=mistletoe.__version__,
-    pygtrie_ver=pygtrie.__version__,
-    pil_ver=PIL.__version__,
-    srctools_ver=srctools.__version__,
-).replace('\n', '  \n')  # Add two spaces to keep line breaks
+'''
+
+
+def credits_text() -> str:
+    """Fill in the library versions for the credits.
+
+    Mistletoe and Pyglet are only imported once needed, so do this when the credits are shown.
+    """
+    import mistletoe
+    sound.load_pyglet()
+    return CREDITS_TEXT.format(
+        # Inject the running Python version.
+        py_ver=platform.python_version(),
+        tk_ver=TK_ROOT.tk.call('info', 'patchlevel'),
+        pyglet_ver=sound.pyglet_version,
+        mstle_ver=mistletoe.__version__,
+        pygtrie_ver=pygtrie.__version__,
+        pil_ver=PIL.__version__,
+        srctools_ver=srctools.__version__,
+    ).replace('\n', '  \n')  # Add two spaces to keep line breaks
 
 
 class Dialog(tk.Toplevel):
     """Show a dialog with a message."""
-    def __init__(self, title: TransToken, text: str):
+    def __init__(self, title: TransToken, text: Callable[[], str]):
         super().__init__(TK_ROOT)
         self.withdraw()
         localisation.set_win_title(self, title)
         self.transient(master=TK_ROOT)
         self.resizable(width=True, height=True)
-        self.text = text
+        self.text: Optional[Callable[[], str]] = text
         tk_tools.set_window_icon(self)
 
         # Hide when the exit button is pressed, or Escape
@@ -474,7 +483,7 @@ class Dialog(tk.Toplevel):
         # That way we don't need to do it on startup.
         # Don't translate this, it's all legal text - not really our business to change.
         if self.text is not None:
-            parsed_text = tkMarkdown.convert(TransToken.untranslated(self.text), package=None)
+            parsed_text = tkMarkdown.convert(TransToken.untranslated(self.text()), package=None)
             self.textbox.set_text(parsed_text)
             self.text = None
 
@@ -547,7 +556,7 @@ def make_help_menu(parent: tk.Menu) -> None:
     }
     icons[ResIcon.NONE] = img.Handle.blank(16, 16)
 
-    credit_window = Dialog(title=TransToken.ui('BEE2 Credits'), text=CREDITS_TEXT)
+    credit_window = Dialog(title=TransToken.ui('BEE2 Credits'), text=credits_text)
 
     for res in WEB_RESOURCES:
         if res is SEPERATOR:
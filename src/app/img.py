@@ -14,6 +14,7 @@ from collections.abc import Sequence, Mapping
 from weakref import ref as WeakRef
 from tkinter import ttk
 import tkinter as tk
+import hashlib
 import itertools
 import logging
 import functools
@@ -24,7 +25,7 @@ import trio
 
 from srctools import Vec, Property
 from srctools.vtf import VTFFlags, VTF
-from srctools.filesys import FileSystem, RawFileSystem, FileSystemChain
+from srctools.filesys import File, FileSystem, RawFileSystem, FileSystemChain
 import srctools.logger
 
 from app import TK_ROOT
@@ -155,21 +156,19 @@ PATH_BLACK = utils.PackagePath('<color>', '000')
 PATH_WHITE = utils.PackagePath('<color>', 'fff')
 
 
-def _load_file(
+def _find_file(
     fsys: FileSystem,
     uri: utils.PackagePath,
-    width: int, height: int,
-    resize_algo: Literal[0, 1, 2, 3, 4, 5],
     check_other_packages: bool=False,
-) -> Image.Image:
-    """Load an image from a filesystem."""
+) -> tuple[File | None, str]:
+    """Locate the file for an image, returning it and the extension."""
     path = uri.path.casefold()
     if path[-4:-3] == '.':
         path, ext = path[:-4], path[-3:]
     else:
         ext = "png"
 
-    image: Image.Image
+    img_file: File | None
     try:
         # TODO: Just for now, always light styled.
         img_file = fsys[f'{path}.light.{ext}']
@@ -192,7 +191,19 @@ def _load_file(
                 break
             except (KeyError, FileNotFoundError):
                 pass
+    return img_file, ext
+
 
+def _load_file(
+    fsys: FileSystem,
+    uri: utils.PackagePath,
+    width: int, height: int,
+    resize_algo: Literal[0, 1, 2, 3, 4, 5],
+    check_other_packages: bool=False,
+) -> Image.Image:
+    """Load an image from a filesystem."""
+    img_file, ext = _find_file(fsys, uri, check_other_packages)
+    image: Image.Image
     if img_file is None:
         LOGGER.error('"{}" does not exist!', uri)
         return Handle.error(width, height).get_pil()
@@ -495,6 +506,15 @@ class Handle:
             self.width, self.height
         )
 
+    def add_to_hash(self, hasher: hashlib._Hash) -> None:
+        """Add the contents of this image to a hash, to key things generated from it.
+
+        By default this uses the image data, subclasses may avoid needing to load it.
+        """
+        image = self.get_pil()
+        hasher.update(f'{type(self).__name__} {image.mode} {image.width}x{image.height}\n'.encode('utf8'))
+        hasher.update(image.tobytes())
+
     def has_users(self) -> bool:
         """Check if this image is being used."""
         return self._force_loaded or bool(self._users)
@@ -627,6 +647,10 @@ class ImgColor(Handle):
             (self.red, self.green, self.blue, 255),
         )
 
+    def add_to_hash(self, hasher: hashlib._Hash) -> None:
+        """The colour determines the contents."""
+        hasher.update(f'ImgColor {self.width}x{self.height} {self.red} {self.green} {self.blue}\n'.encode('utf8'))
+
 
 class ImgAlpha(Handle):
     """An image which is entirely transparent."""
@@ -685,6 +709,23 @@ class ImgFile(Handle):
 
         return _load_file(fsys, self.uri, self.width, self.height, Image.ANTIALIAS, True)
 
+    def add_to_hash(self, hasher: hashlib._Hash) -> None:
+        """Hash the source file directly, instead of decoding it."""
+        try:
+            fsys = PACK_SYSTEMS[self.uri.package]
+        except KeyError:
+            img_file = None
+        else:
+            img_file, ext = _find_file(fsys, self.uri, True)
+        if img_file is None:
+            # Produces the error icon.
+            super().add_to_hash(hasher)
+            return
+        hasher.update(f'ImgFile {self.width}x{self.height} {img_file.path}\n'.encode('utf8'))
+        with img_file.open_bin() as f:
+            while chunk := f.read(1024 * 1024):
+                hasher.update(chunk)
+
     def resize(self, width: int, height: int) -> ImgFile:
         """Return a copy with a different size."""
         return self._deduplicate(width, height, self.uri)
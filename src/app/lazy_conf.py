@@ -1,6 +1,7 @@
 """Implements callables which lazily parses and combines config files."""
 from __future__ import annotations
-from typing import Callable, Pattern
+from typing import Callable, NamedTuple, Pattern
+from weakref import WeakKeyDictionary
 import functools
 
 import trio
@@ -18,18 +19,69 @@ LazyConf = Callable[[], Property]
 BLANK: LazyConf = lambda: Property.root()
 
 
+class CacheInfo(NamedTuple):
+	"""Statistics for the parse cache, matching functools.lru_cache."""
+	hits: int
+	misses: int
+	currsize: int
+
+
+# (filesystem path, file path, source) -> (file cache key, parsed tree).
+# The tree is only handed out directly by shared(), otherwise copies are made.
+_PARSE_CACHE: dict[tuple[str, str, str], tuple[int, Property]] = {}
+_hits = _misses = 0
+# For configs which can be resolved without copying, a function to do so.
+_SHARED: WeakKeyDictionary[LazyConf, LazyConf] = WeakKeyDictionary()
+
+
+def cache_info() -> CacheInfo:
+	"""Report how effective the parse cache is."""
+	return CacheInfo(_hits, _misses, len(_PARSE_CACHE))
+
+
+def clear_cache() -> None:
+	"""Discard all parsed files. This is done whenever packages are reloaded."""
+	global _hits, _misses
+	_PARSE_CACHE.clear()
+	_hits = _misses = 0
+
+
+def shared(conf: LazyConf) -> Property:
+	"""Resolve a config, reusing the cached tree instead of copying it if possible.
+
+	The result may be shared with the cache and other callers, so it must not be modified.
+	"""
+	try:
+		func = _SHARED[conf]
+	except KeyError:
+		return conf()  # A fresh tree, so nobody else has it.
+	return func()
+
+
 def raw_prop(block: Property, source: str= '') -> LazyConf:
 	"""Make an existing property conform to the interface."""
 	if block or block.name is not None:
 		if source:
+			sourced: list[Property] = []
+
+			def get_sourced() -> Property:
+				"""Copy the config once, then apply the source."""
+				if not sourced:
+					copy = block.copy()
+					packages.set_cond_source(copy, source)
+					sourced.append(copy)
+				return sourced[0]
+
 			def copier() -> Property:
-				"""Copy the config, then apply the source."""
-				copy = block.copy()
-				packages.set_cond_source(copy, source)
-				return copy
-			return copier
-		else:  # We can just use the bound method.
-			return block.copy
+				"""Copy the config with the source applied."""
+				return get_sourced().copy()
+			_SHARED[copier] = get_sourced
+		else:
+			def copier() -> Property:
+				"""Copy the config."""
+				return block.copy()
+			_SHARED[copier] = lambda: block
+		return copier
 	else:  # If empty, source is irrelevant, and we can use the constant.
 		return BLANK
 
@@ -49,8 +101,25 @@ def from_file(path: utils.PackagePath, missing_ok: bool=False, source: str= '')
 			LOGGER.warning('File does not exist: "{}"', path)
 		return BLANK
 
-	def loader() -> Property:
-		"""Load and parse the specified file when called."""
+	cache_id = (str(fsys.path), file.path, source)
+
+	def load(copy: bool) -> Property:
+		"""Load and parse the specified file when called.
+
+		If the file is unchanged since it was last parsed, that is used instead.
+		If copy is true, the cached tree is copied before returning it.
+		"""
+		global _hits, _misses
+		cache_key = file.cache_key()
+		try:
+			cached_key, props = _PARSE_CACHE[cache_id]
+		except KeyError:
+			pass
+		else:
+			if cache_key != -1 and cache_key == cached_key:
+				_hits += 1
+				return props.copy() if copy else props
+		_misses += 1
 		try:
 			with file.open_str() as f:
 				props = Property.parse(f)
@@ -59,8 +128,14 @@ def from_file(path: utils.PackagePath, missing_ok: bool=False, source: str= '')
 			raise
 		if source:
 			packages.set_cond_source(props, source)
+		if cache_key != -1:
+			_PARSE_CACHE[cache_id] = (cache_key, props)
+			return props.copy() if copy else props
 		return props
 
+	loader: LazyConf = functools.partial(load, True)
+	_SHARED[loader] = functools.partial(load, False)
+
 	if app.DEV_MODE.get():
 		app.background_run(devmod_check, file, path)
 	return loader
@@ -92,6 +167,16 @@ def concat(a: LazyConf, b: LazyConf) -> LazyConf:
 		prop.extend(a())
 		prop.extend(b())
 		return prop
+
+	def concat_shared() -> Property:
+		"""Resolve then merge the configs, sharing their children."""
+		prop = Property.root()
+		# Extend would copy the children.
+		for child in [*shared(a), *shared(b)]:
+			prop.append(child)
+		return prop
+
+	_SHARED[concat_inner] = concat_shared
 	return concat_inner
 
 
@@ -117,4 +202,40 @@ def replace(base: LazyConf, replacements: list[tuple[Pattern[str], str]]) -> Laz
 					value = func(value)
 				prop.value = value
 		return copy
+
+	def replace_text(text: str) -> str:
+		"""Apply all the replacements to a name or value."""
+		for func in rep_funcs:
+			text = func(text)
+		return text
+
+	def replacer_shared() -> Property:
+		"""Replace values, only copying the blocks which change."""
+		return rebuild_tree(shared(base), replace_text)
+
+	_SHARED[replacer] = replacer_shared
 	return replacer
+
+
+def rebuild_tree(prop: Property, func: Callable[[str], str]) -> Property:
+	"""Apply a function to every name and value in a tree, without modifying the original.
+
+	Blocks where nothing changes are reused, so the result shares them with the original tree.
+	"""
+	name = prop.real_name
+	new_name = func(name) if name is not None else None
+	if prop.has_children():
+		children = [rebuild_tree(child, func) for child in prop]
+		if new_name == name and all(new is old for new, old in zip(children, prop)):
+			return prop
+		if new_name is None:
+			new_prop = Property.root()
+			for child in children:
+				new_prop.append(child)
+			return new_prop
+		return Property(new_name, children)
+	else:
+		value = func(prop.value)
+		if new_name == name and value == prop.value:
+			return prop
+		return Property(new_name, value)
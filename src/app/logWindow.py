@@ -13,17 +13,23 @@ import trio
 import attrs
 
 from config.gen_opts import GenOptions
+from log_buffer import LogBuffer
+import log_buffer
 import config
 
 
 _PIPE_MAIN_REC, PIPE_DAEMON_SEND = multiprocessing.Pipe(duplex=False)
 PIPE_DAEMON_REC, _PIPE_MAIN_SEND = multiprocessing.Pipe(duplex=False)
-# We need a queue because logs could be sent in from another thread.
+# Log records are collected here, then sent across in batches.
+_LOG_BUFFER = LogBuffer()
+# How often batches are sent, in seconds.
+_FLUSH_INTERVAL = log_buffer.DEFAULT_INTERVAL
+# We need a queue because settings could be sent in from another thread.
 _LOG_QUEUE: queue.Queue[
     Type[StopIteration] |
-    Tuple[Literal['log'], str, str] |
     Tuple[Literal['visible'], bool, None] |
-    Tuple[Literal['level'], str | int, None],
+    Tuple[Literal['level'], str | int, None] |
+    Tuple[Literal['capacity'], int, None],
 ] = queue.Queue(394)
 _SHUTDOWN = False
 
@@ -49,10 +55,7 @@ class TextHandler(logging.Handler):
         finally:
             # Undo the record overwrite, so other handlers get the correct object.
             record.msg = msg
-        try:
-            _LOG_QUEUE.put_nowait(('log', record.levelname, text))
-        except queue.Full:
-            print('Log queue overflowed!')
+        _LOG_BUFFER.push(record.levelname, text)
 
     def set_visible(self, is_visible: bool) -> None:
         """Show or hide the window."""
@@ -73,6 +76,17 @@ class TextHandler(logging.Handler):
         except queue.Full:
             pass
 
+    def set_buffer(self, capacity: int, interval: float) -> None:
+        """Set the number of records kept, and how often they are sent to the window."""
+        global _FLUSH_INTERVAL
+        _LOG_BUFFER.resize(capacity)
+        _FLUSH_INTERVAL = interval
+        try:
+            _LOG_QUEUE.put(('capacity', capacity, None), timeout=0.5)
+        except queue.Full:
+            pass
+
+
 HANDLER = TextHandler()
 logging.getLogger().addHandler(HANDLER)
 
@@ -92,13 +106,25 @@ async def loglevel_bg() -> None:
 
 
 def emit_logs() -> None:
-    """Send logs across the pipe in a background thread, so the main does not block."""
+    """Send logs across the pipe in a background thread, so the main does not block.
+
+    Records are sent in batches every flush interval, or whenever a setting changes.
+    """
     while True:
-        msg = _LOG_QUEUE.get()
+        try:
+            msg = _LOG_QUEUE.get(timeout=_FLUSH_INTERVAL)
+        except queue.Empty:
+            msg = None
         if msg is StopIteration or _SHUTDOWN:
             return
-        _PIPE_MAIN_SEND.send(msg)
-        _LOG_QUEUE.task_done()
+        records, dropped = _LOG_BUFFER.drain()
+        if dropped:
+            print(f'Log window skipped {dropped} messages!')
+        if records:
+            _PIPE_MAIN_SEND.send(('log', records, None))
+        if msg is not None:
+            _PIPE_MAIN_SEND.send(msg)
+            _LOG_QUEUE.task_done()
 
 
 async def setting_apply() -> None:
@@ -1,15 +1,18 @@
 """Generates various resources depending on package options."""
 from __future__ import annotations
 
+from io import BytesIO
 from pathlib import Path
 from PIL import Image, ImageDraw, ImageFont
 import colorsys
+import functools
 
 from srctools.vtf import VTF, ImageFormats
 import srctools.logger
 
 from app.itemconfig import ConfigGroup, parse_color
 from app import img
+import texture_cache
 
 LOGGER = srctools.logger.get_logger(__name__)
 # The number of cells to show in each row.
@@ -42,6 +45,23 @@ def make_cube_colourizer_legend(bee2_loc: Path) -> None:
         for tim, var in wid.values
     }
 
+    hasher = texture_cache.make_hasher('cube_colourizer')
+    hasher.update(f'{LEGEND_SIZE} {CELL_SIZE} {COLORIZER_ROWS}\n'.encode('utf8'))
+    for tim, color in sorted(colors.items()):
+        hasher.update(f'{tim}={color}\n'.encode('utf8'))
+    data = texture_cache.cached(
+        'cube_colourizer', hasher.hexdigest(),
+        functools.partial(build_cube_colourizer_legend, colors),
+    )
+
+    vtf_loc = bee2_loc / 'materials/BEE2/models/props_map_editor/cube_coloriser_legend.vtf'
+    vtf_loc.parent.mkdir(parents=True, exist_ok=True)
+    LOGGER.info('Exporting "{}"...', vtf_loc)
+    vtf_loc.write_bytes(data)
+
+
+def build_cube_colourizer_legend(colors: dict[int, tuple[int, int, int]]) -> bytes:
+    """Draw the legend texture, showing each timer value's colour."""
     legend = Image.new('RGB', (LEGEND_SIZE, LEGEND_SIZE), color=(255, 255, 255))
     draw = ImageDraw.Draw(legend)
 
@@ -88,16 +108,13 @@ def make_cube_colourizer_legend(bee2_loc: Path) -> None:
         frame = vtf.get(mipmap=i)
         frame.copy_from(b'\xFF' * (frame.width*frame.height), ImageFormats.I8)
 
-    vtf_loc = bee2_loc / 'materials/BEE2/models/props_map_editor/cube_coloriser_legend.vtf'
-    vtf_loc.parent.mkdir(parents=True, exist_ok=True)
-    with vtf_loc.open('wb') as f:
-        LOGGER.info('Exporting "{}"...', f.name)
-        try:
-            vtf.save(f)
-        except NotImplementedError:
-            LOGGER.warning('No DXT compressor, using RGB888.')
-            # No libsquish, so DXT compression doesn't work.
-            vtf.format = vtf.low_format = ImageFormats.RGB888
-            f.truncate(0)
-            f.seek(0)
-            vtf.save(f)
+    buf = BytesIO()
+    try:
+        vtf.save(buf)
+    except NotImplementedError:
+        LOGGER.warning('No DXT compressor, using RGB888.')
+        # No libsquish, so DXT compression doesn't work.
+        vtf.format = vtf.low_format = ImageFormats.RGB888
+        buf = BytesIO()
+        vtf.save(buf)
+    return buf.getvalue()
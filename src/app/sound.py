@@ -3,16 +3,19 @@ This module provides a wrapper around Pyglet, in order to play sounds easily.
 To use, call sound.fx() with one of the dict keys.
 If PyGame fails to load, all fx() calls will fail silently.
 (Sounds are not critical to the app, so they just won't play.)
+Pyglet is slow to import, so this is only done once sounds are first required.
 """
 from __future__ import annotations
 from tkinter import Event
-from typing import IO, Optional, Callable
+from typing import IO, TYPE_CHECKING, Hashable, Optional, Callable
+from collections import OrderedDict
 import os
 import functools
 import shutil
+import time
 
 import trio
-from srctools.filesys import FileSystemChain, FileSystem, RawFileSystem
+from srctools.filesys import File, FileSystemChain, FileSystem, RawFileSystem
 import srctools.logger
 
 from app import TK_ROOT
@@ -20,15 +23,25 @@ from config.gen_opts import GenOptions
 import config
 import utils
 
+if TYPE_CHECKING:
+    import pyglet.media
+    from pyglet.media.codecs import Source
+    from pyglet.media.codecs.ffmpeg import FFmpegDecoder
+
 __all__ = [
     'SamplePlayer',
 
-    'pyglet_version',
+    'pyglet_version', 'load_pyglet',
     'fx', 'fx_blockable', 'block_fx',
 ]
 
 LOGGER = srctools.logger.get_logger(__name__)
 SAMPLE_WRITE_PATH = utils.conf_location('music_sample/music')
+# Samples at most this long (in seconds) are fully decoded and cached in memory.
+# Longer ones are streamed from the package each time.
+SAMPLE_CACHE_DURATION = 60.0
+# The maximum total size of decoded samples to keep in memory, in bytes.
+SAMPLE_CACHE_BUDGET = 64 * 1024 * 1024
 # Nursery to hold sound-related tasks. We can cancel this to shutdown sound logic.
 _nursery: trio.Nursery | None = None
 
@@ -108,6 +121,7 @@ class PygletSound(NullSound):
         fname = SOUNDS[name]
         path = str(utils.install_path('sounds/{}.ogg'.format(fname)))
         LOGGER.info('Loading sound "{}" -> {}', name, path)
+        assert decoder is not None
         try:
             src: pyglet.media.Source = await trio.to_thread.run_sync(functools.partial(
                 decoder.decode,
@@ -159,6 +173,8 @@ async def sound_task() -> None:
     triggering sound tasks, and gradually loads background sounds.
     """
     global _nursery
+    if not load_pyglet():
+        return
     async with trio.open_nursery() as _nursery:
         # Send off sound tasks.
         for sound in SOUNDS:
@@ -217,20 +233,115 @@ if utils.WIN and not utils.FROZEN:
     # Add a libs folder for FFmpeg dlls.
     os.environ['PATH'] = f'{utils.install_path("lib-" + utils.BITNESS).absolute()};{os.environ["PATH"]}'
 
-sounds: NullSound
-try:
-    import pyglet.media
-    from pyglet.media.codecs import Source
-    from pyglet.media.codecs.ffmpeg import FFmpegDecoder
-    from pyglet import version as pyglet_version
-    from pyglet.clock import tick
+# Set once Pyglet has been imported.
+sounds: NullSound = NullSound()
+pyglet_version = '(Not loaded)'
+decoder: Optional[FFmpegDecoder] = None
+_pyglet_loaded: Optional[bool] = None
+
+
+def load_pyglet() -> bool:
+    """Import Pyglet if not already done, then return if it is available."""
+    global _pyglet_loaded, pyglet, tick, decoder, sounds, pyglet_version
+    if _pyglet_loaded is not None:
+        return _pyglet_loaded
+    start = time.perf_counter()
+    try:
+        import pyglet.media
+        from pyglet.media.codecs.ffmpeg import FFmpegDecoder
+        from pyglet import version
+        from pyglet.clock import tick
+
+        decoder = FFmpegDecoder()
+        sounds = PygletSound()
+    except Exception:
+        LOGGER.exception('Pyglet not importable:')
+        pyglet_version = '(Not installed)'
+        sounds = NullSound()
+        _pyglet_loaded = False
+    else:
+        pyglet_version = version
+        _pyglet_loaded = True
+        LOGGER.debug('Imported Pyglet in {:.0f}ms', (time.perf_counter() - start) * 1000)
+    return _pyglet_loaded
+
+
+class SourceCache:
+    """A least-recently-used cache of decoded sounds, limited to a total size in bytes."""
+    def __init__(self, budget: int) -> None:
+        self._sources: OrderedDict[Hashable, tuple[Source, int]] = OrderedDict()
+        self._budget = budget
+        self.size = 0
+        self.hits = self.misses = 0
+
+    @property
+    def budget(self) -> int:
+        """The maximum number of bytes to keep."""
+        return self._budget
+
+    @budget.setter
+    def budget(self, budget: int) -> None:
+        """Change the budget, evicting sources if required."""
+        self._budget = budget
+        self._evict()
+
+    def get(self, key: Hashable) -> Optional[Source]:
+        """Fetch a source, marking it as recently used."""
+        try:
+            source, size = self._sources[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        self._sources.move_to_end(key)
+        self.hits += 1
+        return source
+
+    def add(self, key: Hashable, source: Source, size: int) -> None:
+        """Store a source. If it's larger than the whole budget, it isn't kept."""
+        if size > self._budget:
+            return
+        try:
+            old_size = self._sources.pop(key)[1]
+        except KeyError:
+            pass
+        else:
+            self.size -= old_size
+        self._sources[key] = (source, size)
+        self.size += size
+        self._evict()
 
-    decoder = FFmpegDecoder()
-    sounds = PygletSound()
-except Exception:
-    LOGGER.exception('Pyglet not importable:')
-    pyglet_version = '(Not installed)'
-    sounds = NullSound()
+    def _evict(self) -> None:
+        """Remove the least recently used sources, until we're within budget."""
+        while self.size > self._budget and self._sources:
+            _, (_, size) = self._sources.popitem(last=False)
+            self.size -= size
+
+    def clear(self) -> None:
+        """Discard all sources."""
+        self._sources.clear()
+        self.size = 0
+
+
+SAMPLE_CACHE = SourceCache(SAMPLE_CACHE_BUDGET)
+
+
+def _sample_key(child_sys: FileSystem, file: File) -> Optional[Hashable]:
+    """Compute the key to cache a sample under, or None if it can't be cached.
+
+    This changes if the file is modified.
+    """
+    cache_key = file.cache_key()
+    if cache_key == -1:
+        return None
+    return child_sys.path, file.path, cache_key
+
+
+def _decoded_size(source: Source) -> int:
+    """Compute the memory required for a decoded source."""
+    fmt = source.audio_format
+    if fmt is None or source.duration is None:
+        return 0
+    return int(fmt.bytes_per_second * source.duration)
 
 
 def clean_sample_folder() -> None:
@@ -280,6 +391,11 @@ class SamplePlayer:
             self.stop()
             return
 
+        start = time.perf_counter()
+        if not load_pyglet():
+            self.stop_callback()
+            LOGGER.warning('Cannot play sample "{}", Pyglet is not available.', self.cur_file)
+            return
         try:
             file = self.system[self.cur_file]
         except (KeyError, FileNotFoundError):
@@ -288,39 +404,79 @@ class SamplePlayer:
             return  # Abort if music isn't found..
 
         child_sys = self.system.get_system(file)
-        # Special case raw filesystems - Pyglet is more efficient
-        # if it can just open the file itself.
-        if isinstance(child_sys, RawFileSystem):
-            load_path = os.path.join(child_sys.path, file.path)
-            LOGGER.debug('Loading music directly from {!r}', load_path)
+        cache_key = _sample_key(child_sys, file)
+        sound = SAMPLE_CACHE.get(cache_key) if cache_key is not None else None
+        if sound is not None:
+            kind = 'warm'
         else:
-            # In a filesystem, we need to extract it.
-            # SAMPLE_WRITE_PATH + the appropriate extension.
-            sample_fname = SAMPLE_WRITE_PATH.with_suffix(os.path.splitext(self.cur_file)[1])
-            with file.open_bin() as fsrc, sample_fname.open('wb') as fdest:
-                shutil.copyfileobj(fsrc, fdest)
-            LOGGER.debug('Loading music {} as {}', self.cur_file, sample_fname)
-            load_path = str(sample_fname)
-        try:
-            sound = decoder.decode(None, load_path)
-        except Exception:
-            self.stop_callback()
-            LOGGER.exception('Sound sample not valid: "{}"', self.cur_file)
-            return  # Abort if music isn't found or can't be loaded.
+            kind = 'cold'
+            try:
+                sound = self._open_source(file, child_sys)
+            except Exception:
+                self._close_handle()
+                self.stop_callback()
+                LOGGER.exception('Sound sample not valid: "{}"', self.cur_file)
+                return  # Abort if music isn't found or can't be loaded.
+            if sound.duration is not None and sound.duration <= SAMPLE_CACHE_DURATION:
+                # Short enough to decode fully, so it can be replayed without decoding again.
+                sound = pyglet.media.StaticSource(sound)
+                self._close_handle()
+                if cache_key is not None:
+                    SAMPLE_CACHE.add(cache_key, sound, _decoded_size(sound))
+            else:
+                kind = 'streamed'
 
         self.player = sound.play()
+        LOGGER.info(
+            'Sample "{}" ({}) started in {:.0f}ms',
+            self.cur_file, kind, (time.perf_counter() - start) * 1000,
+        )
         self.after = TK_ROOT.after(
             int(sound.duration * 1000),
             self._finished,
         )
         self.start_callback()
 
+    def _open_source(self, file: File, child_sys: FileSystem) -> Source:
+        """Open a streaming source for this file.
+
+        Files inside packages are read directly from the package where possible.
+        """
+        assert decoder is not None
+        # Special case raw filesystems - Pyglet is more efficient
+        # if it can just open the file itself.
+        if isinstance(child_sys, RawFileSystem):
+            load_path = os.path.join(child_sys.path, file.path)
+            LOGGER.debug('Loading music directly from {!r}', load_path)
+            return decoder.decode(None, load_path, streaming=True)
+        self._handle = file.open_bin()
+        try:
+            LOGGER.debug('Streaming music {} from {}', file.path, child_sys.path)
+            return decoder.decode(self._handle, file.path, streaming=True)
+        except Exception:
+            LOGGER.debug('Could not stream from package, extracting:', exc_info=True)
+            self._close_handle()
+        # Otherwise, we need to extract it.
+        # SAMPLE_WRITE_PATH + the appropriate extension.
+        sample_fname = SAMPLE_WRITE_PATH.with_suffix(os.path.splitext(file.path)[1])
+        with file.open_bin() as fsrc, sample_fname.open('wb') as fdest:
+            shutil.copyfileobj(fsrc, fdest)
+        LOGGER.debug('Loading music {} as {}', file.path, sample_fname)
+        return decoder.decode(None, str(sample_fname), streaming=True)
+
+    def _close_handle(self) -> None:
+        """Close the package file being streamed from, if any."""
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
     def stop(self) -> None:
         """Cancel the music, if it's playing."""
         if self.player is not None:
             self.player.pause()
             self.player = None
             self.stop_callback()
+        self._close_handle()
 
         if self.after is not None:
             TK_ROOT.after_cancel(self.after)
@@ -330,4 +486,5 @@ class SamplePlayer:
         """Reset values after the sound has finished."""
         self.player = None
         self.after = None
+        self._close_handle()
         self.stop_callback()
@@ -5,18 +5,13 @@ This produces a stream of values, which are fed into richTextBox to display.
 from __future__ import annotations
 
 from typing import Iterator, Mapping, Sequence
-from contextvars import ContextVar
-import urllib.parse
 import itertools
 import enum
 
 import attrs
-from mistletoe import block_token as btok, span_token as stok, base_renderer
-import mistletoe
 import srctools.logger
 
 from app.img import Handle as ImgHandle
-import utils
 from transtoken import TransToken, TransTokenSource
 
 
@@ -80,20 +75,6 @@ class Image(Block):
     handle: ImgHandle
 
 
-_HR = [
-    TextSegment('\n', (), None),
-    TextSegment('\n', (TextTag.HRULE, ), None),
-    TextSegment('\n', (), None),
-]
-# Unicode bullet characters, in order of use.
-BULLETS = [
-    '\N{bullet} ',  # Regular bullet
-    '\u25E6 ',  # White/hollow bullet
-    '- ',  # Dash
-    '\u2023 ',  # Triangular bullet
-]
-
-
 class MarkdownData:
     """Protocol for objects holding Markdown data."""
     def __iter__(self) -> Iterator[Block]:
@@ -149,202 +130,13 @@ class JoinedMarkdown(MarkdownData):
         return itertools.chain.from_iterable(self.children)
 
 
-@attrs.define
-class RenderState:
-    """The data needed to convert tokens.
-
-    Since the TKRenderer is shared, we need this to prevent storing state on that.
-    """
-    package: str
-    # The lists we're currently generating.
-    # If none it's bulleted, otherwise it's the current count.
-    list_stack: list[int | None] = attrs.Factory(list)
-
-
-no_state = RenderState('')
-state = ContextVar('tk_markdown_state', default=no_state)
-
+def _convert(text: str, package: str | None) -> SingleMarkdown:
+    """Actually convert markdown data.
 
-class TKRenderer(base_renderer.BaseRenderer):
-    """Extension needed to extract our list from the tree.
+    The renderer is imported only when first required, since Mistletoe is slow to import.
     """
-    def render(self, token: btok.BlockToken) -> SingleMarkdown:
-        """Indicate the correct types for this."""
-        assert state.get() is not no_state
-        return super().render(token)
-
-    def render_inner(self, token: stok.SpanToken | btok.BlockToken) -> SingleMarkdown:
-        """
-        Recursively renders child tokens. Joins the rendered
-        strings with no space in between.
-
-        If newlines / spaces are needed between tokens, add them
-        in their respective templates, or override this function
-        in the renderer subclass, so that whitespace won't seem to
-        appear magically for anyone reading your program.
-
-        Arguments:
-            token: a branch node who has children attribute.
-        """
-        blocks: list[Block] = []
-        # Merge together adjacent text segments.
-        for child in token.children:
-            for data in self.render(child):
-                if isinstance(data, TextSegment) and blocks:
-                    last = blocks[-1]
-                    if isinstance(last, TextSegment):
-                        if last.tags == data.tags and last.url == data.url:
-                            blocks[-1] = TextSegment(last.text + data.text, last.tags, last.url)
-                            continue
-                blocks.append(data)
-
-        return SingleMarkdown(blocks)
-
-    def _with_tag(self, token: stok.SpanToken | btok.BlockToken, *tags: TextTag, url: str=None) -> SingleMarkdown:
-        added_tags = set(tags)
-        result = self.render_inner(token)
-        for i, data in enumerate(result):
-            if isinstance(data, TextSegment):
-                new_seg = TextSegment(data.text, tuple(added_tags.union(data.tags)), url or data.url)
-                result.blocks[i] = new_seg  # type: ignore  # Readonly to users.
-        return result
-
-    def render_auto_link(self, token: stok.AutoLink) -> SingleMarkdown:
-        """An automatic link - the child is a single raw token."""
-        [child] = token.children
-        assert isinstance(child, stok.RawText)
-        return MarkdownData.text(child.content, TextTag.LINK, url=token.target)
-
-    def render_block_code(self, token: btok.BlockCode) -> SingleMarkdown:
-        """Render full code blocks."""
-        [child] = token.children
-        assert isinstance(child, stok.RawText)
-        # TODO: Code block.
-        return MarkdownData.text(child.content, TextTag.CODE)
-
-    def render_document(self, token: btok.Document) -> SingleMarkdown:
-        """Render the outermost document."""
-        self.footnotes.update(token.footnotes)
-        return self.render_inner(token)
-
-    def render_escape_sequence(self, token: stok.EscapeSequence) -> SingleMarkdown:
-        """Render backslash escaped text."""
-        [child] = token.children
-        assert isinstance(child, stok.RawText)
-        return SingleMarkdown.text(child.content)
-
-    def render_image(self, token: stok.Image) -> SingleMarkdown:
-        """Embed an image into a file."""
-        uri = utils.PackagePath.parse(urllib.parse.unquote(token.src), state.get().package)
-        return SingleMarkdown([Image(ImgHandle.parse_uri(uri))])
-
-    def render_inline_code(self, token: stok.InlineCode) -> SingleMarkdown:
-        """Render inline code segments."""
-        [child] = token.children
-        assert isinstance(child, stok.RawText)
-        return MarkdownData.text(child.content, TextTag.CODE)
-
-    def render_line_break(self, token: stok.LineBreak) -> SingleMarkdown:
-        """Render a newline."""
-        if token.soft:
-            return SingleMarkdown([])
-        else:
-            return MarkdownData.text('\n')
-
-    def render_link(self, token: stok.Link) -> SingleMarkdown:
-        """Render links."""
-        return self._with_tag(token, url=token.target)
-
-    def render_list(self, token: btok.List) -> SingleMarkdown:
-        """The wrapping around a list, specifying the type and start number."""
-        stack = state.get().list_stack
-        stack.append(token.start)
-        try:
-            return self.render_inner(token)
-        finally:
-            stack.pop()
-
-    def render_list_item(self, token: btok.ListItem) -> SingleMarkdown:
-        """The individual items in a list."""
-        stack = state.get().list_stack
-        count = stack[-1]
-        if count is None:
-            # Bullet list, make nested ones use different characters.
-            nesting = stack.count(None) - 1
-            prefix = BULLETS[nesting % len(BULLETS)]
-        else:
-            prefix = f'{count}. '
-            stack[-1] += 1
-
-        return _merge(
-            MarkdownData.text(prefix, TextTag.LIST_START),
-            self._with_tag(token, TextTag.LIST),
-        )
-
-    def render_paragraph(self, token: btok.Paragraph) -> SingleMarkdown:
-        if state.get().list_stack:  # Collapse together.
-            return _merge(self.render_inner(token), MarkdownData.text('\n'))
-        else:
-            return _merge(MarkdownData.text('\n'), self.render_inner(token), MarkdownData.text('\n'))
-
-    def render_raw_text(self, token: stok.RawText) -> SingleMarkdown:
-        return MarkdownData.text(token.content)
-
-    def render_table(self, token: btok.Table) -> SingleMarkdown:
-        """We don't support tables."""
-        # TODO?
-        return MarkdownData.text('<Tables not supported>')
-
-    def render_table_cell(self, token: btok.TableCell) -> SingleMarkdown:
-        """Unimplemented table cells."""
-        return MarkdownData.text('<Tables not supported>')
-
-    def render_table_row(self, token: btok.TableRow) -> SingleMarkdown:
-        """Unimplemented table rows."""
-        return MarkdownData.text('<Tables not supported>')
-
-    def render_thematic_break(self, token: btok.ThematicBreak) -> SingleMarkdown:
-        """Render a horizontal rule."""
-        return SingleMarkdown(_HR.copy())
-
-    def render_heading(self, token: btok.Heading) -> SingleMarkdown:
-        """Render a level 1-6 heading."""
-        return self._with_tag(token, TAG_HEADINGS[token.level])
-
-    def render_quote(self, token: btok.Quote) -> SingleMarkdown:
-        """Render blockquotes."""
-        return self._with_tag(token, TextTag.INDENT)
-
-    def render_strikethrough(self, token: stok.Strikethrough) -> SingleMarkdown:
-        """Render strikethroughed text."""
-        return self._with_tag(token, TextTag.STRIKETHROUGH)
-
-    def render_strong(self, token: stok.Strong) -> SingleMarkdown:
-        """Render <strong> tags, with bold fonts."""
-        return self._with_tag(token, TextTag.BOLD)
-
-    def render_emphasis(self, token: stok.Emphasis) -> SingleMarkdown:
-        """Render <em> tags, with italic fonts."""
-        return self._with_tag(token, TextTag.ITALIC)
-
-_RENDERER = TKRenderer()
-
-
-def _merge(*blocks: SingleMarkdown) -> SingleMarkdown:
-    """Merge single markdown blocks together."""
-    result: list[Block] = []
-    for seg in blocks:
-        result.extend(seg.blocks)
-    return SingleMarkdown(result)
-
-
-def _convert(text: str, package: str | None) -> SingleMarkdown:
-    """Actually convert markdown data."""
-    tok = state.set(RenderState(package))
-    try:
-        return _RENDERER.render(mistletoe.Document(text))
-    finally:
-        state.reset(tok)
+    from app import md_renderer
+    return md_renderer.convert(text, package)
 
 
 def convert(text: TransToken, package: str | None) -> MarkdownData:
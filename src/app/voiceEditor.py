@@ -1,6 +1,12 @@
-"""Allows enabling and disabling specific voicelines."""
-import functools
+"""Allows enabling and disabling specific voicelines.
+
+Large quote packs have thousands of lines, so each tab is only filled in when first
+viewed. The enabled state is stored per tab, and only enough rows of widgets to fill the
+visible part of the tab are made, which are reused as it is scrolled.
+"""
 import itertools
+import math
+import time
 from decimal import Decimal
 from enum import Enum
 from typing import Iterator, List, Tuple, Dict, Optional, Any
@@ -10,12 +16,13 @@ from tkinter import font
 from tkinter import ttk
 
 from srctools import Property
+import attrs
 import srctools.logger
 
 from BEE2_config import ConfigFile
 from packages import QuotePack
 from transtoken import TransToken
-from app.tooltip import add_tooltip
+from app.tooltip import add_tooltip, set_tooltip
 from app import img, TK_ROOT, localisation
 from app import tk_tools
 
@@ -25,10 +32,14 @@ LOGGER = srctools.logger.get_logger(__name__)
 voice_item = None
 
 UI: Dict[str, Any] = {}
-TABS: Dict[str, ttk.Frame] = {}
+TABS: Dict[str, 'Tab'] = {}
 
 QUOTE_FONT = font.nametofont('TkHeadingFont').copy()
 QUOTE_FONT['weight'] = 'bold'
+# Padding above and below each row in the tabs.
+ROW_PADDING = 2
+# Badge images are this size.
+BADGE_SIZE = 16
 
 
 IMG: Dict[str, Tuple[img.Handle, TransToken]] = {
@@ -69,6 +80,25 @@ class TabTypes(Enum):
     MIDCHAMBER = MID = 1
     RESPONSE = RESP = 2
 
+
+@attrs.frozen
+class Row:
+    """A quote heading, or a line which can be toggled."""
+    name: TransToken
+    # For headings, the rest are blank.
+    badges: List[Tuple[img.Handle, TransToken]] = attrs.Factory(list)
+    line: Optional[Property] = None
+    section: str = ''
+    line_id: str = ''
+    # Position in the tab's enabled state.
+    index: int = -1
+
+    @property
+    def is_heading(self) -> bool:
+        """Headings have no line to toggle."""
+        return self.line is None
+
+
 win = Toplevel(TK_ROOT, name='voiceEditor')
 win.withdraw()
 
@@ -100,6 +130,7 @@ def init_widgets():
 
     UI['tabs'] = ttk.Notebook(pane)
     UI['tabs'].enable_traversal()  # Add keyboard shortcuts
+    UI['tabs'].bind('<<NotebookTabChanged>>', lambda e: build_selected())
     pane.add(UI['tabs'])
     pane.paneconfigure(UI['tabs'], minsize=50)
 
@@ -156,12 +187,12 @@ def quote_sort_func(quote: Property) -> Decimal:
         return Decimal('0')
 
 
-def show_trans(e) -> None:
+def show_trans(transcript: List[Tuple[str, str]]) -> None:
     """Add the transcript to the list."""
     text = UI['trans']
     text['state'] = 'normal'
     text.delete(1.0, END)
-    for actor, line in e.widget.transcript:
+    for actor, line in transcript:
         text.insert('end', actor, ('bold',))
         text.insert('end', line + '\n\n')
     # Remove the trailing newlines
@@ -169,11 +200,6 @@ def show_trans(e) -> None:
     text['state'] = 'disabled'
 
 
-def check_toggled(var, config_section, quote_id):
-    """Update the config file to match the checkbox."""
-    config_section[quote_id] = srctools.bool_as_int(var.get())
-
-
 def save():
     global voice_item
     if voice_item is not None:
@@ -186,6 +212,155 @@ def save():
         win.withdraw()
 
 
+class RowWidget:
+    """The widgets for one visible row in a tab, which are reassigned to different rows as it scrolls."""
+    def __init__(self, tab: 'Tab') -> None:
+        self.tab = tab
+        self.row: Optional[Row] = None
+        self.frame = ttk.Frame(tab.canv)
+        self.frame.columnconfigure(0, weight=1)
+        self.win_id = tab.canv.create_window(0, 0, window=self.frame, anchor='nw')
+
+        self.heading = ttk.Label(self.frame, font=QUOTE_FONT)
+        self.line_frame = ttk.Frame(self.frame)
+        self.badges: List[ttk.Label] = []
+        self.var = IntVar(value=1)
+        self.check = ttk.Checkbutton(self.line_frame, variable=self.var, command=self.toggled)
+        self.check.bind('<Enter>', self.hovered)
+
+    def assign(self, row: Row) -> None:
+        """Display this row."""
+        if row is self.row:
+            return
+        self.row = row
+        if row.is_heading:
+            self.line_frame.grid_remove()
+            localisation.set_text(self.heading, row.name)
+            self.heading.grid(row=0, column=0, sticky=W)
+            return
+        self.heading.grid_remove()
+        self.line_frame.grid(row=0, column=0, padx=(10, 0), sticky=W)
+        while len(self.badges) < len(row.badges):
+            label = ttk.Label(self.line_frame, padding=0)
+            add_tooltip(label)
+            self.badges.append(label)
+        for x, label in enumerate(self.badges):
+            if x < len(row.badges):
+                img_handle, ctx = row.badges[x]
+                img.apply(label, img_handle)
+                set_tooltip(label, ctx)
+                label.grid(row=0, column=x)
+            else:
+                img.apply(label, None)
+                label.grid_remove()
+        localisation.set_text(self.check, row.name)
+        self.var.set(self.tab.enabled[row.index])
+        self.check.grid(row=0, column=len(row.badges))
+
+    def toggled(self) -> None:
+        """Update the tab and config file to match the checkbox."""
+        if self.row is not None and not self.row.is_heading:
+            self.tab.set_enabled(self.row, bool(self.var.get()))
+
+    def hovered(self, _: Event) -> None:
+        """Show the transcript for this line."""
+        if self.row is not None and self.row.line is not None:
+            show_trans(list(get_trans_lines(self.row.line)))
+
+
+class Tab:
+    """The quotes in a tab, and their enabled state.
+
+    The widgets are only made once the tab is viewed.
+    """
+    def __init__(
+        self,
+        tab_type: TabTypes,
+        name: TransToken,
+        desc: TransToken,
+        config: ConfigFile,
+        rows: List[Row],
+        enabled: bytearray,
+    ) -> None:
+        self.nb_type = tab_type
+        self.nb_text = name
+        self.desc = desc
+        self.config = config
+        self.rows = rows
+        self.enabled = enabled
+        # This is just to hold the canvas and scrollbar
+        self.frame = ttk.Frame(UI['tabs'])
+        self.frame.columnconfigure(0, weight=1)
+        self.frame.rowconfigure(3, weight=1)
+        self.built = False
+        self.canv: Optional[Canvas] = None
+        self.row_height = 0
+        self.pool: List[RowWidget] = []
+
+    def set_enabled(self, row: Row, enabled: bool) -> None:
+        """Toggle a line."""
+        self.enabled[row.index] = enabled
+        self.config[row.section][row.line_id] = srctools.bool_as_int(enabled)
+
+    def build(self) -> None:
+        """Create the widgets for the tab."""
+        if self.built:
+            return
+        self.built = True
+        localisation.set_text(
+            ttk.Label(self.frame, anchor='center', font='tkHeadingFont'),
+            self.nb_text,
+        ).grid(row=0, column=0, columnspan=2, sticky='EW')
+        localisation.set_text(ttk.Label(self.frame), self.desc).grid(row=1, column=0, columnspan=2, sticky='EW')
+        ttk.Separator(self.frame, orient=HORIZONTAL).grid(row=2, column=0, columnspan=2, sticky='EW')
+
+        # The rows are positioned on the canvas, so it handles the scrolling.
+        self.canv = canv = Canvas(self.frame, highlightthickness=0)
+        scroll = tk_tools.HidingScroll(self.frame, orient=VERTICAL, command=canv.yview)
+        canv.grid(row=3, column=0, sticky='NSEW')
+        scroll.grid(row=3, column=1, sticky='NS')
+
+        def scrolled(first: str, last: str) -> None:
+            """Update the scrollbar, then fill in the rows now visible."""
+            scroll.set(first, last)
+            self.refresh()
+
+        canv['yscrollcommand'] = scrolled
+        first = RowWidget(self)
+        self.pool.append(first)
+        self.row_height = max(
+            first.heading.winfo_reqheight(),
+            first.check.winfo_reqheight(),
+            BADGE_SIZE,
+        ) + 2 * ROW_PADDING
+        canv['yscrollincrement'] = self.row_height
+        canv['scrollregion'] = (0, 0, 0, self.row_height * len(self.rows))
+        canv.bind('<Configure>', self.resized)
+
+    def resized(self, event: Event) -> None:
+        """Make enough rows to fill the canvas, and stretch them across it."""
+        count = min(len(self.rows), math.ceil(event.height / self.row_height) + 1)
+        while len(self.pool) < count:
+            self.pool.append(RowWidget(self))
+        for widget in self.pool:
+            self.canv.itemconfigure(widget.win_id, width=event.width, height=self.row_height)
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Assign the visible rows to the widgets."""
+        if self.canv is None:
+            return
+        start = max(0, int(self.canv.canvasy(0) // self.row_height))
+        for offset, widget in enumerate(self.pool):
+            index = start + offset
+            if index < len(self.rows):
+                widget.assign(self.rows[index])
+                self.canv.coords(widget.win_id, 0, index * self.row_height)
+                self.canv.itemconfigure(widget.win_id, state='normal')
+            else:
+                self.canv.itemconfigure(widget.win_id, state='hidden')
+
+
 def add_tabs() -> None:
     """Add the tabs to the notebook."""
     notebook = UI['tabs']
@@ -197,28 +372,42 @@ def add_tabs() -> None:
 
     # Add or remove tabs so only the correct mode is visible.
     for name, tab in sorted(TABS.items()):
-        notebook.add(tab)
+        notebook.add(tab.frame)
         # For the special tabs, we use a special image to make
         # sure they are well-distinguished from the other groups
         if tab.nb_type is TabTypes.MID:
             notebook.tab(
-                tab,
+                tab.frame,
                 compound='image',
                 image=img.Handle.builtin('icons/mid_quote', 32, 16).get_tk(),
                 )
         if tab.nb_type is TabTypes.RESPONSE:
             notebook.tab(
-                tab,
+                tab.frame,
                 compound=RIGHT,
                 image=img.Handle.builtin('icons/resp_quote', 16, 16),
                 # i18n: 'response' tab name, should be short.
                 text=str(TransToken.ui('Resp')),
             )
         else:
-            notebook.tab(tab, text=str(tab.nb_text))
+            notebook.tab(tab.frame, text=str(tab.nb_text))
 
     if current_tab is not None:
-        notebook.select(current_tab)
+        try:
+            notebook.select(current_tab)
+        except TclError:  # This pack has fewer tabs.
+            pass
+
+
+def build_selected() -> None:
+    """Create the widgets for the selected tab, if not done already."""
+    try:
+        selected = UI['tabs'].select()
+    except TclError:
+        return
+    for tab in TABS.values():
+        if str(tab.frame) == selected:
+            tab.build()
 
 
 def show(quote_pack: QuotePack):
@@ -227,6 +416,7 @@ def show(quote_pack: QuotePack):
     if voice_item is not None:
         return
 
+    start_time = time.perf_counter()
     voice_item = quote_pack
 
     localisation.set_win_title(win, TransToken.ui(
@@ -250,10 +440,10 @@ def show(quote_pack: QuotePack):
     # Destroy all the old tabs
     for tab in TABS.values():
         try:
-            notebook.forget(tab)
+            notebook.forget(tab.frame)
         except TclError:
             pass
-        tab.destroy()
+        tab.frame.destroy()
 
     TABS.clear()
 
@@ -301,14 +491,21 @@ def show(quote_pack: QuotePack):
     config_resp.save()
 
     add_tabs()
+    build_selected()
 
     win.deiconify()
     tk_tools.center_win(win)  # Center inside the parent
     win.lift()
+    win.update_idletasks()
+    LOGGER.info(
+        'Voice editor ready for "{}" in {:.1f}ms ({} lines in {} tabs)',
+        quote_pack.id, (time.perf_counter() - start_time) * 1000,
+        sum(len(tab.enabled) for tab in TABS.values()), len(TABS),
+    )
 
 
 def make_tab(pak_id: str, group: Property, config: ConfigFile, tab_type: TabTypes) -> None:
-    """Create all the widgets for a tab."""
+    """Collect the quotes and lines for a tab. The widgets are made when it's first viewed."""
     if tab_type is TabTypes.MIDCHAMBER:
         # Mid-chamber voice lines have predefined values.
         group_name = TransToken.ui('Mid - Chamber')
@@ -334,53 +531,6 @@ def make_tab(pak_id: str, group: Property, config: ConfigFile, tab_type: TabType
     else:
         raise ValueError('Invalid tab type!')
 
-    # This is just to hold the canvas and scrollbar
-    outer_frame = ttk.Frame(UI['tabs'])
-    outer_frame.columnconfigure(0, weight=1)
-    outer_frame.rowconfigure(0, weight=1)
-
-    TABS[group_name.token] = outer_frame
-    # We add this attribute so the refresh() method knows all the
-    # tab names
-    outer_frame.nb_text = group_name
-    outer_frame.nb_type = tab_type
-
-    # We need a canvas to make the list scrollable.
-    canv = Canvas(
-        outer_frame,
-        highlightthickness=0,
-        )
-    scroll = tk_tools.HidingScroll(
-        outer_frame,
-        orient=VERTICAL,
-        command=canv.yview,
-        )
-    canv['yscrollcommand'] = scroll.set
-    canv.grid(row=0, column=0, sticky='NSEW')
-    scroll.grid(row=0, column=1, sticky='NS')
-
-    UI['tabs'].add(outer_frame)
-
-    # This holds the actual elements
-    frame = ttk.Frame(
-        canv,
-        )
-    frame.columnconfigure(0, weight=1)
-    canv.create_window(0, 0, window=frame, anchor="nw")
-
-    localisation.set_text(
-        ttk.Label(frame, anchor='center', font='tkHeadingFont'),
-        group_name,
-    ).grid(row=0,column=0, sticky='EW')
-
-    localisation.set_text(ttk.Label(frame), group_desc).grid(row=1, column=0, sticky='EW')
-
-    ttk.Separator(frame, orient=HORIZONTAL).grid(
-        row=2,
-        column=0,
-        sticky='EW',
-    )
-
     if tab_type is TabTypes.RESPONSE:
         sorted_quotes = sorted(
             group,
@@ -393,6 +543,8 @@ def make_tab(pak_id: str, group: Property, config: ConfigFile, tab_type: TabType
             reverse=True,
         )
 
+    rows: List[Row] = []
+    enabled = bytearray()
     for quote in sorted_quotes:
         if not quote.has_children():
             continue  # Skip over config commands..
@@ -412,7 +564,7 @@ def make_tab(pak_id: str, group: Property, config: ConfigFile, tab_type: TabType
             except LookupError:
                 name = TRANS_NO_NAME
 
-        localisation.set_text(ttk.Label(frame, font=QUOTE_FONT), name).grid(column=0, sticky=W)
+        rows.append(Row(name))
 
         if tab_type is TabTypes.RESPONSE:
             line_iter = find_resp_lines(quote)
@@ -420,58 +572,14 @@ def make_tab(pak_id: str, group: Property, config: ConfigFile, tab_type: TabType
             line_iter = find_lines(quote)
 
         for badges, line, line_id in line_iter:
-            line_frame = ttk.Frame(
-                frame,
-            )
-            line_frame.grid(
-                column=0,
-                padx=(10, 0),
-                sticky=W,
-            )
-            for x, (img_handle, ctx) in enumerate(badges):
-                label = ttk.Label(line_frame, padding=0)
-                img.apply(label, img_handle)
-                label.grid(row=0, column=x)
-                add_tooltip(label, ctx)
-
-            line_frame.columnconfigure(len(badges), weight=1)
-
-            check = ttk.Checkbutton(line_frame)
             try:
-                check['text'] = line['name']
+                line_name = TransToken.untranslated(line['name'])
             except LookupError:
-                localisation.set_text(check, TRANS_NO_NAME)
-
-            check.quote_var = IntVar(
-                value=config.get_bool(group_id, line_id, True),
-            )
-
-            check['variable'] = check.quote_var
-
-            check['command'] = functools.partial(
-                check_toggled,
-                var=check.quote_var,
-                config_section=config[group_id],
-                quote_id=line_id,
-            )
-            check.transcript = list(get_trans_lines(line))
-            check.grid(
-                row=0,
-                column=len(badges),
-            )
-            check.bind("<Enter>", show_trans)
-
-    def configure_canv(e) -> None:
-        """Allow resizing the windows."""
-        canv['scrollregion'] = (
-            4,
-            0,
-            canv.winfo_reqwidth(),
-            frame.winfo_reqheight(),
-        )
-        frame['width'] = canv.winfo_reqwidth()
+                line_name = TRANS_NO_NAME
+            rows.append(Row(line_name, badges, line, group_id, line_id, len(enabled)))
+            enabled.append(config.get_bool(group_id, line_id, True))
 
-    canv.bind('<Configure>', configure_canv)
+    TABS[group_name.token] = Tab(tab_type, group_name, group_desc, config, rows, enabled)
 
 
 def find_lines(quote_block: Property) -> Iterator[Tuple[
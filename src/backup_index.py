@@ -0,0 +1,199 @@
+"""Metadata for the puzzles listed in the backup window.
+
+Puzzle files contain the entire map, but only a few keys at the start are displayed.
+So only those are read, stopping once the map data is reached. Backup zips also store
+an index of this data, so puzzles don't need to be read at all when listing them.
+"""
+from __future__ import annotations
+from typing import IO, Dict, Iterable, Optional, Union
+from io import TextIOWrapper
+from zipfile import ZipFile
+import os
+
+from srctools import Property, KeyValError, conv_bool, conv_int
+from srctools.tokenizer import Token, Tokenizer
+import attrs
+import srctools.logger
+
+from FakeZip import FakeZip, zip_open_bin
+
+
+__all__ = [
+    'INDEX_NAME', 'PuzzleInfo', 'IndexEntry',
+    'read_header', 'read_puzzle', 'read_index', 'cached_info', 'write_index',
+]
+LOGGER = srctools.logger.get_logger(__name__)
+# The file inside backup zips holding the index.
+INDEX_NAME = 'bee2_backup_index.txt'
+INDEX_VERSION = 1
+# The keys in the puzzle's header which we use.
+HEADER_KEYS = frozenset({
+    'title', 'description', 'coop', 'timestamp_created', 'timestamp_modified',
+})
+Zip = Union[ZipFile, FakeZip]
+
+
+@attrs.frozen
+class PuzzleInfo:
+    """The displayed details of a puzzle."""
+    filename: str  # Without the extension.
+    title: Optional[str] = None
+    description: Optional[str] = None
+    is_coop: bool = False
+    # Timestamps, as hex strings.
+    create_time: str = ''
+    mod_time: str = ''
+    # If set, the puzzle could not be parsed.
+    failed: bool = False
+
+
+@attrs.frozen
+class IndexEntry:
+    """An indexed puzzle, along with the details used to check it's unchanged."""
+    crc: int
+    size: int
+    info: PuzzleInfo
+
+
+def read_header(file: IO[str], filename: str) -> PuzzleInfo:
+    """Read the details of a puzzle, stopping once the map data is reached.
+
+    This raises KeyValError if the syntax is invalid.
+    """
+    tok = Tokenizer(file, filename, KeyValError)
+    values: Dict[str, str] = {}
+    depth = 0
+    in_puzzle = False
+    key: Optional[str] = None
+    for tok_type, tok_value in tok:
+        if tok_type is Token.STRING:
+            if depth == 0:
+                in_puzzle = tok_value.casefold() == 'portal2_puzzle'
+            elif depth == 1 and in_puzzle:
+                if key is None:
+                    key = tok_value
+                else:
+                    values.setdefault(key.casefold(), tok_value)
+                    key = None
+        elif tok_type is Token.BRACE_OPEN:
+            depth += 1
+            key = None
+            # Map data follows the header, so we can skip the rest of the file.
+            if depth == 2 and in_puzzle and HEADER_KEYS.issubset(values):
+                break
+        elif tok_type is Token.BRACE_CLOSE:
+            if depth == 0:
+                raise tok.error(tok_type)
+            depth -= 1
+            if depth == 0 and in_puzzle:
+                break
+        elif tok_type is not Token.NEWLINE and tok_type is not Token.PROP_FLAG:
+            raise tok.error(tok_type)
+
+    return PuzzleInfo(
+        filename=os.path.basename(filename),
+        title=values.get('title'),
+        description=values.get('description'),
+        is_coop=conv_bool(values.get('coop', '0')),
+        create_time=values.get('timestamp_created', ''),
+        mod_time=values.get('timestamp_modified', ''),
+    )
+
+
+def read_puzzle(zip_file: Zip, path: str) -> PuzzleInfo:
+    """Read the details of a puzzle in a zip.
+
+    The path is the location inside the zip, without the extension.
+    """
+    # Some P2Cs may have non-ASCII characters in descriptions, so we
+    # need to read it as bytes and convert to utf-8 ourselves - zips
+    # don't convert encodings automatically for us.
+    try:
+        with zip_open_bin(zip_file, path + '.p2c') as file:
+            # Decode the P2C as UTF-8, and skip unknown characters.
+            # We're only using it for display purposes, so that should
+            # be sufficient.
+            with TextIOWrapper(file, encoding='utf-8', errors='replace') as textfile:
+                return read_header(textfile, path)
+    except KeyValError:
+        # Silently fail if we can't parse the file. That way it's still
+        # possible to back up.
+        LOGGER.warning('Failed parsing puzzle file "{}"!', path, exc_info=True)
+        return PuzzleInfo(os.path.basename(path), failed=True)
+
+
+def read_index(zip_file: Zip) -> Dict[str, IndexEntry]:
+    """Read the index from a backup zip, if present."""
+    if isinstance(zip_file, FakeZip):
+        return {}  # Game folders don't have one.
+    try:
+        with zip_open_bin(zip_file, INDEX_NAME) as file:
+            with TextIOWrapper(file, encoding='utf-8') as textfile:
+                props = Property.parse(textfile, INDEX_NAME)
+    except KeyError:
+        return {}
+    except (KeyValError, UnicodeDecodeError):
+        LOGGER.warning('Invalid backup index, ignoring:', exc_info=True)
+        return {}
+    props = props.find_key('BackupIndex', or_blank=True)
+    if props.int('version') != INDEX_VERSION:
+        LOGGER.info('Backup index is version {}, ignoring.', props['version', '?'])
+        return {}
+
+    index = {}
+    for child in props.find_children('Puzzles'):
+        info = PuzzleInfo(
+            filename=child.real_name,
+            title=child['title', None],
+            description=child['description', None],
+            is_coop=child.bool('coop'),
+            create_time=child['created', ''],
+            mod_time=child['modified', ''],
+            failed=child.bool('failed'),
+        )
+        index[child.real_name] = IndexEntry(
+            conv_int(child['crc', '']),
+            conv_int(child['size', '']),
+            info,
+        )
+    return index
+
+
+def cached_info(index: Dict[str, IndexEntry], zip_file: Zip, path: str) -> Optional[PuzzleInfo]:
+    """Return the indexed details for a puzzle, if it hasn't been modified since."""
+    if isinstance(zip_file, FakeZip):
+        return None
+    try:
+        entry = index[path]
+        zip_info = zip_file.getinfo(path + '.p2c')
+    except KeyError:
+        return None
+    if entry.crc != zip_info.CRC or entry.size != zip_info.file_size:
+        return None
+    return entry.info
+
+
+def write_index(zip_file: ZipFile, puzzles: Iterable[PuzzleInfo]) -> None:
+    """Write an index for these puzzles, which have already been written into the zip."""
+    props = Property('Puzzles', [])
+    for info in puzzles:
+        zip_info = zip_file.getinfo(info.filename + '.p2c')
+        child = Property(info.filename, [
+            Property('crc', str(zip_info.CRC)),
+            Property('size', str(zip_info.file_size)),
+            Property('coop', '1' if info.is_coop else '0'),
+            Property('created', info.create_time),
+            Property('modified', info.mod_time),
+        ])
+        if info.title is not None:
+            child['title'] = info.title
+        if info.description is not None:
+            child['description'] = info.description
+        if info.failed:
+            child['failed'] = '1'
+        props.append(child)
+    root = Property('BackupIndex', [
+        Property('version', str(INDEX_VERSION)),
+        props,
+    ])
+    zip_file.writestr(INDEX_NAME, ''.join(root.export()).encode('utf-8'))
@@ -13,6 +13,7 @@ from app import img, TK_ROOT, tk_tools
 import tkinter as tk
 import multiprocessing.connection
 
+import log_buffer
 import utils
 
 # ID -> screen.
@@ -54,6 +55,8 @@ BOX_LEVELS = [
     'WARNING',
 ]
 START = '1.0'  # Row 1, column 0 = first character
+# The log window is allowed to exceed its capacity by this factor before trimming.
+TRIM_SLACK = 1.25
 
 
 class BaseLoadScreen:
@@ -156,6 +159,16 @@ class BaseLoadScreen:
         self.values[stage] += 1
         self.update_stage(stage)
 
+    def op_progress(self, updates: Dict[str, Tuple[int, int]]) -> None:
+        """Apply the latest (value, max) pair for each changed stage."""
+        for stage, (value, num) in updates.items():
+            self.values[stage] = value
+            if num != self.maxes[stage]:
+                # Let subclasses redraw for the new length.
+                self.op_set_length(stage, num)
+            else:
+                self.update_stage(stage)
+
     def op_set_length(self, stage: str, num: int) -> None:
         """Set the number of items in a stage."""
         if num == 0:
@@ -628,6 +641,9 @@ class LogWindow:
         window.withdraw()
 
         self.has_text = False
+        # Lines kept in the text box. Once it has grown TRIM_SLACK over this, the oldest are
+        # removed in one go.
+        self.capacity = log_buffer.DEFAULT_CAPACITY
         self.text = tk.Text(
             window,
             name='text_box',
@@ -729,29 +745,35 @@ class LogWindow:
         ]
         self.level_selector.current(old_current)
 
-    def log(self, level_name: str, text: str) -> None:
-        """Write a log message to the window."""
+    def log(self, records: List[Tuple[str, str]]) -> None:
+        """Write a batch of log messages to the window."""
         self.text['state'] = "normal"
-        # We don't want to indent the first line.
-        firstline, *lines = text.split('\n')
-
-        if self.has_text:
-            # Start with a newline so it doesn't end with one.
-            self.text.insert(tk.END, '\n', ())
-
-        self.text.insert(tk.END, firstline, (level_name,))
-        for line in lines:
-            self.text.insert(
-                tk.END,
-                '\n',
-                ('INDENT',),
-                line,
+        # Build up the arguments for a single insert call.
+        args: List[object] = []
+        for level_name, text in records:
+            # We don't want to indent the first line.
+            firstline, *lines = text.split('\n')
+
+            if self.has_text:
+                # Start with a newline so it doesn't end with one.
+                args += ['\n', ()]
+
+            args += [firstline, (level_name,)]
+            for line in lines:
                 # Indent following lines.
-                (level_name, 'INDENT'),
-            )
+                args += ['\n', ('INDENT',), line, (level_name, 'INDENT')]
+            self.has_text = True
+        if args:
+            self.text.insert(tk.END, *args)
+        self.trim()
         self.text.see(tk.END)  # Scroll to the end
         self.text['state'] = "disabled"
-        self.has_text = True
+
+    def trim(self) -> None:
+        """If the text box has grown too large, remove the oldest lines."""
+        line_count = int(self.text.index('end-1c').split('.')[0])
+        if line_count > self.capacity * TRIM_SLACK:
+            self.text.delete(START, f'{line_count - self.capacity + 1}.0')
 
     def evt_set_level(self, event: tk.Event) -> None:
         """Set the level of the log window."""
@@ -783,7 +805,12 @@ class LogWindow:
         """Handle messages from the main app."""
         operation, parm1, parm2 = msg
         if operation == 'log':
-            self.log(parm1, parm2)
+            self.log(parm1)
+        elif operation == 'capacity':
+            self.capacity = parm1
+            self.text['state'] = "normal"
+            self.trim()
+            self.text['state'] = "disabled"
         elif operation == 'visible':
             if parm1:
                 self.win.deiconify()
@@ -816,11 +843,21 @@ def run_background(
     def check_queue() -> None:
         """Update stages from the parent process."""
         nonlocal force_ontop
-        had_values = False
         try:
-            while PIPE_REC.poll():  # Pop off all the values.
-                had_values = True
-                operation, scr_id, args = PIPE_REC.recv()
+            # Pop off all the values, then merge together progress updates for each screen,
+            # so we only redraw once per tick.
+            messages = []
+            while PIPE_REC.poll():
+                messages.append(PIPE_REC.recv())
+            had_values = bool(messages)
+            progress: Dict[int, Dict[str, Tuple[int, int]]] = {}
+            for operation, scr_id, args in messages:
+                if operation == 'progress':
+                    progress.setdefault(scr_id, {}).update(args[0])
+                    continue
+                # Anything else must see the progress sent before it.
+                if scr_id in progress:
+                    SCREENS[scr_id].op_progress(progress.pop(scr_id))
                 if operation == 'init':
                     # Create a new loadscreen.
                     is_main, title, stages = args
@@ -854,6 +891,8 @@ def run_background(
                         except AttributeError:  # < 3.10
                             pass
                         raise TypeError(func) from e
+            for scr_id, updates in progress.items():
+                SCREENS[scr_id].op_progress(updates)
             while log_pipe_rec.poll():
                 log_window.handle(log_pipe_rec.recv())
         except BrokenPipeError:
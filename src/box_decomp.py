@@ -0,0 +1,153 @@
+"""Decompose grids of cells into a small set of boxes covering them.
+
+This is shared by the compiler (for brushes like goo or tiles) and editoritems
+(for embedded voxel volumes). Fewer boxes means fewer brushes in the map.
+
+Cells are packed into flat label arrays, then for each remaining cell in scan
+order the largest box anchored at that corner is chosen. Alongside each cell we
+store the length of the run of identical cells along the X axis, so the box can
+be grown along the remaining axes without rescanning each row.
+"""
+from __future__ import annotations
+from typing import Dict, Iterable, Iterator, List, Mapping, Tuple, TypeVar
+from array import array
+
+
+__all__ = ['decompose_2d', 'decompose_3d']
+T = TypeVar('T')
+
+
+def _pack_labels(values: Iterable[T], labels: Dict[int, int], by_id: List[T]) -> Iterator[int]:
+    """Assign each distinct value (by identity) a label, starting from 1."""
+    for value in values:
+        try:
+            yield labels[id(value)]
+        except KeyError:
+            by_id.append(value)
+            yield labels.setdefault(id(value), len(by_id))
+
+
+def decompose_2d(
+    grid: Mapping[Tuple[int, int], T],
+) -> Iterator[Tuple[int, int, int, int, T]]:
+    """Produce an efficient set of rectangles covering each value in a grid.
+
+    The grid should be a (x, y): T mapping. This yields (min_x, min_y, max_x, max_y, T)
+    tuples, where this region has the same value. The values are compared by identity.
+    """
+    if not grid:
+        return
+    items = list(grid.items())
+    positions = [pos for pos, value in items]
+    min_x = min(x for x, y in positions)
+    min_y = min(y for x, y in positions)
+    width = max(x for x, y in positions) - min_x + 1
+    height = max(y for x, y in positions) - min_y + 1
+
+    values: List[T] = []
+    # Index = x * height + y, 0 = empty.
+    labels = array('l', [0]) * (width * height)
+    for (x, y), label in zip(positions, _pack_labels([value for pos, value in items], {}, values)):
+        labels[(x - min_x) * height + y - min_y] = label
+
+    # The number of identical cells starting from this one, going +X.
+    runs = array('l', [1 if label else 0 for label in labels])
+    for ind in range((width - 1) * height - 1, -1, -1):
+        if labels[ind] and labels[ind + height] == labels[ind]:
+            runs[ind] = runs[ind + height] + 1
+
+    for x in range(width):
+        for y in range(height):
+            ind = x * height + y
+            label = labels[ind]
+            if not label:
+                continue
+            # Grow down the column, finding the largest area rectangle.
+            best_area = best_w = best_h = 0
+            max_w = width
+            for h in range(1, height - y + 1):
+                cell = ind + h - 1
+                if labels[cell] != label:
+                    break
+                max_w = min(max_w, runs[cell])
+                if max_w * h > best_area:
+                    best_area = max_w * h
+                    best_w = max_w
+                    best_h = h
+
+            for dx in range(best_w):
+                start = ind + dx * height
+                labels[start:start + best_h] = array('l', [0]) * best_h
+            yield (
+                min_x + x, min_y + y,
+                min_x + x + best_w - 1, min_y + y + best_h - 1,
+                values[label - 1],
+            )
+
+
+def decompose_3d(
+    points: Iterable[Tuple[int, int, int]],
+) -> Iterator[Tuple[Tuple[int, int, int], Tuple[int, int, int]]]:
+    """Produce an efficient set of boxes exactly covering a set of points.
+
+    This yields (mins, maxes) tuples, both inclusive.
+    """
+    positions = set(map(tuple, points))
+    if not positions:
+        return
+    min_x = min(x for x, y, z in positions)
+    min_y = min(y for x, y, z in positions)
+    min_z = min(z for x, y, z in positions)
+    size_x = max(x for x, y, z in positions) - min_x + 1
+    size_y = max(y for x, y, z in positions) - min_y + 1
+    size_z = max(z for x, y, z in positions) - min_z + 1
+    stride_y = size_z
+    stride_x = size_y * size_z
+
+    # Index = (x * size_y + y) * size_z + z.
+    filled = bytearray(size_x * stride_x)
+    for x, y, z in positions:
+        filled[(x - min_x) * stride_x + (y - min_y) * stride_y + z - min_z] = 1
+
+    # The number of filled cells starting from this one, going +X.
+    runs = array('l', list(filled))
+    for ind in range((size_x - 1) * stride_x - 1, -1, -1):
+        if filled[ind]:
+            runs[ind] = runs[ind + stride_x] + 1
+
+    for x in range(size_x):
+        for y in range(size_y):
+            for z in range(size_z):
+                ind = x * stride_x + y * stride_y + z
+                if not filled[ind]:
+                    continue
+                best_vol = 0
+                best = (1, 1, 1)
+                # For each Z in the box, the X length which fits for every Y so far.
+                col_w = [size_x] * (size_z - z)
+                for dy in range(size_y - y):
+                    row = ind + dy * stride_y
+                    if not filled[row]:
+                        break
+                    w = size_x
+                    for dz in range(len(col_w)):
+                        if not filled[row + dz]:
+                            del col_w[dz:]
+                            break
+                        col_w[dz] = min(col_w[dz], runs[row + dz])
+                        w = min(w, col_w[dz])
+                        vol = w * (dy + 1) * (dz + 1)
+                        if vol > best_vol:
+                            best_vol = vol
+                            best = (w, dy + 1, dz + 1)
+                    if not col_w:
+                        break
+                box_x, box_y, box_z = best
+                for dx in range(box_x):
+                    for dy in range(box_y):
+                        start = ind + dx * stride_x + dy * stride_y
+                        filled[start:start + box_z] = bytes(box_z)
+                yield (
+                    (min_x + x, min_y + y, min_z + z),
+                    (min_x + x + box_x - 1, min_y + y + box_y - 1, min_z + z + box_z - 1),
+                )
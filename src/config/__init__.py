@@ -26,6 +26,8 @@ if not os.environ.get('BEE_LOG_CONFIG'):  # Debug messages are spammy.
 
 
 DataT = TypeVar('DataT', bound='Data')
+# When a write is requested, wait this long for more changes before writing.
+WRITE_DELAY = 2.0
 
 
 @attrs.define(eq=False)
@@ -107,6 +109,11 @@ class ConfigSpec:
     callback: Dict[Tuple[Type[Data], str], Callable[[Data], Awaitable]] = attrs.field(factory=dict, repr=False)
 
     _current: Config = attrs.Factory(lambda: Config({}))
+    # Types which have changed since the file was last written, and the exported sections
+    # for the others.
+    _dirty: Set[Type[Data]] = attrs.Factory(set)
+    _section_cache: Dict[Type[Data], Optional[Property]] = attrs.Factory(dict)
+    _write_requested: trio.Event = attrs.Factory(trio.Event)
 
     def datatype_for_name(self, name: str) -> Type[Data]:
         """Lookup the data type for a specific name."""
@@ -190,6 +197,7 @@ class ConfigSpec:
             if cls not in self._registered:
                 continue
             self._current[cls] = opt_map.copy()
+            self._dirty.add(cls)
 
     async def apply_multi(self, config: Config) -> None:
         """Merge the values into our config, then apply the changed types.
@@ -228,6 +236,7 @@ class ConfigSpec:
                 try:
                     conf_map = self._current[cls]
                     data = conf_map[data_id] = conf_map.pop(legacy_id)
+                    self._dirty.add(cls)
                 except KeyError:
                     pass
         if data is None:
@@ -251,9 +260,14 @@ class ConfigSpec:
             raise ValueError(f'Data type "{info.name}" does not support IDs!')
         LOGGER.debug('Storing conf {}[{}] = {!r}', info.name, data_id, data)
         try:
-            self._current[cls][data_id] = data
+            data_map = self._current[cls]
         except KeyError:
             self._current[cls] = {data_id: data}
+        else:
+            if data_map.get(data_id) is data:
+                return  # Unchanged, no need to write.
+            data_map[data_id] = data
+        self._dirty.add(cls)
 
     def parse_kv1(self, props: Property) -> Tuple[Config, bool]:
         """Parse a configuration file into individual data.
@@ -342,28 +356,34 @@ class ConfigSpec:
         """
         yield Property('version', '1')
         for cls, data_map in conf.items():
-            if not data_map or cls not in self._registered:
-                # Blank or not in our definition, don't save.
-                continue
-            info = cls.get_conf_info()
-            prop = Property(info.name, [
-                Property('_version', str(info.version)),
-            ])
-            if info.uses_id:
-                for data_id, data in data_map.items():
-                    sub_prop = data.export_kv1()
-                    sub_prop.name = data_id
-                    prop.append(sub_prop)
-            else:
-                # Must be a single '' key.
-                if list(data_map.keys()) != ['']:
-                    raise ValueError(
-                        f'Must have a single "" key for non-id type '
-                        f'"{info.name}", got:\n{data_map}'
-                    )
-                [data] = data_map.values()
-                prop.extend(data.export_kv1())
-            yield prop
+            prop = self._build_section_kv1(cls, data_map)
+            if prop is not None:
+                yield prop
+
+    def _build_section_kv1(self, cls: Type[Data], data_map: Dict[str, Data]) -> Optional[Property]:
+        """Build the block for a single config type, or None if it shouldn't be saved."""
+        if not data_map or cls not in self._registered:
+            # Blank or not in our definition, don't save.
+            return None
+        info = cls.get_conf_info()
+        prop = Property(info.name, [
+            Property('_version', str(info.version)),
+        ])
+        if info.uses_id:
+            for data_id, data in data_map.items():
+                sub_prop = data.export_kv1()
+                sub_prop.name = data_id
+                prop.append(sub_prop)
+        else:
+            # Must be a single '' key.
+            if list(data_map.keys()) != ['']:
+                raise ValueError(
+                    f'Must have a single "" key for non-id type '
+                    f'"{info.name}", got:\n{data_map}'
+                )
+            [data] = data_map.values()
+            prop.extend(data.export_kv1())
+        return prop
 
     def build_dmx(self, conf: Config) -> Element:
         """Build out a configuration file from some data.
@@ -415,13 +435,20 @@ class ConfigSpec:
                 self.filename.replace(self.filename.with_suffix('.err.vdf'))
             except IOError:
                 pass
-
-        conf, _ = self.parse_kv1(props)
+            props = Property.root()
+        conf, upgraded = self.parse_kv1(props)
         self._current.clear()
         self._current.update(conf)
+        self._section_cache.clear()
+        self._dirty.clear()
+        if upgraded:
+            self._dirty.update(self._current)
 
     def write_file(self) -> None:
-        """Write the settings to disk."""
+        """Write the settings to disk, if they have changed.
+
+        Only the sections which changed are re-exported, the rest are reused.
+        """
         if self.filename is None:
             raise ValueError('No filename specified for this ConfigSpec!')
 
@@ -429,14 +456,39 @@ class ConfigSpec:
             # We don't have any data saved, abort!
             # This could happen while parsing, for example.
             return
+        if not self._dirty and self.filename.exists():
+            return
 
         props = Property.root()
-        props.extend(self.build_kv1(self._current))
+        props.append(Property('version', '1'))
+        for cls, data_map in self._current.items():
+            if cls in self._dirty or cls not in self._section_cache:
+                self._section_cache[cls] = self._build_section_kv1(cls, data_map)
+            prop = self._section_cache[cls]
+            if prop is not None:
+                props.append(prop)
+        self._dirty.clear()
+
         with AtomicWriter(self.filename) as file:
             for prop in props:
                 for line in prop.export():
                     file.write(line)
 
+    def request_write(self) -> None:
+        """Write the file shortly, combining together multiple requests."""
+        self._write_requested.set()
+
+    async def write_task(self, delay: float = WRITE_DELAY) -> None:
+        """Run in the background, performing requested writes."""
+        while True:
+            await self._write_requested.wait()
+            await trio.sleep(delay)
+            self._write_requested = trio.Event()
+            try:
+                self.write_file()
+            except Exception:
+                LOGGER.exception('Could not write config:')
+
 
 def get_pal_conf() -> Config:
     """Return a copy of the current settings for the palette."""
@@ -453,6 +505,7 @@ async def apply_pal_conf(conf: Config) -> None:
     for cls, opt_map in conf.items():
         if cls.get_conf_info().palette_stores:  # Double-check, in case it's added to the file.
             APP._current[cls] = opt_map.copy()
+            APP._dirty.add(cls)
     async with trio.open_nursery() as nursery:
         for cls in conf:
             if cls.get_conf_info().palette_stores:
@@ -1,5 +1,6 @@
 from enum import Enum
 from typing import Any, Dict
+import math
 
 import attrs
 from srctools import Property
@@ -7,6 +8,17 @@ from srctools.dmx import Element
 
 from BEE2_config import GEN_OPTS as LEGACY_CONF
 import config
+import log_buffer
+
+
+def _valid_capacity(capacity: int) -> int:
+    """The log window must keep at least one record, otherwise use the default."""
+    return capacity if capacity >= 1 else log_buffer.DEFAULT_CAPACITY
+
+
+def _valid_interval(interval: float) -> float:
+    """The log window's send interval must be positive, otherwise use the default."""
+    return interval if 0.0 < interval < math.inf else log_buffer.DEFAULT_INTERVAL
 
 
 class AfterExport(Enum):
@@ -35,6 +47,9 @@ class GenOptions(config.Data, conf_name='Options', palette_stores=False, version
     # Log window.
     show_log_win: bool = attrs.field(default=False, metadata={'legacy': 'Debug'})
     log_win_level: str = 'INFO'
+    # The number of records kept, and how often they're sent to the window in seconds.
+    log_win_capacity: int = log_buffer.DEFAULT_CAPACITY
+    log_win_interval: float = log_buffer.DEFAULT_INTERVAL
 
     # Stuff mainly for devs.
     preserve_resources: bool = attrs.field(default=False, metadata={'legacy': 'General:preserve_bee2_resource_dir'})
@@ -96,6 +111,8 @@ class GenOptions(config.Data, conf_name='Options', palette_stores=False, version
         return GenOptions(
             after_export=after_export,
             log_win_level=data['log_win_level', 'INFO'],
+            log_win_capacity=_valid_capacity(data.int('log_win_capacity', log_buffer.DEFAULT_CAPACITY)),
+            log_win_interval=_valid_interval(data.float('log_win_interval', log_buffer.DEFAULT_INTERVAL)),
             language=data['language', ''],
             preserve_fgd=preserve_fgd,
             **{
@@ -109,6 +126,8 @@ class GenOptions(config.Data, conf_name='Options', palette_stores=False, version
         prop = Property('', [
             Property('after_export', str(self.after_export.value)),
             Property('log_win_level', self.log_win_level),
+            Property('log_win_capacity', str(self.log_win_capacity)),
+            Property('log_win_interval', str(self.log_win_interval)),
             Property('language', self.language),
             Property('preserve_fgd', '1' if self.preserve_fgd else '0')
         ])
@@ -135,6 +154,14 @@ class GenOptions(config.Data, conf_name='Options', palette_stores=False, version
             res['log_win_level'] = data['log_win_level'].val_str
         except (KeyError, ValueError):
             res['log_win_level'] = 'INFO'
+        try:
+            res['log_win_capacity'] = _valid_capacity(data['log_win_capacity'].val_int)
+        except (KeyError, ValueError):
+            res['log_win_capacity'] = log_buffer.DEFAULT_CAPACITY
+        try:
+            res['log_win_interval'] = _valid_interval(data['log_win_interval'].val_float)
+        except (KeyError, ValueError):
+            res['log_win_interval'] = log_buffer.DEFAULT_INTERVAL
         try:
             res['language'] = data['language'].val_str
         except KeyError:
@@ -152,6 +179,8 @@ class GenOptions(config.Data, conf_name='Options', palette_stores=False, version
         elem = Element('Options', 'DMElement')
         elem['after_export'] = self.after_export.value
         elem['language'] = self.language
+        elem['log_win_capacity'] = self.log_win_capacity
+        elem['log_win_interval'] = self.log_win_interval
         elem['preserve_fgd'] = self.preserve_fgd
         for field in gen_opts_bool:
             elem[field.name] = getattr(self, field.name)
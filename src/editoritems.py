@@ -16,6 +16,7 @@ from connections import Config as ConnConfig, InputType, OutNames
 from editoritems_props import ItemProp, ItemPropKind, PROP_TYPES
 from collisions import CollideType, BBox, NonBBoxError
 from transtoken import TransToken, TransTokenSource
+import box_decomp
 
 
 LOGGER = logger.get_logger(__name__)
@@ -562,58 +563,8 @@ def bounding_boxes(voxels: Iterable[Coord]) -> Iterator[tuple[Coord, Coord]]:
 
     This is used to determine a good set of Volume definitions to write out.
     """
-    # To compute the volume, pick a random point still to be done, then
-    # expand as far as possible in each direction.
-    EXTENT = 50
-    todo = set(voxels)
-    while todo:
-        x1, y1, z1 = x2, y2, z2 = todo.pop()
-        # X+:
-        for x in range(x1 + 1, x1 + EXTENT):
-            if Coord(x, y1, z1) in todo:
-                x2 = x
-            else:
-                break
-        # X-:
-        for x in range(x1 - 1, x1 - EXTENT, -1):
-            if Coord(x, y1, z1) in todo:
-                x1 = x
-            else:
-                break
-
-        # Y+:
-        for y in range(y1 + 1, y1 + EXTENT):
-            if all(Coord(x, y, z1) in todo for x in range(x1, x2+1)):
-                y2 = y
-            else:
-                break
-
-        # Y-:
-        for y in range(y1 - 1, y1 - EXTENT, -1):
-            if all(Coord(x, y, z1) in todo for x in range(x1, x2+1)):
-                y1 = y
-            else:
-                break
-
-        # Y+:
-        for z in range(z1 + 1, z1 + EXTENT):
-            if all(Coord(x, y, z) in todo for x in range(x1, x2+1) for y in range(y1, y2+1)):
-                z2 = z
-            else:
-                break
-
-        # Y-:
-        for z in range(z1 - 1, z1 - EXTENT, -1):
-            if all(Coord(x, y, z) in todo for x in range(x1, x2+1) for y in range(y1, y2+1)):
-                z1 = z
-            else:
-                break
-
-        for x in range(x1, x2+1):
-            for y in range(y1, y2+1):
-                for z in range(z1, z2+1):
-                    todo.discard(Coord(x, y, z))
-        yield Coord(x1, y1, z1), Coord(x2, y2, z2)
+    for mins, maxes in box_decomp.decompose_3d(voxels):
+        yield Coord(*mins), Coord(*maxes)
 
 
 @attrs.define
@@ -3,10 +3,14 @@
 If an error is detected in VBSP, the map is swapped with one which uses a VScript hook to pop open
 the Steam Overlay and navigate to a webpage hosted by this server, which can show the error.
 
-This has 3 endpoints:
+This has these endpoints:
 - / displays the current error.
-- /refresh causes it to reload the error from a text file on disk, if a new compile runs.
-- /ping is triggered by the webpage repeatedly while open, to ensure the server stays alive.
+- /reload causes it to reload the error from the pickle on disk, if a new compile runs.
+- /keepalive is triggered by VRAD at the start of each compile, so the server stays resident.
+- /heartbeat is triggered by the webpage repeatedly while open, to ensure the server stays alive.
+
+The server stays resident for a while after each compile, so that if the next one fails the
+error can be displayed immediately instead of waiting for a new server to boot.
 """
 import srctools.logger
 LOGGER = srctools.logger.init_logging('bee2/error_server.log')
@@ -17,6 +21,7 @@ import math
 import pickle
 import gettext
 import json
+from pathlib import Path
 from typing import List
 
 from hypercorn.config import Config
@@ -43,6 +48,8 @@ config = Config()
 config.debug = True
 config.bind = ["localhost:8080"]  # Use localhost, request any free port.
 DELAY = 5 * 60  # After 5 minutes of no response, quit.
+# But after a compile contacts us, stay around for longer so the next one finds us warm.
+RESIDENT_DELAY = 30 * 60
 # This cancel scope is cancelled after no response from the client, to shut us down.
 # It starts with an infinite deadline, to ensure there's time to boot the server.
 TIMEOUT_CANCEL = trio.CancelScope(deadline=math.inf)
@@ -84,9 +91,23 @@ async def route_heartbeat() -> quart.ResponseReturnValue:
 
 @app.route('/reload')
 async def route_reload() -> quart.ResponseReturnValue:
-    """Called by our VRAD, to make existing servers reload their data."""
-    update_deadline()
-    load_info()
+    """Called by our VRAD, to make existing servers reload their data from disk."""
+    update_deadline(RESIDENT_DELAY)
+    try:
+        data = await trio.Path(DATA_LOC).read_bytes()
+    except OSError:
+        LOGGER.exception('Failed to read pickle!')
+        data = b''  # Shows the failure message.
+    load_info(data)
+    resp = await app.make_response(('', http.HTTPStatus.NO_CONTENT))
+    resp.mimetype = 'text/plain'
+    return resp
+
+
+@app.route('/keepalive')
+async def route_keepalive() -> quart.ResponseReturnValue:
+    """Called by our VRAD when a compile starts, so we're still running if it fails."""
+    update_deadline(RESIDENT_DELAY)
     resp = await app.make_response(('', http.HTTPStatus.NO_CONTENT))
     resp.mimetype = 'text/plain'
     return resp
@@ -112,29 +133,43 @@ async def route_shutdown() -> quart.ResponseReturnValue:
     return 'DONE'
 
 
-def update_deadline() -> None:
-    """When interacted with, the deadline is reset into the future."""
-    TIMEOUT_CANCEL.deadline = trio.current_time() + DELAY
+def update_deadline(delay: float = DELAY) -> None:
+    """When interacted with, the deadline is pushed into the future.
+
+    This never shortens an existing deadline.
+    """
+    TIMEOUT_CANCEL.deadline = max(TIMEOUT_CANCEL.deadline, trio.current_time() + delay)
     LOGGER.info('Reset deadline!')
 
 
-def load_info() -> None:
-    """Load the error info from disk."""
+@functools.lru_cache(maxsize=4)
+def load_language(filename: Path, mtime: int) -> gettext.GNUTranslations:
+    """Parse a translation file.
+
+    This is cached, since the same file is used for every compile.
+    """
+    with open(filename, 'rb') as f:
+        return gettext.GNUTranslations(f)
+
+
+def load_info(data: bytes) -> None:
+    """Load the pickled error info."""
     global current_error
     try:
-        with open(DATA_LOC, 'rb') as f:
-            data = pickle.load(f)
-        if not isinstance(data, ErrorInfo):
+        info = pickle.loads(data)
+        if not isinstance(info, ErrorInfo):
             raise ValueError
     except Exception:
         LOGGER.exception('Failed to load pickle!')
         current_error = ErrorInfo(message=TOK_ERR_FAIL_LOAD)
     else:
-        current_error = data
+        current_error = info
     if current_error.language_file is not None:
         try:
-            with open(current_error.language_file, 'rb') as f:
-                lang = gettext.GNUTranslations(f)
+            lang = load_language(
+                current_error.language_file,
+                current_error.language_file.stat().st_mtime_ns,
+            )
         except OSError:
             return
         transtoken.CURRENT_LANG = transtoken.Language(
@@ -158,7 +193,10 @@ async def main() -> None:
         # Allow nursery to exit.
         stop_sleeping.cancel()
 
-    load_info()
+    try:
+        load_info(DATA_LOC.read_bytes())
+    except FileNotFoundError:
+        pass  # Started in advance, before any errors occurred.
     SERVER_INFO_FILE.unlink(missing_ok=True)
     try:
         async with trio.open_nursery() as nursery:
@@ -168,7 +206,7 @@ async def main() -> None:
                 shutdown_trigger=timeout_func
             ))
             # Set deadline after app is ready.
-            TIMEOUT_CANCEL.deadline = trio.current_time() + DELAY
+            TIMEOUT_CANCEL.deadline = trio.current_time() + RESIDENT_DELAY
             LOGGER.info('Current time: ', trio.current_time(), 'Deadline:', TIMEOUT_CANCEL.deadline)
             if len(binds):
                 url, port = binds[0].rsplit(':', 1)
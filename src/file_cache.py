@@ -0,0 +1,53 @@
+"""A folder of cached files, where only the most recently used are kept.
+
+Looking up a file marks it as used by updating its modification time. Storing a file
+then removes the oldest files matching the same pattern.
+"""
+from __future__ import annotations
+from pathlib import Path
+from typing import IO, Callable
+import os
+
+import srctools.logger
+
+
+__all__ = ['lookup', 'store', 'discard']
+LOGGER = srctools.logger.get_logger(__name__)
+
+
+def lookup(path: Path) -> bool:
+    """Check if this file is cached, marking it as recently used."""
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def store(path: Path, write: Callable[[IO[bytes]], object], pattern: str, max_entries: int) -> None:
+    """Write a file to the cache, then remove all but the newest files matching the pattern.
+
+    The file is written to a temporary file first, so partial files are never found.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp = path.with_suffix('.tmp')
+    with open(temp, 'wb') as f:
+        write(f)
+    os.replace(temp, path)
+
+    entries = sorted(
+        path.parent.glob(pattern),
+        key=lambda file: file.stat().st_mtime_ns,
+        reverse=True,
+    )
+    for old in entries[max_entries:]:
+        LOGGER.debug('Removing old cached file {}', old)
+        discard(old)
+
+
+def discard(path: Path) -> None:
+    """Remove a file from the cache, if present."""
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
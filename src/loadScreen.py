@@ -21,7 +21,7 @@ import config
 from transtoken import TransToken
 import utils
 
-from typing import Set, Tuple, List, cast, Any, Type
+from typing import Dict, Set, Tuple, List, cast, Any, Type
 
 
 # Keep a reference to all loading screens, so we can close them globally.
@@ -36,6 +36,9 @@ _SCREEN_CANCEL_FLAG: Set[int] = set()
 _PIPE_MAIN_REC, _PIPE_DAEMON_SEND = multiprocessing.Pipe(duplex=False)
 _PIPE_DAEMON_REC, _PIPE_MAIN_SEND = multiprocessing.Pipe(duplex=False)
 
+# Progress updates are coalesced, then sent at most this often per screen (in seconds).
+PROGRESS_INTERVAL = 1 / 30
+
 
 class Cancelled(SystemExit):
     """Raised when the user cancels the loadscreen."""
@@ -115,6 +118,11 @@ class LoadScreen:
         # functions from doing anything
         self.active = False
         self._time = 0.0
+        self._last_progress = 0.0
+        # Our copy of the progress for each stage, and those not yet sent to the daemon.
+        self._values: Dict[str, int] = {}
+        self._maxes: Dict[str, int] = {}
+        self._dirty: Set[str] = set()
         self.stage_ids: Set[str] = set()
         self.stage_labels: List[TransToken] = []
         self.title = title_text
@@ -124,6 +132,8 @@ class LoadScreen:
             init.append((st_id, str(title)))
             self.stage_labels.append(title)
             self.stage_ids.add(st_id)
+            self._values[st_id] = 0
+            self._maxes[st_id] = 10
 
         # Order the daemon to make this screen. We pass translated text in for the splash screen.
         self._send_msg('init', is_splash, str(title_text), init)
@@ -149,9 +159,40 @@ class LoadScreen:
         self.reset()
 
     def _send_msg(self, command: str, *args: Any) -> None:
-        """Send a message to the daemon."""
+        """Send a message to the daemon.
+
+        Any pending progress is sent first, so the daemon sees everything in order.
+        """
+        if self._dirty:
+            self._send_progress()
         _PIPE_MAIN_SEND.send((command, id(self), args))
-        # Check the messages coming back as well.
+        self._check_replies()
+
+    def _send_progress(self) -> None:
+        """Send the latest state of each changed stage to the daemon."""
+        _PIPE_MAIN_SEND.send(('progress', id(self), ({
+            stage: (self._values[stage], self._maxes[stage])
+            for stage in self._dirty
+        }, )))
+        self._dirty.clear()
+        self._last_progress = time.perf_counter()
+
+    def _queue_progress(self, stage: str) -> None:
+        """Record that a stage changed, and send progress if enough time has passed.
+
+        The final step of a stage is always sent immediately, so the bar doesn't
+        appear to stall while the next stage starts.
+        """
+        self._dirty.add(stage)
+        if (
+            self._values[stage] >= self._maxes[stage]
+            or time.perf_counter() - self._last_progress >= PROGRESS_INTERVAL
+        ):
+            self._send_progress()
+            self._check_replies()
+
+    def _check_replies(self) -> None:
+        """Handle messages coming back from the daemon."""
         while _PIPE_MAIN_REC.poll():
             arg: Any
             command, arg = _PIPE_MAIN_REC.recv()
@@ -176,7 +217,15 @@ class LoadScreen:
         """Set the maximum value for the specified stage."""
         if stage not in self.stage_ids:
             raise KeyError(f'"{stage}" not valid for {self.stage_ids}!')
-        self._send_msg('set_length', stage, num)
+        if num == 0:
+            # The daemon treats this as skipping the stage.
+            self._values[stage] = 0
+            self._maxes[stage] = 0
+            self._dirty.discard(stage)
+            self._send_msg('set_length', stage, num)
+        else:
+            self._maxes[stage] = num
+            self._queue_progress(stage)
 
     def step(self, stage: str, disp_name: str='') -> None:
         """Increment the specified stage."""
@@ -187,13 +236,17 @@ class LoadScreen:
         if diff > 0.1:
             LOGGER.debug('{}: "{}" = {:.3}s', stage, disp_name, diff)
         self._time = cur
-        self._send_msg('step', stage)
+        self._values[stage] += 1
+        self._queue_progress(stage)
 
     def skip_stage(self, stage: str) -> None:
         """Skip over this stage of the loading process."""
         if stage not in self.stage_ids:
             raise KeyError(f'"{stage}" not valid for {self.stage_ids}!')
         self._time = time.perf_counter()
+        self._values[stage] = 0
+        self._maxes[stage] = 0
+        self._dirty.discard(stage)
         self._send_msg('skip_stage', stage)
 
     def show(self) -> None:
@@ -206,6 +259,11 @@ class LoadScreen:
     def reset(self) -> None:
         """Hide the loading screen and reset all the progress bars."""
         self.active = False
+        # Progress is about to be discarded, no need to send it.
+        self._dirty.clear()
+        for stage in self.stage_ids:
+            self._values[stage] = 0
+            self._maxes[stage] = 10
         self._send_msg('reset')
 
     def destroy(self):
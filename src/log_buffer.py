@@ -0,0 +1,60 @@
+"""A fixed-capacity ring buffer of formatted log records.
+
+The log window's handler adds records from any thread, then a background thread
+periodically takes them all in one batch to send to the display process. If the
+display falls behind, the oldest records are discarded instead of piling up.
+"""
+from __future__ import annotations
+from collections import deque
+from typing import Deque, List, Tuple
+import threading
+
+
+__all__ = ['LogBuffer', 'Record', 'DEFAULT_CAPACITY', 'DEFAULT_INTERVAL']
+# Level name, formatted text.
+Record = Tuple[str, str]
+# The default number of records kept, and how often in seconds batches are sent.
+DEFAULT_CAPACITY = 2000
+DEFAULT_INTERVAL = 0.1
+
+
+class LogBuffer:
+    """Holds the most recent records, until they are drained."""
+    def __init__(self, capacity: int = DEFAULT_CAPACITY) -> None:
+        if capacity < 1:
+            raise ValueError(f'Capacity must be positive, not {capacity}!')
+        self._lock = threading.Lock()
+        self._records: Deque[Record] = deque(maxlen=capacity)
+        self._dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    @property
+    def capacity(self) -> int:
+        """The maximum number of records which are kept."""
+        return self._records.maxlen or 0
+
+    def resize(self, capacity: int) -> None:
+        """Change the capacity, discarding the oldest records if required."""
+        if capacity < 1:
+            raise ValueError(f'Capacity must be positive, not {capacity}!')
+        with self._lock:
+            if capacity != self._records.maxlen:
+                self._dropped += max(0, len(self._records) - capacity)
+                self._records = deque(self._records, maxlen=capacity)
+
+    def push(self, level: str, text: str) -> None:
+        """Add a record, overwriting the oldest if full. This may be called by any thread."""
+        with self._lock:
+            if len(self._records) == self._records.maxlen:
+                self._dropped += 1
+            self._records.append((level, text))
+
+    def drain(self) -> Tuple[List[Record], int]:
+        """Remove all records, returning them and the number discarded since the last drain."""
+        with self._lock:
+            records = list(self._records)
+            self._records.clear()
+            dropped, self._dropped = self._dropped, 0
+        return records, dropped
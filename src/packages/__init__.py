@@ -18,6 +18,7 @@ from app import tkMarkdown, img, lazy_conf, background_run
 import utils
 import consts
 from srctools import Property, NoKeyError
+from srctools.property_parser import escape_text
 from srctools.tokenizer import TokenSyntaxError
 from srctools.filesys import FileSystem, RawFileSystem, ZipFileSystem, VPKFileSystem
 from editoritems import Item as EditorItem, Renderable, RenderableType
@@ -26,7 +27,7 @@ import srctools.logger
 
 from typing import (
     Iterator, NoReturn, ClassVar, Optional, Any, TYPE_CHECKING, TypeVar, Type,
-    Collection, Iterable, cast,
+    Collection, Iterable, IO, cast,
 )
 
 from transtoken import TransToken, TransTokenSource
@@ -38,6 +39,8 @@ if TYPE_CHECKING:  # Prevent circular import
 
 
 LOGGER = srctools.logger.get_logger(__name__, alias='packages')
+# Top-level vbsp_config blocks which are modified during export, so can't be shared.
+MUTABLE_CONF_BLOCKS = frozenset({'options', 'elevator'})
 OBJ_TYPES: dict[str, Type[PakObject]] = {}
 # Maps a package ID to the matching filesystem for reading files easily.
 PACKAGE_SYS: dict[str, FileSystem] = {}
@@ -283,7 +286,9 @@ class PakObject:
         - selected: The ID of the selected item (or None)
         - selected_style: The selected style object
         - editoritems: The Property block for editoritems.txt
-        - vbsp_conf: The Property block for vbsp_config
+        - vbsp_conf: The Property block for vbsp_config. Apart from those in
+          MUTABLE_CONF_BLOCKS, the blocks in this may be shared with packages,
+          so must not be modified.
         - game: The game we're exporting to.
         """
         raise NotImplementedError
@@ -379,6 +384,36 @@ def set_cond_source(props: Property, source: str) -> None:
         cond['__src__'] = source
 
 
+def add_shared_conf(vbsp_conf: Property, conf: Property) -> None:
+    """Add the blocks in a config to vbsp_config, without copying them.
+
+    The blocks remain shared with the package's cached config, so must not be
+    modified afterwards. Blocks which are changed during export are still copied.
+    """
+    for prop in conf:
+        if prop.name in MUTABLE_CONF_BLOCKS:
+            vbsp_conf.append(prop.copy())
+        else:
+            vbsp_conf.append(prop)
+
+
+def write_config(file: IO[str], props: Property, indent: str = '') -> None:
+    """Write a property tree to a file, producing the same text as Property.export().
+
+    Each line is written directly, instead of passing through a generator for every level.
+    """
+    if props.is_root():
+        for child in props:
+            write_config(file, child, indent)
+    elif props.has_children():
+        file.write(f'{indent}"{props.real_name}"\n{indent}\t{{\n')
+        for child in props:
+            write_config(file, child, indent + '\t')
+        file.write(f'{indent}\t}}\n')
+    else:
+        file.write(f'{indent}"{escape_text(props.real_name)}" "{escape_text(props.value)}"\n')
+
+
 @attrs.define
 class PackagesSet:
     """Holds all the data pared from packages.
@@ -530,6 +565,8 @@ async def load_packages(
     has_tag_music: bool=False,
 ) -> None:
     """Scan and read in all packages."""
+    # Any parsed configs may be from the old packages.
+    lazy_conf.clear_cache()
     async with trio.open_nursery() as find_nurs:
         for pak_dir in pak_dirs:
             find_nurs.start_soon(find_packages, find_nurs, packset, pak_dir)
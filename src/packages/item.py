@@ -22,7 +22,7 @@ import config
 from transtoken import TransToken, TransTokenSource
 from packages import (
     PackagesSet, PakObject, ParseData, ExportData, Style,
-    sep_values, desc_parse, get_config,
+    sep_values, desc_parse, get_config, add_shared_conf,
 )
 from editoritems import Item as EditorItem, InstCount
 from connections import Config as ConnConfig
@@ -674,7 +674,8 @@ class Item(PakObject, needs_foreground=True):
             )
 
             exp_data.all_items.extend(items)
-            vbsp_config.extend(apply_replacements(config_part(), item.id))
+            # These are shared with the parse cache, apply_replacements() only copies what it changes.
+            add_shared_conf(vbsp_config, apply_replacements(lazy_conf.shared(config_part), item.id))
 
             # Add auxiliary configs as well.
             try:
@@ -682,7 +683,10 @@ class Item(PakObject, needs_foreground=True):
             except KeyError:
                 pass
             else:
-                vbsp_config.extend(apply_replacements(aux_conf.all_conf(), item.id + ':aux_all'))
+                add_shared_conf(vbsp_config, apply_replacements(
+                    lazy_conf.shared(aux_conf.all_conf),
+                    item.id + ':aux_all',
+                ))
                 try:
                     version_data = aux_conf.versions[ver_id]
                 except KeyError:
@@ -692,8 +696,8 @@ class Item(PakObject, needs_foreground=True):
                     # that's defined for this config
                     for poss_style in exp_data.selected_style.bases:
                         if poss_style.id in version_data:
-                            vbsp_config.extend(apply_replacements(
-                                version_data[poss_style.id](),
+                            add_shared_conf(vbsp_config, apply_replacements(
+                                lazy_conf.shared(version_data[poss_style.id]),
                                 item.id + ':aux'
                             ))
                             break
@@ -963,14 +967,16 @@ async def parse_item_folder(
 
 
 def apply_replacements(conf: Property, item_id: str) -> Property:
-    """Apply a set of replacement values to a config file, returning a new copy.
+    """Apply a set of replacement values to a config file, returning a new tree.
 
     The replacements are found in a 'Replacements' block in the property.
     These replace %values% starting and ending with percents. A double-percent
     allows literal percents. Unassigned values are an error.
+    The original is not modified, blocks without any replacements are shared
+    with it instead of being copied.
     """
     replace: dict[str, str] = {}
-    new_conf = Property.root() if conf.is_root() else Property(conf.real_name, [])
+    children: list[Property] = []
 
     # Strip the replacement blocks from the config, and save the values.
     for prop in conf:
@@ -978,7 +984,7 @@ def apply_replacements(conf: Property, item_id: str) -> Property:
             for rep_prop in prop:
                 replace[rep_prop.name.strip('%')] = rep_prop.value
         else:
-            new_conf.append(prop)
+            children.append(prop)
 
     def rep_func(match: Match) -> str:
         """Does the replacement."""
@@ -990,11 +996,15 @@ def apply_replacements(conf: Property, item_id: str) -> Property:
         except KeyError:
             raise ValueError(f'Unresolved variable in "{item_id}": {var!r}\nValid vars: {replace}')
 
-    for prop in new_conf.iter_tree(blocks=True):
-        prop.name = RE_PERCENT_VAR.sub(rep_func, prop.real_name)
-        if not prop.has_children():
-            prop.value = RE_PERCENT_VAR.sub(rep_func, prop.value)
+    def rep_text(text: str) -> str:
+        """Replace all the variables in a name or value."""
+        if '%' in text:
+            return RE_PERCENT_VAR.sub(rep_func, text)
+        return text
 
+    new_conf = Property.root() if conf.is_root() else Property(conf.real_name, [])
+    for prop in children:
+        new_conf.append(lazy_conf.rebuild_tree(prop, rep_text))
     return new_conf
 
 
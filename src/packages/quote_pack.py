@@ -6,7 +6,7 @@ import utils
 from transtoken import TransTokenSource
 from packages import (
     PackagesSet, PakObject, set_cond_source, ParseData,
-    get_config, ExportData, LOGGER, SelitemData,
+    get_config, ExportData, LOGGER, SelitemData, add_shared_conf,
 )
 from srctools import Property, Vec, NoKeyError
 
@@ -41,6 +41,8 @@ class QuotePack(PakObject, needs_foreground=True):
         self.cam_pitch = cam_pitch
         self.cam_yaw = cam_yaw
         self.turret_hate = turret_hate
+        # The config written for the compiler, computed when first exported.
+        self._compiler_conf: Optional[Property] = None
 
     @classmethod
     async def parse(cls, data: ParseData) -> 'QuotePack':
@@ -102,6 +104,7 @@ class QuotePack(PakObject, needs_foreground=True):
             'quotes_sp',
             'quotes_coop',
         )
+        self._compiler_conf = None
         if self.cave_skin is None:
             self.cave_skin = override.cave_skin
 
@@ -131,14 +134,7 @@ class QuotePack(PakObject, needs_foreground=True):
             ) from None
 
         vbsp_config = exp_data.vbsp_conf  # type: Property
-
-        # We want to strip 'trans' sections from the voice pack, since
-        # they're not useful.
-        for prop in voice.config:
-            if prop.name == 'quotes':
-                vbsp_config.append(QuotePack.strip_quote_data(prop))
-            else:
-                vbsp_config.append(prop.copy())
+        add_shared_conf(vbsp_config, voice.compiler_config())
 
         # Set values in vbsp_config, so flags can determine which voiceline
         # is selected.
@@ -177,6 +173,21 @@ class QuotePack(PakObject, needs_foreground=True):
             else:
                 LOGGER.info('No {} voice config!', pretty)
 
+    def compiler_config(self) -> Property:
+        """Return the config passed to the compiler.
+
+        We want to strip 'trans' sections from the voice pack, since
+        they're not useful. This is only done once, then shared between exports.
+        """
+        if self._compiler_conf is None:
+            self._compiler_conf = Property.root()
+            for prop in self.config:
+                if prop.name == 'quotes':
+                    self._compiler_conf.append(QuotePack.strip_quote_data(prop))
+                else:
+                    self._compiler_conf.append(prop)
+        return self._compiler_conf
+
     @staticmethod
     def strip_quote_data(prop: Property, _depth=0) -> Property:
         """Strip unused property blocks from the config files.
@@ -2,6 +2,7 @@
 from __future__ import annotations
 from io import BytesIO
 from typing import NamedTuple, Optional
+import functools
 
 from PIL import Image
 
@@ -11,6 +12,7 @@ import srctools.logger
 
 from packages import PackagesSet, PakObject, ParseData, ExportData, Style
 from app.img import Handle as ImgHandle
+import texture_cache
 import utils
 
 LOGGER = srctools.logger.get_logger(__name__)
@@ -219,8 +221,10 @@ class Signage(PakObject, allow_mult=True, needs_foreground=True):
                 sel_icons[int(tim_id)] = sty_sign.icon
 
         exp_data.vbsp_conf.append(conf)
-        exp_data.resources[SIGN_LOC] = build_texture(
-            exp_data.packset, exp_data.selected_style, sel_icons,
+        exp_data.resources[SIGN_LOC] = texture_cache.cached(
+            'signage',
+            texture_key(exp_data.packset, exp_data.selected_style, sel_icons),
+            functools.partial(build_texture, exp_data.packset, exp_data.selected_style, sel_icons),
         )
 
     def _serialise(self, parent: Property, style: Style) -> Optional[SignStyle]:
@@ -247,6 +251,41 @@ class Signage(PakObject, allow_mult=True, needs_foreground=True):
         return data
 
 
+def find_legend(packset: PackagesSet, sel_style: Style) -> Optional[SignageLegend]:
+    """Find the legend images used by this style."""
+    for style in sel_style.bases:
+        try:
+            return packset.obj_by_id(SignageLegend, style.id)
+        except KeyError:
+            pass
+    return None
+
+
+def texture_key(
+    packset: PackagesSet,
+    sel_style: Style,
+    icons: dict[int, ImgHandle],
+) -> str:
+    """Compute the key for caching the legend texture, from all the images it uses."""
+    hasher = texture_cache.make_hasher('signage')
+    hasher.update(f'{LEGEND_SIZE} {CELL_SIZE}\n'.encode('utf8'))
+    legend_info = find_legend(packset, sel_style)
+    if legend_info is not None:
+        hasher.update(f'legend {legend_info.id}\n'.encode('utf8'))
+        for handle in [legend_info.overlay, legend_info.background, legend_info.blank]:
+            if handle is not None:
+                handle.add_to_hash(hasher)
+            else:
+                hasher.update(b'<none>\n')
+    for i in range(3, 31):
+        hasher.update(f'icon {i}\n'.encode('utf8'))
+        try:
+            icons[i].add_to_hash(hasher)
+        except KeyError:
+            hasher.update(b'<blank>\n')
+    return hasher.hexdigest()
+
+
 def build_texture(
     packset: PackagesSet,
     sel_style: Style,
@@ -256,18 +295,13 @@ def build_texture(
     legend = Image.new('RGBA', LEGEND_SIZE, (0, 0, 0, 0))
 
     blank_img: Optional[Image.Image] = None
-    for style in sel_style.bases:
-        try:
-            legend_info = packset.obj_by_id(SignageLegend, style.id)
-        except KeyError:
-            pass
-        else:
-            overlay = legend_info.overlay.get_pil()
-            if legend_info.blank is not None:
-                blank_img = legend_info.blank.get_pil().convert('RGB')
-            if legend_info.background is not None:
-                legend.paste(legend_info.background.get_pil(), (0, 0))
-            break
+    legend_info = find_legend(packset, sel_style)
+    if legend_info is not None:
+        overlay = legend_info.overlay.get_pil()
+        if legend_info.blank is not None:
+            blank_img = legend_info.blank.get_pil().convert('RGB')
+        if legend_info.background is not None:
+            legend.paste(legend_info.background.get_pil(), (0, 0))
     else:
         LOGGER.warning('No Signage style overlay defined.')
         overlay = None
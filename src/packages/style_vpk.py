@@ -3,11 +3,16 @@
 This allows altering the in-editor wall textures, as well as a few others.
 """
 from __future__ import annotations
-from typing import Optional, TYPE_CHECKING
+from typing import Callable, Dict, Optional, Set, TYPE_CHECKING
+from enum import Enum
+import hashlib
 import os
 import shutil
+import time
 
-from srctools import FileSystem, VPK
+import attrs
+from srctools import FileSystem, Property, VPK
+from srctools.vpk import get_arch_filename
 import srctools.logger
 
 import utils
@@ -24,6 +29,248 @@ Use to override resources as you please.
 """
 
 
+# Records the contents of the VPK, so unchanged exports can skip rewriting it.
+# This starts with pak01_, so it'll be cleared along with the VPK.
+MANIFEST_NAME = 'pak01_bee2_manifest.txt'
+MANIFEST_VERSION = 2
+# Larger files are split into archives of roughly this size, so a change only
+# requires rewriting the archive containing that file.
+ARCHIVE_SIZE = 8 * 1024 * 1024
+# If more than this fraction of files have changed, rebuild from scratch.
+PATCH_LIMIT = 0.5
+# Files at most this size are stored in the directory file, not archives.
+DIR_DATA_LIMIT = 1024
+
+
+class VPKResult(Enum):
+    """The action performed when exporting the VPK."""
+    SKIPPED = 'skipped'  # Nothing changed.
+    PATCHED = 'patched'  # Only some archives were rewritten.
+    REBUILT = 'rebuilt'  # Regenerated from scratch.
+
+
+@attrs.frozen
+class SourceFile:
+    """A file to be packed into the VPK."""
+    # Where the file comes from. Modification times are only compared for the same origin,
+    # since different folders can contain files with identical times.
+    origin: str
+    # A modification time or other key which changes if the file does, or -1 if not known.
+    mtime: int
+    read: Callable[[], bytes]
+
+
+@attrs.frozen
+class ManifestEntry:
+    """A file in the VPK, when it was last written."""
+    origin: str
+    size: int
+    mtime: int
+    hash: str
+    archive: int  # -1 if stored in the directory file.
+
+
+@attrs.frozen
+class Manifest:
+    """The contents of an existing VPK."""
+    # The size and modification time of the directory VPK, to detect it being changed.
+    dir_size: int
+    dir_mtime: int
+    files: Dict[str, ManifestEntry]
+
+    @classmethod
+    def parse(cls, props: Property) -> Manifest:
+        """Parse a manifest file."""
+        if props.int('version') != MANIFEST_VERSION:
+            raise ValueError('Unknown manifest version!')
+        return cls(
+            int(props['dir_size']),
+            int(props['dir_mtime']),
+            {
+                file_prop.real_name: ManifestEntry(
+                    file_prop['origin'],
+                    int(file_prop['size']),
+                    int(file_prop['mtime']),
+                    file_prop['hash'],
+                    int(file_prop['archive']),
+                )
+                for file_prop in props.find_children('Files')
+            },
+        )
+
+    def export(self) -> Property:
+        """Produce the manifest file."""
+        return Property('Manifest', [
+            Property('version', str(MANIFEST_VERSION)),
+            Property('dir_size', str(self.dir_size)),
+            Property('dir_mtime', str(self.dir_mtime)),
+            Property('Files', [
+                Property(filename, [
+                    Property('origin', entry.origin),
+                    Property('size', str(entry.size)),
+                    Property('mtime', str(entry.mtime)),
+                    Property('hash', entry.hash),
+                    Property('archive', str(entry.archive)),
+                ])
+                for filename, entry in sorted(self.files.items())
+            ]),
+        ])
+
+
+def _hash(data: bytes) -> str:
+    """Compute the hash used to detect changed files."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def read_manifest(dest_folder: str) -> Optional[Manifest]:
+    """Read the manifest for the existing VPK, if it matches the files present."""
+    try:
+        with open(os.path.join(dest_folder, MANIFEST_NAME), encoding='utf8') as f:
+            manifest = Manifest.parse(Property.parse(f, MANIFEST_NAME).find_key('Manifest'))
+        stat = os.stat(os.path.join(dest_folder, 'pak01_dir.vpk'))
+    except FileNotFoundError:
+        return None
+    except (LookupError, ValueError, srctools.KeyValError) as exc:
+        LOGGER.warning('Invalid VPK manifest, rebuilding:', exc_info=exc)
+        return None
+    if stat.st_size != manifest.dir_size or stat.st_mtime_ns != manifest.dir_mtime:
+        LOGGER.info('VPK was modified externally, rebuilding.')
+        return None
+    for entry in manifest.files.values():
+        if entry.archive >= 0 and not os.path.isfile(
+            os.path.join(dest_folder, get_arch_filename('pak01', entry.archive))
+        ):
+            LOGGER.info('VPK archive {} is missing, rebuilding.', entry.archive)
+            return None
+    return manifest
+
+
+def _write_manifest(dest_folder: str, files: Dict[str, ManifestEntry]) -> None:
+    """Write the manifest, after the VPK has been written."""
+    stat = os.stat(os.path.join(dest_folder, 'pak01_dir.vpk'))
+    manifest = Manifest(stat.st_size, stat.st_mtime_ns, files)
+    with open(os.path.join(dest_folder, MANIFEST_NAME), 'w', encoding='utf8') as f:
+        for line in manifest.export().export():
+            f.write(line)
+
+
+def _add(vpk: VPK, filename: str, data: bytes, source: SourceFile, archive: int) -> ManifestEntry:
+    """Add a file to the VPK, returning the entry to record."""
+    if len(data) <= DIR_DATA_LIMIT:
+        archive = -1
+    vpk.add_file(filename, data, arch_index=archive)
+    return ManifestEntry(source.origin, len(data), source.mtime, _hash(data), archive)
+
+
+def _rebuild(dest_folder: str, sources: Dict[str, SourceFile]) -> Dict[str, ManifestEntry]:
+    """Write the VPK from scratch."""
+    files: Dict[str, ManifestEntry] = {}
+    archive = 0
+    archive_size = 0
+    with VPK(os.path.join(dest_folder, 'pak01_dir.vpk'), mode='w', dir_data_limit=DIR_DATA_LIMIT) as vpk:
+        # Sort, so archives are filled deterministically.
+        for filename, source in sorted(sources.items()):
+            data = source.read()
+            if len(data) > DIR_DATA_LIMIT:
+                if archive_size and archive_size + len(data) > ARCHIVE_SIZE:
+                    archive += 1
+                    archive_size = 0
+                archive_size += len(data)
+            files[filename] = _add(vpk, filename, data, source, archive)
+    return files
+
+
+def write_vpk(dest_folder: str, sources: Dict[str, SourceFile]) -> VPKResult:
+    """Update pak01_dir.vpk in the destination folder to contain the specified files.
+
+    If a manifest is present, unchanged files are detected from their modification times if
+    they come from the same origin, or otherwise their hashes. Then the VPK is either left alone, or only the archives containing changed files are
+    rewritten.
+    """
+    manifest = read_manifest(dest_folder)
+    if manifest is None:
+        clear_folder(dest_folder)
+        _write_manifest(dest_folder, _rebuild(dest_folder, sources))
+        return VPKResult.REBUILT
+
+    files = manifest.files.copy()
+    changed: Dict[str, bytes] = {}
+    for filename, source in sources.items():
+        try:
+            entry = files[filename]
+        except KeyError:
+            changed[filename] = source.read()
+            continue
+        if source.mtime != -1 and source.mtime == entry.mtime and source.origin == entry.origin:
+            continue
+        data = source.read()
+        if len(data) == entry.size and _hash(data) == entry.hash:
+            # Touched or moved, but not modified.
+            files[filename] = attrs.evolve(entry, origin=source.origin, mtime=source.mtime)
+        else:
+            changed[filename] = data
+    removed = files.keys() - sources.keys()
+
+    if not changed and not removed:
+        if files != manifest.files:
+            _write_manifest(dest_folder, files)
+        return VPKResult.SKIPPED
+
+    if len(changed) + len(removed) > PATCH_LIMIT * max(len(files), 1):
+        clear_folder(dest_folder)
+        _write_manifest(dest_folder, _rebuild(dest_folder, sources))
+        return VPKResult.REBUILT
+
+    # Each affected archive is deleted, then all the files it contains are written back.
+    affected: Set[int] = {
+        files[filename].archive
+        for filename in [*changed, *removed]
+        if filename in files and files[filename].archive >= 0
+    }
+    rewrite = set(changed)
+    for filename, entry in files.items():
+        if entry.archive in affected and filename not in removed:
+            rewrite.add(filename)
+    # Rewritten files are packed into the affected archives, then new ones if those fill up.
+    free_archives = sorted(affected, reverse=True)
+    next_archive = max((entry.archive for entry in files.values()), default=-1) + 1
+    archive = -1
+    archive_size = 0
+
+    with VPK(os.path.join(dest_folder, 'pak01_dir.vpk'), mode='a', dir_data_limit=DIR_DATA_LIMIT) as vpk:
+        for arch_index in affected:
+            os.remove(os.path.join(dest_folder, get_arch_filename('pak01', arch_index)))
+        for filename in removed:
+            del vpk[filename]
+            del files[filename]
+        for filename in sorted(rewrite):
+            try:
+                data = changed[filename]
+            except KeyError:
+                data = sources[filename].read()
+            if filename in files:
+                del vpk[filename]
+            if len(data) > DIR_DATA_LIMIT:
+                if archive < 0 or (archive_size and archive_size + len(data) > ARCHIVE_SIZE):
+                    if free_archives:
+                        archive = free_archives.pop()
+                    else:
+                        archive = next_archive
+                        next_archive += 1
+                    archive_size = 0
+                archive_size += len(data)
+            files[filename] = _add(vpk, filename, data, sources[filename], archive)
+    _write_manifest(dest_folder, files)
+    return VPKResult.PATCHED
+
+
+def clear_folder(dest_folder: str) -> None:
+    """Remove the VPK files and manifest from the folder."""
+    for file in os.listdir(dest_folder):
+        if file[:6] == 'pak01_':
+            os.remove(os.path.join(dest_folder, file))
+
+
 # The folder we want to copy our VPKs to.
 VPK_FOLDER = {
     # The last DLC released by Valve - this is the one that we
@@ -42,9 +289,10 @@ class StyleVPK(PakObject):
     These are copied into _dlc3, allowing changing the in-editor wall
     textures.
     """
-    def __init__(self, vpk_id: str, filesys: FileSystem, directory: str) -> None:
+    def __init__(self, vpk_id: str, pak_id: str, filesys: FileSystem, directory: str) -> None:
         """Initialise a StyleVPK object."""
         self.id = vpk_id
+        self.pak_id = pak_id
         self.fsys = filesys
         self.dir = directory
 
@@ -61,7 +309,7 @@ class StyleVPK(PakObject):
                 'VPK object "{}" has no associated files!'.format(data.id)
             )
 
-        return cls(data.id, data.fsys, source_folder)
+        return cls(data.id, data.pak_id, data.fsys, source_folder)
 
     @staticmethod
     def export(exp_data: ExportData) -> None:
@@ -77,10 +325,8 @@ class StyleVPK(PakObject):
         else:
             sel_vpk = None
 
-        try:
-            dest_folder = StyleVPK.clear_vpk_files(exp_data.game)
-        except PermissionError:
-            raise NoVPKExport()  # We can't edit the VPK files - P2 is open..
+        dest_folder = exp_data.game.abs_path(VPK_FOLDER.get(exp_data.game.steamID, 'portal2_dlc3'))
+        os.makedirs(dest_folder, exist_ok=True)
 
         if exp_data.game.steamID == utils.STEAM_IDS['PORTAL2']:
             # In Portal 2, we make a dlc3 folder - this changes priorities,
@@ -103,32 +349,50 @@ class StyleVPK(PakObject):
                     # It's fine, this will be regenerated automatically
                     pass
 
-        # Generate the VPK.
-        vpk_file = VPK(os.path.join(dest_folder, 'pak01_dir.vpk'), mode='w')
-        with vpk_file:
-            if sel_vpk is not None:
-                for file in sel_vpk.fsys.walk_folder(sel_vpk.dir):
-                    with file.open_bin() as open_file:
-                        vpk_file.add_file(
-                            file.path,
-                            open_file.read(),
-                            sel_vpk.dir,
-                        )
+        sources: Dict[str, SourceFile] = {}
+        if sel_vpk is not None:
+            origin = f'{sel_vpk.pak_id}:{sel_vpk.dir}'
+            for file in sel_vpk.fsys.walk_folder(sel_vpk.dir):
+                sources[os.path.relpath(file.path, sel_vpk.dir).replace('\\', '/')] = SourceFile(
+                    origin,
+                    file.cache_key(),
+                    # Bind the file now, not the loop variable.
+                    lambda file=file: _read_file(file),
+                )
 
-            # Additionally, pack in game/vpk_override/ into the vpk - this allows
-            # users to easily override resources in general.
+        # Additionally, pack in game/vpk_override/ into the vpk - this allows
+        # users to easily override resources in general.
 
-            override_folder = exp_data.game.abs_path('vpk_override')
-            os.makedirs(override_folder, exist_ok=True)
+        override_folder = exp_data.game.abs_path('vpk_override')
+        os.makedirs(override_folder, exist_ok=True)
 
-            # Also write a file to explain what it's for..
-            with open(os.path.join(override_folder, 'BEE2_README.txt'), 'w') as f:
-                f.write(VPK_OVERRIDE_README)
+        # Also write a file to explain what it's for..
+        with open(os.path.join(override_folder, 'BEE2_README.txt'), 'w') as f:
+            f.write(VPK_OVERRIDE_README)
 
-            vpk_file.add_folder(override_folder)
-            del vpk_file['BEE2_README.txt']  # Don't add this to the VPK though.
+        for subfolder, _, filenames in os.walk(override_folder):
+            for filename in filenames:
+                path = os.path.join(subfolder, filename)
+                rel_path = os.path.relpath(path, override_folder).replace('\\', '/')
+                if rel_path == 'BEE2_README.txt':
+                    continue  # Don't add this to the VPK though.
+                sources[rel_path] = SourceFile(
+                    'vpk_override',
+                    os.stat(path).st_mtime_ns,
+                    lambda path=path: _read_path(path),
+                )
 
-        LOGGER.info('Written {} files to VPK!', len(vpk_file))
+        start = time.perf_counter()
+        try:
+            result = write_vpk(dest_folder, sources)
+        except PermissionError:
+            # The player might have Portal 2 open. Abort changing the VPK.
+            LOGGER.warning("Couldn't replace VPK files. Is Portal 2 or Hammer open?")
+            raise NoVPKExport()
+        LOGGER.info(
+            'VPK {} with {} files in {:.2f}s',
+            result.value, len(sources), time.perf_counter() - start,
+        )
 
     @staticmethod
     def clear_vpk_files(game: Game) -> str:
@@ -142,11 +406,21 @@ class StyleVPK(PakObject):
         dest_folder = game.abs_path(VPK_FOLDER.get(game.steamID, 'portal2_dlc3'))
         os.makedirs(dest_folder, exist_ok=True)
         try:
-            for file in os.listdir(dest_folder):
-                if file[:6] == 'pak01_':
-                    os.remove(os.path.join(dest_folder, file))
+            clear_folder(dest_folder)
         except PermissionError:
             # The player might have Portal 2 open. Abort changing the VPK.
             LOGGER.warning("Couldn't replace VPK files. Is Portal 2 or Hammer open?")
             raise
         return dest_folder
+
+
+def _read_file(file: srctools.filesys.File) -> bytes:
+    """Read a file from a package."""
+    with file.open_bin() as f:
+        return f.read()
+
+
+def _read_path(path: str) -> bytes:
+    """Read a file from the override folder."""
+    with open(path, 'rb') as f:
+        return f.read()
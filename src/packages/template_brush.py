@@ -1,6 +1,8 @@
 """Implements the parsing required for the app to identify all templates."""
 from __future__ import annotations
 
+from typing import Iterator
+
 import trio
 import os
 
@@ -10,6 +12,7 @@ from srctools.dmx import Element as DMXElement, ValueType as DMXValue, Attribute
 import srctools.logger
 
 import packages
+import template_bundle
 from app import gameMan
 from utils import PackagePath
 
@@ -97,3 +100,24 @@ def write_templates(game: gameMan.Game) -> None:
 
     with AtomicWriter(game.abs_path('bin/bee2/templates.lst'), is_bytes=True) as f:
         root.export_binary(f, fmt_name='bee_templates', unicode='format')
+
+    with AtomicWriter(game.abs_path('bin/bee2/templates.bin'), is_bytes=True) as f:
+        template_bundle.write_bundle(f, iter_bundled(TEMPLATES))
+
+
+def iter_bundled(templates: dict[str, PackagePath]) -> Iterator[tuple[str, DMXElement]]:
+    """Parse each template, and strip it down for the compiler's bundle.
+
+    Templates which fail to parse are skipped, the compiler falls back to
+    reading those from the package itself.
+    """
+    for temp_id, path in templates.items():
+        try:
+            file = packages.PACKAGE_SYS[path.package][path.path]
+            with file.open_str() as f:
+                props = Property.parse(f, str(path))
+            vmf = VMF.parse(props, preserve_ids=True)
+            del props
+            yield temp_id, template_bundle.vmf_to_element(temp_id, vmf)
+        except Exception:
+            LOGGER.warning('Could not bundle template "{}":', path, exc_info=True)
@@ -0,0 +1,235 @@
+"""Build the BSP pakfile, streaming files into a temporary archive.
+
+PackList.pack_into_zip() reads every existing and packed file into memory, then
+writes them all into another in-memory zip. For maps with a lot of packed content
+that's several copies of the whole pakfile. Instead, files are streamed into a
+spooled temporary file, and entries already in the pakfile are copied over as-is,
+without decompressing. The result is then memory-mapped to become the lump data.
+"""
+from __future__ import annotations
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from contextlib import contextmanager
+from pathlib import Path
+from zipfile import ZIP64_LIMIT, ZIP_STORED, BadZipFile, ZipFile, ZipInfo
+import copy
+import mmap
+import shutil
+import struct
+import tempfile
+import time
+
+from srctools.bsp import BSP, BSP_LUMPS
+from srctools.filesys import File, FileSystem, VPKFileSystem
+from srctools.packlist import PackList
+import attrs
+import srctools.logger
+
+
+__all__ = ['SPOOL_SIZE', 'PackStats', 'spool', 'pack_into_bsp']
+LOGGER = srctools.logger.get_logger(__name__)
+# Pakfiles smaller than this are built in memory, larger ones in a temporary file.
+SPOOL_SIZE = 32 * 1024 * 1024
+CHUNK_SIZE = 1024 * 1024
+# The fixed-size portion of a zip local file header, and the offset of the name/extra lengths.
+LOCAL_HEADER_SIZE = 30
+LOCAL_HEADER_SIG = b'PK\x03\x04'
+# Set if the sizes and CRC follow the data, instead of being in the local header.
+FLAG_DATA_DESCRIPTOR = 0x08
+# The local header stores this for the sizes if they're in the ZIP64 extra field instead.
+ZIP64_SIZE = 0xFFFFFFFF
+
+
+@attrs.define
+class PackStats:
+    """Details about the packing process, for logging."""
+    packed: List[str] = attrs.Factory(list)  # Filenames added from the packlist.
+    copied: int = 0  # Existing entries copied over.
+    size: int = 0  # Final size of the pakfile.
+    duration: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """The rate the pakfile was written at, in MB/s."""
+        return self.size / 1024 / 1024 / self.duration if self.duration > 0 else 0.0
+
+
+@contextmanager
+def spool(bsp: BSP) -> Iterator[IO[bytes]]:
+    """Provide the temporary file to build the pakfile in.
+
+    This must remain open until the BSP has been saved.
+    """
+    with tempfile.SpooledTemporaryFile(SPOOL_SIZE) as buf:
+        try:
+            yield buf
+        finally:
+            lump = bsp.lumps[BSP_LUMPS.PAKFILE]
+            if isinstance(lump.data, mmap.mmap):
+                view = lump.data
+                lump.data = b''
+                view.close()
+
+
+def _copy_entry(src: ZipFile, info: ZipInfo, dest: ZipFile) -> None:
+    """Copy an entry between zips, without recompressing if possible."""
+    assert src.fp is not None
+    src.fp.seek(info.header_offset)
+    header = src.fp.read(LOCAL_HEADER_SIZE)
+    if len(header) != LOCAL_HEADER_SIZE or header[:4] != LOCAL_HEADER_SIG:
+        raise BadZipFile(f'Bad local header for "{info.filename}"!')
+    compress_size, file_size, name_len, extra_len = struct.unpack('<IIHH', header[18:30])
+    if (
+        info.flag_bits & FLAG_DATA_DESCRIPTOR
+        or ZIP64_SIZE in (compress_size, file_size)
+        or max(info.compress_size, info.file_size) >= ZIP64_LIMIT
+    ):
+        # Uncommon in pakfiles, so just let zipfile handle these.
+        with src.open(info) as src_file, dest.open(copy.copy(info), 'w') as dest_file:
+            shutil.copyfileobj(src_file, dest_file, CHUNK_SIZE)
+        return
+    src.fp.seek(name_len + extra_len, 1)
+    _copy_raw(src, info, dest)
+
+
+def _copy_raw(src: ZipFile, info: ZipInfo, dest: ZipFile) -> None:
+    """Copy the compressed data for an entry, with src positioned at the start of the data.
+
+    zipfile has no public API for this, so this relies on these CPython internals,
+    the same ones ZipFile.mkdir() uses to write an entry directly:
+    - ZipInfo.FileHeader() to produce the local header.
+    - ZipFile.fp, the underlying file.
+    - ZipFile.start_dir, the offset to write the next entry (and the central directory) at.
+    - ZipFile.filelist and ZipFile.NameToInfo, the entries written in the central directory.
+    - ZipFile._didModify, which must be set for close() to write the central directory.
+    """
+    assert src.fp is not None and dest.fp is not None
+    new_info = copy.copy(info)
+    dest.fp.seek(dest.start_dir)
+    new_info.header_offset = dest.fp.tell()
+    dest.fp.write(new_info.FileHeader())
+    remaining = info.compress_size
+    while remaining > 0:
+        chunk = src.fp.read(min(remaining, CHUNK_SIZE))
+        if not chunk:
+            raise BadZipFile(f'Truncated data for "{info.filename}"!')
+        dest.fp.write(chunk)
+        remaining -= len(chunk)
+    dest.filelist.append(new_info)
+    dest.NameToInfo[new_info.filename] = new_info
+    dest.start_dir = dest.fp.tell()
+    dest._didModify = True
+
+
+def _write_file(dest: ZipFile, fname: str, src: File, dump: Optional[Path]) -> None:
+    """Stream a file into the zip, and the dump folder if set."""
+    with src.open_bin() as f, dest.open(fname, 'w') as zip_file:
+        if dump is None:
+            shutil.copyfileobj(f, zip_file, CHUNK_SIZE)
+            return
+        dump.parent.mkdir(exist_ok=True, parents=True)
+        with dump.open('wb') as dump_file:
+            while chunk := f.read(CHUNK_SIZE):
+                zip_file.write(chunk)
+                dump_file.write(chunk)
+
+
+def pack_into_bsp(
+    packlist: PackList,
+    bsp: BSP,
+    buf: IO[bytes],
+    *,
+    whitelist: Iterable[FileSystem] = (),
+    blacklist: Iterable[FileSystem] = (),
+    dump_loc: Optional[Path] = None,
+    ignore_vpk: bool = True,
+) -> PackStats:
+    """Pack all the files into the pakfile in the BSP, replacing existing files.
+
+    This matches PackList.pack_into_zip(), but the new pakfile is written into buf,
+    which should be produced by spool().
+    """
+    start = time.perf_counter()
+    stats = PackStats()
+    fsys = packlist.fsys
+    pakfile = bsp.pakfile
+    existing = {info.filename.casefold() for info in pakfile.infolist()}
+
+    all_systems = {sys for sys, _ in fsys.systems}
+    allowed = set(all_systems)
+    if ignore_vpk:
+        for child_sys in all_systems:
+            if isinstance(child_sys, VPKFileSystem):
+                allowed.discard(child_sys)
+    # Add these on top, so this overrides ignore_vpk.
+    allowed.update(whitelist)
+    allowed.difference_update(blacklist)
+
+    LOGGER.debug('Allowed filesystems:\n{}', '\n'.join([
+        ('+ ' if sys in allowed else '- ') + repr(sys)
+        for sys, _ in fsys.systems
+    ]))
+
+    if dump_loc is not None:
+        # Always write to a subfolder named after the map.
+        # This ensures we're unlikely to overwrite important folders.
+        dump_loc /= Path(bsp.filename).stem
+        LOGGER.info('Dumping pakfile to "{}"..', dump_loc)
+        shutil.rmtree(dump_loc, ignore_errors=True)
+
+    # Find what to pack first, so we know which existing files are replaced.
+    # Casefolded name -> name, data or file.
+    to_pack: Dict[str, Tuple[str, Union[bytes, File]]] = {}
+    for file in packlist:
+        # Need to ensure / separators.
+        fname = file.filename.replace('\\', '/')
+        if file.data is not None:
+            # Always pack, we've got custom data.
+            LOGGER.debug('CUSTOM DATA: {}', fname)
+            to_pack[fname.casefold()] = (fname, file.data)
+            continue
+
+        try:
+            sys_file = fsys[file.filename]
+        except FileNotFoundError:
+            if not file.optional and fname.casefold() not in existing:
+                LOGGER.warning('WARNING: "{}" not packed!', file.filename)
+            continue
+
+        if fname.casefold().endswith('.bik'):
+            # BINK cannot be packed, always skip.
+            LOGGER.debug('EXT:  {}', fname)
+        elif fsys.get_system(sys_file) in allowed:
+            LOGGER.debug('ADD:  {}', fname)
+            to_pack[fname.casefold()] = (fname, sys_file)
+        else:
+            LOGGER.debug('SKIP: {}', fname)
+
+    LOGGER.info('Writing packfile...')
+    with ZipFile(buf, 'w', ZIP_STORED) as new_zip:
+        for info in pakfile.infolist():
+            if info.filename.casefold() not in to_pack:
+                _copy_entry(pakfile, info, new_zip)
+                stats.copied += 1
+        for fname, data in to_pack.values():
+            dump = dump_loc / fname if dump_loc is not None else None
+            if isinstance(data, bytes):
+                new_zip.writestr(fname, data)
+                if dump is not None:
+                    dump.parent.mkdir(exist_ok=True, parents=True)
+                    dump.write_bytes(data)
+            else:
+                _write_file(new_zip, fname, data, dump)
+            stats.packed.append(fname)
+
+    stats.size = buf.tell()
+    buf.seek(0)
+    if stats.size <= SPOOL_SIZE:
+        data: Union[bytes, mmap.mmap] = buf.read()
+    else:
+        # Fetching the fileno moves the data to disk, if it wasn't already.
+        data = mmap.mmap(buf.fileno(), 0, access=mmap.ACCESS_READ)
+    # Replace the parsed zipfile with the raw data, so saving doesn't rebuild it.
+    bsp._parsed_lumps.pop(BSP_LUMPS.PAKFILE, None)
+    bsp.lumps[BSP_LUMPS.PAKFILE].data = data
+    stats.duration = time.perf_counter() - start
+    return stats
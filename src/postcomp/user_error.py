@@ -1,7 +1,8 @@
 """Inject VScript if a user error occurs."""
+import functools
 import json
 
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
 import subprocess
 
@@ -36,6 +37,8 @@ function Think() {
 
 LOGGER = srctools.logger.get_logger(__name__)
 ASYNC_SERVER_INFO = trio.Path(SERVER_INFO_FILE)
+# If we started a server in advance, the process for it.
+_starting_server: Optional[trio.Process] = None
 
 
 @trans('BEE2: User Error')
@@ -87,27 +90,31 @@ async def start_error_server(ctx: Context) -> None:
             webbrowser.get('chrome').open(f'http://127.0.0.1:{port}/')
 
 
-async def load_server() -> Tuple[int, str]:
-    """Load the webserver, then return the port and the localised error text."""
-    # We need to boot the web server.
+async def read_server_info() -> Optional[ServerInfo]:
+    """Read the port file written by a live server, if present."""
     try:
-        data: ServerInfo = json.loads(await ASYNC_SERVER_INFO.read_text('utf8'))
+        return json.loads(await ASYNC_SERVER_INFO.read_text('utf8'))
     except (FileNotFoundError, json.JSONDecodeError):
-        pass
-    else:
-        port = data['port']
-        coop_text = data.get('coop_text', '')
-        LOGGER.debug('Server port file = {}', port)
-        # Server appears to be live. Connect to it, so we can make it reload + check it's alive.
-        try:
-            urlopen(f'http://127.0.0.1:{port}/reload', timeout=5.0)
-        except OSError:  # No response, it's likely dead.
-            LOGGER.debug('No response from server.')
-            await ASYNC_SERVER_INFO.unlink()  # This is invalid.
-        else:
-            LOGGER.debug('Server responded from localhost:{}', port)
-            return port, coop_text  # This is live and its timeout was just refreshed, good to go.
+        return None
+
+
+async def ping_server(port: int, route: str) -> bool:
+    """Access a route on a running server, which also refreshes its timeout.
+
+    This returns whether it responded.
+    """
+    try:
+        await trio.to_thread.run_sync(functools.partial(
+            urlopen, f'http://127.0.0.1:{port}/{route}', timeout=5.0,
+        ))
+    except OSError:  # No response, it's likely dead.
+        LOGGER.debug('No response from server.')
+        return False
+    return True
+
 
+async def launch_server() -> trio.Process:
+    """Start a new server process, without waiting for it to boot."""
     if utils.FROZEN:
         args = [sys.executable]
     else:
@@ -124,22 +131,56 @@ async def load_server() -> Tuple[int, str]:
 
     proc: trio.Process = await trio.lowlevel.open_process(args, startupinfo=startup_info)
     LOGGER.debug('Launched server.')
+    return proc
+
+
+async def prewarm_server() -> None:
+    """Make sure the server is running before any errors occur.
+
+    If one is live its timeout is refreshed, otherwise a new one is started in the background.
+    That way if this or the next compile fails, the error can be shown immediately.
+    """
+    global _starting_server
+    data = await read_server_info()
+    if data is not None and await ping_server(data['port'], 'keepalive'):
+        return
+    _starting_server = await launch_server()
+
+
+async def load_server() -> Tuple[int, str]:
+    """Make the webserver load the error, then return the port and the localised error text."""
+    data = await read_server_info()
+    if data is not None:
+        port = data['port']
+        coop_text = data.get('coop_text', '')
+        LOGGER.debug('Server port file = {}', port)
+        # Server appears to be live. Connect to it, so we can make it reload + check it's alive.
+        if await ping_server(port, 'reload'):
+            LOGGER.debug('Server responded from localhost:{}', port)
+            return port, coop_text  # This is live and its timeout was just refreshed, good to go.
+        await ASYNC_SERVER_INFO.unlink(missing_ok=True)  # This is invalid.
+
+    # If we started one earlier, it's probably almost booted.
+    if _starting_server is not None and _starting_server.returncode is None:
+        proc = _starting_server
+    else:
+        proc = await launch_server()
 
     # Wait for it to boot, and update the ports file.
     with trio.move_on_after(5.0):
         while proc.returncode is None:
-            try:
-                data = json.loads(await ASYNC_SERVER_INFO.read_text('utf8'))
-            except (FileNotFoundError, json.JSONDecodeError):
+            data = await read_server_info()
+            if data is None:
                 await trio.sleep(0.1)
                 continue
-            else:
-                port = data['port']
-                coop_text = data.get('coop_text', '')
-                assert isinstance(port, int), data
-                assert isinstance(coop_text, str), data
-                # Successfully booted. Hack: set the return code of the subprocess.Process object,
-                # so it thinks the server has already quit and doesn't try killing it when we exit.
-                proc._proc.returncode = 0
-                return port, coop_text
+            port = data['port']
+            coop_text = data.get('coop_text', '')
+            assert isinstance(port, int), data
+            assert isinstance(coop_text, str), data
+            # It might have booted before the error was written.
+            await ping_server(port, 'reload')
+            # Successfully booted. Hack: set the return code of the subprocess.Process object,
+            # so it thinks the server has already quit and doesn't try killing it when we exit.
+            proc._proc.returncode = 0
+            return port, coop_text
     raise ValueError('Failed to start error server!')
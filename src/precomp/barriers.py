@@ -11,9 +11,10 @@ from typing_extensions import Literal
 
 from plane import Plane
 from precomp import (
-    instanceLocs, texturing, options, packing,
+    instanceLocs, instance_index, texturing, options, packing,
     template_brush, conditions, collisions,
 )
+from union_find import grid_components
 import consts
 import user_errors
 from precomp.grid_optim import optimise as grid_optimise
@@ -193,7 +194,7 @@ def res_glass_hole(inst: Entity, res: Property):
             ),
         )
     HOLES[key] = hole_type
-    inst['origin'] = sel_origin
+    instance_index.set_origin(inst, sel_origin)
     inst['angles'] = sel_normal.to_angle()
 
 
@@ -636,8 +637,7 @@ def add_glass_floorbeams(vmf: VMF, temp_name: str):
     separation *= 128
 
     # First we want to find all the groups of contiguous glass sections.
-    # This is a mapping from some glass piece to its group list.
-    groups = {}
+    glass_pos: list[tuple[float, float, float]] = []
 
     for (origin, normal_tup), barr_type in BARRIERS.items():
         # Grating doesn't use it.
@@ -650,42 +650,12 @@ def add_glass_floorbeams(vmf: VMF, temp_name: str):
             # Not walls.
             continue
 
-        pos = Vec(origin) + normal * 62
+        glass_pos.append((Vec(origin) + normal * 62).as_tuple())
 
-        groups[pos.as_tuple()] = [pos]
-
-    # Loop over every pos and check in the +x/y directions for another glass
-    # piece. If there, merge the two lists and set every pos in the group to
-    # point to the new list.
-    # Once done, every unique list = a group.
-
-    for pos_tup in groups.keys():
-        pos = Vec(pos_tup)
-        for off in ((128, 0, 0), (0, 128, 0)):
-            neighbour = (pos + off).as_tuple()
-            if neighbour in groups:
-                our_group = groups[pos_tup]
-                neigh_group = groups[neighbour]
-                if our_group is neigh_group:
-                    continue
-
-                # Now merge the two lists. We then need to update all dict
-                # locations to point to the new list.
-
-                if len(neigh_group) > len(our_group):
-                    small_group, large_group = our_group, neigh_group
-                else:
-                    small_group, large_group = neigh_group, our_group
-
-                large_group.extend(small_group)
-                for pos in small_group:
-                    groups[pos.as_tuple()] = large_group
-
-    # Remove duplicates objects by using the ID as key..
-    groups = list({
-        id(group): group
-        for group in groups.values()
-    }.values())
+    groups = [
+        [Vec(pos) for pos in group]
+        for group in grid_components(glass_pos, [(128, 0, 0), (0, 128, 0)])
+    ]
 
     # Side -> u, v or None
 
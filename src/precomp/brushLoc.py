@@ -5,6 +5,7 @@ from __future__ import annotations
 
 from collections.abc import Iterable, Iterator
 from collections import deque
+import itertools
 from typing import Union, Any, Tuple, ItemsView, MutableMapping
 from enum import Enum
 
@@ -128,6 +129,16 @@ BLOCK_LOOKUP['pit'] = {
 
 
 _grid_keys = Union[Vec, Tuple[float, float, float], slice]
+# Blocks which goo may flood into when filling.
+_GOO_FILLABLE = frozenset({
+    Block.AIR,
+    Block.OCCUPIED,
+    Block.PIT_BOTTOM,
+    Block.PIT_MID,
+    Block.PIT_TOP,
+    Block.PIT_SINGLE,
+})
+_SOLID_BLOCKS = frozenset({block for block in Block if block.is_solid})
 
 
 def _conv_key(pos: _grid_keys) -> tuple[float, float, float]:
@@ -248,6 +259,18 @@ class Grid(MutableMapping[_grid_keys, Block]):
 
         self._grid[world_to_grid(Vec(pos)).as_tuple()] = value
 
+    def set_region(self, mins: Iterable[float], maxes: Iterable[float], value: Block) -> None:
+        """Set every grid position in the box between two grid positions (inclusive)."""
+        if type(value) is not Block:
+            raise ValueError(f'Must be set to a Block item, not "{type(value).__name__}"!')
+        min_x, min_y, min_z = map(int, mins)
+        max_x, max_y, max_z = map(int, maxes)
+        self._grid.update(dict.fromkeys(itertools.product(
+            range(min_x, max_x + 1),
+            range(min_y, max_y + 1),
+            range(min_z, max_z + 1),
+        ), value))
+
     def __delitem__(self, pos: _grid_keys) -> None:
         del self._grid[_conv_key(pos)]
 
@@ -338,15 +361,19 @@ class Grid(MutableMapping[_grid_keys, Block]):
                 is_pit = can_have_pit and bottomlessPit.is_pit(bbox_min, bbox_max)
 
                 # If goo is multi-level, we want to record all pos!
+                # Set the whole column as the middle, then fix the ends.
                 z_pos = range(int(bbox_min.z) + 64, int(bbox_max.z), 128)
-                top_ind = len(z_pos) - 1
-                for ind, z in enumerate(z_pos):
-                    g_z = z // 128
-                    self[g_x, g_y, g_z] = Block.from_pitgoo_attr(
-                        is_pit,
-                        is_top=(ind == top_ind),
-                        is_bottom=(ind == 0),
+                if z_pos:
+                    bottom_z = z_pos[0] // 128
+                    top_z = z_pos[-1] // 128
+                    self.set_region(
+                        (g_x, g_y, bottom_z), (g_x, g_y, top_z),
+                        Block.from_pitgoo_attr(is_pit, False, False),
                     )
+                    self[g_x, g_y, bottom_z] = Block.from_pitgoo_attr(is_pit, bottom_z == top_z, True)
+                    self[g_x, g_y, top_z] = Block.from_pitgoo_attr(is_pit, True, bottom_z == top_z)
+                for z in z_pos:
+                    g_z = z // 128
                     # If goo has totally submerged tunnels, they are not filled.
                     # Add each horizontal neighbour to the search list.
                     # If not found they'll be ignored.
@@ -393,39 +420,35 @@ class Grid(MutableMapping[_grid_keys, Block]):
         cover all playable space.
 
         This will also fill the submerged tunnels with goo.
-        """
-        queue: deque[tuple[Vec, bool]] = deque(search_locs)
-
-        def iterdel() -> Iterator[tuple[Vec, bool]]:
-            """Iterate as FIFO queue, deleting as we go."""
-            try:
-                while True:
-                    yield queue.popleft()
-            except IndexError:  # We're empty!
-                return
 
+        Goo and air fill in lockstep in FIFO order, since air can spread into
+        tunnels before goo later overwrites them. Neighbours which would be
+        skipped when popped are never queued - set blocks never revert to being
+        unset or goo-fillable, so that check can be done when pushing.
+        """
+        grid = self._grid
         # Air pockets need to be filled, and bottomless pits.
         # Otherwise we could have those appearing next to real goo pits,
         # with complicated room heights.
-        goo_fillable = [
-            Block.AIR,
-            Block.OCCUPIED,
-            Block.PIT_BOTTOM,
-            Block.PIT_MID,
-            Block.PIT_TOP,
-            Block.PIT_SINGLE,
-        ]
+        goo_fillable = _GOO_FILLABLE
+        solid = _SOLID_BLOCKS
+        queue: deque[tuple[int, int, int, bool]] = deque()
+        for pos, is_goo in search_locs:
+            x, y, z = pos
+            queue.append((int(x), int(y), int(z), is_goo))
 
         # This will iterate every item we add to the queue..
-        for pos, is_goo in iterdel():
+        while queue:
+            x, y, z, is_goo = queue.popleft()
+            block = grid.get((x, y, z))
             # Already set. But allow the goo to fill certain types.
-            if pos in self and not (is_goo and self[pos] in goo_fillable):
+            if block is not None and not (is_goo and block in goo_fillable):
                 continue
 
             # We got outside the map somehow?
             # There's a buffer region since large embedded areas may
             # be interpreted as small air pockets, that's fine.
-            if not ((-15, -15, -15) <= pos <= (40, 40, 40)):
+            if not (-15 <= x <= 40 and -15 <= y <= 40 and -15 <= z <= 40):
                 # We're too early to actually visualise anything.
                 raise user_errors.UserError(user_errors.TOK_BRUSHLOC_LEAK)
 
@@ -433,29 +456,30 @@ class Grid(MutableMapping[_grid_keys, Block]):
             # We only fill from underneath the surface, so
             # use "mid" even for toplevel pits.
             if is_goo:
-                if self[pos].is_pit:
-                    self[pos] = Block.from_pitgoo_attr(
-                        False,
-                        self[pos].is_top,
-                        self[pos].is_bottom,
-                    )
-                elif self[pos.x, pos.y - 1, pos.z].is_solid:
-                    self[pos] = Block.GOO_BOTTOM
+                if block is not None and block.is_pit:
+                    grid[x, y, z] = Block.from_pitgoo_attr(False, block.is_top, block.is_bottom)
+                elif grid.get((x, y - 1, z)) in solid:
+                    grid[x, y, z] = Block.GOO_BOTTOM
                 else:
-                    self[pos] = Block.GOO_MID
+                    grid[x, y, z] = Block.GOO_MID
             else:
-                self[pos] = Block.AIR
+                grid[x, y, z] = Block.AIR
 
-            x, y, z = pos
             # Continue filling in each other direction.
             # But not up for goo.
+            neighbours = [
+                (x, y + 1, z),
+                (x, y - 1, z),
+                (x + 1, y, z),
+                (x - 1, y, z),
+                (x, y, z - 1),
+            ]
             if not is_goo:
-                queue.append((Vec(x, y, z + 1), is_goo))
-            queue.append((Vec(x, y + 1, z), is_goo))
-            queue.append((Vec(x, y - 1, z), is_goo))
-            queue.append((Vec(x + 1, y, z), is_goo))
-            queue.append((Vec(x - 1, y, z), is_goo))
-            queue.append((Vec(x, y, z - 1), is_goo))
+                neighbours.insert(0, (x, y, z + 1))
+            for neighbour in neighbours:
+                block = grid.get(neighbour)
+                if block is None or (is_goo and block in goo_fillable):
+                    queue.append((*neighbour, is_goo))
 
     def dump_to_map(self, vmf: VMF) -> None:
         """Debug purposes: Dump the info as entities in the map.
@@ -0,0 +1,227 @@
+"""Track what uses up the engine limits in the compiled map.
+
+At each checkpoint during the compile, everything added to (or removed from) the
+map since the previous one is attributed to the pass, condition or item which
+just ran. At the end this produces a report of where the budget went, and warns
+if the map is close to a limit.
+
+Instances are collapsed by VBSP, so their contents can't be seen here. They're
+counted separately, and the limits only include what we've generated directly.
+"""
+from __future__ import annotations
+from collections import Counter
+from typing import Dict, Iterator, Mapping, MutableMapping, Optional, Tuple, Union
+from weakref import WeakKeyDictionary
+import functools
+import json
+import weakref
+
+from srctools import VMF, Entity, Solid
+import srctools.logger
+
+
+__all__ = ['LIMITS', 'WARN_FRACTION', 'Tracker', 'start', 'checkpoint', 'finish']
+LOGGER = srctools.logger.get_logger(__name__)
+
+# The categories we track, and the engine limit for each if there is one.
+LIMITS: Mapping[str, Optional[int]] = {
+    'entity': 2048,  # Edicts.
+    'brush': 8192,
+    'side': 65536,
+    'overlay': 512,
+    'output': None,
+    'instance': None,
+}
+# Warn if this fraction of a limit is used.
+WARN_FRACTION = 0.8
+# Entities which are merged into the world or compiled away, so they don't use an edict.
+COMPILED_CLASSES = {
+    'func_detail', 'func_instance', 'func_instance_parms', 'func_instance_io_proxy',
+    'info_overlay', 'prop_static', 'env_cubemap', 'info_lighting', 'func_viscluster',
+}
+# What an entity or world brush counts towards: its category, then the number of brushes,
+# sides and outputs.
+Usage = Tuple[Optional[str], int, int, int]
+NO_USAGE: Usage = (None, 0, 0, 0)
+
+
+@functools.lru_cache(maxsize=None)
+def _category(classname: str) -> Optional[str]:
+    """Determine the category an entity with this classname counts towards, if any."""
+    classname = classname.casefold()
+    if classname == 'func_instance':
+        return 'instance'
+    elif classname == 'info_overlay':
+        return 'overlay'
+    # Our postcompiler removes comp_ entities.
+    elif classname in COMPILED_CLASSES or classname.startswith('comp_'):
+        return None
+    else:
+        return 'entity'
+
+
+def _contents(vmf: VMF) -> Iterator[Tuple[Union[Entity, Solid], Usage]]:
+    """Produce each entity and world brush in the map, with what it counts towards."""
+    for brush in vmf.brushes:
+        yield brush, (None, 1, len(brush.sides), 0)
+    # This is kept up to date when classnames change, and avoids looking up each one.
+    for classname, ents in vmf.by_class.items():
+        if classname == 'worldspawn':
+            continue  # Its brushes were counted above.
+        category = _category(classname)
+        for ent in ents:
+            solids = ent.solids
+            yield ent, (
+                category,
+                len(solids),
+                sum(len(brush.sides) for brush in solids) if solids else 0,
+                len(ent.outputs),
+            )
+
+
+class Tracker:
+    """Attributes the contents of a map to the sources which added or removed them."""
+    def __init__(self, vmf: VMF) -> None:
+        # Entities reference their map, so only weak references are kept. Otherwise
+        # this would keep the map alive in _TRACKERS.
+        self._vmf = weakref.ref(vmf)
+        self.added: Dict[str, Counter[str]] = {}
+        self.removed: Dict[str, Counter[str]] = {}
+        # Each entity and world brush present at the last checkpoint, and its usage then.
+        # These are keyed by id(), the reference checks it is still the same object.
+        self._last: Dict[int, Tuple[weakref.ref[Union[Entity, Solid]], Usage]] = {}
+
+    @property
+    def vmf(self) -> VMF:
+        """The map being tracked."""
+        vmf = self._vmf()
+        if vmf is None:
+            raise ReferenceError('The map was freed!')
+        return vmf
+
+    def checkpoint(self, source: str) -> None:
+        """Attribute everything added or removed since the last checkpoint to this source."""
+        added = self.added.setdefault(source, Counter())
+        removed = self.removed.setdefault(source, Counter())
+        last = self._last
+        current: Dict[int, Tuple[weakref.ref[Union[Entity, Solid]], Usage]] = {}
+        for obj, usage in _contents(self.vmf):
+            key = id(obj)
+            try:
+                ref, old = last.pop(key)
+            except KeyError:
+                ref, old = weakref.ref(obj), NO_USAGE
+            else:
+                if ref() is not obj:
+                    # The old object was freed, and this one reused its ID.
+                    _diff(added, removed, old, NO_USAGE)
+                    ref, old = weakref.ref(obj), NO_USAGE
+            if usage != old:
+                _diff(added, removed, old, usage)
+            current[key] = ref, usage
+        # Anything left was removed.
+        for ref, old in last.values():
+            _diff(added, removed, old, NO_USAGE)
+        self._last = current
+
+    def totals(self) -> Counter[str]:
+        """Sum the usage of every source."""
+        total: Counter[str] = Counter({category: 0 for category in LIMITS})
+        for usage in self.added.values():
+            total.update(usage)
+        for usage in self.removed.values():
+            total.subtract(usage)
+        return total
+
+    def warnings(self) -> Dict[str, Tuple[int, int]]:
+        """Return the categories which are close to the limit, with the usage and limit."""
+        totals = self.totals()
+        return {
+            category: (totals[category], limit)
+            for category, limit in LIMITS.items()
+            if limit is not None and totals[category] >= limit * WARN_FRACTION
+        }
+
+    def report(self) -> dict:
+        """Produce the report, in a form which can be saved as JSON."""
+        sources = {}
+        for source, added in self.added.items():
+            removed = self.removed[source]
+            if any(added.values()) or any(removed.values()):
+                sources[source] = {
+                    'added': {category: count for category, count in added.items() if count},
+                    'removed': {category: count for category, count in removed.items() if count},
+                }
+        return {
+            'limits': dict(LIMITS),
+            'totals': dict(self.totals()),
+            'warnings': sorted(self.warnings()),
+            'sources': sources,
+        }
+
+
+def _diff(added: Counter[str], removed: Counter[str], old: Usage, new: Usage) -> None:
+    """Record the change in usage of a single entity or brush."""
+    old_cat, *old_counts = old
+    new_cat, *new_counts = new
+    if old_cat != new_cat:
+        if old_cat is not None:
+            removed[old_cat] += 1
+        if new_cat is not None:
+            added[new_cat] += 1
+    for category, old_count, new_count in zip(['brush', 'side', 'output'], old_counts, new_counts):
+        if new_count > old_count:
+            added[category] += new_count - old_count
+        elif new_count < old_count:
+            removed[category] += old_count - new_count
+
+
+_TRACKERS: MutableMapping[VMF, Tracker] = WeakKeyDictionary()
+
+
+def start(vmf: VMF, source: str) -> Tracker:
+    """Begin tracking a map, attributing the initial contents to this source."""
+    tracker = _TRACKERS[vmf] = Tracker(vmf)
+    tracker.checkpoint(source)
+    return tracker
+
+
+def checkpoint(vmf: VMF, source: str) -> None:
+    """Attribute the changes since the last checkpoint to this source, if we're tracking this map."""
+    try:
+        tracker = _TRACKERS[vmf]
+    except KeyError:
+        return
+    tracker.checkpoint(source)
+
+
+def finish(vmf: VMF, filename: str) -> None:
+    """Write out the report, and warn about any limits which are close."""
+    try:
+        tracker = _TRACKERS.pop(vmf)
+    except KeyError:
+        return
+    report = tracker.report()
+    with open(filename, 'w', encoding='utf8') as f:
+        json.dump(report, f, indent=1)
+
+    totals = report['totals']
+    LOGGER.info('Map budget: {}', ', '.join([
+        f'{category}={totals[category]}' + (f'/{limit}' if limit is not None else '')
+        for category, limit in LIMITS.items()
+    ]))
+    for category, (used, limit) in tracker.warnings().items():
+        top = sorted(
+            tracker.added.items(),
+            key=lambda item: item[1][category],
+            reverse=True,
+        )[:5]
+        LOGGER.warning(
+            'Map is close to the {} limit ({}/{})! Largest sources:\n{}',
+            category, used, limit,
+            '\n'.join([
+                f' - {source}: {usage[category]}'
+                for source, usage in top
+                if usage[category] > 0
+            ]),
+        )
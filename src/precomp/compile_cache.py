@@ -0,0 +1,109 @@
+"""Cache the styled map, so recompiling an unchanged puzzle can skip straight to VBSP.
+
+The key is a hash of the map, all the files exported by the app, the compiler
+settings and the compiler itself. Only maps which VBSP successfully compiled are stored.
+"""
+from __future__ import annotations
+from configparser import ConfigParser
+from pathlib import Path
+from typing import Optional
+import hashlib
+import os
+import shutil
+import sys
+
+import srctools.logger
+
+from precomp.texturing import ANTIGEL_PATH
+import file_cache
+import utils
+
+
+LOGGER = srctools.logger.get_logger(__name__)
+CACHE_FOLDER = Path('bee2', 'compile_cache')
+# The number of maps to keep.
+MAX_ENTRIES = 4
+# Files exported by the app, which affect the result.
+INPUT_FILES = [
+    'bee2/vbsp_config.cfg',
+    'bee2/editor.bin',
+    'bee2/corridors.bin',
+    'bee2/pack_list.cfg',
+    'bee2/templates.lst',
+    'bee2/templates.bin',
+]
+# Sections of compile.cfg which are written by the compiler, not read.
+OUTPUT_SECTIONS = {'counts'}
+CHUNK_SIZE = 1024 * 1024
+
+
+def _hash_file(hasher: hashlib._Hash, filename: str) -> None:
+    """Add the contents of a file to the hash."""
+    try:
+        with open(filename, 'rb') as f:
+            while chunk := f.read(CHUNK_SIZE):
+                hasher.update(chunk)
+    except FileNotFoundError:
+        hasher.update(b'<missing>')
+    hasher.update(b'\0')
+
+
+def _compiler_stamp() -> str:
+    """Produce a value which changes whenever the compiler is modified."""
+    if utils.FROZEN:
+        stat = os.stat(sys.executable)
+        return f'{stat.st_size}:{stat.st_mtime_ns}'
+    # Running from source, check the modification time of every module.
+    src = Path(__file__).parent.parent
+    return str(max(file.stat().st_mtime_ns for file in src.rglob('*.py')))
+
+
+def compute_key(map_path: str, game_dir: str, config: ConfigParser) -> str:
+    """Compute the key for this map and the current configuration."""
+    hasher = hashlib.sha256()
+    hasher.update(f'{utils.BEE_VERSION}\n{_compiler_stamp()}\n{game_dir}\n'.encode('utf8'))
+    for section in sorted(config.sections()):
+        if section.casefold() in OUTPUT_SECTIONS:
+            continue
+        for key, value in sorted(config.items(section, raw=True)):
+            hasher.update(f'{section}.{key}={value}\n'.encode('utf8'))
+
+    _hash_file(hasher, map_path)
+    for filename in INPUT_FILES:
+        hasher.update(filename.encode('utf8') + b'\0')
+        _hash_file(hasher, filename)
+
+    # Existing antigel materials are reused by texturing, so the generated names depend on these.
+    antigel_loc = Path(game_dir, '../bee2/materials/', ANTIGEL_PATH)
+    try:
+        antigel = sorted(os.listdir(antigel_loc))
+    except FileNotFoundError:
+        antigel = []
+    hasher.update('\n'.join(antigel).encode('utf8'))
+    return hasher.hexdigest()
+
+
+def _path(key: str) -> Path:
+    """The location a map is stored."""
+    return CACHE_FOLDER / f'{key}.vmf'
+
+
+def lookup(key: str) -> Optional[Path]:
+    """Return the cached styled map for this key, if present."""
+    path = _path(key)
+    return path if file_cache.lookup(path) else None
+
+
+def store(key: str, styled_path: str) -> None:
+    """Store a copy of the styled map, then remove the oldest entries."""
+    with open(styled_path, 'rb') as src:
+        file_cache.store(
+            _path(key),
+            lambda dest: shutil.copyfileobj(src, dest, CHUNK_SIZE),
+            '*.vmf', MAX_ENTRIES,
+        )
+
+
+def discard(key: str) -> None:
+    """Remove the cached map for this key."""
+    file_cache.discard(_path(key))
@@ -50,7 +50,7 @@ from srctools import (
     VMF, Entity, Output, Solid, Angle, Matrix,
 )
 
-from precomp import instanceLocs, rand, collisions
+from precomp import budget, instanceLocs, instance_index, rand, collisions
 from precomp.corridor import Info as MapInfo
 import consts
 import utils
@@ -261,10 +261,11 @@ class Condition:
         else:
             return cond_call(coll, info, inst, res)
 
-    def test(self, coll: collisions.Collisions, info: MapInfo, inst: Entity) -> None:
+    def test(self, coll: collisions.Collisions, info: MapInfo, inst: Entity) -> bool:
         """Try to satisfy this condition on the given instance.
 
         If we find that no instance will succeed, raise Unsatisfiable.
+        This returns whether any results were executed.
         """
         success = True
         # Only the first one can cause this condition to be skipped.
@@ -276,10 +277,12 @@ class Condition:
                 success = False
                 break
         results = self.results if success else self.else_results
+        ran = bool(results)
         for res in results[:]:
             should_del = self.test_result(coll, info, inst, res)
             if should_del is RES_EXHAUSTED:
                 results.remove(res)
+        return ran
 
 
 AnnResT = TypeVar('AnnResT')
@@ -693,14 +696,24 @@ def check_all(vmf: VMF, coll: collisions.Collisions, info: MapInfo) -> None:
     LOGGER.info('Checking Conditions...')
     LOGGER.info('-----------------------')
     skipped_cond = 0
+    # Checking the budget is slow, so it's only done if results were run. Consecutive
+    # conditions from the same source are checked together.
+    pending_source: str | None = None
     for condition in conditions:
+        source = f'condition: {condition.source or "?"}'
+        if pending_source is not None and source != pending_source:
+            budget.checkpoint(vmf, pending_source)
+            pending_source = None
+        ran = False
         with srctools.logger.context(condition.source or ''):
             for inst in vmf.by_class['func_instance']:
                 try:
-                    condition.test(coll, info, inst)
+                    if condition.test(coll, info, inst):
+                        ran = True
                 except NextInstance:
                     # NextInstance is raised to immediately stop running
                     # this condition, and skip to the next instance.
+                    ran = True
                     continue
                 except Unsatisfiable:
                     # Unsatisfiable indicates this condition's flags will
@@ -710,6 +723,7 @@ def check_all(vmf: VMF, coll: collisions.Collisions, info: MapInfo) -> None:
                 except EndCondition:
                     # EndCondition is raised to immediately stop running
                     # this condition, and skip to the next condition.
+                    ran = True
                     break
                 except Exception:
                     # Print the source of the condition if it fails...
@@ -719,6 +733,8 @@ def check_all(vmf: VMF, coll: collisions.Collisions, info: MapInfo) -> None:
                     utils.quit_app(1)
                 if not condition.results and not condition.else_results:
                     break  # Condition has run out of results, quit early
+        if ran:
+            pending_source = source
 
         if utils.DEV_MODE:
             # Check ALL_INST is correct.
@@ -735,6 +751,10 @@ def check_all(vmf: VMF, coll: collisions.Collisions, info: MapInfo) -> None:
                     extra.add(inst['file'].casefold())
             # Suppress errors for future conditions.
             ALL_INST.update(extra)
+            # Check instances were re-filed/moved via the index.
+            instance_index.check(vmf, f'Condition "{condition.source}"')
+    if pending_source is not None:
+        budget.checkpoint(vmf, pending_source)
 
     LOGGER.info('---------------------')
     LOGGER.info(
@@ -974,7 +994,8 @@ def add_suffix(inst: Entity, suff: str) -> None:
     """
     file = inst['file']
     old_name, dot, ext = file.partition('.')
-    inst['file'] = new_filename = ''.join((old_name, suff, dot, ext))
+    new_filename = ''.join((old_name, suff, dot, ext))
+    instance_index.set_file(inst, new_filename)
     ALL_INST.add(new_filename.casefold())
 
 
@@ -1378,7 +1399,7 @@ def make_static_pist(vmf: srctools.VMF, res: Property) -> Callable[[Entity], Non
             # Use instances based on the height of the bottom position.
             val = instances['bottom_' + str(bottom_pos)]
             if val:  # Only if defined
-                ent['file'] = val
+                instance_index.set_file(ent, val)
                 ALL_INST.add(val.casefold())
 
             logic_file = instances['logic_' + str(bottom_pos)]
@@ -1405,7 +1426,7 @@ def make_static_pist(vmf: srctools.VMF, res: Property) -> Callable[[Entity], Non
 
             val = instances['static_' + str(pos)]
             if val:
-                ent['file'] = val
+                instance_index.set_file(ent, val)
                 ALL_INST.add(val.casefold())
 
         # Add in the grating for the bottom as an overlay.
@@ -7,7 +7,7 @@ import math
 from srctools import Vec, Property, VMF
 import srctools.logger
 
-from precomp import instanceLocs, item_chain, conditions
+from precomp import instanceLocs, instance_index, item_chain, conditions
 
 
 class LinkType(Enum):
@@ -184,7 +184,7 @@ def legacy_scaffold_link(vmf: VMF) -> None:
 
                 new_file = conf.get('inst_' + orient, '')
                 if new_file:
-                    node.inst['file'] = new_file
+                    instance_index.set_file(node.inst, new_file)
 
                 if node.prev is None:
                     link_type = LinkType.START
@@ -5,7 +5,7 @@ from typing import Iterable, Optional, Callable
 from srctools import Vec, Entity, Property, VMF, Angle
 import srctools.logger
 
-from precomp import instanceLocs, options, collisions, conditions, rand, corridor
+from precomp import instanceLocs, instance_index, options, collisions, conditions, rand, corridor
 
 
 COND_MOD_NAME = 'Instance Generation'
@@ -48,9 +48,9 @@ def res_add_global_inst(vmf: VMF, inst: Entity, res: Property) -> object:
             fixup_style=res['fixup_style', '0'],
         )
         try:
-            new_inst['origin'] = inst.fixup.substitute(res['position'])
+            instance_index.set_origin(new_inst, inst.fixup.substitute(res['position']))
         except IndexError:
-            new_inst['origin'] = options.get(Vec, 'global_ents_loc')
+            instance_index.set_origin(new_inst, options.get(Vec, 'global_ents_loc'))
 
         conditions.GLOBAL_INSTANCES.add(file.casefold())
         conditions.ALL_INST.add(file.casefold())
@@ -132,7 +132,7 @@ def res_add_overlay_inst(vmf: VMF, inst: Entity, res: Property) -> Optional[Enti
         inst.outputs = []
 
     if 'offset' in res:
-        overlay_inst['origin'] = conditions.resolve_offset(inst, res['offset'])
+        instance_index.set_origin(overlay_inst, conditions.resolve_offset(inst, res['offset']))
 
     return overlay_inst
 
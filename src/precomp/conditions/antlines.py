@@ -8,6 +8,7 @@ from precomp import instanceLocs, connections, conditions, antlines
 import srctools.logger
 from precomp.conditions import make_result
 from srctools import VMF, Property, Output, Vec, Entity, Matrix
+from union_find import UnionFind
 
 
 COND_MOD_NAME = None
@@ -60,8 +61,6 @@ class Node:
     item: connections.Item
     pos: Vec
     orient: Matrix
-    # Group has been found yet for this node?
-    is_grouped: bool = False
     # Track if an input was set, to force a corner overlay.
     had_input: bool = False
 
@@ -178,8 +177,8 @@ def res_antlaser(vmf: VMF, res: Property) -> object:
 
     This is executed once to modify all instances.
     """
-    conf_inst_corner = instanceLocs.resolve('<item_bee2_antline_corner>', silent=True)
-    conf_inst_laser = instanceLocs.resolve(res['instance'])
+    conf_inst_corner = instanceLocs.resolve_filter('<item_bee2_antline_corner>', silent=True)
+    conf_inst_laser = instanceLocs.resolve_filter(res['instance'])
     conf_glow_height = Vec(z=res.float('GlowHeight', 48) - 64)
     conf_las_start = Vec(z=res.float('LasStart') - 64)
     conf_rope_off = res.vec('RopePos')
@@ -247,36 +246,35 @@ def res_antlaser(vmf: VMF, res: Property) -> object:
         # None at all.
         return conditions.RES_EXHAUSTED
 
-    # Now find every connected group, recording inputs, outputs and links.
-    todo = set(nodes.values())
+    # Now find every connected group of nodes of the same type.
+    node_sets: UnionFind[Node] = UnionFind(nodes.values())
+    for node in nodes.values():
+        for conn in node.item.outputs:
+            neigh_node = nodes.get(conn.to_item.name, None)
+            if neigh_node is not None and neigh_node.type is node.type:
+                node_sets.union(node, neigh_node)
 
+    # Then record the inputs, outputs and links for each.
     groups: list[Group] = []
-
-    while todo:
-        start = todo.pop()
+    for group_nodes in node_sets.groups():
         # Synthesise the Item used for logic.
         # We use a random info_target to manage the IO data.
-        group = Group(start, start.type)
+        group = Group(group_nodes[0], group_nodes[0].type)
+        group.nodes = group_nodes
         groups.append(group)
         for node in group.nodes:
             # If this node has no non-node outputs, destroy the antlines.
             has_output = False
-            node.is_grouped = True
 
             for conn in list(node.item.outputs):
                 neighbour = conn.to_item
                 neigh_node = nodes.get(neighbour.name, None)
-                todo.discard(neigh_node)
                 if neigh_node is None or neigh_node.type is not node.type:
                     # Not a node or different item type, it must therefore
                     # be a target of our logic.
                     conn.from_item = group.item
                     has_output = True
                     continue
-                elif not neigh_node.is_grouped:
-                    # Another node.
-                    group.nodes.append(neigh_node)
-                # else: True, node already added.
 
                 # For nodes, connect link.
                 conn.remove()
@@ -293,17 +291,12 @@ def res_antlaser(vmf: VMF, res: Property) -> object:
             for conn in list(node.item.inputs):
                 neighbour = conn.from_item
                 neigh_node = nodes.get(neighbour.name, None)
-                todo.discard(neigh_node)
                 if neigh_node is None or neigh_node.type is not node.type:
                     # Not a node or different item type, it must therefore
                     # be a target of our logic.
                     conn.to_item = group.item
                     node.had_input = True
                     continue
-                elif not neigh_node.is_grouped:
-                    # Another node.
-                    group.nodes.append(neigh_node)
-                # else: True, node already added.
 
                 # For nodes, connect link.
                 conn.remove()
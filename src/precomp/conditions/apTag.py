@@ -8,7 +8,7 @@ from precomp.connections import Item
 from srctools import Vec, Property, VMF, Entity, Output, Angle, Matrix
 import srctools.logger
 
-from precomp import instanceLocs, options, connections, conditions
+from precomp import instanceLocs, instance_index, options, connections, conditions
 from connections import Config
 from precomp.fizzler import FIZZLERS, FIZZ_TYPES, Fizzler
 import utils
@@ -114,10 +114,11 @@ def ap_tag_modifications(vmf: VMF):
     has['spawn_nogun'] = True
 
     transition_ents = instanceLocs.get_special_inst('transitionents')
-    for inst in vmf.by_class['func_instance']:
-        if inst['file'].casefold() in transition_ents:
-            inst['file'] = TRANSITION_ENTS
-            conditions.ALL_INST.add(TRANSITION_ENTS.casefold())
+    if isinstance(transition_ents, str):
+        transition_ents = [transition_ents]
+    for inst in instance_index.get(vmf).by_file(transition_ents):
+        instance_index.set_file(inst, TRANSITION_ENTS)
+        conditions.ALL_INST.add(TRANSITION_ENTS.casefold())
 
     # Because of a bug in P2, these folders aren't created automatically.
     # We need a folder with the user's ID in portal2/maps/puzzlemaker.
@@ -235,7 +236,7 @@ def res_make_tag_fizzler(vmf: VMF, info: conditions.MapInfo, res: Property) -> c
         loc = Vec.from_str(inst['origin'])
 
         if disable_other or (blue_enabled and oran_enabled):
-            inst['file'] = inst_frame_double
+            instance_index.set_file(inst, inst_frame_double)
             conditions.ALL_INST.add(inst_frame_double.casefold())
             # On a wall, and pointing vertically
             if abs(inst_normal.z) < 0.01 and abs(inst_orient.left().z) > 0.01:
@@ -251,7 +252,7 @@ def res_make_tag_fizzler(vmf: VMF, info: conditions.MapInfo, res: Property) -> c
                 blue_loc = loc + offset
                 oran_loc = loc - offset
         else:
-            inst['file'] = inst_frame_single
+            instance_index.set_file(inst, inst_frame_single)
             conditions.ALL_INST.add(inst_frame_single.casefold())
             # They're always centered
             blue_loc = loc
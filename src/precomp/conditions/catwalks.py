@@ -8,7 +8,7 @@ from srctools import Angle, Vec, Property, VMF
 from srctools.logger import get_logger
 import srctools
 
-from precomp import brushLoc, instanceLocs, conditions
+from precomp import brushLoc, instanceLocs, instance_index, conditions
 from precomp.connections import ITEMS
 import utils
 
@@ -186,7 +186,7 @@ def res_make_catwalk(vmf: VMF, res: Property):
         * `single_wall`: A section connecting to an East wall.
     """
     LOGGER.info("Starting catwalk generator...")
-    marker = instanceLocs.resolve(res['markerInst'])
+    marker = instanceLocs.resolve_filter(res['markerInst'])
 
     instances: Dict[Optional[Instances], str] = {
         inst_name: instanceLocs.resolve_one(res[inst_name.value, ''], error=True)
@@ -203,9 +203,7 @@ def res_make_catwalk(vmf: VMF, res: Property):
     markers = {}
 
     # Find all our markers, so we can look them up by targetname.
-    for inst in vmf.by_class['func_instance']:
-        if inst['file'].casefold() not in marker:
-            continue
+    for inst in instance_index.get(vmf).by_file(marker):
         markers[inst['targetname']] = inst
 
         # Snap the markers to the grid. If on glass it can become offset...
@@ -221,7 +219,7 @@ def res_make_catwalk(vmf: VMF, res: Property):
 
         catwalks[origin.as_tuple()] = Link()
 
-        inst['origin'] = str(origin)
+        instance_index.set_origin(inst, str(origin))
 
     if not markers:
         return conditions.RES_EXHAUSTED
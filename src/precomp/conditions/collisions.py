@@ -2,7 +2,7 @@
 from __future__ import annotations
 from srctools import Matrix, Vec, Property, VMF, Entity, conv_float, logger
 
-from precomp import conditions, instance_traits
+from precomp import conditions, instance_index, instance_traits
 from precomp.collisions import CollideType, Collisions, BBox
 
 from typing import Callable
@@ -42,8 +42,8 @@ def res_mod_conditions(vmf: VMF, inst: Entity, coll: Collisions, res: Property)
     track_dist = 0.0
     track_orient = orient.copy()
     if 'trackplat' in res:
-        # We need the orientation of the track, so search all ents :(
-        for track_inst in vmf.by_class['func_instance']:
+        # We need the orientation of the track, so find the instances at our origin.
+        for track_inst in instance_index.get(vmf).at(origin):
             if Vec.from_str(track_inst['origin']) != origin:
                 continue
             if 'track' not in instance_traits.get(track_inst):
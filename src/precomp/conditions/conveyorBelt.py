@@ -3,7 +3,7 @@
 from srctools import Property, Vec, Entity, Output, VMF, Matrix
 
 import srctools.logger
-from precomp import instanceLocs, template_brush, conditions
+from precomp import instanceLocs, instance_index, template_brush, conditions
 import consts
 
 
@@ -65,7 +65,7 @@ def res_conveyor_belt(vmf: VMF, inst: Entity, res: Property) -> None:
         if start_offset > 0.5:
             # Swap the direction of movement..
             start_pos, end_pos = end_pos, start_pos
-        inst['origin'] = start_pos
+        instance_index.set_origin(inst, start_pos)
 
     norm = orig_orient.up()
 
@@ -4,7 +4,7 @@ import srctools.logger
 
 import user_errors
 from precomp.instanceLocs import resolve_one
-from precomp import conditions, connections, fizzler
+from precomp import conditions, connections, fizzler, instance_index
 
 
 COND_MOD_NAME = 'Fizzlers'
@@ -74,7 +74,7 @@ def res_reshape_fizzler(vmf: VMF, shape_inst: Entity, res: Property):
 
         fizz.emitters.clear()  # Remove old positions.
         fizz.up_axis = up_axis
-        fizz.base_inst['origin'] = shape_inst['origin']
+        instance_index.set_origin(fizz.base_inst, shape_inst['origin'])
         fizz.base_inst['angles'] = shape_inst['angles']
         break
     else:
@@ -118,7 +118,7 @@ def res_reshape_fizzler(vmf: VMF, shape_inst: Entity, res: Property):
         shape_item.transfer_antlines(fizz_item)
 
     fizz_base = fizz.base_inst
-    fizz_base['origin'] = shape_inst['origin']
+    instance_index.set_origin(fizz_base, shape_inst['origin'])
     origin = Vec.from_str(shape_inst['origin'])
 
     fizz.has_cust_position = True
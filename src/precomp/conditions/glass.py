@@ -4,7 +4,7 @@ from typing import Iterator, Any, Tuple, Dict, List, Optional
 from srctools import Property, Vec, VMF, Side, Entity, Output, Angle
 import srctools.logger
 
-from precomp import template_brush, conditions
+from precomp import template_brush, conditions, instance_index
 from precomp.instanceLocs import resolve as resolve_inst
 import consts
 
@@ -76,11 +76,8 @@ def find_glass_items(config, vmf: VMF) -> Iterator[Tuple[str, Vec, Vec, Vec, dic
     """
     # targetname -> min, max, normal, config
     glass_items: dict[str, tuple[Vec, Vec, Vec, dict]] = {}
-    for inst in vmf.by_class['func_instance']:
-        try:
-            conf = config[inst['file'].casefold()]
-        except KeyError:
-            continue
+    for inst in instance_index.get(vmf).by_file(config):
+        conf = config[inst['file'].casefold()]
         targ = inst['targetname']
         norm = Vec(x=1).rotate_by_str(inst['angles'])
         origin = Vec.from_str(inst['origin']) - 64 * norm
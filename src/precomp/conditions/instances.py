@@ -7,7 +7,7 @@ import operator
 
 import srctools.logger
 from precomp.conditions import make_flag, make_result
-from precomp import instance_traits, instanceLocs, conditions, options
+from precomp import instance_index, instance_traits, instanceLocs, conditions, options
 from srctools import Property, Angle, Vec, Entity, Output, VMF, conv_bool
 
 LOGGER = srctools.logger.get_logger(__name__, 'cond.instances')
@@ -17,7 +17,7 @@ COND_MOD_NAME = 'Instances'
 @make_flag('instance')
 def flag_file_equal(flag: Property) -> Callable[[Entity], bool]:
     """Evaluates True if the instance matches the given file."""
-    inst_list = set(instanceLocs.resolve(flag.value))
+    inst_list = instanceLocs.resolve_filter(flag.value)
 
     def check_inst(inst: Entity) -> bool:
         """Each time, check if no matching instances exist, so we can skip conditions."""
@@ -36,7 +36,7 @@ def flag_file_cont(inst: Entity, flag: Property) -> bool:
 @make_flag('hasInst')
 def flag_has_inst(flag: Property) -> Callable[[Entity], bool]:
     """Checks if the given instance is present anywhere in the map."""
-    flags = set(instanceLocs.resolve(flag.value))
+    flags = instanceLocs.resolve_filter(flag.value)
     return lambda inst: flags.isdisjoint(conditions.ALL_INST)
 
 
@@ -204,7 +204,8 @@ def flag_offset_distance(inst: Entity, flag: Property) -> bool:
 @make_result('rename', 'changeInstance')
 def res_change_instance(inst: Entity, res: Property):
     """Set the file to a value."""
-    inst['file'] = filename = instanceLocs.resolve_one(res.value, error=True)
+    filename = instanceLocs.resolve_one(res.value, error=True)
+    instance_index.set_file(inst, filename)
     conditions.ALL_INST.add(filename.casefold())
 
 
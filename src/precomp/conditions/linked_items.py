@@ -8,7 +8,7 @@ import attrs
 from srctools import Property, VMF, Entity
 import srctools.logger
 
-from precomp import instanceLocs, item_chain, conditions
+from precomp import instanceLocs, instance_index, item_chain, conditions
 
 
 COND_MOD_NAME = 'Item Linkage'
@@ -228,6 +228,6 @@ def link_item(vmf: VMF, group: list[item_chain.Node[Config]]) -> None:
                         # Round to nearest 90 degrees
                         # Add 45 so the switchover point is at the diagonals
                         link_ang = (link_ang + 45) // 90 * 90
-                    node.inst['file'] = conf.scaff_endcap
+                    instance_index.set_file(node.inst, conf.scaff_endcap)
                     conditions.ALL_INST.add(conf.scaff_endcap.casefold())
                     node.inst['angles'] = '0 {:.0f} 0'.format(link_ang)
@@ -1,7 +1,7 @@
 """Handles generating Piston Platforms with specific logic."""
 from typing import Optional
 
-from precomp import packing, template_brush, conditions
+from precomp import packing, template_brush, conditions, instance_index
 import srctools.logger
 from consts import FixupVars
 from precomp.connections import ITEMS
@@ -97,7 +97,8 @@ def res_piston_plat(vmf: VMF, res: Property) -> conditions.ResultCallable:
                 inst.fixup[FixupVars.PIST_TOP] = position
                 static_inst = inst.copy()
                 vmf.add_ent(static_inst)
-                static_inst['file'] = fname = inst_filenames['fullstatic_' + str(position)]
+                fname = inst_filenames['fullstatic_' + str(position)]
+                instance_index.set_file(static_inst, fname)
                 conditions.ALL_INST.add(fname)
                 return
 
@@ -150,21 +151,25 @@ def res_piston_plat(vmf: VMF, res: Property) -> conditions.ResultCallable:
 
             if pist_ind <= min_pos:
                 # It's below the lowest position, so it can be static.
-                pist_ent['file'] = fname = inst_filenames['static_' + str(pist_ind)]
-                pist_ent['origin'] = brush_pos = origin + pist_ind * off
+                fname = inst_filenames['static_' + str(pist_ind)]
+                instance_index.set_file(pist_ent, fname)
+                brush_pos = origin + pist_ind * off
+                instance_index.set_origin(pist_ent, brush_pos)
                 temp_targ = static_ent
             else:
                 # It's a moving component.
-                pist_ent['file'] = fname = inst_filenames['dynamic_' + str(pist_ind)]
+                fname = inst_filenames['dynamic_' + str(pist_ind)]
+                instance_index.set_file(pist_ent, fname)
                 if pist_ind > max_pos:
                     # It's 'after' the highest position, so it never extends.
                     # So simplify by merging those all.
                     # The max pos was evaluated earlier, so this must be set.
                     temp_targ = pistons[max_pos]
                     if start_up:
-                        pist_ent['origin'] = brush_pos = origin + max_pos * off
+                        brush_pos = origin + max_pos * off
                     else:
-                        pist_ent['origin'] = brush_pos = origin + min_pos * off
+                        brush_pos = origin + min_pos * off
+                    instance_index.set_origin(pist_ent, brush_pos)
                     pist_ent.fixup['$parent'] = 'pist' + str(max_pos)
                 else:
                     # It's actually a moving piston.
@@ -173,7 +178,7 @@ def res_piston_plat(vmf: VMF, res: Property) -> conditions.ResultCallable:
                     else:
                         brush_pos = origin + min_pos * off
 
-                    pist_ent['origin'] = brush_pos
+                    instance_index.set_origin(pist_ent, brush_pos)
                     pist_ent.fixup['$parent'] = 'pist' + str(pist_ind)
 
                     pistons[pist_ind] = temp_targ = vmf.create_ent(
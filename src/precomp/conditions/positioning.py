@@ -9,7 +9,7 @@ from precomp.conditions import (
     make_flag, make_result, resolve_offset,
     DIRECTIONS,
 )
-from precomp import tiling, brushLoc
+from precomp import tiling, brushLoc, instance_index
 from srctools import Vec, Angle, Matrix, conv_float, Property, Entity
 from srctools.logger import get_logger
 
@@ -510,7 +510,7 @@ def res_translate_inst(inst: Entity, res: Property):
     used to offset it based on the starting position, bottom or top position
     of a piston platform.
     """
-    inst['origin'] = resolve_offset(inst, res.value)
+    instance_index.set_origin(inst, resolve_offset(inst, res.value))
 
 
 @make_result('OppositeWallDist')
@@ -589,6 +589,6 @@ def res_rotate_inst(inst: Entity, res: Property) -> None:
         pass
     else:
         origin = Vec.from_str(inst['origin'])
-        inst['origin'] = origin + (-offset @ orient + offset) @ angles
+        instance_index.set_origin(inst, origin + (-offset @ orient + offset) @ angles)
 
     inst['angles'] = (orient @ angles).to_angle()
@@ -4,7 +4,7 @@ from typing import Callable
 from srctools import Property, Vec, Entity, Angle
 import srctools
 
-from precomp import collisions, conditions, rand
+from precomp import collisions, conditions, instance_index, rand
 from precomp.conditions import Condition, RES_EXHAUSTED, make_flag, make_result, MapInfo
 
 COND_MOD_NAME = 'Randomisation'
@@ -212,5 +212,5 @@ def res_rand_inst_shift(res: Property) -> Callable[[Entity], None]:
             rng.uniform(min_z, max_z),
         )
         pos.localise(Vec.from_str(inst['origin']), Angle.from_str(inst['angles']))
-        inst['origin'] = pos
+        instance_index.set_origin(inst, pos)
     return shift_ent
@@ -3,7 +3,7 @@ from typing import Tuple, Dict, Optional, Iterable, List
 from enum import Enum
 
 import srctools.logger
-from precomp import tiling, texturing, template_brush, conditions
+from precomp import tiling, texturing, template_brush, conditions, instance_index
 import consts
 from srctools import Property, Entity, VMF, Vec, NoKeyError, Matrix
 from srctools.vmf import make_overlay, Side
@@ -145,11 +145,13 @@ def res_signage(vmf: VMF, inst: Entity, res: Property):
         sec_visgroup = 'secondary'
 
     if sign_prim and sign_sec:
-        inst['file'] = fname = res['large_clip', '']
-        inst['origin'] = (prim_pos + sec_pos) / 2
+        fname = res['large_clip', '']
+        instance_index.set_file(inst, fname)
+        instance_index.set_origin(inst, (prim_pos + sec_pos) / 2)
     else:
-        inst['file'] = fname = res['small_clip', '']
-        inst['origin'] = prim_pos if sign_prim else sec_pos
+        fname = res['small_clip', '']
+        instance_index.set_file(inst, fname)
+        instance_index.set_origin(inst, prim_pos if sign_prim else sec_pos)
     conditions.ALL_INST.add(fname.casefold())
 
     brush_faces: List[Side] = []
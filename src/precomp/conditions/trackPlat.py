@@ -1,8 +1,7 @@
 """Conditions relating to track platforms."""
-from typing import Set, Dict, Tuple
-
-from precomp import instanceLocs, conditions
+from precomp import instanceLocs, instance_index, conditions
 from srctools import Matrix, Vec, Property, Entity, VMF, logger
+from union_find import UnionFind
 
 
 COND_MOD_NAME = 'Track Platforms'
@@ -50,12 +49,11 @@ def res_track_plat(vmf: VMF, res: Property) -> object:
     track_files = [inst_bottom, inst_middle, inst_top, inst_single]
     platforms = [inst_plat, inst_plat_oscil]
 
+    inst_index = instance_index.get(vmf)
     # All the track_set in the map, indexed by origin
     track_instances = {
         Vec.from_str(inst['origin']).as_tuple(): inst
-        for inst in
-        vmf.by_class['func_instance']
-        if inst['file'].casefold() in track_files
+        for inst in inst_index.by_file(track_files)
     }
 
     LOGGER.debug('Track instances:')
@@ -68,54 +66,52 @@ def res_track_plat(vmf: VMF, res: Property) -> object:
     if not track_instances:
         return conditions.RES_EXHAUSTED
 
+    # Join each piece to the next along its local +X axis, to find each complete track.
+    # Bottom pieces are at the -X end, top pieces at the +X end.
+    track_sets: UnionFind[Entity] = UnionFind(track_instances.values())
+    for origin, track in track_instances.items():
+        if track['file'].casefold() not in (inst_bottom, inst_middle):
+            continue
+        next_pos = Vec(origin) + Vec(128, 0, 0) @ Matrix.from_angstr(track['angles'])
+        try:
+            next_track = track_instances[next_pos.as_tuple()]
+        except KeyError:
+            continue
+        if next_track['file'].casefold() in (inst_middle, inst_top):
+            track_sets.union(track, next_track)
+    track_groups = {
+        track: group
+        for group in track_sets.groups()
+        for track in group
+    }
+
     # Now we loop through all platforms in the map, and then locate their
     # track_set
-    for plat_inst in vmf.by_class['func_instance']:
-        if plat_inst['file'].casefold() not in platforms:
-            continue  # Not a platform!
-
+    for plat_inst in inst_index.by_file(platforms):
         LOGGER.debug('Modifying "{}"!', plat_inst['targetname'])
 
         plat_loc = Vec.from_str(plat_inst['origin'])
         # The direction away from the wall/floor/ceil
         normal = Matrix.from_angstr(plat_inst['angles']).up()
 
-        for tr_origin, first_track in track_instances.items():
-            if plat_loc == tr_origin:
-                # Check direction
-                if Vec.dot(normal, Matrix.from_angstr(first_track['angles']).up()) > 0.9:
-                    break
-        else:
+        try:
+            first_track = track_instances[plat_loc.as_tuple()]
+        except KeyError:
+            raise Exception(f'Platform "{plat_inst["targetname"]}" has no track!') from None
+        # Check direction
+        if Vec.dot(normal, Matrix.from_angstr(first_track['angles']).up()) <= 0.9:
             raise Exception(f'Platform "{plat_inst["targetname"]}" has no track!')
 
         track_type = first_track['file'].casefold()
         if track_type == inst_single:
             # Track is one block long, use a single-only instance and
             # remove track!
-            plat_inst['file'] = single_plat_inst
+            instance_index.set_file(plat_inst, single_plat_inst)
             conditions.ALL_INST.add(single_plat_inst.casefold())
             first_track.remove()
             continue  # Next platform
 
-        track_set: set[Entity] = set()
-        if track_type == inst_top or track_type == inst_middle:
-            # search left
-            track_scan(
-                track_set,
-                track_instances,
-                first_track,
-                middle_file=inst_middle,
-                x_dir=-1,
-            )
-        if track_type == inst_bottom or track_type == inst_middle:
-            # search right
-            track_scan(
-                track_set,
-                track_instances,
-                first_track,
-                middle_file=inst_middle,
-                x_dir=+1,
-            )
+        track_set = track_groups[first_track]
 
         # Give every track a targetname matching the platform
         for ind, track in enumerate(track_set, start=1):
@@ -156,30 +152,3 @@ def res_track_plat(vmf: VMF, res: Property) -> object:
 
     return conditions.RES_EXHAUSTED  # Don't re-run
 
-
-def track_scan(
-    tr_set: Set[Entity],
-    track_inst: Dict[Tuple[float, float, float], Entity],
-    start_track: Entity,
-    middle_file: str,
-    x_dir: int,
-):
-    """Build a set of track instances extending from a point.
-    :param track_inst: A dictionary mapping origins to track instances
-    :param start_track: The instance we start on
-    :param middle_file: The file for the center track piece
-    :param x_dir: The direction to look (-1 or 1)
-    """
-    track = start_track
-    move_dir = Vec(x_dir*128, 0, 0) @ Matrix.from_angstr(track['angles'])
-    while track:
-        tr_set.add(track)
-
-        next_pos = Vec.from_str(track['origin']) + move_dir
-        track = track_inst.get(next_pos.as_tuple(), None)
-        if track is None:
-            return
-        if track['file'].casefold() != middle_file:
-            # If the next piece is an end section, add it then quit
-            tr_set.add(track)
-            return
@@ -7,7 +7,7 @@ import attrs
 from srctools import Vec, Property, Entity, VMF, Solid, Matrix
 import srctools.logger
 
-from precomp import tiling, instanceLocs, conditions, connections, template_brush
+from precomp import tiling, instanceLocs, instance_index, conditions, connections, template_brush
 from precomp.brushLoc import POS as BLOCK_POS
 import utils
 
@@ -167,11 +167,8 @@ def res_vactubes(vmf: VMF, res: Property) -> conditions.ResultCallable:
         markers: dict[str, Marker] = {}
 
         # Find all our markers, so we can look them up by targetname.
-        for inst in vmf.by_class['func_instance']:
-            try:
-                config, inst_size = inst_config[inst['file'].casefold()]
-            except KeyError:
-                continue  # Not a marker
+        for inst in instance_index.get(vmf).by_file(inst_config):
+            config, inst_size = inst_config[inst['file'].casefold()]
 
             # Remove the original instance from the level - we spawn entirely new
             # ones.
@@ -229,11 +226,12 @@ def vactube_gen(vmf: VMF) -> None:
         vmf.add_ent(start_logic)
 
         if start_normal.z > 0:
-            start_logic['file'] = fname = start.conf.inst_entry_ceil
+            fname = start.conf.inst_entry_ceil
         elif start_normal.z < 0:
-            start_logic['file'] = fname = start.conf.inst_entry_floor
+            fname = start.conf.inst_entry_floor
         else:
-            start_logic['file'] = fname = start.conf.inst_entry_wall
+            fname = start.conf.inst_entry_wall
+        instance_index.set_file(start_logic, fname)
         conditions.ALL_INST.add(fname.casefold())
 
         end = start
@@ -259,7 +257,7 @@ def vactube_gen(vmf: VMF) -> None:
         if not (BLOCK_POS.lookup_world(end_loc).is_goo and end_norm.z < -1e-6):
             end_logic = end.ent.copy()
             vmf.add_ent(end_logic)
-            end_logic['file'] = end.conf.inst_exit
+            instance_index.set_file(end_logic, end.conf.inst_exit)
             conditions.ALL_INST.add(end.conf.inst_exit.casefold())
 
 
@@ -10,7 +10,7 @@ from connections import InputType, FeatureMode, Config, ConnType, OutNames
 from srctools import VMF, Entity, Output, conv_bool, Vec, Angle
 from precomp.antlines import Antline, AntType
 from precomp import (
-    instance_traits, instanceLocs,
+    instance_index, instance_traits, instanceLocs,
     options,
     packing,
     conditions,
@@ -676,36 +676,134 @@ def calc_connections(
             pass
 
 
-def do_item_optimisation(vmf: VMF) -> None:
-    """Optimise redundant logic items."""
-    needs_global_toggle = False
+def is_simple_gate(item: Item) -> bool:
+    """Check if this is a logic gate with no extra behaviour, so it can be merged with others."""
+    if item.config is None or not item.config.input_type.is_logic:
+        return False
+    if item.config.spawn_fire is not FeatureMode.NEVER or item.timer is not None:
+        return False
+    return not (
+        conv_bool(item.inst.fixup.substitute(item.config.invert_var, allow_invert=True)) or
+        conv_bool(item.inst.fixup.substitute(item.config.sec_invert_var, allow_invert=True))
+    )
+
+
+def merge_equivalent_gates() -> int:
+    """Merge logic gates of the same type which have the same inputs.
 
+    The outputs of all of them are then fired by a single gate.
+    This returns the number of gates removed.
+    """
+    gates: Dict[Tuple[str, str, Tuple[str, ...]], Item] = {}
+    merged = 0
     for item in list(ITEMS.values()):
-        # We can't remove items that have functionality, or don't have IO.
-        if item.config is None or not item.config.input_type.is_logic:
+        if not item.inputs or not is_simple_gate(item):
+            continue
+        inputs = sorted(conn.from_item.name for conn in item.inputs)
+        # Don't touch loops, these don't have any sensible behaviour to preserve.
+        if item.name in inputs:
+            continue
+        key = (item.config.id, item.ant_toggle_var, tuple(inputs))
+        try:
+            existing = gates[key]
+        except KeyError:
+            gates[key] = item
             continue
 
-        prim_inverted = conv_bool(item.inst.fixup.substitute(item.config.invert_var, allow_invert=True))
-        sec_inverted = conv_bool(item.inst.fixup.substitute(item.config.sec_invert_var, allow_invert=True))
+        LOGGER.debug('Merging "{}" into equivalent gate "{}"...', item.name, existing.name)
+        for conn in list(item.inputs):
+            conn.remove()
+        for conn in list(item.outputs):
+            conn.from_item = existing
+        item.transfer_antlines(existing)
+        del ITEMS[item.name]
+        item.inst.remove()
+        merged += 1
+    return merged
+
+
+def flatten_gates() -> int:
+    """Merge logic gates which only feed into another gate of the same type.
 
-        # Don't optimise if inverted.
-        if prim_inverted or sec_inverted:
+    AND and OR are associative, so the inputs can be moved to the outer gate directly.
+    This returns the number of gates removed.
+    """
+    flattened = 0
+    for item in list(ITEMS.values()):
+        # If the gate has indicators or other outputs, its own state is observable.
+        if (
+            len(item.outputs) != 1 or not item.inputs
+            or item.antlines or item.ind_panels or item.shape_signs
+            or not is_simple_gate(item)
+        ):
             continue
-        inp_count = len(item.inputs)
-        if inp_count == 0:
-            # Totally useless, remove.
-            # We just leave the panel entities, and tie all the antlines
-            # to the same toggle.
-            needs_global_toggle = True
-            for ant in item.antlines:
-                ant.name = '_static_ind'
-
-            del ITEMS[item.name]
-            item.inst.remove()
-        elif inp_count == 1:
-            # Only one input, so AND or OR are useless.
-            # Transfer input item to point to the output(s).
-            collapse_item(item)
+        [out_conn] = item.outputs
+        outer = out_conn.to_item
+        if (
+            outer is item or not is_simple_gate(outer)
+            or outer.config.input_type is not item.config.input_type
+            or any(conn.from_item is outer for conn in item.inputs)
+        ):
+            continue
+
+        LOGGER.debug('Flattening "{}" into "{}"...', item.name, outer.name)
+        out_conn.remove()
+        for conn in list(item.inputs):
+            conn.to_item = outer
+        del ITEMS[item.name]
+        item.inst.remove()
+        flattened += 1
+    return flattened
+
+
+def do_item_optimisation(vmf: VMF) -> None:
+    """Optimise redundant logic items.
+
+    Each change can expose more redundancy elsewhere in the graph, so this
+    repeats until nothing changes.
+    """
+    needs_global_toggle = False
+    removed = 0
+    changed = True
+
+    while changed:
+        merged = merge_equivalent_gates() + flatten_gates()
+        removed += merged
+        changed = merged > 0
+
+        for item in list(ITEMS.values()):
+            # We can't remove items that have functionality, or don't have IO.
+            if item.config is None or not item.config.input_type.is_logic:
+                continue
+
+            prim_inverted = conv_bool(item.inst.fixup.substitute(item.config.invert_var, allow_invert=True))
+            sec_inverted = conv_bool(item.inst.fixup.substitute(item.config.sec_invert_var, allow_invert=True))
+
+            # Don't optimise if inverted.
+            if prim_inverted or sec_inverted:
+                continue
+            inp_count = len(item.inputs)
+            if inp_count == 0:
+                # Totally useless, remove.
+                # We just leave the panel entities, and tie all the antlines
+                # to the same toggle.
+                needs_global_toggle = True
+                for ant in item.antlines:
+                    ant.name = '_static_ind'
+
+                del ITEMS[item.name]
+                item.inst.remove()
+            elif inp_count == 1:
+                # Only one input, so AND or OR are useless.
+                # Transfer input item to point to the output(s).
+                collapse_item(item)
+            else:
+                continue
+            removed += 1
+            changed = True
+
+    if removed:
+        LOGGER.info('Optimised away {} logic gates.', removed)
 
     # The antlines need a toggle entity, otherwise they'll copy random other
     # overlays.
@@ -841,7 +939,7 @@ def gen_item_outputs(vmf: VMF) -> None:
         desired_panel_inst = panel_check if item.timer is None else panel_timer
 
         for pan in item.ind_panels:
-            pan['file'] = desired_panel_inst
+            instance_index.set_file(pan, desired_panel_inst)
             pan.fixup[consts.FixupVars.TIM_ENABLED] = item.timer is not None
         if item.ind_panels:
             conditions.ALL_INST.add(desired_panel_inst.casefold())
@@ -10,7 +10,7 @@ import srctools.logger
 
 import consts
 import utils
-from . import instanceLocs, rand
+from . import instanceLocs, instance_index, rand
 from corridor import (  # noqa
     GameMode, Direction, Orient,
     CORRIDOR_COUNTS, CORR_TO_ID, ID_TO_CORR,
@@ -154,7 +154,7 @@ def analyse_and_modify(
                     '{}_{}_{} corridor selected {} -> {}',
                     corr_mode.value, corr_dir.value, corr_orient.value, corr_ind, chosen,
                 )
-            item['file'] = chosen.instance
+            instance_index.set_file(item, chosen.instance)
             file = chosen.instance.casefold()
 
             if corr_dir is Direction.ENTRY:
@@ -170,7 +170,7 @@ def analyse_and_modify(
 
             if chosen.legacy:
                 # Converted type, keep original angles and positioning.
-                item['origin'] = origin - (0, 0, 64)
+                instance_index.set_origin(item, origin - (0, 0, 64))
                 # And write the index.
                 item.fixup[consts.FixupVars.BEE_CORR_INDEX] = chosen.orig_index
             # Otherwise, give more useful orientations for building instances.
@@ -7,7 +7,7 @@ from weakref import WeakKeyDictionary
 from enum import Enum
 from typing import NamedTuple, MutableMapping
 
-from precomp import brushLoc, options, packing, conditions
+from precomp import brushLoc, instance_index, options, packing, conditions
 from precomp.conditions.globals import precache_model
 from precomp.instanceLocs import resolve as resolve_inst
 from srctools.vmf import VMF, Entity, EntityFixup, Output
@@ -1158,7 +1158,8 @@ def link_cubes(vmf: VMF, info: conditions.MapInfo) -> None:
     # Cube items.
     cubes: list[tuple[Entity, CubeType]] = []
 
-    for inst in vmf.by_class['func_instance']:
+    inst_index = instance_index.get(vmf)
+    for inst in inst_index.by_file([*inst_to_cube, *inst_to_drop]):
         fname = inst['file'].casefold()
         try:
             cube_type = inst_to_cube[fname]
@@ -1297,16 +1298,11 @@ def link_cubes(vmf: VMF, info: conditions.MapInfo) -> None:
     coloriser_inst = resolve_inst('<ITEM_BEE2_CUBE_COLORISER>', silent=True)
     splat_inst = resolve_inst('<ITEM_PAINT_SPLAT>', silent=True)
 
-    for inst in vmf.by_class['func_instance']:
-        file = inst['file'].casefold()
-
-        if file in coloriser_inst:
+    for inst in inst_index.by_file([*coloriser_inst, *splat_inst]):
+        if inst['file'].casefold() in coloriser_inst:
             kind = coloriser_inst
-        elif file in splat_inst:
-            kind = splat_inst
         else:
-            # Not one we care about.
-            continue
+            kind = splat_inst
 
         pairs: list[CubePair] = []
 
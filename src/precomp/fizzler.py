@@ -12,7 +12,7 @@ from srctools import Property, NoKeyError, Vec, Matrix, Angle, logger
 
 import utils
 from precomp import (
-    instance_traits, tiling, instanceLocs,
+    instance_index, instance_traits, tiling, instanceLocs,
     texturing,
     connections,
     options,
@@ -1117,15 +1117,12 @@ def parse_map(vmf: VMF, info: conditions.MapInfo) -> None:
             brush.remove()
 
     # Check for fizzler output relays.
-    relay_file = instanceLocs.resolve('<ITEM_BEE2_FIZZLER_OUT_RELAY>', silent=True)
+    relay_file = instanceLocs.resolve_filter('<ITEM_BEE2_FIZZLER_OUT_RELAY>', silent=True)
     if not relay_file:
         # No relay item - deactivated most likely.
         return
 
-    for inst in vmf.by_class['func_instance']:
-        if inst['file'].casefold() not in relay_file:
-            continue
-
+    for inst in instance_index.get(vmf).by_item('ITEM_BEE2_FIZZLER_OUT_RELAY'):
         inst.remove()
 
         relay_item = connections.ITEMS[inst['targetname']]
@@ -1200,7 +1197,8 @@ def generate_fizzlers(vmf: VMF) -> None:
 
         if fizz_type.inst[FizzInst.BASE, is_static]:
             rng = rand.seed(b'fizz_base', fizz_name)
-            fizz.base_inst['file'] = base_file = rng.choice(fizz_type.inst[FizzInst.BASE, is_static])
+            base_file = rng.choice(fizz_type.inst[FizzInst.BASE, is_static])
+            instance_index.set_file(fizz.base_inst, base_file)
             conditions.ALL_INST.add(base_file.casefold())
 
         if not fizz.emitters:
@@ -13,7 +13,7 @@ import srctools.logger
 
 from typing import (
     Callable, Optional, Union,
-    List, Dict, Tuple, TypeVar, Iterable,
+    List, Dict, Tuple, TypeVar, Iterable, FrozenSet, NamedTuple,
 )
 import corridor
 import user_errors
@@ -38,6 +38,16 @@ _RE_SUBITEMS = re.compile(r'''
     \s*>\s*
 ''', re.VERBOSE)
 
+
+class ItemLookup(NamedTuple):
+    """A parsed <ITEM_ID:subitems> group. Subitems are None if not specified."""
+    id: str
+    subitems: Optional[Tuple[Union[int, str], ...]]
+
+# Each group in a lookup string is either an item, or a [special] name.
+Lookup = Union[ItemLookup, str]
+T = TypeVar('T')
+
 # A dict holding dicts of additional custom instance names - used to define
 # names in conditions or BEE2-added features.
 CUST_INST_FILES: Dict[str, Dict[str, str]] = defaultdict(dict)
@@ -243,6 +253,7 @@ def load_conf(items: Iterable[editoritems.Item]) -> None:
             if fname != '.' and not fname.startswith('instances/bee2_corridor/'):
                 ITEM_FOR_FILE[fname] = (item.id, ind)
 
+    _clear_caches()
     INST_SPECIAL.clear()
     INST_SPECIAL.update({
         key.casefold(): resolve(val_string, silent=True)
@@ -278,7 +289,7 @@ def set_chosen_corridor(
                 INST_SPECIAL[f'{prefix}{i}'] = []
             INSTANCE_FILES[item_id.casefold()][:count] = [''] * count
     # Clear since these were evaluated before.
-    _resolve.cache_clear()
+    _clear_caches()
 
 
 def resolve(path: str, silent: bool=False) -> List[str]:
@@ -304,16 +315,32 @@ def resolve(path: str, silent: bool=False) -> List[str]:
     If silent is True, no error messages will be output (for use with hardcoded
     names).
     """
-    if silent:
-        # Ignore messages < ERROR (warning and info)
-        log_level = LOGGER.level
-        LOGGER.setLevel(logging.ERROR)
-        try:
-            return _resolve(path)
-        finally:
-            LOGGER.setLevel(log_level)
-    else:
-        return _resolve(path)
+    return list(_silenced(_resolve, path) if silent else _resolve(path))
+
+
+def resolve_filter(path: str, silent: bool=False) -> FrozenSet[str]:
+    """Resolve an instance path into a set of filenames, for checking instances against.
+
+    This is cached, so it can be called repeatedly.
+    """
+    return _silenced(_resolve_filter, path) if silent else _resolve_filter(path)
+
+
+def _silenced(func: Callable[[str], T], path: str) -> T:
+    """Call the function, ignoring messages < ERROR (warning and info)."""
+    log_level = LOGGER.level
+    LOGGER.setLevel(logging.ERROR)
+    try:
+        return func(path)
+    finally:
+        LOGGER.setLevel(log_level)
+
+
+def _clear_caches() -> None:
+    """Clear cached lookups, after the instances they were resolved from changed."""
+    _resolve.cache_clear()
+    _resolve_filter.cache_clear()
+
 
 Default_T = TypeVar('Default_T')
 
@@ -325,7 +352,7 @@ def resolve_one(path, default: Union[str, Default_T]='', *, error: bool) -> Unio
     If none are found, the default is returned (which may be any value).
     If error is True, an exception will be raised instead.
     """
-    instances = resolve(path)
+    instances = _resolve(path)
     if not instances:
         if error:
             raise user_errors.UserError(user_errors.TOK_INSTLOC_EMPTY.format(path=path))
@@ -334,76 +361,91 @@ def resolve_one(path, default: Union[str, Default_T]='', *, error: bool) -> Unio
         if error:
             raise user_errors.UserError(
                 user_errors.TOK_INSTLOC_MULTIPLE.format(path=path),
-                textlist=instances,
+                textlist=list(instances),
             )
         LOGGER.warning('Path "{}" returned multiple instances', path)
     return instances[0]
 
 
+# Parsing doesn't depend on the loaded items, so this can be kept forever.
+@lru_cache(maxsize=None)
+def _parse_lookup(path: str) -> Optional[Tuple[Lookup, ...]]:
+    """Parse a lookup string into the groups it contains.
+
+    For raw paths this returns an empty tuple, for invalid ones None.
+    """
+    out: List[Lookup] = []
+    for group in _RE_DEFS.findall(path):
+        if group[0] == '<':
+            try:
+                item_id, subitems = _RE_SUBITEMS.fullmatch(group).groups()
+            except (ValueError, AttributeError):  # None.groups fail
+                LOGGER.warning('Could not parse instance lookup "{}"!', group)
+                return None
+            out.append(ItemLookup(
+                item_id.casefold(),
+                parse_subitems(subitems) if subitems else None,
+            ))
+        elif group[0] == '[':
+            out.append(group[1:-1].casefold())
+        else:
+            raise Exception(group)
+    return tuple(out)
+
+
 # Cache the return values, since they're constant.
-@lru_cache(maxsize=100)
-def _resolve(path: str) -> List[str]:
+@lru_cache(maxsize=500)
+def _resolve(path: str) -> Tuple[str, ...]:
     """Use a secondary function to allow caching values, while ignoring the
     'silent' parameter.
     """
-    groups = _RE_DEFS.findall(path)
-    if groups:
-        out = []
-        for group in groups:
-            if group[0] == '<':
-                try:
-                    item_id, subitems = _RE_SUBITEMS.fullmatch(group).groups()
-                except (ValueError, AttributeError):  # None.groups fail
-                    LOGGER.warning('Could not parse instance lookup "{}"!', group)
-                    return []
-
-                item_id = item_id.casefold()
-                try:
-                    item_inst = INSTANCE_FILES[item_id]
-                except KeyError:
-                    LOGGER.warning('"{}" is not a valid item!', item_id)
-                    return []
-                if subitems:
-                    out.extend(get_subitems(subitems, item_inst, item_id))
-                else:
-                    # It's just the <item_id>, return all the values
-                    out.extend(item_inst)
-
-            elif group[0] == '[':
-                special_name = group[1:-1].casefold()
-                try:
-                    out.extend(INST_SPECIAL[special_name])
-                except KeyError:
-                    LOGGER.warning('"{}" is not a valid instance category!', special_name)
-                    continue
+    groups = _parse_lookup(path)
+    if groups is None:
+        return ()
+    if not groups:
+        return (path.casefold(), )
+
+    out: List[str] = []
+    for group in groups:
+        if isinstance(group, ItemLookup):
+            try:
+                item_inst = INSTANCE_FILES[group.id]
+            except KeyError:
+                LOGGER.warning('"{}" is not a valid item!', group.id)
+                return ()
+            if group.subitems is not None:
+                out.extend(_lookup_subitems(group.subitems, item_inst, group.id))
             else:
-                raise Exception(group)
-        # Remove "" from the output.
-        return list(filter(None, out))
-    else:
-        return [path.casefold()]
+                # It's just the <item_id>, return all the values
+                out.extend(item_inst)
+        else:
+            try:
+                out.extend(INST_SPECIAL[group])
+            except KeyError:
+                LOGGER.warning('"{}" is not a valid instance category!', group)
+                continue
+    # Remove "" from the output.
+    return tuple(filter(None, out))
 
 
-def get_subitems(comma_list: str, item_inst: List[str], item_id: str) -> List[str]:
-    """Pick out the subitems from a list."""
-    output: List[Union[str, int]] = []
+@lru_cache(maxsize=None)
+def _resolve_filter(path: str) -> FrozenSet[str]:
+    """Cache the set form of a lookup."""
+    return frozenset(_resolve(path))
+
+
+def parse_subitems(comma_list: str) -> Tuple[Union[int, str], ...]:
+    """Parse the subitems portion of a lookup.
+
+    Custom instances are returned as their name, without the bee2_ prefix.
+    """
+    output: List[Union[int, str]] = []
     for val in comma_list.split(','):
         folded_value = val.strip().casefold()
         if folded_value.startswith('bee2_'):
             # A custom value...
-            bee_inst = CUST_INST_FILES[item_id]
-            try:
-                output.append(bee_inst[folded_value[5:]])
-                continue
-            except KeyError:
-                LOGGER.warning(
-                    'Invalid custom instance name - "{}" for '
-                    '<{}> (Valid: {!r})',
-                    folded_value[5:],
-                    item_id,
-                    bee_inst,
-                )
-                continue
+            output.append(folded_value[5:])
+            continue
 
         ind = SUBITEMS.get(folded_value, None)
 
@@ -427,13 +469,35 @@ def get_subitems(comma_list: str, item_inst: List[str], item_id: str) -> List[st
             output.extend(ind)
         else:
             output.append(ind)
+    return tuple(output)
+
+
+def get_subitems(comma_list: str, item_inst: List[str], item_id: str) -> List[str]:
+    """Pick out the subitems from a list."""
+    return _lookup_subitems(parse_subitems(comma_list), item_inst, item_id)
+
 
-    # Convert to instance lists
+def _lookup_subitems(
+    subitems: Iterable[Union[int, str]],
+    item_inst: List[str],
+    item_id: str,
+) -> List[str]:
+    """Convert parsed subitems to the instances they refer to."""
     inst_out = []
-    for inst in output:
-        # bee_ instance, already evaluated
+    for inst in subitems:
         if isinstance(inst, str):
-            inst_out.append(inst)
+            # A custom bee2_ instance.
+            bee_inst = CUST_INST_FILES[item_id]
+            try:
+                inst_out.append(bee_inst[inst])
+            except KeyError:
+                LOGGER.warning(
+                    'Invalid custom instance name - "{}" for '
+                    '<{}> (Valid: {!r})',
+                    inst,
+                    item_id,
+                    bee_inst,
+                )
             continue
 
         # Only use if it's actually in range
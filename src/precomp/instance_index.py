@@ -0,0 +1,235 @@
+"""An index of the instances in the map, by filename, item ID and origin.
+
+Most passes only care about a few instances, so instead of looping over every
+instance in the map to find them they can query this index.
+Instances added to or removed from the map are picked up by comparing against
+VMF.by_class. srctools can't tell us when keyvalues change though, so instances must
+be re-filed or moved with set_file() and set_origin(). Results are rechecked when
+returned, so an instance changed directly is never returned for its old value. It
+can't be found under its new value though, so in dev mode check() is run after each
+condition, raising if any instances were changed directly.
+"""
+from __future__ import annotations
+from typing import Callable, Dict, Iterable, List, MutableMapping, Optional, Tuple, TypeVar, Union
+from weakref import WeakKeyDictionary
+import weakref
+
+from srctools import Entity, VMF, Vec
+import srctools.logger
+
+from precomp.instanceLocs import ITEM_FOR_FILE
+
+
+__all__ = ['InstanceIndex', 'get', 'set_file', 'set_origin', 'check']
+LOGGER = srctools.logger.get_logger(__name__)
+GridPos = Tuple[int, int, int]
+KeyT = TypeVar('KeyT')
+# Weak dicts are used as ordered sets, so results are consistent. Entities reference
+# their map, so strong references here would keep it alive.
+Bucket = MutableMapping[Entity, None]
+
+
+def _grid_pos(origin: Union[str, Vec]) -> GridPos:
+    """Round an origin to the nearest unit, for use as a key."""
+    if isinstance(origin, str):
+        origin = Vec.from_str(origin)
+    return round(origin.x), round(origin.y), round(origin.z)
+
+
+def _item_id(filename: str) -> Optional[str]:
+    """Return the casefolded item ID for an instance filename."""
+    try:
+        item_id, _ = ITEM_FOR_FILE[filename]
+    except KeyError:
+        return None
+    return item_id.casefold()
+
+
+def _bucket_add(buckets: Dict[KeyT, Bucket], key: KeyT, inst: Entity) -> None:
+    """Add an instance to the bucket for this key."""
+    try:
+        bucket = buckets[key]
+    except KeyError:
+        bucket = buckets[key] = WeakKeyDictionary()
+    bucket[inst] = None
+
+
+class InstanceIndex:
+    """Tracks the instances in a map."""
+    def __init__(self, vmf: VMF) -> None:
+        self._vmf = weakref.ref(vmf)
+        # The known instances, and their casefolded filename.
+        self._file_of: MutableMapping[Entity, str] = WeakKeyDictionary()
+        self._by_file: Dict[str, Bucket] = {}
+        self._by_item: Dict[str, Bucket] = {}
+        # Positions are only needed for a few lookups, and almost every instance has
+        # its own, so these are only built when first queried.
+        self._pos_of: Optional[MutableMapping[Entity, GridPos]] = None
+        self._by_pos: Dict[GridPos, Bucket] = {}
+        # The number of instances examined, for benchmarking.
+        self.examined = 0
+
+    @property
+    def vmf(self) -> VMF:
+        """The map this indexes."""
+        vmf = self._vmf()
+        if vmf is None:
+            raise ReferenceError('The map was freed!')
+        return vmf
+
+    def _sync(self) -> None:
+        """Add and remove instances to match the map."""
+        current = self.vmf.by_class['func_instance']
+        known = set(self._file_of.keys())
+        if len(current) == len(known) and current == known:
+            return
+        for inst in known - current:
+            self._discard(inst)
+        # Add in ID order, so results don't depend on set ordering.
+        for inst in sorted(current - known, key=lambda ent: ent.id):
+            self._add(inst)
+
+    def _add(self, inst: Entity) -> None:
+        """Add an instance to the index."""
+        self.examined += 1
+        filename = self._file_of[inst] = inst['file'].casefold()
+        _bucket_add(self._by_file, filename, inst)
+        item_id = _item_id(filename)
+        if item_id is not None:
+            _bucket_add(self._by_item, item_id, inst)
+        if self._pos_of is not None:
+            self._add_pos(inst)
+
+    def _add_pos(self, inst: Entity) -> None:
+        """Add an instance to the position index."""
+        assert self._pos_of is not None
+        pos = self._pos_of[inst] = _grid_pos(inst['origin'])
+        _bucket_add(self._by_pos, pos, inst)
+
+    def _discard(self, inst: Entity) -> None:
+        """Remove an instance from the index."""
+        try:
+            filename = self._file_of.pop(inst)
+        except KeyError:
+            return
+        self._by_file[filename].pop(inst, None)
+        item_id = _item_id(filename)
+        if item_id is not None:
+            self._by_item[item_id].pop(inst, None)
+        if self._pos_of is not None:
+            self._by_pos[self._pos_of.pop(inst)].pop(inst, None)
+
+    def update(self, inst: Entity) -> None:
+        """Re-index an instance after its keyvalues were changed."""
+        self._discard(inst)
+        if inst in self.vmf.by_class['func_instance']:
+            self._add(inst)
+
+    def _check(self, bucket: Optional[Bucket], valid: Callable[[Entity], bool]) -> None:
+        """Re-index any instances in this bucket which were changed directly."""
+        if not bucket:
+            return
+        for inst in list(bucket.keys()):
+            if not valid(inst):
+                LOGGER.debug('Instance "{}" was modified directly!', inst['targetname'])
+                self.update(inst)
+
+    def by_file(self, filenames: Iterable[str]) -> List[Entity]:
+        """Return all instances using one of these casefolded filenames."""
+        self._sync()
+        filenames = list(dict.fromkeys(filenames))
+        for filename in filenames:
+            self._check(
+                self._by_file.get(filename),
+                lambda inst: inst['file'].casefold() == filename,
+            )
+        return [
+            inst
+            for filename in filenames
+            for inst in self._by_file.get(filename, {}).keys()
+        ]
+
+    def by_item(self, item_id: str) -> List[Entity]:
+        """Return all instances belonging to this item ID."""
+        self._sync()
+        item_id = item_id.casefold()
+        self._check(
+            self._by_item.get(item_id),
+            lambda inst: _item_id(inst['file'].casefold()) == item_id,
+        )
+        return list(self._by_item.get(item_id, {}).keys())
+
+    def at(self, origin: Vec) -> List[Entity]:
+        """Return all instances at this origin, rounded to the nearest unit."""
+        self._sync()
+        if self._pos_of is None:
+            self._pos_of = WeakKeyDictionary()
+            for inst in list(self._file_of.keys()):
+                self._add_pos(inst)
+        pos = _grid_pos(origin)
+        self._check(
+            self._by_pos.get(pos),
+            lambda inst: _grid_pos(inst['origin']) == pos,
+        )
+        return list(self._by_pos.get(pos, {}).keys())
+
+    def check(self, source: str) -> None:
+        """Raise if any instances were re-filed or moved directly, so the index is wrong."""
+        current = self.vmf.by_class['func_instance']
+        changed = [
+            inst
+            for inst, filename in list(self._file_of.items())
+            if inst in current and (
+                inst['file'].casefold() != filename
+                or (self._pos_of is not None and _grid_pos(inst['origin']) != self._pos_of[inst])
+            )
+        ]
+        if changed:
+            raise ValueError(
+                f'{source} changed instances without using '
+                f'instance_index.set_file() or set_origin():\n' + '\n'.join([
+                    f' - "{inst["targetname"]}": {inst["file"]} @ {inst["origin"]}'
+                    for inst in changed
+                ])
+            )
+
+
+_INDEXES: MutableMapping[VMF, InstanceIndex] = WeakKeyDictionary()
+
+
+def get(vmf: VMF) -> InstanceIndex:
+    """Return the index for this map."""
+    try:
+        return _INDEXES[vmf]
+    except KeyError:
+        index = _INDEXES[vmf] = InstanceIndex(vmf)
+        return index
+
+
+def set_file(inst: Entity, filename: str) -> None:
+    """Change the filename of an instance, updating the index."""
+    inst['file'] = filename
+    try:
+        index = _INDEXES[inst.map]
+    except KeyError:
+        return  # Not built yet, it'll find the new value then.
+    index.update(inst)
+
+
+def set_origin(inst: Entity, origin: Union[str, Vec]) -> None:
+    """Move an instance, updating the index."""
+    inst['origin'] = origin
+    try:
+        index = _INDEXES[inst.map]
+    except KeyError:
+        return
+    index.update(inst)
+
+
+def check(vmf: VMF, source: str) -> None:
+    """If this map is indexed, raise if any instances were re-filed or moved directly."""
+    try:
+        index = _INDEXES[vmf]
+    except KeyError:
+        return
+    index.check(source)
@@ -10,6 +10,7 @@ import attrs
 
 from precomp import connections
 from precomp.connections import Item
+from union_find import UnionFind
 
 __all__ = ['Node', 'chain']
 ConfT = TypeVar('ConfT')
@@ -64,6 +65,8 @@ def chain(
         for node in node_list
     }
 
+    node_sets: UnionFind[Node[ConfT]] = UnionFind(nodes.values())
+
     # Now compute the links, and check for double-links.
     for node in nodes.values():
         for conn in list(node.item.outputs):
@@ -80,32 +83,23 @@ def chain(
                 raise ValueError(f'Item "{next_node.item.name}" links to multiple input items!')
             node.next = next_node
             next_node.prev = node
+            node_sets.union(node, next_node)
 
-    todo = set(nodes.values())
-    while todo:
-        # Grab a random node, then go backwards until we find the start.
-        # If we return back to this node, it's an infinite loop.
-        pop_node = todo.pop()
-
-        if pop_node.prev is None:
-            start_node = pop_node
+    for group in node_sets.groups():
+        # Each node has at most one input, so there's only one start.
+        # If none, it's a loop.
+        for start_node in group:
+            if start_node.prev is None:
+                break
         else:
-            start_node = pop_node.prev
-            while True:
-                if start_node.prev is None:
-                    break
-                # We've looped back.
-                elif start_node is pop_node:
-                    if not allow_loop:
-                        raise ValueError('Loop in linked items!')
-                    break
-                start_node = start_node.prev
+            if not allow_loop:
+                raise ValueError('Loop in linked items!')
+            start_node = group[0]
 
         node_list = []
         node = start_node
         while True:
             node_list.append(node)
-            todo.discard(node)
             if node.next is None:
                 break
             node = node.next
@@ -21,6 +21,7 @@ from srctools.vmf import EntityFixup, Entity, EntityGroup, Solid, Side, VMF, UVA
 from srctools.dmx import Element as DMElement
 import srctools.logger
 
+import template_bundle
 import user_errors
 from .texturing import Portalable, GenCat, TileSize
 from .tiling import TileType
@@ -36,6 +37,8 @@ LOGGER = srctools.logger.get_logger(__name__, alias='template')
 # _SCALE_TEMP is converted from Template. The frozenset is the visgroups.
 _TEMPLATES: dict[str, Union[UnparsedTemplate, Template]] = {}
 _SCALE_TEMP: dict[tuple[str, frozenset[str]], ScalingTemplate] = {}
+# If present, the pre-parsed templates the app exported.
+_BUNDLE: Optional[template_bundle.BundleReader] = None
 
 
 class InvalidTemplateName(LookupError):
@@ -441,8 +444,22 @@ def parse_temp_name(name) -> tuple[str, set[str]]:
         return name.casefold(), set()
 
 
-async def load_templates(path: str) -> None:
-    """Load in the template file, used for import_template()."""
+async def load_templates(path: str, bundle_path: Optional[str] = None) -> None:
+    """Load in the template file, used for import_template().
+
+    If provided, the bundle holds pre-parsed templates, which are used in
+    preference to reading the original packages.
+    """
+    global _BUNDLE
+    if bundle_path is not None:
+        try:
+            _BUNDLE = template_bundle.BundleReader(bundle_path)
+        except (OSError, ValueError) as exc:
+            LOGGER.warning('Could not load template bundle "{}": {}', bundle_path, exc)
+            _BUNDLE = None
+        else:
+            LOGGER.info('Loaded template bundle with {} templates.', len(_BUNDLE))
+
     with open(path, 'rb') as f:
         dmx, fmt_name, fmt_ver = await trio.to_thread.run_sync(lambda: DMElement.parse(f, unicode=True))
     if fmt_name != 'bee_templates' or fmt_ver not in [1]:
@@ -455,8 +472,11 @@ async def load_templates(path: str) -> None:
         )
 
 
-def _parse_template(loc: UnparsedTemplate) -> Template:
-    """Parse a template VMF."""
+def _read_template_vmf(loc: UnparsedTemplate) -> VMF:
+    """Read the VMF for a template, from the bundle or the original package."""
+    if _BUNDLE is not None and loc.id in _BUNDLE:
+        return _BUNDLE.read_vmf(loc.id)
+
     filesys: FileSystem
     if os.path.isdir(loc.pak_path):
         filesys = RawFileSystem(loc.pak_path)
@@ -471,8 +491,12 @@ def _parse_template(loc: UnparsedTemplate) -> Template:
 
     with filesys[loc.path].open_str() as f:
         props = Property.parse(f, f'{loc.pak_path}:{loc.path}')
-    vmf = srctools.VMF.parse(props, preserve_ids=True)
-    del props, filesys, f  # Discard all this data.
+    return srctools.VMF.parse(props, preserve_ids=True)
+
+
+def _parse_template(loc: UnparsedTemplate) -> Template:
+    """Parse a template VMF."""
+    vmf = _read_template_vmf(loc)
 
     # visgroup -> list of brushes/overlays
     detail_ents: dict[str, list[Solid]] = defaultdict(list)
@@ -0,0 +1,226 @@
+"""A streaming writer for the styled map, producing the same text as VMF.export().
+
+Styled maps contain tens of thousands of brushes, so instead of writing each
+line to the file individually this formats brushes directly into chunks,
+and caches the plane and UV strings which repeat across tiles.
+"""
+from typing import IO, Dict, List, Tuple
+import operator
+import time
+
+from srctools import bool_as_int
+from srctools.vmf import VMF, Entity, Side, Solid, UVAxis
+import srctools.logger
+
+
+__all__ = ['VMFWriter', 'export']
+LOGGER = srctools.logger.get_logger(__name__)
+# Flush after roughly this many characters.
+CHUNK_SIZE = 1 << 20
+
+
+class VMFWriter:
+    """Buffers text for a file, writing it out in large chunks.
+
+    This is file-like, so the export() methods on VMF objects can write into it.
+    """
+    def __init__(self, file: IO[str], chunk_size: int = CHUNK_SIZE) -> None:
+        self.file = file
+        self.chunk_size = chunk_size
+        # The number of characters written to the file.
+        self.written = 0
+        self._parts: List[str] = []
+        self._size = 0
+        self._plane_cache: Dict[Tuple[float, ...], str] = {}
+        self._uv_cache: Dict[Tuple[float, float, float, float, float], str] = {}
+
+    def write(self, text: str) -> None:
+        """Add text to the buffer, flushing if required."""
+        self._parts.append(text)
+        self._size += len(text)
+        if self._size >= self.chunk_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write out all buffered text."""
+        if self._parts:
+            self.file.write(''.join(self._parts))
+            self.written += self._size
+            self._parts.clear()
+            self._size = 0
+
+    def _plane_str(self, side: Side) -> str:
+        """Format the plane of a side, reusing identical planes."""
+        [a, b, c] = side.planes
+        key = (a.x, a.y, a.z, b.x, b.y, b.z, c.x, c.y, c.z)
+        try:
+            return self._plane_cache[key]
+        except KeyError:
+            res = self._plane_cache[key] = f'({a}) ({b}) ({c})'
+            return res
+
+    def _uv_str(self, uv: UVAxis) -> str:
+        """Format a UV axis, reusing identical values."""
+        key = (uv.x, uv.y, uv.z, uv.offset, uv.scale)
+        try:
+            return self._uv_cache[key]
+        except KeyError:
+            res = self._uv_cache[key] = str(uv)
+            return res
+
+    def write_side(self, side: Side, ind: str) -> None:
+        """Write a brush side."""
+        if side.disp_power > 0:
+            side.export(self, ind)
+            return
+        self.write(
+            f'{ind}side\n'
+            f'{ind}{{\n'
+            f'{ind}\t"id" "{side.id}"\n'
+            f'{ind}\t"plane" "{self._plane_str(side)}"\n'
+            f'{ind}\t"material" "{side.mat}"\n'
+            f'{ind}\t"uaxis" "{self._uv_str(side.uaxis)}"\n'
+            f'{ind}\t"vaxis" "{self._uv_str(side.vaxis)}"\n'
+            f'{ind}\t"rotation" "{side.ham_rot:g}"\n'
+            f'{ind}\t"lightmapscale" "{side.lightmap}"\n'
+            f'{ind}\t"smoothing_groups" "{side.smooth}"\n'
+            f'{ind}}}\n'
+        )
+
+    def write_solid(self, solid: Solid, ind: str, include_groups: bool = True) -> None:
+        """Write a brush, matching Solid.export()."""
+        if solid.hidden:
+            self.write(f'{ind}hidden\n{ind}{{\n')
+            ind += '\t'
+        self.write(f'{ind}solid\n{ind}{{\n{ind}\t"id" "{solid.id}"\n')
+        side_ind = ind + '\t'
+        for side in solid.sides:
+            self.write_side(side, side_ind)
+        self.write(f'{ind}\teditor\n{ind}\t{{\n{ind}\t\t"color" "{solid.editor_color}"\n')
+        if include_groups:
+            if solid.group_id is not None:
+                self.write(f'{ind}\t\t"groupid" "{solid.group_id}"\n')
+            for group in solid.visgroup_ids:
+                self.write(f'{ind}\t\t"visgroupid" "{group}"\n')
+        self.write(
+            f'{ind}\t\t"visgroupshown" "{bool_as_int(solid.vis_shown)}"\n'
+            f'{ind}\t\t"visgroupautoshown" "{bool_as_int(solid.vis_auto_shown)}"\n'
+        )
+        if solid.cordon_solid is not None:
+            self.write(f'{ind}\t\t"cordonsolid" "{solid.cordon_solid}"\n')
+        self.write(f'{ind}\t}}\n{ind}}}\n')
+        if solid.hidden:
+            self.write(ind[:-1] + '}\n')
+
+    def write_entity(self, ent: Entity, is_worldspawn: bool = False) -> None:
+        """Write an entity, matching Entity.export()."""
+        ind = ''
+        if ent.hidden:
+            self.write('hidden\n{\n')
+            ind = '\t'
+
+        self.write(f'{ind}{"world" if is_worldspawn else "entity"}\n{ind}{{\n{ind}\t"id" "{ent.id}"\n')
+        self.write(''.join([
+            f'{ind}\t"{key}" "{value}"\n'
+            for key, value in sorted(ent.items(), key=operator.itemgetter(0))
+        ]))
+        ent.fixup.export(self, ind)
+
+        if ent.is_brush():
+            for solid in ent.solids:
+                self.write_solid(solid, ind + '\t', include_groups=not is_worldspawn)
+        if ent.outputs:
+            self.write(f'{ind}\tconnections\n{ind}\t{{\n')
+            for out in ent.outputs:
+                out.export(self, ind=ind + '\t\t')
+            self.write(ind + '\t}\n')
+
+        if is_worldspawn:
+            for group in ent.map.groups.values():
+                group.export(self, ind + '\t')
+
+        self.write(f'{ind}\teditor\n{ind}\t{{\n{ind}\t\t"color" "{ent.editor_color}"\n')
+        if not is_worldspawn:
+            for group_id in ent.groups:
+                self.write(f'{ind}\t\t"groupid" "{group_id}"\n')
+            for vis_id in ent.visgroup_ids:
+                self.write(f'{ind}\t\t"visgroupid" "{vis_id}"\n')
+            self.write(
+                f'{ind}\t\t"visgroupshown" "{bool_as_int(ent.vis_shown)}"\n'
+                f'{ind}\t\t"visgroupautoshown" "{bool_as_int(ent.vis_auto_shown)}"\n'
+                f'{ind}\t\t"logicalpos" "{ent.logical_pos}"\n'
+            )
+        if ent.comments:
+            self.write(f'{ind}\t\t"comments" "{ent.comments}"\n')
+        self.write(f'{ind}\t}}\n{ind}}}\n')
+        if ent.hidden:
+            self.write('}\n')
+
+    def write_vmf(self, vmf: VMF, inc_version: bool = True) -> None:
+        """Write an entire map, matching VMF.export()."""
+        if inc_version:
+            vmf.map_ver += 1
+
+        self.write(
+            'versioninfo\n{\n'
+            f'\t"editorversion" "{vmf.hammer_ver}"\n'
+            f'\t"editorbuild" "{vmf.hammer_build}"\n'
+            f'\t"mapversion" "{vmf.map_ver}"\n'
+            f'\t"formatversion" "{vmf.format_ver}"\n'
+            f'\t"prefab" "{bool_as_int(vmf.is_prefab)}"\n'
+            '}\n'
+            'visgroups\n{\n'
+        )
+        for vis in vmf.vis_tree:
+            vis.export(self, ind='\t')
+        self.write(
+            '}\n'
+            'viewsettings\n{\n'
+            f'\t"bSnapToGrid" "{bool_as_int(vmf.snap_grid)}"\n'
+            f'\t"bShowGrid" "{bool_as_int(vmf.show_grid)}"\n'
+            f'\t"bShowLogicalGrid" "{bool_as_int(vmf.show_logic_grid)}"\n'
+            f'\t"nGridSpacing" "{vmf.grid_spacing}"\n'
+            f'\t"bShow3DGrid" "{bool_as_int(vmf.show_3d_grid)}"\n'
+            '}\n'
+        )
+
+        # Worldspawn always matches the global version, and must be named correctly.
+        vmf.spawn['mapversion'] = str(vmf.map_ver)
+        vmf.spawn['classname'] = 'worldspawn'
+        self.write_entity(vmf.spawn, is_worldspawn=True)
+        del vmf.spawn['mapversion']
+
+        for ent in vmf.entities:
+            self.write_entity(ent)
+
+        if not vmf.cameras:
+            vmf.active_cam = -1
+        self.write(f'cameras\n{{\n\t"activecamera" "{vmf.active_cam}"\n')
+        for cam in vmf.cameras:
+            cam.export(self, '\t')
+        self.write('}\ncordons\n{\n')
+        if vmf.cordons:
+            self.write(f'\t"active" "{bool_as_int(vmf.cordon_enabled)}"\n')
+            for cord in vmf.cordons:
+                cord.export(self, '\t')
+        else:
+            self.write('\t"active" "0"\n')
+        self.write('}\n')
+
+        if vmf.quickhide_count > 0:
+            self.write(f'quickhide\n{{\n\t"count" "{vmf.quickhide_count}"\n}}\n')
+        self.flush()
+
+
+def export(vmf: VMF, file: IO[str], inc_version: bool = True) -> int:
+    """Write the map to the file, logging the throughput. The number of characters written is returned."""
+    start = time.perf_counter()
+    writer = VMFWriter(file)
+    writer.write_vmf(vmf, inc_version)
+    duration = time.perf_counter() - start
+    LOGGER.info(
+        'Wrote {:,} characters in {:.2f}s ({:,.0f} characters/s)',
+        writer.written, duration,
+        writer.written / duration if duration > 0 else 0,
+    )
+    return writer.written
@@ -0,0 +1,264 @@
+"""A single binary file holding every template, pre-parsed by the app.
+
+The compiler used to locate each template's package and parse the VMF on first
+use, which meant opening package zips on every compile. Instead the app strips
+each template down to the brushes and entities the compiler cares about, and
+stores those as binary DMX inside one bundle. The bundle starts with an index,
+so the compiler can memory-map it and only decode templates when they're used.
+
+Layout:
+* The magic bytes, then a version and template count (``<II``).
+* For each template, the length-prefixed (``<H``) UTF8 ID, followed by the
+  offset and length of its payload (``<QI``).
+* The payloads, each a binary DMX tree.
+"""
+from __future__ import annotations
+from typing import IO, Dict, Iterable, Iterator, List, Tuple
+from typing_extensions import Final
+
+import io
+import mmap
+import struct
+
+from srctools import Property, Vec
+from srctools.dmx import Attribute, Element, ValueType, Vec3
+from srctools.vmf import VMF, Entity, Side, Solid, UVAxis, VisGroup
+
+
+MAGIC: Final = b'BEE2TMPL'
+VERSION: Final = 1
+DMX_FMT_NAME: Final = 'bee_template'
+DMX_FMT_VER: Final = 1
+ST_HEADER = struct.Struct('<II')
+ST_NAME_LEN = struct.Struct('<H')
+ST_LOCATION = struct.Struct('<QI')
+
+# Entities the compiler reads out of templates. Everything else is discarded.
+TEMPLATE_CLASSES: Final = frozenset({
+    'func_detail',
+    'info_overlay',
+    'bee2_template_conf',
+    'bee2_template_colorpicker',
+    'bee2_template_voxelsetter',
+    'bee2_template_tilesetter',
+    'bee2_collision_bbox',
+})
+
+
+def _int_array(name: str, values: Iterable[int]) -> Attribute[int]:
+    """Build an integer array attribute."""
+    attr = Attribute.array(name, ValueType.INTEGER)
+    attr.extend(values)
+    return attr
+
+
+def _str_array(name: str, values: Iterable[str]) -> Attribute[str]:
+    """Build a string array attribute."""
+    attr = Attribute.array(name, ValueType.STR)
+    attr.extend(values)
+    return attr
+
+
+def _elem_array(name: str, values: Iterable[Element]) -> Attribute[Element]:
+    """Build an element array attribute."""
+    attr = Attribute.array(name, ValueType.ELEMENT)
+    attr.extend(values)
+    return attr
+
+
+def _side_to_elem(side: Side) -> Element:
+    """Convert a brush side."""
+    elem = Element('side', 'DMESide')
+    if side.is_disp:
+        # Displacements are rare in templates, just keep the whole keyvalues block.
+        buf = io.StringIO()
+        side.export(buf)
+        [prop] = Property.parse(buf.getvalue())
+        elem['kv1'] = Element.from_kv1(prop)
+        return elem
+    elem['id'] = side.id
+    planes = elem['planes'] = Attribute.array('planes', ValueType.VEC3)
+    planes.extend(Vec3(*pos) for pos in side.planes)
+    elem['material'] = side.mat
+    elem['uaxis'] = str(side.uaxis)
+    elem['vaxis'] = str(side.vaxis)
+    elem['rotation'] = float(side.ham_rot)
+    elem['lightmap'] = side.lightmap
+    elem['smoothing'] = side.smooth
+    return elem
+
+
+def _solid_to_elem(solid: Solid) -> Element:
+    """Convert a brush."""
+    elem = Element('solid', 'DMESolid')
+    elem['id'] = solid.id
+    elem['visgroups'] = _int_array('visgroups', solid.visgroup_ids)
+    elem['sides'] = _elem_array('sides', map(_side_to_elem, solid.sides))
+    return elem
+
+
+def _visgroup_to_elem(vis: VisGroup) -> Element:
+    """Convert a visgroup, and any children."""
+    elem = Element(vis.name, 'DMEVisGroup')
+    elem['id'] = vis.id
+    elem['children'] = _elem_array('children', map(_visgroup_to_elem, vis.child_groups))
+    return elem
+
+
+def vmf_to_element(temp_id: str, vmf: VMF) -> Element:
+    """Strip a template VMF down to the parts the compiler uses."""
+    root = Element(temp_id.upper(), 'DMETemplate')
+    root['visgroups'] = _elem_array('visgroups', map(_visgroup_to_elem, vmf.vis_tree))
+    root['world'] = _elem_array('world', map(_solid_to_elem, vmf.brushes))
+    entities = root['entities'] = Attribute.array('entities', ValueType.ELEMENT)
+    for ent in vmf.entities:
+        if ent['classname'].casefold() not in TEMPLATE_CLASSES:
+            continue
+        ent_elem = Element(ent['classname'], 'DMEEntity')
+        ent_elem['id'] = ent.id
+        keys, values = zip(*ent.items())
+        ent_elem['keys'] = _str_array('keys', keys)
+        ent_elem['values'] = _str_array('values', values)
+        ent_elem['visgroups'] = _int_array('visgroups', ent.visgroup_ids)
+        ent_elem['solids'] = _elem_array('solids', map(_solid_to_elem, ent.solids))
+        entities.append(ent_elem)
+    return root
+
+
+def _elem_to_side(vmf: VMF, elem: Element) -> Side:
+    """Rebuild a brush side."""
+    if 'kv1' in elem:
+        return Side.parse(vmf, elem['kv1'].val_elem.to_kv1())
+    return Side(
+        vmf,
+        [Vec(pos) for pos in elem['planes'].iter_vec3()],
+        elem['id'].val_int,
+        elem['lightmap'].val_int,
+        elem['smoothing'].val_int,
+        elem['material'].val_str,
+        elem['rotation'].val_float,
+        UVAxis.parse(elem['uaxis'].val_str),
+        UVAxis.parse(elem['vaxis'].val_str),
+    )
+
+
+def _elem_to_solid(vmf: VMF, elem: Element) -> Solid:
+    """Rebuild a brush."""
+    return Solid(
+        vmf,
+        elem['id'].val_int,
+        [_elem_to_side(vmf, side) for side in elem['sides'].iter_elem()],
+        visgroup_ids=elem['visgroups'].iter_int(),
+    )
+
+
+def _elem_to_visgroup(vmf: VMF, elem: Element) -> VisGroup:
+    """Rebuild a visgroup and its children."""
+    return VisGroup(
+        vmf, elem.name, elem['id'].val_int,
+        child_groups=[
+            _elem_to_visgroup(vmf, child)
+            for child in elem['children'].iter_elem()
+        ],
+    )
+
+
+def element_to_vmf(root: Element) -> VMF:
+    """Rebuild the VMF produced by vmf_to_element(), preserving IDs."""
+    vmf = VMF(preserve_ids=True)
+    for vis_elem in root['visgroups'].iter_elem():
+        vmf.vis_tree.append(_elem_to_visgroup(vmf, vis_elem))
+    for solid_elem in root['world'].iter_elem():
+        vmf.add_brush(_elem_to_solid(vmf, solid_elem))
+    for ent_elem in root['entities'].iter_elem():
+        vmf.add_ent(Entity(
+            vmf,
+            keys=dict(zip(ent_elem['keys'].iter_str(), ent_elem['values'].iter_str())),
+            ent_id=ent_elem['id'].val_int,
+            solids=[
+                _elem_to_solid(vmf, solid_elem)
+                for solid_elem in ent_elem['solids'].iter_elem()
+            ],
+            vis_ids=ent_elem['visgroups'].iter_int(),
+        ))
+    return vmf
+
+
+def write_bundle(file: IO[bytes], templates: Iterable[Tuple[str, Element]]) -> None:
+    """Write out a bundle, given pairs of template IDs and their elements."""
+    payloads: List[Tuple[bytes, bytes]] = []
+    for temp_id, elem in templates:
+        buf = io.BytesIO()
+        elem.export_binary(buf, fmt_name=DMX_FMT_NAME, fmt_ver=DMX_FMT_VER, unicode='format')
+        payloads.append((temp_id.casefold().encode('utf8'), buf.getvalue()))
+
+    index_size = sum(
+        ST_NAME_LEN.size + len(name) + ST_LOCATION.size
+        for name, _ in payloads
+    )
+    offset = len(MAGIC) + ST_HEADER.size + index_size
+
+    file.write(MAGIC)
+    file.write(ST_HEADER.pack(VERSION, len(payloads)))
+    for name, data in payloads:
+        file.write(ST_NAME_LEN.pack(len(name)))
+        file.write(name)
+        file.write(ST_LOCATION.pack(offset, len(data)))
+        offset += len(data)
+    for _, data in payloads:
+        file.write(data)
+
+
+class BundleReader:
+    """Lazily decodes templates from a memory-mapped bundle."""
+    _index: Dict[str, Tuple[int, int]]
+
+    def __init__(self, path: str) -> None:
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._index = {}
+        try:
+            self._read_index()
+        except Exception:
+            self.close()
+            raise
+
+    def _read_index(self) -> None:
+        """Parse the index at the start of the file."""
+        data = self._map
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError('Not a template bundle!')
+        pos = len(MAGIC)
+        version, count = ST_HEADER.unpack_from(data, pos)
+        if version != VERSION:
+            raise ValueError(f'Unknown template bundle version {version}!')
+        pos += ST_HEADER.size
+        for _ in range(count):
+            [name_len] = ST_NAME_LEN.unpack_from(data, pos)
+            pos += ST_NAME_LEN.size
+            name = data[pos:pos + name_len].decode('utf8')
+            pos += name_len
+            self._index[name] = ST_LOCATION.unpack_from(data, pos)
+            pos += ST_LOCATION.size
+
+    def __contains__(self, temp_id: str) -> bool:
+        return temp_id.casefold() in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def read_vmf(self, temp_id: str) -> VMF:
+        """Decode the specified template."""
+        offset, length = self._index[temp_id.casefold()]
+        buf = io.BytesIO(self._map[offset:offset + length])
+        root, fmt_name, fmt_ver = Element.parse(buf, unicode=True)
+        if fmt_name != DMX_FMT_NAME or fmt_ver != DMX_FMT_VER:
+            raise ValueError(f'Invalid template format "{fmt_name}" v{fmt_ver}')
+        return element_to_vmf(root)
+
+    def close(self) -> None:
+        """Release the memory map."""
+        self._map.close()
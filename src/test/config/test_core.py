@@ -1,10 +1,17 @@
 """Test the main config logic."""
+from uuid import UUID
 import io
 import uuid
 
 from srctools import Property, bool_as_int
 import pytest
+import trio
 
+from config import (
+    compile_pane, corridors, gen_opts, last_sel, palette,
+    signage, stylevar, widgets, windows,
+)
+from corridor import Direction, GameMode, Orient
 import config
 
 
@@ -140,3 +147,160 @@ def test_export_dmx_regress(value: str, triple: str, file_regression) -> None:
         buf.getvalue().decode().replace('\r\n', '\n'),
         basename=f'export_noid_{triple}_{value}', extension='.dmx',
     )
+
+
+class DataID(config.Data, conf_name='TestID', version=1, uses_id=True):
+    """Simple data type, using IDs."""
+    def __init__(self, value: str) -> None:
+        self.value = value
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, DataID):
+            return self.value == other.value
+        return NotImplemented
+
+    @classmethod
+    def parse_kv1(cls, data: Property, version: int) -> 'DataID':
+        """Parse keyvalues."""
+        return DataID(data['value'])
+
+    def export_kv1(self) -> Property:
+        """Write out KV1 data."""
+        return Property('TestData', [
+            Property('value', self.value),
+        ])
+
+
+def test_write_only_when_dirty(tmp_path) -> None:
+    """Test the file is only written if data changed."""
+    spec = config.ConfigSpec(tmp_path / 'config.vdf')
+    spec.register(DataSingle)
+    spec.register(DataID)
+    data = DataSingle('value', 'a')
+    spec.store_conf(data)
+    spec.store_conf(DataID('first'), 'first')
+    spec.write_file()
+    assert spec.filename.exists()
+
+    spec.filename.write_text('// Replaced\n')
+    spec.write_file()  # Nothing changed, not written.
+    spec.store_conf(data)  # Identical object, not a change.
+    spec.write_file()
+    assert spec.filename.read_text() == '// Replaced\n'
+
+    spec.store_conf(DataID('second'), 'second')
+    spec.write_file()
+    # The unchanged section is still present.
+    conf, upgraded = spec.parse_kv1(Property.parse(spec.filename.read_text()))
+    assert not upgraded
+    assert conf == {
+        DataSingle: {'': data},
+        DataID: {'first': DataID('first'), 'second': DataID('second')},
+    }
+
+
+# Non-default values for every type saved in the main config.
+ROUND_TRIP_DATA: config.Config = config.Config({
+    compile_pane.CompilePaneState: {'': compile_pane.CompilePaneState(
+        sshot_type='CUST',
+        sshot_cleanup=True,
+        sshot_cust=bytes(range(256)) * 4,
+        spawn_elev=True,
+        player_mdl='ATLAS',
+        use_voice_priority=True,
+    )},
+    corridors.Config: {
+        'clean:sp_entry_horizontal': corridors.Config(selected=['a', 'b'], unselected=['c']),
+        'clean:coop_exit_up': corridors.Config(unselected=['d']),
+    },
+    corridors.UIState: {'': corridors.UIState(
+        last_mode=GameMode.COOP,
+        last_direction=Direction.EXIT,
+        last_orient=Orient.UP,
+        width=400,
+        height=300,
+    )},
+    gen_opts.GenOptions: {'': gen_opts.GenOptions(
+        after_export=gen_opts.AfterExport.MINIMISE,
+        launch_after_export=False,
+        play_sounds=False,
+        show_log_win=True,
+        log_win_level='DEBUG',
+        log_win_capacity=1234,
+        log_win_interval=0.5,
+        preserve_resources=True,
+        preserve_fgd=True,
+        dev_mode=True,
+        language='fr',
+    )},
+    last_sel.LastSelected: {
+        'game': last_sel.LastSelected('portal_2'),
+        'styles': last_sel.LastSelected(None),
+    },
+    palette.PaletteState: {'': palette.PaletteState(
+        UUID('a7f3bc1e-2f4d-4b79-9ab0-3d1e4e0e9a55'),
+        True,
+        frozenset({UUID('5bd5a4a1-6a5d-4e8a-b5f3-6c9c2a4a8e11')}),
+    )},
+    signage.Layout: {'': signage.Layout({3: 'SIGN_EXIT', 5: '', 10: 'SIGN_DOT'})},
+    stylevar.State: {
+        'MultiverseCave': stylevar.State(True),
+        'EnableShapeSignageFrame': stylevar.State(False),
+    },
+    widgets.WidgetConfig: {
+        'VALVE_TEST:SingleVar': widgets.WidgetConfig('42'),
+        'VALVE_TEST:Timer': widgets.WidgetConfig({'3': '1', '4': '0', 'inf': '1'}),
+    },
+    windows.SelectorState: {
+        'item': windows.SelectorState({'group_a': True, 'group_b': False}, 320, 240),
+    },
+    windows.WindowState: {
+        'item': windows.WindowState(10, 20, 300, 400, False),
+        'style': windows.WindowState(-5, 12),
+    },
+})
+
+
+def test_round_trip(tmp_path) -> None:
+    """Test every registered type is restored identically from the text file."""
+    assert ROUND_TRIP_DATA.keys() == config.APP._registered, 'Add new types to ROUND_TRIP_DATA.'
+    spec = config.ConfigSpec(tmp_path / 'config.vdf')
+    for cls in ROUND_TRIP_DATA:
+        spec.register(cls)
+    for data_map in ROUND_TRIP_DATA.values():
+        for data_id, data in data_map.items():
+            spec.store_conf(data, data_id)
+    spec.write_file()
+    assert spec.parse_kv1(Property.parse(spec.filename.read_text('utf8'))) == (ROUND_TRIP_DATA, False)
+
+    new_spec = config.ConfigSpec(spec.filename)
+    for cls in ROUND_TRIP_DATA:
+        new_spec.register(cls)
+    new_spec.read_file()
+    assert new_spec._current == ROUND_TRIP_DATA
+
+
+async def test_debounced_write(tmp_path, autojump_clock, monkeypatch) -> None:
+    """Test multiple write requests are combined together."""
+    spec = config.ConfigSpec(tmp_path / 'config.vdf')
+    spec.register(DataSingle)
+    writes = []
+    write_file = config.ConfigSpec.write_file
+
+    def record_write(self: config.ConfigSpec) -> None:
+        """Record the file contents after each write."""
+        write_file(self)
+        writes.append(self.filename.read_text())
+    monkeypatch.setattr(config.ConfigSpec, 'write_file', record_write)
+
+    async with trio.open_nursery() as nursery:
+        nursery.start_soon(spec.write_task, 5.0)
+        for value in ['a', 'b', 'c']:
+            spec.store_conf(DataSingle(value, 'a'))
+            spec.request_write()
+            await trio.sleep(1.0)
+        assert writes == []
+        await trio.sleep(5.0)
+        assert len(writes) == 1
+        assert '"value" "c"' in writes[0]
+        nursery.cancel_scope.cancel()
@@ -0,0 +1,33 @@
+"""Test parsing general options."""
+import pytest
+from srctools import Property as Keyvalues
+from srctools.dmx import Element
+
+from config.gen_opts import GenOptions
+from log_buffer import DEFAULT_CAPACITY, DEFAULT_INTERVAL, LogBuffer
+
+
+@pytest.mark.parametrize('capacity, interval, exp_capacity, exp_interval', [
+    ('500', '0.25', 500, 0.25),
+    ('0', '0', DEFAULT_CAPACITY, DEFAULT_INTERVAL),
+    ('-20', '-1.5', DEFAULT_CAPACITY, DEFAULT_INTERVAL),
+    ('1', 'inf', 1, DEFAULT_INTERVAL),
+    ('many', 'nan', DEFAULT_CAPACITY, DEFAULT_INTERVAL),
+])
+def test_log_window_limits(capacity: str, interval: str, exp_capacity: int, exp_interval: float) -> None:
+    """Invalid log window capacities and intervals are replaced by the defaults."""
+    conf = GenOptions.parse_kv1(Keyvalues('Options', [
+        Keyvalues('log_win_capacity', capacity),
+        Keyvalues('log_win_interval', interval),
+    ]), 2)
+    assert conf.log_win_capacity == exp_capacity
+    assert conf.log_win_interval == exp_interval
+    LogBuffer(conf.log_win_capacity)  # Does not raise.
+
+    elem = Element('Options', 'DMElement')
+    if capacity.lstrip('-').isdigit():
+        elem['log_win_capacity'] = int(capacity)
+    elem['log_win_interval'] = float(interval)
+    conf = GenOptions.parse_dmx(elem, 2)
+    assert conf.log_win_capacity == exp_capacity
+    assert conf.log_win_interval == exp_interval
@@ -0,0 +1,69 @@
+"""Test applying replacement variables to item configs."""
+import pytest
+from srctools import Property
+
+from packages.item import apply_replacements
+
+
+def make_config() -> Property:
+    """Build a config with replacements, and some blocks without any variables."""
+    return Property.root(
+        Property('Replacements', [
+            Property('%name%', 'door'),
+            Property('%Skin%', '2'),
+        ]),
+        Property('Conditions', [
+            Property('Condition', [
+                Property('Instance', '<ITEM_%name%>'),
+                Property('Result', [
+                    Property('setKey', '$skin %skin%'),
+                    Property('Percent', '100%%'),
+                ]),
+            ]),
+            Property('Condition', [
+                Property('Instance', '<ITEM_OTHER>'),
+                Property('Result', [Property('Static', '1')]),
+            ]),
+        ]),
+        Property('Block_%name%', []),
+    )
+
+
+def test_replacements() -> None:
+    """Variables are substituted in names and values, without modifying the original."""
+    conf = make_config()
+    before = ''.join(conf.export())
+    result = apply_replacements(conf, 'ITEM_DOOR')
+    assert ''.join(conf.export()) == before
+    assert ''.join(result.export()) == ''.join(Property.root(
+        Property('Conditions', [
+            Property('Condition', [
+                Property('Instance', '<ITEM_door>'),
+                Property('Result', [
+                    Property('setKey', '$skin 2'),
+                    Property('Percent', '100%'),
+                ]),
+            ]),
+            Property('Condition', [
+                Property('Instance', '<ITEM_OTHER>'),
+                Property('Result', [Property('Static', '1')]),
+            ]),
+        ]),
+        Property('Block_door', []),
+    ).export())
+
+
+def test_unchanged_shared() -> None:
+    """Blocks without any variables are reused, not copied."""
+    conf = make_config()
+    result = apply_replacements(conf, 'ITEM_DOOR')
+    orig_first, orig_second = conf.find_children('Conditions')
+    new_first, new_second = result.find_children('Conditions')
+    assert new_first is not orig_first
+    assert new_second is orig_second
+
+
+def test_unresolved() -> None:
+    """Unknown variables are an error."""
+    with pytest.raises(ValueError, match='missing'):
+        apply_replacements(Property.root(Property('Key', '%missing%')), 'ITEM')
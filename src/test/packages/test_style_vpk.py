@@ -0,0 +1,100 @@
+"""Test incremental StyleVPK exports."""
+from pathlib import Path
+from typing import Dict
+
+from srctools import VPK
+
+from packages.style_vpk import SourceFile, VPKResult, write_vpk
+import packages.style_vpk
+
+
+def make_sources(
+    files: Dict[str, bytes],
+    mtime: int = 1,
+    origin: str = 'pak:vpk/style',
+) -> Dict[str, SourceFile]:
+    """Produce sources from the given data."""
+    return {
+        filename: SourceFile(origin, mtime, lambda data=data: data)
+        for filename, data in files.items()
+    }
+
+
+def read_vpk(folder: Path) -> Dict[str, bytes]:
+    """Read back all files in the VPK."""
+    vpk = VPK(str(folder / 'pak01_dir.vpk'))
+    return {info.filename: info.read() for info in vpk}
+
+
+def test_skip_patch_rebuild(tmp_path: Path, monkeypatch) -> None:
+    """Check each kind of export produces the correct VPK."""
+    # Use tiny archives, so each large file gets its own.
+    monkeypatch.setattr(packages.style_vpk, 'ARCHIVE_SIZE', 2048)
+    files = {
+        f'materials/tile/wall_{i}.vtf': bytes([i]) * 2000
+        for i in range(8)
+    }
+    files['materials/tile/small.vmt'] = b'"LightmappedGeneric" {}'
+
+    assert write_vpk(str(tmp_path), make_sources(files)) is VPKResult.REBUILT
+    assert read_vpk(tmp_path) == files
+    archives = sorted(tmp_path.glob('pak01_0*.vpk'))
+    assert len(archives) == 8
+
+    # Nothing changed.
+    assert write_vpk(str(tmp_path), make_sources(files)) is VPKResult.SKIPPED
+    # Touched, but the contents are identical.
+    assert write_vpk(str(tmp_path), make_sources(files, mtime=2)) is VPKResult.SKIPPED
+    assert read_vpk(tmp_path) == files
+
+    # Change one file, remove another and add a new one. Only affected archives are rewritten.
+    untouched = tmp_path / 'pak01_005.vpk'
+    untouched_mtime = untouched.stat().st_mtime_ns
+    files['materials/tile/wall_2.vtf'] = b'x' * 3000
+    del files['materials/tile/wall_3.vtf']
+    files['materials/tile/new.vtf'] = b'y' * 1500
+    files['materials/tile/small.vmt'] = b'"UnlitGeneric" {}'
+    assert write_vpk(str(tmp_path), make_sources(files, mtime=3)) is VPKResult.PATCHED
+    assert read_vpk(tmp_path) == files
+    assert untouched.stat().st_mtime_ns == untouched_mtime
+
+    # Changing most files rebuilds.
+    files = {name: data + b'!' for name, data in files.items()}
+    assert write_vpk(str(tmp_path), make_sources(files, mtime=4)) is VPKResult.REBUILT
+    assert read_vpk(tmp_path) == files
+
+    # If the VPK is replaced externally, it's rebuilt.
+    (tmp_path / 'pak01_dir.vpk').write_bytes(b'')
+    assert write_vpk(str(tmp_path), make_sources(files, mtime=4)) is VPKResult.REBUILT
+    assert read_vpk(tmp_path) == files
+
+
+def test_origin_changed(tmp_path: Path) -> None:
+    """Files from a different origin are compared by contents, even with the same time."""
+    files = {f'materials/tile/wall_{i}.vtf': bytes([i]) * 2000 for i in range(4)}
+    assert write_vpk(str(tmp_path), make_sources(files)) is VPKResult.REBUILT
+
+    # Identical files in another folder aren't rewritten.
+    assert write_vpk(str(tmp_path), make_sources(files, origin='vpk_override')) is VPKResult.SKIPPED
+    # But a different file with the same time is.
+    files['materials/tile/wall_1.vtf'] = b'x' * 2000
+    assert write_vpk(str(tmp_path), make_sources(files)) is VPKResult.PATCHED
+    assert read_vpk(tmp_path) == files
+
+
+def test_patch_archive_size(tmp_path: Path, monkeypatch) -> None:
+    """Files added when patching are split into archives, like a rebuild."""
+    monkeypatch.setattr(packages.style_vpk, 'ARCHIVE_SIZE', 4096)
+    files = {f'materials/tile/wall_{i}.vtf': bytes([i]) * 2000 for i in range(8)}
+    assert write_vpk(str(tmp_path), make_sources(files)) is VPKResult.REBUILT
+    assert len(list(tmp_path.glob('pak01_0*.vpk'))) == 4
+
+    files['materials/tile/wall_0.vtf'] = b'x' * 2000
+    for i in range(3):
+        files[f'materials/tile/new_{i}.vtf'] = bytes([i]) * 2000
+    assert write_vpk(str(tmp_path), make_sources(files, mtime=2)) is VPKResult.PATCHED
+    assert read_vpk(tmp_path) == files
+    archives = list(tmp_path.glob('pak01_0*.vpk'))
+    assert len(archives) == 6
+    for archive in archives:
+        assert archive.stat().st_size <= 4096
@@ -0,0 +1,99 @@
+"""Test reading puzzle details for the backup window."""
+from io import BytesIO, StringIO
+from zipfile import ZipFile
+
+import pytest
+from srctools import KeyValError
+
+from backup_index import (
+    INDEX_NAME, PuzzleInfo, cached_info, read_header, read_index, read_puzzle, write_index,
+)
+
+PUZZLE = '''\
+"portal2_puzzle"
+{
+    "AppID"     "644"
+    "Version"       "12"
+    "Title"     "{title}"
+    "Description"       "A \\"quoted\\" description"
+    "Timestamp_Created"     "0x0000000060000000"
+    "Timestamp_Modified"        "0x0000000061000000"
+    "Coop"      "{coop}"
+    "Voxels"
+    {
+        "Voxel"
+        {
+            "Position"      "0 0 0"
+        }
+    }
+}
+'''
+
+
+def make_puzzle(title: str, coop: bool = False) -> bytes:
+    """Produce a puzzle file."""
+    return PUZZLE.replace('{title}', title).replace('{coop}', '1' if coop else '0').encode('utf8')
+
+
+def test_read_header() -> None:
+    """The header keys are read, without reading the map data."""
+    # The map data is invalid, which would fail if it was parsed.
+    text = make_puzzle('Test Chamber', coop=True).decode('utf8').replace('"Voxel"', '}}}')
+    assert read_header(StringIO(text), 'puzzles/mymap') == PuzzleInfo(
+        filename='mymap',
+        title='Test Chamber',
+        description='A "quoted" description',
+        is_coop=True,
+        create_time='0x0000000060000000',
+        mod_time='0x0000000061000000',
+    )
+
+    # Missing keys are allowed.
+    info = read_header(StringIO('"portal2_puzzle" { "Title" "Blank" }'), 'blank')
+    assert info == PuzzleInfo('blank', title='Blank')
+
+    with pytest.raises(KeyValError):
+        read_header(StringIO('} "portal2_puzzle" { "Title" "Blank" }'), 'blank')
+
+
+def test_index_round_trip() -> None:
+    """Unchanged puzzles are read from the index, changed ones are reread."""
+    data = BytesIO()
+    with ZipFile(data, 'w') as zip_file:
+        zip_file.writestr('first.p2c', make_puzzle('First'))
+        zip_file.writestr('second.p2c', make_puzzle('Second', coop=True))
+        zip_file.writestr('broken.p2c', b'"portal2_puzzle" { ] }')
+        infos = [read_puzzle(zip_file, name) for name in ['first', 'second', 'broken']]
+        assert infos[2] == PuzzleInfo('broken', failed=True)
+        write_index(zip_file, infos)
+
+    changed = BytesIO()
+    with ZipFile(data, 'r') as zip_file, ZipFile(changed, 'w') as changed_zip:
+        assert INDEX_NAME in zip_file.namelist()
+        index = read_index(zip_file)
+        assert [entry.info for entry in index.values()] == infos
+        for info in infos:
+            assert cached_info(index, zip_file, info.filename) == info
+        # Replace a puzzle but keep the old index, so it is out of date for that.
+        for name in zip_file.namelist():
+            if name == 'first.p2c':
+                changed_zip.writestr(name, make_puzzle('Changed'))
+            else:
+                changed_zip.writestr(name, zip_file.read(name))
+
+    with ZipFile(changed, 'r') as zip_file:
+        index = read_index(zip_file)
+        assert cached_info(index, zip_file, 'first') is None
+        assert cached_info(index, zip_file, 'second') == infos[1]
+        assert read_puzzle(zip_file, 'first').title == 'Changed'
+
+
+def test_no_index() -> None:
+    """Zips without an index, or an invalid one are fine."""
+    data = BytesIO()
+    with ZipFile(data, 'w') as zip_file:
+        zip_file.writestr('first.p2c', make_puzzle('First'))
+    with ZipFile(data, 'a') as zip_file:
+        assert read_index(zip_file) == {}
+        zip_file.writestr(INDEX_NAME, b'"BackupIndex" { "version" "1"')
+        assert read_index(zip_file) == {}
@@ -0,0 +1,63 @@
+"""Test the rectangle/box decomposition engine."""
+import random
+
+import pytest
+
+import box_decomp
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_2d_exact_cover(seed: int) -> None:
+    """Check rectangles exactly cover the grid, without overlaps or mixing values."""
+    rand = random.Random(seed)
+    values = [object() for _ in range(3)]
+    grid = {
+        (x, y): rand.choice(values)
+        for x in range(-4, rand.randint(0, 16))
+        for y in range(2, rand.randint(3, 16))
+        if rand.random() < 0.8
+    }
+    covered = {}
+    for min_x, min_y, max_x, max_y, value in box_decomp.decompose_2d(grid):
+        assert min_x <= max_x and min_y <= max_y
+        for x in range(min_x, max_x + 1):
+            for y in range(min_y, max_y + 1):
+                assert (x, y) not in covered
+                covered[x, y] = value
+    assert covered.keys() == grid.keys()
+    for pos, value in grid.items():
+        assert covered[pos] is value
+
+
+def test_2d_maximal() -> None:
+    """An L shape and a full rectangle need the minimum number of boxes."""
+    grid = {(x, y): True for x in range(10) for y in range(6)}
+    assert list(box_decomp.decompose_2d(grid)) == [(0, 0, 9, 5, True)]
+    grid = {(x, y): True for x in range(3) for y in range(8)}
+    grid.update({(x, y): True for x in range(3, 9) for y in range(2)})
+    assert len(list(box_decomp.decompose_2d(grid))) == 2
+    assert list(box_decomp.decompose_2d({})) == []
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_3d_exact_cover(seed: int) -> None:
+    """Check boxes exactly cover the points, without overlaps."""
+    rand = random.Random(seed)
+    points = {
+        (rand.randint(-2, 5), rand.randint(0, 6), rand.randint(-1, 4))
+        for _ in range(rand.randint(1, 120))
+    }
+    covered = set()
+    for (x1, y1, z1), (x2, y2, z2) in box_decomp.decompose_3d(points):
+        for x in range(x1, x2 + 1):
+            for y in range(y1, y2 + 1):
+                for z in range(z1, z2 + 1):
+                    assert (x, y, z) not in covered
+                    covered.add((x, y, z))
+    assert covered == points
+
+
+def test_3d_single_box() -> None:
+    """A solid cuboid produces one box."""
+    points = [(x, y, z) for x in range(2, 5) for y in range(-3, 1) for z in range(4)]
+    assert list(box_decomp.decompose_3d(points)) == [((2, -3, 0), (4, 0, 3))]
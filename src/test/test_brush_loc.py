@@ -0,0 +1,108 @@
+"""Test the grid of block types."""
+from collections import deque
+from typing import Dict, Iterable, Tuple
+import itertools
+
+import pytest
+from srctools import Vec
+
+from precomp.brushLoc import Block, Grid
+from user_errors import UserError
+
+
+def reference_fill(grid: Grid, search_locs: Iterable[Tuple[Vec, bool]]) -> None:
+    """The original flood fill, which each block is compared against."""
+    queue = deque(search_locs)
+    goo_fillable = [
+        Block.AIR, Block.OCCUPIED,
+        Block.PIT_BOTTOM, Block.PIT_MID, Block.PIT_TOP, Block.PIT_SINGLE,
+    ]
+    while queue:
+        pos, is_goo = queue.popleft()
+        if pos in grid and not (is_goo and grid[pos] in goo_fillable):
+            continue
+        if not ((-15, -15, -15) <= pos <= (40, 40, 40)):
+            raise UserError('leak')
+        if is_goo:
+            if grid[pos].is_pit:
+                grid[pos] = Block.from_pitgoo_attr(False, grid[pos].is_top, grid[pos].is_bottom)
+            elif grid[pos.x, pos.y - 1, pos.z].is_solid:
+                grid[pos] = Block.GOO_BOTTOM
+            else:
+                grid[pos] = Block.GOO_MID
+        else:
+            grid[pos] = Block.AIR
+        x, y, z = pos
+        if not is_goo:
+            queue.append((Vec(x, y, z + 1), is_goo))
+        queue.append((Vec(x, y + 1, z), is_goo))
+        queue.append((Vec(x, y - 1, z), is_goo))
+        queue.append((Vec(x + 1, y, z), is_goo))
+        queue.append((Vec(x - 1, y, z), is_goo))
+        queue.append((Vec(x, y, z - 1), is_goo))
+
+
+def make_room(sealed: bool) -> Grid:
+    """Build a room with solid walls, containing a pit, an item and a sealed pocket.
+
+    If not sealed, a hole is made in the wall.
+    """
+    grid = Grid()
+    for pos in itertools.product(range(8), repeat=3):
+        if 0 in pos or 7 in pos:
+            grid[pos] = Block.SOLID
+    # A hollow pillar, whose inside should stay unset.
+    for pos in itertools.product(range(4, 7), range(4, 7), range(1, 4)):
+        grid[pos] = Block.SOLID
+    del grid[5, 5, 2]
+    grid[2, 2, 1] = Block.PIT_BOTTOM
+    grid[2, 2, 2] = Block.PIT_TOP
+    grid[3, 1, 1] = Block.OCCUPIED
+    grid[1, 5, 1] = Block.EMBED
+    if not sealed:
+        del grid[7, 3, 3]
+    return grid
+
+
+def blocks(grid: Grid) -> Dict[Tuple[float, float, float], Block]:
+    """Return all set blocks."""
+    return {pos.as_tuple(): block for pos, block in grid.items()}
+
+
+@pytest.mark.parametrize('seeds', [
+    [(Vec(3, 3, 5), False)],
+    [(Vec(1, 1, 1), True), (Vec(3, 3, 5), False)],
+    [(Vec(3, 3, 5), False), (Vec(2, 2, 2), True), (Vec(1, 1, 1), True)],
+], ids=['air', 'goo_first', 'lockstep'])
+def test_fill_sealed(seeds) -> None:
+    """A sealed room is filled identically to the original algorithm."""
+    grid = make_room(sealed=True)
+    grid.fill_air(seeds)
+    expected = make_room(sealed=True)
+    reference_fill(expected, seeds)
+    assert blocks(grid) == blocks(expected)
+    # The sealed pocket is never reached.
+    assert (5, 5, 2) not in grid
+    assert grid[3, 3, 5] is Block.AIR
+
+
+def test_fill_open() -> None:
+    """A room with a hole leaks."""
+    grid = make_room(sealed=False)
+    with pytest.raises(UserError):
+        grid.fill_air([(Vec(3, 3, 5), False)])
+    with pytest.raises(UserError):
+        reference_fill(make_room(sealed=False), [(Vec(3, 3, 5), False)])
+
+
+def test_set_region() -> None:
+    """Setting a region matches setting each block individually."""
+    grid = make_room(sealed=True)
+    grid.set_region(Vec(1, 2, 3), (3.0, 2, 6), Block.OCCUPIED)
+    expected = make_room(sealed=True)
+    for pos in itertools.product(range(1, 4), range(2, 3), range(3, 7)):
+        expected[pos] = Block.OCCUPIED
+    assert blocks(grid) == blocks(expected)
+
+    with pytest.raises(ValueError):
+        grid.set_region((0, 0, 0), (1, 1, 1), 'AIR')  # type: ignore
@@ -0,0 +1,122 @@
+"""Test attributing the map budget to compiler passes."""
+from pathlib import Path
+import gc
+import json
+import weakref
+
+import pytest
+from srctools import VMF, Output
+
+from precomp import budget
+
+
+def test_attribution() -> None:
+    """Check additions, removals and outputs are attributed to the right pass."""
+    vmf = VMF()
+    inst = vmf.create_ent('func_instance', targetname='inst', file='instances/a.vmf')
+    target = vmf.create_ent('info_target', targetname='target')
+    vmf.add_brush(vmf.make_prism((0, 0, 0), (64, 64, 64)).solid)
+    tracker = budget.start(vmf, 'map')
+
+    # Nothing changed, so nothing is recorded.
+    budget.checkpoint(vmf, 'empty')
+
+    relay = vmf.create_ent('logic_relay', targetname='relay')
+    relay.add_out(Output('OnTrigger', 'target', 'Kill'), Output('OnTrigger', 'inst', 'Trigger'))
+    target.add_out(Output('OnUser1', 'relay', 'Trigger'))
+    vmf.create_ent('info_overlay')
+    vmf.create_ent('comp_relay')  # Removed by the postcompiler.
+    budget.checkpoint(vmf, 'relays')
+
+    door = vmf.create_ent('func_door', targetname='door')
+    door.solids.append(vmf.make_prism((0, 0, 0), (64, 64, 8)).solid)
+    detail = vmf.create_ent('func_detail')
+    detail.solids.append(vmf.make_prism((0, 0, 0), (64, 64, 8)).solid)
+    inst.remove()
+    budget.checkpoint(vmf, 'doors')
+
+    relay.remove()
+    budget.checkpoint(vmf, 'cleanup')
+
+    report = tracker.report()
+    assert report['sources'] == {
+        'map': {'added': {'instance': 1, 'entity': 1, 'brush': 1, 'side': 6}, 'removed': {}},
+        'relays': {'added': {'entity': 1, 'overlay': 1, 'output': 3}, 'removed': {}},
+        'doors': {'added': {'entity': 1, 'brush': 2, 'side': 12}, 'removed': {'instance': 1}},
+        'cleanup': {'added': {}, 'removed': {'entity': 1, 'output': 2}},
+    }
+    assert report['totals'] == {
+        'entity': 2, 'instance': 0, 'overlay': 1,
+        'brush': 3, 'side': 18, 'output': 1,
+    }
+    assert report['warnings'] == []
+
+
+def test_replaced() -> None:
+    """Entities which are removed and replaced in a pass are still attributed to it."""
+    vmf = VMF()
+    old = [vmf.create_ent('info_target') for _ in range(5)]
+    gate = vmf.create_ent('func_instance', file='instances/gate.vmf')
+    tracker = budget.start(vmf, 'map')
+
+    for ent in old:
+        ent.remove()
+    del ent, old
+    for _ in range(5):
+        vmf.create_ent('info_target')
+    # Changing the classname moves it to another category.
+    gate['classname'] = 'logic_auto'
+    budget.checkpoint(vmf, 'churn')
+
+    assert tracker.report()['sources'] == {
+        'map': {'added': {'entity': 5, 'instance': 1}, 'removed': {}},
+        'churn': {'added': {'entity': 6}, 'removed': {'entity': 5, 'instance': 1}},
+    }
+    assert tracker.totals()['entity'] == 6
+    assert tracker.totals()['instance'] == 0
+
+
+def test_untracked() -> None:
+    """Checkpoints are ignored for maps which aren't being tracked."""
+    vmf = VMF()
+    budget.checkpoint(vmf, 'pass')
+    budget.finish(vmf, 'unused.json')  # Does nothing.
+
+
+def test_map_freed() -> None:
+    """A map which is never finished isn't kept alive by its tracker."""
+    vmf = VMF()
+    vmf.create_ent('info_target')
+    budget.start(vmf, 'map')
+    budget.checkpoint(vmf, 'pass')
+    vmf_ref = weakref.ref(vmf)
+    del vmf
+    gc.collect()
+    assert vmf_ref() is None
+    assert len(budget._TRACKERS) == 0
+
+
+def test_report(monkeypatch: pytest.MonkeyPatch, tmp_path: Path, caplog: pytest.LogCaptureFixture) -> None:
+    """Check the report is written, and limits produce warnings."""
+    monkeypatch.setattr(budget, 'LIMITS', {**budget.LIMITS, 'entity': 10})
+    vmf = VMF()
+    budget.start(vmf, 'map')
+    for i in range(3):
+        vmf.create_ent('info_target')
+    budget.checkpoint(vmf, 'small')
+    for i in range(6):
+        vmf.create_ent('info_target')
+    budget.checkpoint(vmf, 'large')
+
+    budget.finish(vmf, str(tmp_path / 'budget.json'))
+    with open(tmp_path / 'budget.json') as f:
+        report = json.load(f)
+    assert report['totals']['entity'] == 9
+    assert report['limits']['entity'] == 10
+    assert report['warnings'] == ['entity']
+    assert report['sources'] == {
+        'small': {'added': {'entity': 3}, 'removed': {}},
+        'large': {'added': {'entity': 6}, 'removed': {}},
+    }
+    assert 'close to the entity limit (9/10)' in caplog.text
+    assert caplog.text.index('- large: 6') < caplog.text.index('- small: 3')
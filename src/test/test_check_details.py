@@ -0,0 +1,143 @@
+"""Test the CheckDetails list, with the widgets replaced."""
+from typing import List, Optional, Tuple
+from unittest.mock import Mock
+
+import pytest
+
+from app import CheckDetails as check_details
+from app.CheckDetails import CheckDetails, Item
+from transtoken import TransToken
+
+SPACING = check_details.ROW_HEIGHT + check_details.ROW_PADDING
+
+
+class FakeRow:
+    """Records the item placed in each row, instead of making widgets."""
+    def __init__(self, master: CheckDetails) -> None:
+        self.item: Optional[Item] = None
+        self.y = -1
+        self.state_var = Mock()
+
+    def place(self, item: Item, check_width: int, head_pos: List[Tuple[int, int]], y: int) -> None:
+        """Display an item."""
+        self.item = item
+        self.y = y
+
+    def hide(self) -> None:
+        """Remove the row."""
+        self.item = None
+
+
+class FakeCanvas:
+    """A canvas scrolled to a position."""
+    def __init__(self, height: int) -> None:
+        self.height = height
+        self.scroll = 0
+
+    def canvasy(self, y: int) -> float:
+        """Convert a window position to the canvas."""
+        return y + self.scroll
+
+    def winfo_height(self) -> int:
+        """The height of the window."""
+        return self.height
+
+
+def make_list(monkeypatch: pytest.MonkeyPatch, items: List[Item], height: int = 100) -> Tuple[CheckDetails, List[str]]:
+    """Construct the list without any widgets, returning it and the events generated."""
+    monkeypatch.setattr(check_details, 'Row', FakeRow)
+    details: CheckDetails = CheckDetails.__new__(CheckDetails)
+    events: List[str] = []
+    details.event_generate = events.append  # type: ignore
+    details.items = []
+    details.rows = []
+    details.sort_ind = None
+    details.rev_sort = False
+    details.headers = [Mock(sorter={}), Mock(sorter={})]
+    details.head_check_var = Mock()
+    details.wid_head_check = Mock()
+    details.wid_canvas = FakeCanvas(height)  # type: ignore
+    details._check_width = 16
+    details._header_sizes = [(0, 100), (100, 100)]
+    details.refresh = lambda _=None: details.render()  # type: ignore
+    details.add_items(*items)
+    return details, events
+
+
+def make_item(name: str, author: str, state: bool = False, locked: bool = False) -> Item:
+    """Make an item with two columns."""
+    return Item(
+        TransToken.untranslated(name), TransToken.untranslated(author),
+        state=state, lock_check=locked,
+    )
+
+
+def test_render_slice(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Only the visible items are placed, reusing the same rows when scrolling."""
+    items = [make_item(f'item_{i:02}', 'author') for i in range(50)]
+    details, _ = make_list(monkeypatch, items, height=100)
+    # 100 pixels fits 5.5 rows, plus one partially visible as it scrolls.
+    visible = -(-100 // SPACING) + 1
+    assert len(details.rows) == visible
+    assert [row.item for row in details.rows] == items[:visible]
+
+    rows = details.rows.copy()
+    details.wid_canvas.scroll = 20 * SPACING + 5
+    details.render()
+    assert details.rows == rows
+    assert [row.item for row in details.rows] == items[20:20 + visible]
+    assert details.rows[0].y == check_details.ROW_PADDING + 20 * SPACING
+
+    # At the end, the rows past the last item are hidden.
+    details.wid_canvas.scroll = check_details.ROW_PADDING + 47 * SPACING
+    details.render()
+    assert [row.item for row in details.rows] == [*items[47:], *[None] * (visible - 3)]
+
+
+def test_sort(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Clicking a header sorts by that column, then reverses."""
+    first = make_item('b', 'z')
+    second = make_item('c', 'x')
+    third = make_item('a', 'y')
+    details, _ = make_list(monkeypatch, [first, second, third])
+
+    details.sort(0, None)
+    assert details.items == [third, first, second]
+    assert details.headers[0].sorter['text'] == check_details.DN_ARROW
+    assert [row.item for row in details.rows] == [third, first, second]
+
+    details.sort(0, None)
+    assert details.items == [second, first, third]
+    assert details.headers[0].sorter['text'] == check_details.UP_ARROW
+
+    details.sort(1, None)
+    assert details.items == [second, third, first]
+    assert details.headers[0].sorter['text'] == ''
+    assert details.headers[1].sorter['text'] == check_details.DN_ARROW
+
+
+def test_toggle_all(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Toggling all changes every unlocked item, including those not visible."""
+    items = [make_item(f'item_{i:02}', 'author') for i in range(20)]
+    locked = make_item('locked', 'author', state=True, locked=True)
+    details, events = make_list(monkeypatch, [*items, locked])
+    assert events[-1] == check_details.EVENT_HAS_CHECKS
+
+    details.head_check_var.get.return_value = True
+    details.toggle_allcheck()
+    assert all(item.state for item in details.items)
+    assert events[-1] == check_details.EVENT_HAS_CHECKS
+    for row in details.rows:
+        row.state_var.set.assert_called_with(True)
+
+    details.head_check_var.get.return_value = False
+    details.toggle_allcheck()
+    assert list(details.checked()) == [locked]
+    assert list(details.unchecked()) == items
+    assert events[-1] == check_details.EVENT_NO_CHECKS
+    for row in details.rows:
+        row.state_var.set.assert_called_with(False)
+
+    # Changing one item updates the header checkbox.
+    items[5].state = True
+    details.wid_head_check.state.assert_called_with(['alternate'])
@@ -0,0 +1,65 @@
+"""Test the cache of styled maps."""
+from configparser import ConfigParser
+from pathlib import Path
+import os
+
+from precomp import compile_cache
+
+
+def make_config(**general: str) -> ConfigParser:
+    """Build a compile.cfg."""
+    config = ConfigParser()
+    config['General'] = general
+    config['Counts'] = {'brush': '42'}
+    return config
+
+
+def test_key(tmp_path: Path, monkeypatch) -> None:
+    """Check which changes affect the key."""
+    monkeypatch.chdir(tmp_path)
+    os.mkdir('bee2')
+    for filename in compile_cache.INPUT_FILES:
+        Path(filename).write_bytes(b'data for ' + filename.encode())
+    Path('map.vmf').write_text('world {}')
+
+    key = compile_cache.compute_key('map.vmf', 'game', make_config(spawn_elev='0'))
+    assert key == compile_cache.compute_key('map.vmf', 'game', make_config(spawn_elev='0'))
+
+    # Counts are written by the compiler, so don't matter.
+    config = make_config(spawn_elev='0')
+    config['Counts']['brush'] = '128'
+    assert compile_cache.compute_key('map.vmf', 'game', config) == key
+
+    assert compile_cache.compute_key('map.vmf', 'game', make_config(spawn_elev='1')) != key
+    assert compile_cache.compute_key('map.vmf', 'other_game', make_config(spawn_elev='0')) != key
+
+    Path('bee2/editor.bin').write_bytes(b'changed')
+    changed = compile_cache.compute_key('map.vmf', 'game', make_config(spawn_elev='0'))
+    assert changed != key
+    Path('map.vmf').write_text('world { "id" "1" }')
+    assert compile_cache.compute_key('map.vmf', 'game', make_config(spawn_elev='0')) not in {key, changed}
+    os.remove('bee2/editor.bin')
+    assert compile_cache.compute_key('map.vmf', 'game', make_config(spawn_elev='0')) not in {key, changed}
+
+
+def test_store_lookup(tmp_path: Path, monkeypatch) -> None:
+    """Check storing, then pruning old entries."""
+    monkeypatch.setattr(compile_cache, 'CACHE_FOLDER', tmp_path / 'cache')
+    monkeypatch.setattr(compile_cache, 'MAX_ENTRIES', 2)
+    styled = tmp_path / 'styled.vmf'
+
+    assert compile_cache.lookup('first') is None
+    for i, key in enumerate(['first', 'second', 'third']):
+        styled.write_text(f'map {key}')
+        compile_cache.store(key, str(styled))
+        # Ensure modification times differ.
+        os.utime(tmp_path / 'cache' / f'{key}.vmf', ns=(i * 10**9, i * 10**9))
+
+    assert compile_cache.lookup('first') is None
+    cached = compile_cache.lookup('second')
+    assert cached is not None and cached.read_text() == 'map second'
+    assert compile_cache.lookup('third') is not None
+
+    compile_cache.discard('third')
+    assert compile_cache.lookup('third') is None
+    compile_cache.discard('missing')
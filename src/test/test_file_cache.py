@@ -0,0 +1,25 @@
+"""Test the least-recently-used file cache."""
+from pathlib import Path
+import os
+
+import file_cache
+
+
+def test_store_prune(tmp_path: Path) -> None:
+    """Only the newest files matching the pattern are kept."""
+    folder = tmp_path / 'cache'
+    for i, name in enumerate(['a_1.bin', 'a_2.bin', 'b_1.bin', 'a_3.bin']):
+        file_cache.store(folder / name, lambda f: f.write(name.encode()), 'a_*.bin', 2)
+        # Ensure modification times differ.
+        os.utime(folder / name, ns=(i * 10**9, i * 10**9))
+    assert sorted(file.name for file in folder.iterdir()) == ['a_2.bin', 'a_3.bin', 'b_1.bin']
+
+    # Looking up a file marks it as used, so it's kept over newer ones.
+    assert file_cache.lookup(folder / 'a_2.bin')
+    assert not file_cache.lookup(folder / 'a_1.bin')
+    file_cache.store(folder / 'a_4.bin', lambda f: f.write(b'data'), 'a_*.bin', 2)
+    assert sorted(file.name for file in folder.iterdir()) == ['a_2.bin', 'a_4.bin', 'b_1.bin']
+
+    file_cache.discard(folder / 'a_4.bin')
+    file_cache.discard(folder / 'missing.bin')
+    assert not file_cache.lookup(folder / 'a_4.bin')
@@ -0,0 +1,122 @@
+"""Test the index of instances."""
+import gc
+import weakref
+
+from srctools import VMF, Vec
+import pytest
+
+from precomp import instance_index
+
+
+def test_by_file() -> None:
+    """Instances are found as they're added, removed and changed."""
+    vmf = VMF()
+    first = vmf.create_ent('func_instance', file='instances/First.vmf', origin='0 0 0')
+    second = vmf.create_ent('func_instance', file='instances/second.vmf', origin='0 0 0')
+    vmf.create_ent('info_target', file='instances/first.vmf')
+
+    index = instance_index.get(vmf)
+    assert instance_index.get(vmf) is index
+    assert index.by_file(['instances/first.vmf']) == [first]
+    assert index.by_file(['instances/first.vmf', 'instances/second.vmf']) == [first, second]
+    assert index.by_file(['instances/missing.vmf']) == []
+
+    third = vmf.create_ent('func_instance', file='instances/first.vmf', origin='0 0 0')
+    assert index.by_file(['instances/first.vmf']) == [first, third]
+
+    instance_index.set_file(third, 'instances/second.vmf')
+    assert index.by_file(['instances/first.vmf']) == [first]
+    assert index.by_file(['instances/second.vmf']) == [second, third]
+
+    first.remove()
+    assert index.by_file(['instances/first.vmf']) == []
+    assert index.examined == 4
+
+
+def test_by_item(monkeypatch) -> None:
+    """Instances can be found by their item ID."""
+    monkeypatch.setattr(instance_index, 'ITEM_FOR_FILE', {
+        'instances/button_a.vmf': ('ITEM_BUTTON', 0),
+        'instances/button_b.vmf': ('ITEM_BUTTON', 1),
+        'instances/cube.vmf': ('ITEM_CUBE', 0),
+    })
+    vmf = VMF()
+    button = vmf.create_ent('func_instance', file='instances/button_a.vmf')
+    cube = vmf.create_ent('func_instance', file='instances/Cube.vmf')
+    vmf.create_ent('func_instance', file='instances/other.vmf')
+
+    index = instance_index.get(vmf)
+    assert index.by_item('item_button') == [button]
+    assert index.by_item('ITEM_CUBE') == [cube]
+    assert index.by_item('ITEM_MISSING') == []
+
+    instance_index.set_file(cube, 'instances/button_b.vmf')
+    assert index.by_item('ITEM_BUTTON') == [button, cube]
+    assert index.by_item('ITEM_CUBE') == []
+
+
+def test_at() -> None:
+    """Instances can be found by their origin, rounded to the nearest unit."""
+    vmf = VMF()
+    first = vmf.create_ent('func_instance', file='instances/a.vmf', origin='64 0 128')
+    second = vmf.create_ent('func_instance', file='instances/b.vmf', origin='64.01 0 127.99')
+    third = vmf.create_ent('func_instance', file='instances/c.vmf', origin='0 0 0')
+
+    index = instance_index.get(vmf)
+    assert index.at(Vec(64, 0, 128)) == [first, second]
+    assert index.at(Vec(0, 0, 0)) == [third]
+    assert index.at(Vec(0, 0, 64)) == []
+
+    instance_index.set_origin(third, Vec(64, 0, 128))
+    assert index.at(Vec(64, 0, 128)) == [first, second, third]
+    assert index.at(Vec(0, 0, 0)) == []
+
+
+def test_check() -> None:
+    """Instances changed without using the index are reported."""
+    vmf = VMF()
+    inst = vmf.create_ent('func_instance', targetname='inst', file='instances/a.vmf', origin='0 0 0')
+    instance_index.check(vmf, 'Unindexed')  # Not built yet, nothing to check.
+    index = instance_index.get(vmf)
+    assert index.by_file(['instances/a.vmf']) == [inst]
+    instance_index.check(vmf, 'Condition')
+
+    inst['file'] = 'instances/b.vmf'
+    # Never returned under the old value.
+    assert index.by_file(['instances/a.vmf']) == []
+    inst['origin'] = '0 0 64'
+    # Positions aren't indexed until they're first used, so this doesn't matter yet.
+    instance_index.check(vmf, 'Condition')
+    instance_index.set_origin(inst, '0 0 0')
+    assert index.at(Vec(0, 0, 0)) == [inst]
+    inst['origin'] = '0 0 64'
+    with pytest.raises(ValueError, match='Condition "moved"'):
+        instance_index.check(vmf, 'Condition "moved"')
+
+    instance_index.set_origin(inst, '0 0 64')
+    instance_index.check(vmf, 'Condition')
+    inst.remove()
+    instance_index.check(vmf, 'Condition')
+
+
+def test_set_file_new_value() -> None:
+    """Instances re-filed with set_file() are found under the new filename immediately."""
+    vmf = VMF()
+    inst = vmf.create_ent('func_instance', file='instances/old.vmf')
+    index = instance_index.get(vmf)
+    assert index.by_file(['instances/old.vmf']) == [inst]
+
+    instance_index.set_file(inst, 'instances/New.vmf')
+    assert index.by_file(['instances/new.vmf']) == [inst]
+    assert index.by_file(['instances/old.vmf']) == []
+
+
+def test_map_freed() -> None:
+    """The index does not keep its map alive."""
+    vmf = VMF()
+    vmf.create_ent('func_instance', file='instances/a.vmf')
+    assert len(instance_index.get(vmf).by_file(['instances/a.vmf'])) == 1
+    vmf_ref = weakref.ref(vmf)
+    del vmf
+    gc.collect()
+    assert vmf_ref() is None
@@ -0,0 +1,138 @@
+"""Test resolving instance lookups."""
+from typing import Dict, List
+
+import pytest
+
+from editoritems import InstCount, Item
+from precomp import instanceLocs
+
+
+def make_item(item_id: str, instances: List[str], cust: Dict[str, str]=None) -> Item:
+    """Create an item using the specified instances."""
+    return Item(
+        item_id,
+        instances=[InstCount(inst) for inst in instances],
+        cust_instances=dict(cust or {}),
+    )
+
+
+@pytest.fixture(autouse=True)
+def isolate_instances(monkeypatch) -> None:
+    """Use empty tables of instances, and clear the caches before and after."""
+    monkeypatch.setattr(instanceLocs, 'INSTANCE_FILES', {})
+    monkeypatch.setattr(instanceLocs, 'ITEM_FOR_FILE', {})
+    monkeypatch.setattr(instanceLocs, 'CUST_INST_FILES', instanceLocs.defaultdict(dict))
+    monkeypatch.setattr(instanceLocs, 'INST_SPECIAL', {})
+    instanceLocs._clear_caches()
+    yield
+    instanceLocs._clear_caches()
+
+
+def load_items() -> None:
+    """Load a few sample items."""
+    instanceLocs.load_conf([
+        make_item('ITEM_CUBE', [
+            'instances/cube/Standard.vmf',
+            'instances/cube/companion.vmf',
+            'instances/cube/reflect.vmf',
+            '',
+        ], {'dropper': 'instances/cube/Dropper.vmf'}),
+        make_item('ITEM_BARRIER', [f'instances/glass_{i}.vmf' for i in range(7)]),
+    ])
+
+
+def test_resolve() -> None:
+    """Test resolving item lookups."""
+    load_items()
+    assert instanceLocs.resolve('<ITEM_CUBE>') == [
+        'instances/cube/standard.vmf',
+        'instances/cube/companion.vmf',
+        'instances/cube/reflect.vmf',
+    ]
+    assert instanceLocs.resolve('<item_cube:0,2>') == [
+        'instances/cube/standard.vmf',
+        'instances/cube/reflect.vmf',
+    ]
+    assert instanceLocs.resolve('<ITEM_CUBE:companion, bee2_dropper>') == [
+        'instances/cube/companion.vmf',
+        'instances/cube/dropper.vmf',
+    ]
+    # Out of range indexes and unknown custom instances are skipped.
+    assert instanceLocs.resolve('<ITEM_CUBE:1, 8, bee2_missing>') == ['instances/cube/companion.vmf']
+    assert instanceLocs.resolve('<ITEM_CUBE:reflect>, <ITEM_BARRIER:3>') == [
+        'instances/cube/reflect.vmf',
+        'instances/glass_3.vmf',
+    ]
+    assert instanceLocs.resolve('instances/Raw/Path.vmf') == ['instances/raw/path.vmf']
+    assert instanceLocs.resolve('<ITEM_MISSING>', silent=True) == []
+    assert instanceLocs.resolve('<ITEM_CUBE:a:b>', silent=True) == []
+
+
+def test_resolve_special() -> None:
+    """Test [special] names, which are defined in terms of item lookups."""
+    load_items()
+    assert instanceLocs.resolve('[glass_128]') == ['instances/glass_0.vmf']
+    assert instanceLocs.resolve('[Glass_Left_Corner], <ITEM_CUBE:0>') == [
+        'instances/glass_1.vmf',
+        'instances/cube/standard.vmf',
+    ]
+    assert instanceLocs.resolve('[not_a_special]', silent=True) == []
+
+
+def test_resolve_copies() -> None:
+    """The cached result cannot be modified via resolve()."""
+    load_items()
+    first = instanceLocs.resolve('<ITEM_CUBE>')
+    first.clear()
+    assert len(instanceLocs.resolve('<ITEM_CUBE>')) == 3
+
+
+def test_resolve_filter() -> None:
+    """Test the set form is cached, and matches resolve()."""
+    load_items()
+    files = instanceLocs.resolve_filter('<ITEM_CUBE:0, bee2_dropper>, [glass_128]')
+    assert files == {
+        'instances/cube/standard.vmf',
+        'instances/cube/dropper.vmf',
+        'instances/glass_0.vmf',
+    }
+    assert isinstance(files, frozenset)
+    assert instanceLocs.resolve_filter('<ITEM_CUBE:0, bee2_dropper>, [glass_128]') is files
+    assert instanceLocs.resolve_filter('<ITEM_MISSING>', silent=True) == frozenset()
+
+
+def test_parse_lookup() -> None:
+    """Parsing is cached, and independent of the loaded items."""
+    lookup = '<ITEM_CUBE:cube_black, bee2_Dropper, 4>, [spExitCorridor]'
+    parsed = instanceLocs._parse_lookup(lookup)
+    assert parsed == (
+        instanceLocs.ItemLookup('item_cube', (3, 'dropper', 4)),
+        'spexitcorridor',
+    )
+    load_items()
+    hits = instanceLocs._parse_lookup.cache_info().hits
+    assert instanceLocs._parse_lookup(lookup) is parsed
+    assert instanceLocs._parse_lookup.cache_info().hits == hits + 1
+
+    assert instanceLocs._parse_lookup('<ITEM_CUBE:btn_white>') == (
+        instanceLocs.ItemLookup('item_cube', (0, 2, 4)),
+    )
+    assert instanceLocs._parse_lookup('<ITEM_CUBE>') == (instanceLocs.ItemLookup('item_cube', None), )
+    assert instanceLocs._parse_lookup('instances/raw.vmf') == ()
+    assert instanceLocs._parse_lookup('<ITEM_CUBE:a:b>') is None
+    with pytest.raises(Exception, match='not a valid instance'):
+        instanceLocs._parse_lookup('<ITEM_CUBE:not_a_subitem>')
+
+
+def test_reload_clears_cache() -> None:
+    """Loading new items discards previously resolved lookups."""
+    load_items()
+    assert instanceLocs.resolve('<ITEM_CUBE:0>') == ['instances/cube/standard.vmf']
+    assert instanceLocs.resolve_filter('[glass_128]') == {'instances/glass_0.vmf'}
+
+    instanceLocs.load_conf([
+        make_item('ITEM_CUBE', ['instances/new_cube.vmf']),
+        make_item('ITEM_BARRIER', ['instances/new_glass.vmf']),
+    ])
+    assert instanceLocs.resolve('<ITEM_CUBE:0>') == ['instances/new_cube.vmf']
+    assert instanceLocs.resolve_filter('[glass_128]') == {'instances/new_glass.vmf'}
@@ -0,0 +1,222 @@
+"""Test optimising the graph of logic gates between items."""
+from __future__ import annotations
+from typing import Dict, Iterator, List, Tuple
+import itertools
+import random
+
+import pytest
+from srctools import VMF, Output
+
+from connections import Config, ConnType, InputType
+# This needs to be imported first to avoid a circular import.
+from precomp import template_brush  # noqa: F401
+from precomp import connections
+from precomp.antlines import AntType
+from precomp.connections import Connection, Item
+import consts
+
+
+BUTTON = Config(
+    'BUTTON',
+    output_act=('button', 'OnPressed'),
+    output_deact=('button', 'OnUnPressed'),
+)
+DOOR = Config(
+    'DOOR',
+    input_type=InputType.AND,
+    enable_cmd=[Output('', 'door', 'Open')],
+    disable_cmd=[Output('', 'door', 'Close')],
+)
+AND_GATE = Config('AND', input_type=InputType.AND_LOGIC)
+OR_GATE = Config('OR', input_type=InputType.OR_LOGIC)
+# An inverted gate, which mustn't be merged.
+NAND_GATE = Config('NAND', input_type=InputType.AND_LOGIC, invert_var='1')
+GATES = [AND_GATE, OR_GATE]
+
+
+@pytest.fixture(autouse=True)
+def clear_items() -> Iterator[None]:
+    """Reset the global item list between tests."""
+    connections.ITEMS.clear()
+    yield
+    connections.ITEMS.clear()
+
+
+def make_item(vmf: VMF, name: str, config: Config) -> Item:
+    """Create an item."""
+    item = connections.ITEMS[name] = Item(
+        vmf.create_ent('func_instance', targetname=name, file=f'instances/{config.id}.vmf'),
+        config,
+        ant_floor_style=AntType.default(),
+        ant_wall_style=AntType.default(),
+    )
+    return item
+
+
+def connect(from_item: Item, to_item: Item) -> None:
+    """Connect two items."""
+    Connection(to_item, from_item, ConnType.PRIMARY).add()
+
+
+def evaluate(buttons: Dict[str, bool]) -> Dict[str, bool]:
+    """Compute the state of each door, given the state of the buttons."""
+    states: Dict[str, bool] = {}
+
+    def state(item: Item) -> bool:
+        """Compute the state of an item."""
+        try:
+            return states[item.name]
+        except KeyError:
+            pass
+        if item.config is BUTTON:
+            res = buttons[item.name]
+        else:
+            inputs = [state(conn.from_item) for conn in item.inputs]
+            if item.config is OR_GATE:
+                res = any(inputs)
+            else:
+                res = all(inputs)
+            if item.config is NAND_GATE:
+                res = not res
+        states[item.name] = res
+        return res
+
+    return {
+        item.name: state(item)
+        for item in connections.ITEMS.values()
+        if item.config is DOOR
+    }
+
+
+def truth_table(names: List[str]) -> List[Dict[str, bool]]:
+    """Compute the state of every door for every combination of buttons."""
+    return [
+        evaluate(dict(zip(names, values)))
+        for values in itertools.product([False, True], repeat=len(names))
+    ]
+
+
+def generate_io(vmf: VMF) -> Tuple[int, int]:
+    """Generate the inputs for every item, then count the entities and outputs produced."""
+    for item in connections.ITEMS.values():
+        connections.add_item_inputs(
+            [], item, item.config.input_type, list(item.inputs),
+            consts.FixupVars.CONN_COUNT,
+            item.enable_cmd, item.disable_cmd,
+            item.config.invert_var, item.config.spawn_fire, '_inv_rl',
+        )
+    ents = list(vmf.entities)
+    return len(ents), sum(len(ent.outputs) for ent in ents)
+
+
+def make_random_map(seed: int) -> Tuple[VMF, List[str]]:
+    """Generate a map with lots of layered, overlapping logic gates."""
+    rand = random.Random(seed)
+    vmf = VMF()
+    buttons = [make_item(vmf, f'button_{i}', BUTTON) for i in range(5)]
+    layer: List[Item] = list(buttons)
+    for depth in range(3):
+        next_layer = []
+        for i in range(8):
+            gate = make_item(vmf, f'gate_{depth}_{i}', rand.choice(GATES + [NAND_GATE]))
+            for inp in rand.sample(layer, rand.randint(1, 3)):
+                connect(inp, gate)
+            next_layer.append(gate)
+        # Some gates are duplicates of others.
+        for i in range(3):
+            orig = rand.choice(next_layer)
+            dup = make_item(vmf, f'dup_{depth}_{i}', orig.config)
+            for conn in orig.inputs:
+                connect(conn.from_item, dup)
+            next_layer.append(dup)
+        layer = next_layer + rand.sample(buttons, 2)
+    for i, item in enumerate(layer):
+        door = make_item(vmf, f'door_{i}', DOOR)
+        connect(item, door)
+        if rand.random() < 0.5:
+            connect(rand.choice(layer), door)
+    # Gates that don't lead to a door are fine, they still get generated.
+    return vmf, [button.name for button in buttons]
+
+
+def test_merge_equivalent() -> None:
+    """Gates with identical inputs are merged."""
+    vmf = VMF()
+    a = make_item(vmf, 'a', BUTTON)
+    b = make_item(vmf, 'b', BUTTON)
+    gates = [make_item(vmf, f'and_{i}', AND_GATE) for i in range(3)]
+    inverted = make_item(vmf, 'nand', NAND_GATE)
+    for gate in [*gates, inverted]:
+        connect(a, gate)
+        connect(b, gate)
+        connect(gate, make_item(vmf, f'door_{gate.name}', DOOR))
+
+    assert connections.merge_equivalent_gates() == 2
+    assert 'and_0' in connections.ITEMS
+    assert 'and_1' not in connections.ITEMS and 'and_2' not in connections.ITEMS
+    assert 'nand' in connections.ITEMS
+    assert {conn.to_item.name for conn in gates[0].outputs} == {
+        'door_and_0', 'door_and_1', 'door_and_2',
+    }
+    assert not gates[1].inputs and not gates[1].outputs
+    assert len(a.outputs) == 2
+
+
+def test_flatten() -> None:
+    """Gates feeding only into a gate of the same type are merged into it."""
+    vmf = VMF()
+    a, b, c, d = [make_item(vmf, name, BUTTON) for name in 'abcd']
+    inner = make_item(vmf, 'inner', AND_GATE)
+    outer = make_item(vmf, 'outer', AND_GATE)
+    other = make_item(vmf, 'other', OR_GATE)
+    door = make_item(vmf, 'door', DOOR)
+    connect(a, inner)
+    connect(b, inner)
+    connect(inner, outer)
+    connect(c, outer)
+    # Different type, can't be flattened.
+    connect(d, other)
+    connect(c, other)
+    connect(other, outer)
+    connect(outer, door)
+
+    assert connections.flatten_gates() == 1
+    assert 'inner' not in connections.ITEMS
+    assert sorted(conn.from_item.name for conn in outer.inputs) == ['a', 'b', 'c', 'other']
+
+
+def test_no_flatten_observable() -> None:
+    """Gates with indicators or multiple outputs can't be flattened."""
+    vmf = VMF()
+    a, b = make_item(vmf, 'a', BUTTON), make_item(vmf, 'b', BUTTON)
+    fanout = make_item(vmf, 'fanout', OR_GATE)
+    outer = make_item(vmf, 'outer', OR_GATE)
+    connect(a, fanout)
+    connect(b, fanout)
+    connect(fanout, outer)
+    connect(fanout, make_item(vmf, 'door', DOOR))
+    connect(a, outer)
+    assert connections.flatten_gates() == 0
+    # With the second output removed, the panel still shows its state.
+    [door_conn] = [conn for conn in fanout.outputs if conn.to_item.name == 'door']
+    door_conn.remove()
+    fanout.ind_panels.add(vmf.create_ent('func_instance'))
+    assert connections.flatten_gates() == 0
+
+
+@pytest.mark.parametrize('seed', range(8))
+def test_random_maps(seed: int) -> None:
+    """Optimising generated logic-heavy maps preserves behaviour, and reduces the IO."""
+    vmf, buttons = make_random_map(seed)
+    before_table = truth_table(buttons)
+    gate_count = len(connections.ITEMS)
+    ents_before, outputs_before = generate_io(vmf)
+
+    connections.ITEMS.clear()
+    vmf, buttons = make_random_map(seed)
+    connections.do_item_optimisation(vmf)
+    assert truth_table(buttons) == before_table
+    assert len(connections.ITEMS) < gate_count
+    ents_after, outputs_after = generate_io(vmf)
+    assert ents_after < ents_before
+    assert outputs_after < outputs_before
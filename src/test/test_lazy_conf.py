@@ -0,0 +1,116 @@
+"""Test lazily parsing package configs."""
+from pathlib import Path
+from unittest.mock import Mock
+import os
+
+import pytest
+from srctools import Property
+from srctools.filesys import RawFileSystem, VirtualFileSystem
+
+import packages  # Import first, lazy_conf imports this partway through.
+from app import lazy_conf
+import app
+import utils
+
+
+@pytest.fixture(autouse=True)
+def clear_cache(monkeypatch: pytest.MonkeyPatch):
+    """Start with an empty cache, and don't leave entries for other tests."""
+    # In dev mode files are also checked in the background, which needs the app running.
+    monkeypatch.setattr(app, 'background_run', Mock())
+    lazy_conf.clear_cache()
+    yield
+    lazy_conf.clear_cache()
+
+
+@pytest.fixture
+def package(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Register a package, containing a single config file."""
+    (tmp_path / 'conf.cfg').write_text('"Block"\n\t{\n\t"key" "first"\n\t}\n')
+    monkeypatch.setitem(packages.PACKAGE_SYS, 'test_pak', RawFileSystem(str(tmp_path)))
+    return tmp_path / 'conf.cfg'
+
+
+def load(source: str = '') -> lazy_conf.LazyConf:
+    """Make the lazy config for the package file."""
+    return lazy_conf.from_file(utils.PackagePath('test_pak', 'conf.cfg'), source=source)
+
+
+def test_cache_hit(package: Path) -> None:
+    """Files are only parsed once, and callers get their own copy."""
+    conf = load()
+    first = conf()
+    assert lazy_conf.cache_info() == lazy_conf.CacheInfo(hits=0, misses=1, currsize=1)
+    first.find_key('Block')['key'] = 'modified'
+
+    # A different loader for the same file still uses the cache.
+    second = load()()
+    assert second is not first
+    assert second.find_key('Block')['key'] == 'first'
+    assert lazy_conf.cache_info() == lazy_conf.CacheInfo(hits=1, misses=1, currsize=1)
+
+    # The source is applied to the parsed tree, so it's cached separately.
+    load('other')()
+    assert lazy_conf.cache_info() == lazy_conf.CacheInfo(hits=1, misses=2, currsize=2)
+
+
+def test_modified(package: Path) -> None:
+    """If the file's cache key changes, it is parsed again."""
+    conf = load()
+    assert conf().find_key('Block')['key'] == 'first'
+    package.write_text('"Block"\n\t{\n\t"key" "second"\n\t}\n')
+    stat = package.stat()
+    os.utime(package, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert conf().find_key('Block')['key'] == 'second'
+    assert lazy_conf.cache_info() == lazy_conf.CacheInfo(hits=0, misses=2, currsize=1)
+
+
+def test_uncacheable(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Files without a cache key are parsed every time."""
+    monkeypatch.setitem(packages.PACKAGE_SYS, 'test_pak', VirtualFileSystem({
+        'conf.cfg': '"Block"\n\t{\n\t"key" "value"\n\t}\n',
+    }))
+    conf = load()
+    assert conf().find_key('Block')['key'] == 'value'
+    assert conf().find_key('Block')['key'] == 'value'
+    assert lazy_conf.cache_info() == lazy_conf.CacheInfo(hits=0, misses=2, currsize=0)
+
+
+def test_shared(package: Path) -> None:
+    """shared() hands out the cached tree, while calling the config copies it."""
+    conf = load()
+    tree = lazy_conf.shared(conf)
+    assert lazy_conf.shared(conf) is tree
+    copy = conf()
+    assert copy is not tree
+    assert ''.join(copy.export()) == ''.join(tree.export())
+
+    block = Property('Block', [Property('key', 'value')])
+    raw = lazy_conf.raw_prop(block)
+    assert lazy_conf.shared(raw) is block
+    assert raw() is not block
+
+
+def test_clear(package: Path) -> None:
+    """clear_cache() discards parsed files."""
+    conf = load()
+    tree = lazy_conf.shared(conf)
+    lazy_conf.clear_cache()
+    assert lazy_conf.cache_info() == lazy_conf.CacheInfo(hits=0, misses=0, currsize=0)
+    assert lazy_conf.shared(conf) is not tree
+
+
+async def test_cleared_on_reload(package: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Reloading packages discards previously parsed files."""
+    load()()
+    assert lazy_conf.cache_info().currsize == 1
+
+    class NoPackages(Exception):
+        """Raised instead of quitting the app."""
+
+    def no_packages_err(pak_dirs, message) -> None:
+        raise NoPackages
+    monkeypatch.setattr(packages, 'no_packages_err', no_packages_err)
+    with pytest.raises(NoPackages):
+        await packages.load_packages(packages.PackagesSet(), [], Mock())
+    assert lazy_conf.cache_info().currsize == 0
@@ -0,0 +1,72 @@
+"""Test the log window's ring buffer."""
+import tracemalloc
+
+import pytest
+
+from log_buffer import LogBuffer
+
+
+def test_overwrite_oldest() -> None:
+    """When full, the oldest records are discarded and counted."""
+    buf = LogBuffer(3)
+    for i in range(5):
+        buf.push('INFO', f'msg {i}')
+    assert len(buf) == 3
+    assert buf.drain() == ([('INFO', 'msg 2'), ('INFO', 'msg 3'), ('INFO', 'msg 4')], 2)
+    assert len(buf) == 0
+    assert buf.drain() == ([], 0)
+
+
+def test_resize() -> None:
+    """Shrinking keeps the newest records."""
+    buf = LogBuffer(4)
+    for i in range(4):
+        buf.push('DEBUG', str(i))
+    buf.resize(2)
+    assert buf.capacity == 2
+    assert buf.drain() == ([('DEBUG', '2'), ('DEBUG', '3')], 2)
+    buf.resize(10)
+    assert buf.capacity == 10
+    with pytest.raises(ValueError):
+        buf.resize(0)
+    with pytest.raises(ValueError):
+        LogBuffer(-1)
+
+
+def test_flat_under_load() -> None:
+    """Push 100k records, checking memory stays flat and every record is accounted for."""
+    buf = LogBuffer(1000)
+    chunk = 10_000
+    text = 'module.func(): A typical log message with some length to it'
+    sizes = []
+    received = dropped_total = 0
+    tracemalloc.start()
+    try:
+        for batch in range(10):
+            for i in range(chunk):
+                buf.push('INFO', f'{text} {batch * chunk + i:06}')
+            sizes.append(tracemalloc.get_traced_memory()[0])
+            assert len(buf) == 1000
+            # Drain only occasionally, as if the display is falling behind.
+            if batch % 3 == 2:
+                records, dropped = buf.drain()
+                assert len(records) == 1000
+                assert dropped == 3 * chunk - 1000
+                # The newest records are kept, in order.
+                last = (batch + 1) * chunk
+                assert records[0] == ('INFO', f'{text} {last - 1000:06}')
+                assert records[-1] == ('INFO', f'{text} {last - 1:06}')
+                received += len(records)
+                dropped_total += dropped
+                del records  # Don't count these towards the memory used.
+    finally:
+        tracemalloc.stop()
+
+    records, dropped = buf.drain()
+    received += len(records)
+    dropped_total += dropped
+    # Every record pushed was either sent or counted as dropped.
+    assert received + dropped_total == 10 * chunk
+    # Memory use is bounded by the capacity, not the total number of records.
+    # The deque is allocated in blocks, so allow a little variation.
+    assert max(sizes) - min(sizes) < 64 * 1024, sizes
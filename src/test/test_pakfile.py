@@ -0,0 +1,127 @@
+"""Test building the BSP pakfile."""
+from io import BytesIO
+from pathlib import Path
+from typing import Optional
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile
+import struct
+
+import pytest
+from srctools.bsp import BSP, BSP_LUMPS
+from srctools.filesys import FileSystemChain, RawFileSystem
+from srctools.packlist import PackList
+
+from postcomp import pakfile
+
+
+class UnseekableWriter:
+    """A file which can't be seeked, so zipfile writes data descriptors."""
+    def __init__(self) -> None:
+        self.buf = BytesIO()
+
+    def write(self, data: bytes) -> int:
+        """Write to the buffer."""
+        return self.buf.write(data)
+
+    def flush(self) -> None:
+        """Nothing to flush."""
+
+
+def make_bsp(path: Path, pak_data: Optional[bytes] = None) -> BSP:
+    """Write a BSP containing only a pakfile."""
+    if pak_data is None:
+        buf = BytesIO()
+        with ZipFile(buf, 'w') as zip_file:
+            zip_file.writestr('materials/maps/cubemap.vtf', b'cubemap' * 64, ZIP_DEFLATED)
+            zip_file.writestr('scripts/Replaced.txt', b'old')
+        pak_data = buf.getvalue()
+    lump_data = {
+        BSP_LUMPS.PAKFILE: pak_data,
+        BSP_LUMPS.GAME_LUMP: struct.pack('<i', 0),
+    }
+    offset = 4 + 4 + 16 * len(BSP_LUMPS) + 4
+    headers = []
+    for lump in BSP_LUMPS:
+        data = lump_data.get(lump, b'')
+        headers.append(struct.pack('<iiii', offset, len(data), 0, 0))
+        offset += len(data)
+    with path.open('wb') as f:
+        f.write(struct.pack('<4si', b'VBSP', 21))
+        f.write(b''.join(headers))
+        f.write(struct.pack('<i', 1))
+        for lump in BSP_LUMPS:
+            f.write(lump_data.get(lump, b''))
+    return BSP(path)
+
+
+@pytest.mark.parametrize('spool_size', [pakfile.SPOOL_SIZE, 16], ids=['memory', 'disk'])
+def test_pack(tmp_path: Path, monkeypatch, spool_size: int) -> None:
+    """Pack files, replacing and keeping existing ones."""
+    monkeypatch.setattr(pakfile, 'SPOOL_SIZE', spool_size)
+    bsp = make_bsp(tmp_path / 'map.bsp')
+    content = tmp_path / 'content'
+    (content / 'scripts').mkdir(parents=True)
+    (content / 'scripts' / 'replaced.txt').write_bytes(b'new')
+    (content / 'scripts' / 'added.txt').write_bytes(b'added' * 1024)
+
+    fsys = FileSystemChain(RawFileSystem(str(content)))
+    packlist = PackList(fsys)
+    packlist.pack_file('scripts/replaced.txt')
+    packlist.pack_file('scripts/added.txt')
+    packlist.pack_file('scripts/custom.txt', data=b'custom')
+    packlist.pack_file('scripts/missing.txt')
+
+    with pakfile.spool(bsp) as buf:
+        stats = pakfile.pack_into_bsp(packlist, bsp, buf, dump_loc=tmp_path / 'dump')
+        bsp.save()
+    assert sorted(stats.packed) == ['scripts/added.txt', 'scripts/custom.txt', 'scripts/replaced.txt']
+    assert stats.copied == 1
+
+    with ZipFile(BytesIO(BSP(tmp_path / 'map.bsp').lumps[BSP_LUMPS.PAKFILE].data)) as zip_file:
+        assert zip_file.testzip() is None
+        assert sorted(zip_file.namelist()) == [
+            'materials/maps/cubemap.vtf',
+            'scripts/added.txt',
+            'scripts/custom.txt',
+            'scripts/replaced.txt',
+        ]
+        # Existing files are copied without recompressing.
+        assert zip_file.getinfo('materials/maps/cubemap.vtf').compress_type == ZIP_DEFLATED
+        assert zip_file.read('materials/maps/cubemap.vtf') == b'cubemap' * 64
+        assert zip_file.getinfo('scripts/added.txt').compress_type == ZIP_STORED
+        assert zip_file.read('scripts/added.txt') == b'added' * 1024
+        assert zip_file.read('scripts/replaced.txt') == b'new'
+        assert zip_file.read('scripts/custom.txt') == b'custom'
+
+    assert (tmp_path / 'dump' / 'map' / 'scripts' / 'added.txt').read_bytes() == b'added' * 1024
+    assert (tmp_path / 'dump' / 'map' / 'scripts' / 'custom.txt').read_bytes() == b'custom'
+
+
+def test_copy_flagged(tmp_path: Path) -> None:
+    """Entries with data descriptors or ZIP64 sizes are copied correctly."""
+    writer = UnseekableWriter()
+    with ZipFile(writer, 'w') as zip_file:  # type: ignore[arg-type]
+        zip_file.writestr('scripts/descriptor.txt', b'descriptor' * 64, ZIP_DEFLATED)
+        with zip_file.open('scripts/zip64.txt', 'w', force_zip64=True) as f:
+            f.write(b'zip64' * 64)
+    with ZipFile(writer.buf) as zip_file:
+        assert zip_file.getinfo('scripts/descriptor.txt').flag_bits & pakfile.FLAG_DATA_DESCRIPTOR
+    bsp = make_bsp(tmp_path / 'map.bsp', writer.buf.getvalue())
+
+    packlist = PackList(FileSystemChain())
+    packlist.pack_file('scripts/custom.txt', data=b'custom')
+    with pakfile.spool(bsp) as buf:
+        stats = pakfile.pack_into_bsp(packlist, bsp, buf)
+        bsp.save()
+    assert stats.copied == 2
+
+    with ZipFile(BytesIO(BSP(tmp_path / 'map.bsp').lumps[BSP_LUMPS.PAKFILE].data)) as zip_file:
+        assert zip_file.testzip() is None
+        assert sorted(zip_file.namelist()) == [
+            'scripts/custom.txt',
+            'scripts/descriptor.txt',
+            'scripts/zip64.txt',
+        ]
+        assert zip_file.getinfo('scripts/descriptor.txt').compress_type == ZIP_DEFLATED
+        assert zip_file.read('scripts/descriptor.txt') == b'descriptor' * 64
+        assert zip_file.read('scripts/zip64.txt') == b'zip64' * 64
+        assert zip_file.read('scripts/custom.txt') == b'custom'
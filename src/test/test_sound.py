@@ -0,0 +1,61 @@
+"""Test the cache of decoded sound samples."""
+import os
+from pathlib import Path
+
+from srctools.filesys import RawFileSystem, VirtualFileSystem
+
+from app.sound import SourceCache, _sample_key
+
+
+def test_lru_eviction() -> None:
+    """The least recently used sources are evicted first."""
+    cache = SourceCache(100)
+    cache.add('a', 'source_a', 40)
+    cache.add('b', 'source_b', 40)
+    assert cache.get('a') == 'source_a'  # Now b is the oldest.
+    cache.add('c', 'source_c', 40)
+    assert cache.size == 80
+    assert cache.get('b') is None
+    assert cache.get('a') == 'source_a'
+    assert cache.get('c') == 'source_c'
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_size_limit() -> None:
+    """The total size is kept within the budget."""
+    cache = SourceCache(100)
+    cache.add('huge', 'source_huge', 101)  # Larger than the budget, so not kept.
+    assert cache.get('huge') is None
+    assert cache.size == 0
+
+    cache.add('a', 'source_a', 60)
+    cache.add('a', 'source_a2', 30)  # Replacing doesn't count the old size.
+    assert cache.size == 30
+    assert cache.get('a') == 'source_a2'
+    cache.add('b', 'source_b', 50)
+    cache.budget = 60
+    assert cache.size == 50
+    assert cache.get('a') is None
+    assert cache.get('b') == 'source_b'
+
+    cache.clear()
+    assert cache.size == 0
+    assert cache.get('b') is None
+
+
+def test_sample_key(tmp_path: Path) -> None:
+    """The key changes when the file is modified, and uncacheable files have no key."""
+    sample = tmp_path / 'sample.wav'
+    sample.write_bytes(b'first')
+    fsys = RawFileSystem(str(tmp_path))
+    key = _sample_key(fsys, fsys['sample.wav'])
+    assert key is not None
+    assert _sample_key(fsys, fsys['sample.wav']) == key
+
+    sample.write_bytes(b'second')
+    stat = sample.stat()
+    os.utime(sample, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert _sample_key(fsys, fsys['sample.wav']) not in {key, None}
+
+    virtual = VirtualFileSystem({'sample.wav': b'data'})
+    assert _sample_key(virtual, virtual['sample.wav']) is None
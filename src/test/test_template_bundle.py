@@ -0,0 +1,67 @@
+"""Test the pre-parsed template bundle."""
+from pathlib import Path
+
+from srctools import VMF, Vec
+
+import template_bundle
+
+
+def make_template(temp_id: str) -> VMF:
+    """Build a small template map."""
+    vmf = VMF()
+    vis = vmf.create_visgroup('Extra')
+    world = vmf.make_prism(Vec(0, 0, 0), Vec(64, 64, 64), 'tile/white_wall_tile003a').solid
+    world.visgroup_ids.add(vis.id)
+    vmf.add_brush(world)
+    detail = vmf.create_ent('func_detail')
+    detail.solids.append(vmf.make_prism(Vec(0, 0, 64), Vec(8, 8, 72)).solid)
+    vmf.create_ent('bee2_template_conf', template_id=temp_id, skip_faces='1 2')
+    vmf.create_ent('info_overlay', material='signage/arrow', sides='3').visgroup_ids.add(vis.id)
+    vmf.create_ent('prop_static', model='models/error.mdl')
+    return vmf
+
+
+def test_roundtrip(tmp_path: Path) -> None:
+    """Check templates survive being bundled and read back lazily."""
+    orig = {
+        temp_id: make_template(temp_id)
+        for temp_id in ['FIRST', 'Second']
+    }
+    bundle = tmp_path / 'templates.bin'
+    with bundle.open('wb') as f:
+        template_bundle.write_bundle(f, (
+            (temp_id, template_bundle.vmf_to_element(temp_id, vmf))
+            for temp_id, vmf in orig.items()
+        ))
+
+    reader = template_bundle.BundleReader(str(bundle))
+    try:
+        assert sorted(reader) == ['first', 'second']
+        assert 'SECOND' in reader
+        assert 'third' not in reader
+        for temp_id, vmf in orig.items():
+            result = reader.read_vmf(temp_id)
+            assert [vis.name for vis in result.vis_tree] == ['Extra']
+            [brush] = result.brushes
+            [orig_brush] = vmf.brushes
+            assert brush.id == orig_brush.id
+            assert brush.visgroup_ids == orig_brush.visgroup_ids
+            assert [
+                (side.id, side.mat, side.planes, str(side.uaxis), str(side.vaxis))
+                for side in brush
+            ] == [
+                (side.id, side.mat, side.planes, str(side.uaxis), str(side.vaxis))
+                for side in orig_brush
+            ]
+            [conf] = result.by_class['bee2_template_conf']
+            assert conf['template_id'] == temp_id
+            assert conf['skip_faces'] == '1 2'
+            [detail] = result.by_class['func_detail']
+            assert len(detail.solids) == 1
+            [overlay] = result.by_class['info_overlay']
+            assert overlay['material'] == 'signage/arrow'
+            assert overlay.visgroup_ids == {result.vis_tree[0].id}
+            # Irrelevant entities are stripped.
+            assert not result.by_class['prop_static']
+    finally:
+        reader.close()
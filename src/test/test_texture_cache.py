@@ -0,0 +1,61 @@
+"""Test the cache of generated textures."""
+from pathlib import Path
+from typing import List
+import os
+
+import pytest
+
+import texture_cache
+
+
+@pytest.fixture
+def cache_folder(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Use a temporary cache folder."""
+    folder = tmp_path / 'cache'
+    monkeypatch.setattr(texture_cache, 'CACHE_FOLDER', folder)
+    monkeypatch.setattr(texture_cache, 'MAX_ENTRIES', 2)
+    return folder
+
+
+def test_keys() -> None:
+    """Keys differ for each kind of texture."""
+    first = texture_cache.make_hasher('signage')
+    second = texture_cache.make_hasher('signage')
+    other = texture_cache.make_hasher('cube_colourizer')
+    first.update(b'data')
+    second.update(b'data')
+    other.update(b'data')
+    assert first.hexdigest() == second.hexdigest()
+    assert first.hexdigest() != other.hexdigest()
+
+
+def test_store_lookup(cache_folder: Path) -> None:
+    """Check storing, then pruning old entries of the same kind."""
+    assert texture_cache.lookup('signage', 'first') is None
+    texture_cache.store('other', 'key', b'other texture')
+    for i, key in enumerate(['first', 'second', 'third']):
+        texture_cache.store('signage', key, f'texture {key}'.encode())
+        # Ensure modification times differ.
+        os.utime(cache_folder / f'signage_{key}.vtf', ns=(i * 10**9, i * 10**9))
+
+    assert texture_cache.lookup('signage', 'first') is None
+    assert texture_cache.lookup('signage', 'second') == b'texture second'
+    assert texture_cache.lookup('signage', 'third') == b'texture third'
+    # Other kinds aren't pruned.
+    assert texture_cache.lookup('other', 'key') == b'other texture'
+    assert not list(cache_folder.glob('*.tmp'))
+
+
+def test_cached(cache_folder: Path) -> None:
+    """Textures are only built if not already cached."""
+    built: List[str] = []
+
+    def build(value: str) -> bytes:
+        """Record that we built the texture."""
+        built.append(value)
+        return value.encode()
+
+    assert texture_cache.cached('signage', 'a', lambda: build('a')) == b'a'
+    assert texture_cache.cached('signage', 'a', lambda: build('a2')) == b'a'
+    assert texture_cache.cached('signage', 'b', lambda: build('b')) == b'b'
+    assert built == ['a', 'b']
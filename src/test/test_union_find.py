@@ -0,0 +1,59 @@
+"""Test grouping values into connected components."""
+import pytest
+
+from union_find import UnionFind, grid_components
+
+
+def test_union_find() -> None:
+    """Test merging sets."""
+    sets = UnionFind(['a', 'b', 'c', 'd', 'e'])
+    assert len(sets) == 5
+    assert 'a' in sets and 'z' not in sets
+    assert sets.groups() == [['a'], ['b'], ['c'], ['d'], ['e']]
+
+    sets.union('a', 'c')
+    sets.union('d', 'e')
+    assert sets.same('a', 'c')
+    assert not sets.same('a', 'b')
+    assert sets.find('a') == sets.find('c')
+    assert sets.groups() == [['a', 'c'], ['b'], ['d', 'e']]
+
+    sets.union('e', 'c')
+    sets.union('c', 'a')  # Already merged.
+    # New values are added.
+    sets.union('f', 'b')
+    assert sets.groups() == [['a', 'c', 'd', 'e'], ['b', 'f']]
+    assert len(sets) == 6
+
+    with pytest.raises(KeyError):
+        sets.find('z')
+
+
+def test_long_chain() -> None:
+    """Long chains don't recurse."""
+    sets = UnionFind(range(100_000))
+    for i in range(99_999):
+        sets.union(i + 1, i)
+    [group] = sets.groups()
+    assert len(group) == 100_000
+
+
+def test_grid_components() -> None:
+    """Test grouping grid cells."""
+    cells = [
+        (0, 0, 0), (128, 0, 0), (128, 128, 0),  # L shape.
+        (0, 0, 128),  # Above the first.
+        (512, 0, 0),  # Separate.
+        (640.0, 0.0, 0.0),  # Floats are fine.
+    ]
+    assert grid_components(cells) == [
+        [(0, 0, 0), (128, 0, 0), (128, 128, 0), (0, 0, 128)],
+        [(512, 0, 0), (640.0, 0.0, 0.0)],
+    ]
+    # Only horizontally.
+    assert grid_components(cells, [(128, 0, 0), (0, 128, 0)]) == [
+        [(0, 0, 0), (128, 0, 0), (128, 128, 0)],
+        [(0, 0, 128)],
+        [(512, 0, 0), (640.0, 0.0, 0.0)],
+    ]
+    assert grid_components([]) == []
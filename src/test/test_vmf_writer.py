@@ -0,0 +1,40 @@
+"""Test the streaming VMF writer produces identical output to VMF.export()."""
+import io
+
+from srctools import VMF, Vec
+from srctools.vmf import Output
+
+from precomp import vmf_writer
+
+
+def test_matches_export() -> None:
+    """Check every kind of block is written identically."""
+    vmf = VMF()
+    vis = vmf.create_visgroup('Group')
+    for x in range(4):
+        prism = vmf.make_prism(Vec(128 * x, 0, 0), Vec(128 * x + 128, 128, 4), 'tile/white_wall_tile003a')
+        prism.solid.visgroup_ids.add(vis.id)
+        vmf.add_brush(prism.solid)
+    hidden = vmf.make_prism(Vec(0, 0, 0), Vec(8, 8, 8)).solid
+    hidden.hidden = True
+    vmf.add_brush(hidden)
+
+    detail = vmf.create_ent('func_detail')
+    detail.solids.append(vmf.make_prism(Vec(0, 0, 64), Vec(8, 8, 72)).solid)
+    inst = vmf.create_ent('func_instance', targetname='inst', file='instances/a.vmf')
+    inst.fixup['$var'] = 'value'
+    inst.add_out(Output('OnTrigger', 'target', 'Kill', delay=0.5))
+    vmf.create_ent('info_target', targetname='hidden').hidden = True
+    vmf.create_ent('info_null', comments='A comment')
+
+    expected = vmf.export(inc_version=False)
+    buf = io.StringIO()
+    writer = vmf_writer.VMFWriter(buf, chunk_size=256)
+    writer.write_vmf(vmf, inc_version=False)
+    assert buf.getvalue() == expected
+    assert writer.written == len(expected)
+
+    # Check the version is incremented the same way.
+    buf = io.StringIO()
+    vmf_writer.export(vmf, buf)
+    assert buf.getvalue() == vmf.export(inc_version=False)
@@ -0,0 +1,77 @@
+"""Cache textures generated during export, so they're only rebuilt if their inputs change.
+
+Each texture is keyed on a hash of everything used to produce it. The encoded VTF is then
+stored on disk, and reused by later exports with the same key.
+"""
+from __future__ import annotations
+from pathlib import Path
+from typing import Callable, Optional
+import hashlib
+import time
+
+import srctools.logger
+
+import file_cache
+import utils
+
+
+__all__ = ['CACHE_FOLDER', 'make_hasher', 'lookup', 'store', 'cached']
+LOGGER = srctools.logger.get_logger(__name__)
+CACHE_FOLDER = utils.conf_location('cache/textures/')
+# Increment to discard all previously cached textures.
+VERSION = 1
+# The number of textures to keep for each kind.
+MAX_ENTRIES = 4
+
+
+def make_hasher(kind: str) -> hashlib._Hash:
+    """Start computing the key for a kind of texture."""
+    return hashlib.sha256(f'{kind}\n{VERSION}\n{utils.BEE_VERSION}\n'.encode('utf8'))
+
+
+def _path(kind: str, key: str) -> Path:
+    """The location a texture is stored."""
+    return CACHE_FOLDER / f'{kind}_{key}.vtf'
+
+
+def lookup(kind: str, key: str) -> Optional[bytes]:
+    """Return the cached texture for this key, if present."""
+    path = _path(kind, key)
+    if not file_cache.lookup(path):
+        return None
+    try:
+        return path.read_bytes()
+    except FileNotFoundError:  # Removed by another export.
+        return None
+
+
+def store(kind: str, key: str, data: bytes) -> None:
+    """Store a texture, then remove the oldest entries of this kind."""
+    file_cache.store(_path(kind, key), lambda f: f.write(data), f'{kind}_*.vtf', MAX_ENTRIES)
+
+
+def cached(kind: str, key: str, build: Callable[[], bytes]) -> bytes:
+    """Return the cached texture for this key, or build and store it if not present."""
+    start = time.perf_counter()
+    try:
+        data = lookup(kind, key)
+    except OSError:
+        LOGGER.warning('Could not read cached {} texture:', kind, exc_info=True)
+        data = None
+    if data is not None:
+        LOGGER.info(
+            'Reused cached {} texture ({:.1f}ms)',
+            kind, (time.perf_counter() - start) * 1000,
+        )
+        return data
+
+    data = build()
+    LOGGER.info(
+        'Generated {} texture, not cached ({:.1f}ms)',
+        kind, (time.perf_counter() - start) * 1000,
+    )
+    try:
+        store(kind, key, data)
+    except OSError:
+        LOGGER.warning('Could not cache {} texture:', kind, exc_info=True)
+    return data
@@ -0,0 +1,116 @@
+"""Group values into connected components, using a disjoint-set forest.
+
+This is used by the compiler to group contiguous regions of grid cells (glass,
+track platforms) and chains of linked items. Values are mapped to indexes, with
+path halving and union by size so operations are effectively constant time.
+"""
+from __future__ import annotations
+from typing import Dict, Generic, Hashable, Iterable, List, Sequence, Tuple, TypeVar
+
+
+__all__ = ['UnionFind', 'GRID_OFFSETS', 'grid_components']
+T = TypeVar('T', bound=Hashable)
+Cell = Tuple[float, float, float]
+# The positive neighbours of a 128-unit grid cell, checking these for every cell
+# finds all face-adjacent pairs.
+GRID_OFFSETS: Sequence[Cell] = [(128, 0, 0), (0, 128, 0), (0, 0, 128)]
+
+
+class UnionFind(Generic[T]):
+    """Disjoint sets of values, which can be merged together."""
+    def __init__(self, values: Iterable[T] = ()) -> None:
+        self._index: Dict[T, int] = {}
+        self._values: List[T] = []
+        self._parent: List[int] = []
+        self._size: List[int] = []
+        for value in values:
+            self.add(value)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __contains__(self, value: object) -> bool:
+        return value in self._index
+
+    def add(self, value: T) -> None:
+        """Add a value in its own set, if not already present."""
+        if value not in self._index:
+            self._index[value] = len(self._values)
+            self._parent.append(len(self._values))
+            self._size.append(1)
+            self._values.append(value)
+
+    def _root(self, ind: int) -> int:
+        """Find the root index for a set, halving the path as we go."""
+        parent = self._parent
+        while parent[ind] != ind:
+            parent[ind] = parent[parent[ind]]
+            ind = parent[ind]
+        return ind
+
+    def find(self, value: T) -> T:
+        """Return the representative value for the set containing this value."""
+        return self._values[self._root(self._index[value])]
+
+    def union(self, first: T, second: T) -> None:
+        """Merge the sets containing these values, adding them if required."""
+        self.add(first)
+        self.add(second)
+        root_a = self._root(self._index[first])
+        root_b = self._root(self._index[second])
+        if root_a == root_b:
+            return
+        if self._size[root_a] < self._size[root_b]:
+            root_a, root_b = root_b, root_a
+        self._parent[root_b] = root_a
+        self._size[root_a] += self._size[root_b]
+
+    def same(self, first: T, second: T) -> bool:
+        """Check if these values are in the same set."""
+        return self._root(self._index[first]) == self._root(self._index[second])
+
+    def groups(self) -> List[List[T]]:
+        """Return each set, in the order they were added."""
+        by_root: Dict[int, List[T]] = {}
+        for ind, value in enumerate(self._values):
+            by_root.setdefault(self._root(ind), []).append(value)
+        return list(by_root.values())
+
+
+def grid_components(
+    cells: Iterable[Cell],
+    offsets: Iterable[Cell] = GRID_OFFSETS,
+) -> List[List[Cell]]:
+    """Group cells into contiguous regions.
+
+    Cells are neighbours if they're separated by one of the offsets (or the inverse).
+    """
+    index: Dict[Cell, int] = {}
+    for cell in cells:
+        index.setdefault(cell, len(index))
+    offsets = list(offsets)
+    # The same as UnionFind, but inlined since this is used for very large regions.
+    parent = list(range(len(index)))
+    size = [1] * len(index)
+    for (x, y, z), ind_a in index.items():
+        for off_x, off_y, off_z in offsets:
+            ind_b = index.get((x + off_x, y + off_y, z + off_z))
+            if ind_b is None:
+                continue
+            while parent[ind_a] != ind_a:
+                parent[ind_a] = ind_a = parent[parent[ind_a]]
+            while parent[ind_b] != ind_b:
+                parent[ind_b] = ind_b = parent[parent[ind_b]]
+            if ind_a == ind_b:
+                continue
+            if size[ind_a] < size[ind_b]:
+                ind_a, ind_b = ind_b, ind_a
+            parent[ind_b] = ind_a
+            size[ind_a] += size[ind_b]
+
+    by_root: Dict[int, List[Cell]] = {}
+    for cell, ind in index.items():
+        while parent[ind] != ind:
+            parent[ind] = ind = parent[parent[ind]]
+        by_root.setdefault(ind, []).append(cell)
+    return list(by_root.values())
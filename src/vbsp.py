@@ -52,6 +52,9 @@ from precomp import (
     rand,
     cubes,
     errors,
+    vmf_writer,
+    compile_cache,
+    budget,
 )
 import consts
 import editoritems
@@ -116,8 +119,11 @@ async def load_settings() -> Tuple[
                     nursery,
                     Property.parse, file_packlist, 'bee2/pack_list.cfg',
                 )
-                # Load in templates locations.
-                nursery.start_soon(template_brush.load_templates, 'bee2/templates.lst')
+                # Load in templates locations, and the pre-parsed bundle.
+                nursery.start_soon(
+                    template_brush.load_templates,
+                    'bee2/templates.lst', 'bee2/templates.bin',
+                )
     except FileNotFoundError:
         LOGGER.exception(
             'Failed to parse required config file. Recompile the compiler '
@@ -803,7 +809,7 @@ def set_elev_videos(vmf: VMF, info: corridor.Info) -> None:
         LOGGER.warning('Invalid elevator video type!')
         return
 
-    transition_ents = instanceLocs.resolve('[transitionents]')
+    transition_ents = instanceLocs.resolve_filter('[transitionents]')
     for inst in vmf.by_class['func_instance']:
         if inst['file'].casefold() not in transition_ents:
             continue
@@ -1269,8 +1275,8 @@ def fix_worldspawn(vmf: VMF) -> None:
     vmf.spawn['skyname'] = options.get(str, 'skybox')
 
 
-async def find_missing_instances(game: Game, vmf: VMF) -> List[Vec]:
-    """Go through the map, and check for missing instances.
+async def find_missing_instances(game: Game, instances: Iterable[Tuple[str, Vec]]) -> List[Vec]:
+    """Go through the filenames and origins of the map's instances, and check for missing ones.
 
     We don't raise an error immediately, because it could be possible that VBSP checks differently
     and can find them anyway. In that case just let it continue successfully.
@@ -1278,15 +1284,14 @@ async def find_missing_instances(game: Game, vmf: VMF) -> List[Vec]:
     missing: List[Vec] = []
     sdk_content = await trio.Path(game.path / '../sdk_content/maps/').absolute()
 
-    async def check(inst: Entity) -> None:
+    async def check(filename: str, origin: Vec) -> None:
         """See if this file exists."""
-        filename = inst['file']
         if not await (sdk_content / filename).exists():
-            missing.append(Vec.from_str(inst['origin']))
+            missing.append(origin)
 
     async with trio.open_nursery() as nursery:
-        for instance in vmf.by_class['func_instance']:
-            nursery.start_soon(check, instance)
+        for filename, origin in instances:
+            nursery.start_soon(check, filename, origin)
 
     return missing
 
@@ -1318,7 +1323,7 @@ def save(vmf: VMF, path: str) -> None:
     LOGGER.info("Saving New Map...")
     os.makedirs(os.path.dirname(path), exist_ok=True)
     with AtomicWriter(path) as f:
-        vmf.export(dest_file=f, inc_version=True)
+        vmf_writer.export(vmf, f, inc_version=True)
     LOGGER.info("Complete!")
 
 
@@ -1542,6 +1547,7 @@ async def main() -> None:
             '-verbose: A default VBSP command, has the same effect as above.\n'
             '-force_peti: Force enabling map conversion. \n'
             "-force_hammer: Don't convert the map at all.\n"
+            '-force_rebuild: Ignore the cached result from previous compiles.\n'
             '-entity_limit: A default VBSP command, this is inspected to'
             'determine if the map is PeTI or not.'
         )
@@ -1560,11 +1566,16 @@ async def main() -> None:
     game_dir = ''
 
     skip_vbsp = False
+    force_rebuild = False
     for i, a in enumerate(new_args):
         # We need to strip these out, otherwise VBSP will get confused.
         if a == '-force_peti' or a == '-force_hammer':
             new_args[i] = ''
             old_args[i] = ''
+        elif a == '-force_rebuild':
+            force_rebuild = True
+            new_args[i] = ''
+            old_args[i] = ''
         elif a == '-skip_vbsp':  # Debug command, for skipping.
             skip_vbsp = True
         # Strip the entity limit, and the following number
@@ -1605,6 +1616,31 @@ async def main() -> None:
         )
         return
 
+    cache_key: Optional[str] = None
+    if skip_vbsp:
+        pass  # Nothing would be stored.
+    elif force_rebuild or not BEE2_config.get_bool('General', 'compile_cache', True):
+        LOGGER.info('Compile cache: disabled, doing a full rebuild.')
+    else:
+        cache_key = compile_cache.compute_key(path, game_dir, BEE2_config)
+        cached_map = compile_cache.lookup(cache_key)
+        if cached_map is None:
+            LOGGER.info('Compile cache: miss for {}, doing a full rebuild.', cache_key)
+        else:
+            LOGGER.info('Compile cache: hit for {}, skipping straight to VBSP.', cache_key)
+            os.makedirs(os.path.dirname(new_path), exist_ok=True)
+            shutil.copyfile(cached_map, new_path)
+            try:
+                run_vbsp(vbsp_args=new_args, path=path, new_path=new_path)
+            except errors.UserError:
+                # Something outside the map changed, rebuild to produce the error map.
+                LOGGER.warning('Cached map failed to compile, doing a full rebuild.')
+                compile_cache.discard(cache_key)
+                cache_key = None
+            else:
+                LOGGER.info("BEE2 VBSP hook finished!")
+                return
+
     is_publishing = False
     try:
         LOGGER.info("PeTI map detected!")
@@ -1616,6 +1652,7 @@ async def main() -> None:
 
         ant_floor, ant_wall, id_to_item, corridor_conf = res_settings()
         vmf: VMF = vmf_res()
+        budget.start(vmf, 'map')
 
         coll = Collisions()
 
@@ -1631,6 +1668,7 @@ async def main() -> None:
             voice_attrs=settings['has_attr'],
         )
         is_publishing = info.is_publishing
+        budget.checkpoint(vmf, 'corridors')
 
         ant, side_to_antline = antlines.parse_antlines(vmf)
 
@@ -1644,9 +1682,12 @@ async def main() -> None:
             antline_floor=ant_floor,
         )
         change_ents(vmf)
+        budget.checkpoint(vmf, 'connections')
 
         fizzler.parse_map(vmf, info)
+        budget.checkpoint(vmf, 'fizzlers')
         barriers.parse_map(vmf, info)
+        budget.checkpoint(vmf, 'barriers')
         # We have barriers, pass to our error display.
         errors.load_barriers(barriers.BARRIERS)
 
@@ -1658,14 +1699,21 @@ async def main() -> None:
         errors.load_tiledefs(tiling.TILES.values(), brushLoc.POS)
 
         await texturing.setup(game, vmf, list(tiling.TILES.values()))
+        budget.checkpoint(vmf, 'tiling')
 
         conditions.check_all(vmf, coll, info)
         add_extra_ents(vmf, info)
+        budget.checkpoint(vmf, 'extra entities')
 
         tiling.generate_brushes(vmf)
+        budget.checkpoint(vmf, 'tile brushes')
         faithplate.gen_faithplates(vmf)
+        budget.checkpoint(vmf, 'faith plates')
         change_overlays(vmf)
+        budget.checkpoint(vmf, 'overlays')
         fix_worldspawn(vmf)
+        budget.checkpoint(vmf, 'worldspawn')
+        budget.finish(vmf, 'bee2/vbsp_budget.json')
 
         if utils.DEV_MODE:
             coll.dump(vmf, vis_name='collisions')
@@ -1682,13 +1730,23 @@ async def main() -> None:
 
         # Save and run VBSP. If this leaks, this will raise UserError, and we'll compile again.
         if not skip_vbsp:
-            save(vmf, new_path)
+            # Write the map in the background while we check for instances. The writer
+            # changes the map version and worldspawn, so collect the instances first.
+            instances = [
+                (inst['file'], Vec.from_str(inst['origin']))
+                for inst in vmf.by_class['func_instance']
+            ]
+            async with trio.open_nursery() as nursery:
+                nursery.start_soon(trio.to_thread.run_sync, save, vmf, new_path)
+                missing_inst = await find_missing_instances(game, instances)
             run_vbsp(
                 vbsp_args=new_args,
                 path=path,
                 new_path=new_path,
-                maybe_missing_inst=await find_missing_instances(game, vmf),
+                maybe_missing_inst=missing_inst,
             )
+            if cache_key is not None:
+                compile_cache.store(cache_key, new_path)
     except errors.UserError as error:
         # The user did something wrong, so the map is invalid.
         # In preview, compile a special map which displays the message.
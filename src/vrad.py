@@ -9,15 +9,13 @@ LOGGER = init_logging('bee2/vrad.log')
 
 import os
 import sys
-from io import BytesIO
-from zipfile import ZipFile
 from typing import List
 from pathlib import Path
 
 
 import srctools.run
 from srctools import FGD
-from srctools.bsp import BSP, BSP_LUMPS
+from srctools.bsp import BSP
 from srctools.filesys import RawFileSystem, ZipFileSystem, FileSystem
 from srctools.packlist import PackList
 from srctools.game import find_gameinfo
@@ -29,7 +27,7 @@ from hammeraddons import __version__ as version_haddons
 import trio
 
 from BEE2_config import ConfigFile
-from postcomp import music, screenshot
+from postcomp import music, pakfile, screenshot
 # Load our BSP transforms.
 # noinspection PyUnresolvedReferences
 from postcomp import coop_responses, filter, user_error
@@ -195,6 +193,9 @@ async def main(argv: List[str]) -> None:
         run_vrad(full_args)
         return
 
+    # Start the error server now if it isn't running, so it's ready if this or the next compile fails.
+    await user_error.prewarm_server()
+
     # Grab the currently mounted filesystems in P2.
     game = find_gameinfo(argv)
     root_folder = game.path.parent
@@ -206,12 +207,8 @@ async def main(argv: List[str]) -> None:
             fsys.systems.remove(child_sys)
             fsys.systems.insert(0, child_sys)
 
-    zip_data = BytesIO()
-    zip_data.write(bsp_file.get_lump(BSP_LUMPS.PAKFILE))
-    zipfile = ZipFile(zip_data)
-
     # Mount the existing packfile, so the cubemap files are recognised.
-    fsys.add_sys(ZipFileSystem('<BSP pakfile>', zipfile))
+    fsys.add_sys(ZipFileSystem('<BSP pakfile>', bsp_file.pakfile))
 
     LOGGER.info('Done!')
 
@@ -281,26 +278,34 @@ async def main(argv: List[str]) -> None:
     else:
         dump_loc = None
 
-    if '-no_pack' not in args and enable_packing:
-        # Cubemap files packed into the map already.
-        existing = set(bsp_file.pakfile.namelist())
-
-        LOGGER.info('Writing to BSP...')
-        packlist.pack_into_zip(
-            bsp_file,
-            ignore_vpk=True,
-            whitelist=pack_whitelist,
-            blacklist=pack_blacklist,
-            dump_loc=dump_loc,
-        )
+    with pakfile.spool(bsp_file) as pak_buf:
+        if '-no_pack' not in args and enable_packing:
+            # Cubemap files packed into the map already.
+            existing = set(bsp_file.pakfile.namelist())
+
+            LOGGER.info('Writing to BSP...')
+            stats = pakfile.pack_into_bsp(
+                packlist,
+                bsp_file,
+                pak_buf,
+                ignore_vpk=True,
+                whitelist=pack_whitelist,
+                blacklist=pack_blacklist,
+                dump_loc=dump_loc,
+            )
 
-        LOGGER.info('Packed files:\n{}', '\n'.join(
-            set(bsp_file.pakfile.namelist()) - existing
-        ))
+            LOGGER.info('Packed files:\n{}', '\n'.join(
+                set(stats.packed) - existing
+            ))
+            LOGGER.info(
+                'Pakfile: {} packed, {} copied, {:.1f}MB in {:.2f}s ({:.1f}MB/s)',
+                len(stats.packed), stats.copied,
+                stats.size / 1024 / 1024, stats.duration, stats.throughput,
+            )
 
-    LOGGER.info('Writing BSP...')
-    bsp_file.save()
-    LOGGER.info(' - BSP written!')
+        LOGGER.info('Writing BSP...')
+        bsp_file.save()
+        LOGGER.info(' - BSP written!')
 
     screenshot.modify(config, game.path)
 